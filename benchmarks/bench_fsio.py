@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Benchmark of batched filesystem scans against file by file access.
+
+Lays out the markdown of a catalog (a directory per group, a file per
+control) and times the scans the server makes of such directories: listing
+the files with their mtime and size (watches, single-flight keys), reading
+every file (watch digests, content hashes of incremental calls). File by file
+access is ``os.walk`` with a ``stat`` per file and sequential reads, as the
+server did before ``libs/fsio.py``.
+
+High-latency mounts are simulated by adding a delay to every directory
+listing, stat and open, the round trip a network filesystem makes for each.
+
+Usage:
+    python benchmarks/bench_fsio.py [--controls N] [--groups N] [--latency MS]
+"""
+
+import argparse
+import builtins
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.cache import file_key
+
+CONTROL = "---\nx-trestle-global:\n  sort-id: {id}\n---\n\n# {id}\n\n" + "text " * 400
+
+
+class SlowEntry:
+    """Directory entry whose stat takes a round trip."""
+
+    def __init__(self, entry, delay):
+        self._entry = entry
+        self._delay = delay
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def stat(self, follow_symlinks=True):
+        time.sleep(self._delay)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class SlowScandir:
+    def __init__(self, path, delay):
+        time.sleep(delay)
+        self._it = os_scandir(path)
+        self._delay = delay
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return SlowEntry(next(self._it), self._delay)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._it.close()
+
+    def close(self):
+        self._it.close()
+
+
+os_scandir, os_stat, builtin_open = os.scandir, os.stat, builtins.open
+
+
+@contextmanager
+def latency(ms: float):
+    """Add a delay to every listing, stat and open."""
+    if not ms:
+        yield
+        return
+    delay = ms / 1000
+
+    def stat(*args, **kwargs):
+        time.sleep(delay)
+        return os_stat(*args, **kwargs)
+
+    def open_(*args, **kwargs):
+        time.sleep(delay)
+        return builtin_open(*args, **kwargs)
+
+    os.scandir = lambda path=".": SlowScandir(path, delay)
+    os.stat, builtins.open = stat, open_
+    try:
+        yield
+    finally:
+        os.scandir, os.stat, builtins.open = os_scandir, os_stat, builtin_open
+
+
+def walk_keys(directory: Path) -> list:
+    return sorted(
+        filter(
+            None,
+            (
+                file_key(os.path.join(parent, name))
+                for parent, _, names in os.walk(directory)
+                for name in names
+            ),
+        )
+    )
+
+
+def digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def timed(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--controls", type=int, default=1200)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for i in range(args.controls):
+            group = root / f"g{i % args.groups:02d}"
+            group.mkdir(exist_ok=True)
+            (group / f"c-{i}.md").write_text(CONTROL.format(id=f"c-{i}"))
+        paths = [key[0] for key in walk_keys(root)]
+        assert fsio.scan(root) == walk_keys(root)
+
+        print(
+            f"{args.controls} files in {args.groups} directories, "
+            f"{fsio.DEFAULT_WORKERS} I/O threads, median of {args.runs} runs\n"
+        )
+        print(f"{'mount':<12} {'operation':<16} {'file by file':>13} {'batched':>9}")
+        for mount, ms in (("local", 0), (f"+{args.latency:g} ms", args.latency)):
+            cases = [
+                ("list and stat", lambda: walk_keys(root), lambda: fsio.scan(root)),
+                (
+                    "read all",
+                    lambda: [digest(p) for p in paths],
+                    lambda: fsio.map_files(digest, paths),
+                ),
+            ]
+            with latency(ms):
+                for name, before, after in cases:
+                    old, new = timed(before, args.runs), timed(after, args.runs)
+                    print(f"{mount:<12} {name:<16} {old:>10.1f} ms {new:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
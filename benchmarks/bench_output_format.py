@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark of compact against indented JSON models.
+
+Writes a catalog the size of a resolved NIST SP 800-53 catalog as trestle
+does (indented) and as compact JSON, then times the reads the server makes of
+models: the JSON parse of search, the dependency graph and diff, the control
+index scan, and trestle's own parse and validation. Also times rewriting the
+indented file with ``libs/model_format.py``.
+
+Usage:
+    python benchmarks/bench_output_format.py [--scale N] [--runs N]
+
+The test catalog is replicated --scale times.
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+from trestle.oscal.catalog import Catalog
+
+from trestle_mcp.libs import model_format
+from trestle_mcp.libs.model_index import scan_controls
+
+DATA = Path(__file__).parents[1] / "tests" / "data" / "test-catalog.json"
+
+
+def synthetic_catalog(scale: int) -> dict:
+    catalog = json.loads(DATA.read_text())
+    groups = catalog["catalog"]["groups"]
+    replicated = []
+    for i in range(scale):
+        for group in groups:
+            group = copy.deepcopy(group)
+            group["id"] = f"{group['id']}-{i}"
+            replicated.append(group)
+    catalog["catalog"]["groups"] = replicated
+    return catalog
+
+
+def timed(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def json_load(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    model = Catalog.model_validate(synthetic_catalog(args.scale)["catalog"])
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        print(f"{'format':<8} {'MB':>6} {'write ms':>9}")
+        for name, pretty in (("pretty", True), ("compact", False)):
+            path = Path(tmp) / f"{name}.json"
+
+            def write():
+                path.write_bytes(model.oscal_serialize_json_bytes(pretty=pretty))
+
+            elapsed = timed(write, args.runs)
+            files[name] = path
+            print(f"{name:<8} {path.stat().st_size / 1e6:>6.1f} {elapsed:>9.1f}")
+
+        reads = [
+            ("json.load", json_load),
+            ("control index scan", lambda path: scan_controls(path.read_bytes())),
+            ("trestle oscal_read", lambda path: Catalog.oscal_read(path)),
+        ]
+        print(f"\n{'read (median ms)':<20} {'pretty':>8} {'compact':>8} {'saved':>6}")
+        for name, read in reads:
+            pretty, compact = (
+                timed(lambda: read(files[f]), args.runs) for f in ("pretty", "compact")
+            )
+            saved = 1 - compact / pretty
+            print(f"{name:<20} {pretty:>8.1f} {compact:>8.1f} {saved:>6.0%}")
+
+        indented = files["pretty"].read_bytes()
+
+        def rewrite():
+            files["pretty"].write_bytes(indented)
+            model_format.format_model(files["pretty"], "compact")
+
+        copy_only = timed(lambda: files["pretty"].write_bytes(indented), args.runs)
+        print(f"\nrewrite as compact: {timed(rewrite, args.runs) - copy_only:.1f} ms")
+        assert orjson.loads(files["pretty"].read_bytes()) == orjson.loads(indented)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark of compressed storage against uncompressed storage.
+
+Stores an OSCAL catalog with every available codec and measures the stored
+size, the write time, the time to the first chunk of a streaming read, the time
+to parse the whole entry as JSON, and the time to restore it to a file.
+
+Usage:
+    python benchmarks/bench_storage.py [--catalog FILE] [--scale N] [--runs N]
+
+Without --catalog, the test catalog is replicated --scale times to get an
+artifact of realistic size.
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from trestle_mcp.libs.storage import CompressedStore, available_codecs
+
+DATA = Path(__file__).parents[1] / "tests" / "data" / "test-catalog.json"
+
+
+def synthetic_catalog(scale: int) -> bytes:
+    catalog = json.loads(DATA.read_text())
+    groups = catalog["catalog"]["groups"]
+    replicated = []
+    for i in range(scale):
+        for group in groups:
+            group = copy.deepcopy(group)
+            group["id"] = f"{group['id']}-{i}"
+            replicated.append(group)
+    catalog["catalog"]["groups"] = replicated
+    return json.dumps(catalog, indent=2).encode()
+
+
+def timed(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog", type=Path, help="Catalog to store")
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    content = (
+        args.catalog.read_bytes() if args.catalog else synthetic_catalog(args.scale)
+    )
+    print(f"Content: {len(content) / 1e6:.1f} MB, median of {args.runs} runs\n")
+    print(
+        f"{'codec':<6} {'size MB':>8} {'ratio':>6} {'write ms':>9} "
+        f"{'first chunk ms':>15} {'json ms':>8} {'restore ms':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in available_codecs():
+            store = CompressedStore(Path(tmp) / codec, codec)
+            write = timed(lambda: store.write("catalog.json", content), args.runs)
+            size = store.stored_size("catalog.json")
+
+            def first_chunk():
+                with store.open("catalog.json") as f:
+                    f.read(64 * 1024)
+
+            first = timed(first_chunk, args.runs)
+            parse = timed(lambda: store.read_json("catalog.json"), args.runs)
+            restore = timed(
+                lambda: store.copy_to("catalog.json", Path(tmp) / "restored"),
+                args.runs,
+            )
+            print(
+                f"{codec:<6} {size / 1e6:>8.2f} {len(content) / size:>6.1f} "
+                f"{write:>9.1f} {first:>15.2f} {parse:>8.1f} {restore:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark of the parsed YAML cache against parsing on every call.
+
+Loads a YAML catalog, a yaml header and the markdown of many controls with the
+loaders of the trestle CLI (ruamel.yaml safe and round-trip, python-frontmatter),
+with the fast loader, and from the cache of ``libs/yaml_cache.py``, where a hit
+costs a stat and a deep copy.
+
+Usage:
+    python benchmarks/bench_yaml.py [--scale N] [--controls N] [--runs N]
+
+The test catalog is replicated --scale times and written as YAML.
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from ruamel.yaml import YAML
+from trestle.core.markdown.markdown_processor import MarkdownProcessor
+
+from trestle_mcp.libs import yaml_cache
+
+DATA = Path(__file__).parents[1] / "tests" / "data" / "test-catalog.json"
+
+HEADER = """\
+# header inserted at the top of every control
+x-trestle-global:
+  profile:
+    title: Baseline  # shown in every control
+  sort-id: ac-01
+x-trestle-set-params:
+{params}
+"""
+
+PARAM = """\
+  ac-01_odp.{i:02d}:
+    alt-identifier: ac-1_prm_{i}
+    profile-values:
+      - <REPLACE_ME>
+    profile-param-value-origin: <REPLACE_ME>
+"""
+
+
+def synthetic_catalog(scale: int) -> dict:
+    catalog = json.loads(DATA.read_text())
+    groups = catalog["catalog"]["groups"]
+    replicated = []
+    for i in range(scale):
+        for group in groups:
+            group = copy.deepcopy(group)
+            group["id"] = f"{group['id']}-{i}"
+            replicated.append(group)
+    catalog["catalog"]["groups"] = replicated
+    return catalog
+
+
+def timed(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--controls", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        model = tmp / "catalog.yaml"
+        with open(model, "w") as f:
+            YAML(typ="safe").dump(synthetic_catalog(args.scale), f)
+        header = tmp / "header.yaml"
+        header.write_text(
+            HEADER.format(params="".join(PARAM.format(i=i) for i in range(1, 9)))
+        )
+        controls = []
+        for i in range(args.controls):
+            control = tmp / f"ac-{i}.md"
+            control.write_text(f"---\n{header.read_text()}---\n\n# ac-{i}\n")
+            controls.append(control)
+        processor = MarkdownProcessor()
+
+        def read_controls():
+            for control in controls:
+                processor.read_markdown_wo_processing(control)
+
+        def cached_controls():
+            with yaml_cache.cached_frontmatter():
+                read_controls()
+
+        def parse(path, typ=None):
+            with open(path) as f:
+                return YAML(typ=typ).load(f) if typ else YAML().load(f)
+
+        print(
+            f"Catalog: {model.stat().st_size / 1e6:.1f} MB, "
+            f"{args.controls} controls, median of {args.runs} runs\n"
+        )
+        print(f"{'file':<22} {'loader':<14} {'parse ms':>9} {'cached ms':>10}")
+        cases = [
+            ("catalog", model, "safe", lambda: parse(model, "safe")),
+            ("catalog", model, "fast", None),
+            ("yaml header", header, "safe", lambda: parse(header, "safe")),
+            ("yaml header", header, "round-trip", lambda: parse(header)),
+            ("yaml header", header, "fast", None),
+        ]
+        for name, path, loader, current in cases:
+            yaml_cache.clear()
+            first = timed(
+                current or (lambda: yaml_cache._parse(path, loader)), args.runs
+            )
+            shared = loader == "fast"
+            yaml_cache.load_yaml(path, loader)
+            cached = timed(
+                lambda: yaml_cache.load_yaml(path, loader, shared=shared), args.runs
+            )
+            print(f"{name:<22} {loader:<14} {first:>9.2f} {cached:>10.2f}")
+        yaml_cache.clear()
+        first = timed(read_controls, args.runs)
+        cached_controls()
+        cached = timed(cached_controls, args.runs)
+        print(
+            f"{'control frontmatter':<22} {'frontmatter':<14} {first:>9.1f} {cached:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
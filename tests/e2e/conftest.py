@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def restore_cwd():
+    """Restore the working directory tests change into temporary workspaces."""
+    cwd = os.getcwd()
+    yield
+    os.chdir(cwd)
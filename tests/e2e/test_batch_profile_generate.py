@@ -0,0 +1,144 @@
+import importlib
+import json
+import subprocess
+import uuid
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.concurrency import BATCH
+from trestle_mcp.libs.snapshot import SnapshotStore
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.author.profile_generate import (
+    ProfileOutput,
+    TrestleAuthorProfileGenerateBatchInput,
+    trestle_author_profile_generate_batch,
+)
+
+DATA = Path(__file__).parents[1] / "data"
+
+server = importlib.import_module("trestle_mcp.main")
+
+
+def profile(title: str, href: str, ids: list[str]) -> dict:
+    prof = json.loads((DATA / "test-profile.json").read_text())
+    prof["profile"]["uuid"] = str(uuid.uuid4())
+    prof["profile"]["metadata"]["title"] = title
+    prof["profile"]["imports"] = [
+        {"href": href, "include-controls": [{"with-ids": ids}]}
+    ]
+    return prof
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    catalog_dir = tmp_path / "catalogs" / "test"
+    catalog_dir.mkdir(parents=True)
+    (catalog_dir / "catalog.json").write_text((DATA / "test-catalog.json").read_text())
+    profiles = {
+        "low": profile("Low", "trestle://catalogs/test/catalog.json", ["ac-1"]),
+        "high": profile(
+            "High", "trestle://catalogs/test/catalog.json", ["ac-1", "ac-2", "ac-2.1"]
+        ),
+        # overlay on another profile: the shared catalog is imported indirectly
+        "org": profile("Org", "trestle://profiles/high/profile.json", ["ac-2"]),
+    }
+    for name, content in profiles.items():
+        (tmp_path / "profiles" / name).mkdir(parents=True)
+        (tmp_path / "profiles" / name / "profile.json").write_text(json.dumps(content))
+    return tmp_path
+
+
+def read_tree(root: Path) -> dict:
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_output_identical_to_cli(workspace):
+    names = ["low", "high", "org"]
+    for name in names:
+        subprocess.run(
+            [find_trestle_bin(), "author", "profile-generate"]
+            + ["-n", name, "-o", f"cli_{name}"],
+            cwd=workspace,
+            check=True,
+            capture_output=True,
+        )
+
+    result = await trestle_author_profile_generate_batch(
+        TrestleAuthorProfileGenerateBatchInput(
+            profiles=[ProfileOutput(name=n, output=f"batch_{n}") for n in names],
+            trestle_root=str(workspace),
+            workers=2,
+        )
+    )
+    assert "✅" in result
+    assert "Profiles: 3 generated, 0 failed (shared imports: 2" in result
+    for name in names:
+        cli_tree = read_tree(workspace / f"cli_{name}")
+        assert cli_tree
+        assert read_tree(workspace / f"batch_{name}") == cli_tree
+
+    # warm workers reuse the imports they parsed; output must not change
+    await trestle_author_profile_generate_batch(
+        TrestleAuthorProfileGenerateBatchInput(
+            profiles=[ProfileOutput(name="org", output="warm_org")],
+            trestle_root=str(workspace),
+        )
+    )
+    assert read_tree(workspace / "warm_org") == read_tree(workspace / "cli_org")
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_each_failure(workspace):
+    result = await trestle_author_profile_generate_batch(
+        TrestleAuthorProfileGenerateBatchInput(
+            profiles=[
+                ProfileOutput(name="low", output="md_low"),
+                ProfileOutput(name="missing", output="md_missing"),
+            ],
+            trestle_root=str(workspace),
+        )
+    )
+    assert "❌ Failed to generate some profile-based markdowns" in result
+    assert "Profiles: 1 generated, 1 failed" in result
+    assert "✅ low: md_low" in result
+    assert "❌ missing:" in result
+    assert (workspace / "md_low").is_dir()
+
+
+@pytest.mark.asyncio
+async def test_batch_outputs_unshared_from_snapshot(workspace):
+    async def generate():
+        params = TrestleAuthorProfileGenerateBatchInput(
+            profiles=[ProfileOutput(name="high", output="md_high")],
+            trestle_root=str(workspace),
+        )
+        result = await server._call(
+            server.mcp.get_context(),
+            params,
+            trestle_author_profile_generate_batch,
+            BATCH,
+        )
+        assert result.content[0].text.startswith("✅")
+
+    await generate()
+    before = read_tree(workspace / "md_high")
+    store = SnapshotStore(workspace)
+    store.create("before", mode="hardlink")
+    # existing markdown is merged and rewritten in place without force_overwrite
+    await generate()
+
+    report = store.restore("before")
+    assert report["damaged"] == []
+    assert read_tree(workspace / "md_high") == before
@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.forkserver import ForkServer
+from trestle_mcp.libs.trestle import find_trestle_bin
+
+DATA = Path(__file__).parents[1] / "data"
+
+COMMANDS = [
+    ["validate", "-a"],
+    ["validate", "-f", "catalogs/test/catalog.json", "-v"],
+    ["validate", "-f", "catalogs/test/catalog.json", "--unknown"],
+    ["author", "catalog-generate", "-n", "test", "-o", "md_catalog"],
+    ["author", "profile-generate", "-n", "test", "-o", "md_profile"],
+    ["author", "profile-resolve", "-n", "test", "-o", "resolved"],
+    ["author", "profile-generate", "-n", "missing", "-o", "md_profile"],
+    ["import", "-f", "missing.json", "-o", "imported"],
+    ["unknown-command"],
+    ["-h"],
+]
+
+
+# trestle lists some options in usage messages in set order: same seed everywhere
+HASH_SEED = {"PYTHONHASHSEED": "0"}
+
+
+def run(root: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [find_trestle_bin(), *args],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **HASH_SEED},
+    )
+
+
+@pytest.fixture(scope="module")
+def pristine(tmp_path_factory):
+    root = tmp_path_factory.mktemp("pristine")
+    run(root, "init", "--local")
+    (root / "catalogs" / "test").mkdir(parents=True)
+    shutil.copy(DATA / "test-catalog.json", root / "catalogs" / "test" / "catalog.json")
+    profile = json.loads((DATA / "test-profile.json").read_text())
+    profile["profile"]["imports"][0]["href"] = "trestle://catalogs/test/catalog.json"
+    (root / "profiles" / "test").mkdir(parents=True)
+    (root / "profiles" / "test" / "profile.json").write_text(json.dumps(profile))
+    return root
+
+
+@pytest.fixture(scope="module")
+def workspace(pristine, tmp_path_factory):
+    """Workspace whose catalog the fork server preloads, reset by reset()."""
+    return tmp_path_factory.mktemp("forked") / "workspace"
+
+
+def reset(pristine: Path, workspace: Path) -> None:
+    """Copy the pristine workspace, keeping mtimes: preloaded models still match."""
+    shutil.rmtree(workspace, ignore_errors=True)
+    shutil.copytree(pristine, workspace)
+
+
+@pytest.fixture(scope="module")
+def forkserver(pristine, workspace):
+    reset(pristine, workspace)
+    with pytest.MonkeyPatch.context() as m:
+        for name, value in HASH_SEED.items():
+            m.setenv(name, value)
+        server = ForkServer([workspace / "catalogs" / "test" / "catalog.json"])
+        server.start()
+    yield server
+    server.stop()
+
+
+def files(root: Path) -> dict[str, str]:
+    """Return the files of a workspace, without the timestamps of models."""
+    content = {}
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            text = path.read_text()
+            if path.suffix == ".json":
+                model = json.loads(text)
+                # generated for every run
+                root_model = next(iter(model.values()))
+                root_model.pop("uuid", None)
+                root_model.get("metadata", {}).pop("last-modified", None)
+                text = json.dumps(model)
+            content[str(path.relative_to(root))] = text
+    return content
+
+
+@pytest.mark.parametrize("args", COMMANDS, ids=" ".join)
+def test_identical_to_subprocess(pristine, workspace, forkserver, args):
+    """Test that a forked command returns and writes what a new process does."""
+    reset(pristine, workspace)
+    expected = run(workspace, *args)
+    expected_files = files(workspace)
+
+    reset(pristine, workspace)
+    result = forkserver.run([find_trestle_bin(), *args], str(workspace), 60)
+
+    assert result.returncode == expected.returncode
+    assert result.stdout == expected.stdout
+    assert result.stderr == expected.stderr
+    assert files(workspace) == expected_files
+
+
+def test_preloaded_model_changed(pristine, workspace, forkserver):
+    """Test that a preloaded model edited since is read from its file."""
+    reset(pristine, workspace)
+    catalog = workspace / "catalogs" / "test" / "catalog.json"
+    model = json.loads(catalog.read_text())
+    model["catalog"]["groups"][0]["controls"][0]["title"] = "Edited Title"
+    catalog.write_text(json.dumps(model))
+    result = forkserver.run(
+        [find_trestle_bin(), "author", "catalog-generate", "-n", "test", "-o", "md"],
+        str(workspace),
+        60,
+    )
+    assert result.returncode == 0
+    assert "Edited Title" in (workspace / "md" / "ac" / "ac-1.md").read_text()
+
+
+def test_timeout_kills_command(pristine, workspace, forkserver):
+    """Test that a command running past its timeout is killed."""
+    reset(pristine, workspace)
+    with pytest.raises(subprocess.TimeoutExpired):
+        forkserver.run([find_trestle_bin(), "validate", "-a"], str(workspace), 0.001)
+    result = forkserver.run([find_trestle_bin(), "validate", "-a"], str(workspace), 60)
+    assert result.returncode == 0
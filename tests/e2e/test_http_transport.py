@@ -0,0 +1,61 @@
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import pytest
+from fastmcp.client import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+from trestle_mcp.main import mcp
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+@asynccontextmanager
+async def http_server():
+    """Serve the streamable HTTP app in-process without binding a socket."""
+    json_response = mcp.settings.json_response
+    mcp.settings.json_response = True
+    app = mcp.streamable_http_app()
+    try:
+        async with mcp.session_manager.run():
+
+            def client_factory(headers=None, timeout=None, auth=None, **kwargs):
+                return httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app),
+                    base_url=BASE_URL,
+                    headers=headers,
+                    timeout=timeout,
+                    auth=auth,
+                )
+
+            yield lambda: StreamableHttpTransport(
+                f"{BASE_URL}/mcp", httpx_client_factory=client_factory
+            )
+    finally:
+        # The session manager can only run once, so drop it for the next server
+        mcp._session_manager = None
+        mcp.settings.json_response = json_response
+
+
+@pytest.mark.asyncio
+async def test_concurrent_clients_over_http():
+    with tempfile.TemporaryDirectory() as ws_a, tempfile.TemporaryDirectory() as ws_b:
+        async with http_server() as transport:
+
+            async def init(root):
+                async with Client(transport()) as client:
+                    return await client.call_tool(
+                        "trestle_init",
+                        {"params": {"mode": "local", "trestle_root": root}},
+                        raise_on_error=True,
+                    )
+
+            resp_a, resp_b = await asyncio.gather(init(ws_a), init(ws_b))
+
+        assert "✅" in resp_a.content[0].text
+        assert "✅" in resp_b.content[0].text
+        assert Path(ws_a, ".trestle").is_dir()
+        assert Path(ws_b, ".trestle").is_dir()
@@ -0,0 +1,100 @@
+import copy
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs import trestle
+from trestle_mcp.libs.limits import MB, Limits
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.import_ import TrestleImportInput, trestle_import
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    """Test catalog with its groups repeated, about 2 MB."""
+    model = json.loads((DATA / "test-catalog.json").read_text())
+    groups = model["catalog"]["groups"]
+    model["catalog"]["groups"] = []
+    for i in range(40):
+        for group in groups:
+            group = copy.deepcopy(group)
+            group["id"] = f"{group['id']}-{i}"
+            model["catalog"]["groups"].append(group)
+    path = tmp_path_factory.mktemp("big") / "catalog.json"
+    path.write_text(json.dumps(model))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def limited():
+    def configure(runner: str, limits: Limits) -> None:
+        trestle.configure(runner, (), limits)
+
+    yield configure
+    trestle.configure()
+
+
+async def import_catalog(catalog: Path, workspace: Path):
+    return await trestle_import(
+        TrestleImportInput(file=str(catalog), output="big", trestle_root=str(workspace))
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("runner", trestle.RUNNERS)
+async def test_output_limit(runner, catalog, workspace, limited):
+    """Test that a model larger than the output limit is not written."""
+    limited(runner, Limits(output=MB))
+    result = await import_catalog(catalog, workspace)
+
+    assert result.content.status == "error"
+    assert result.content.limit == "output"
+    assert "Resource limit exceeded: output size (1 MB per file)" in result
+    assert not (workspace / "catalogs" / "big" / "catalog.json").exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("runner", trestle.RUNNERS)
+async def test_memory_limit(runner, catalog, workspace, limited):
+    """Test that a command out of memory fails with the memory limit reported."""
+    limited(runner, Limits(memory=100 * MB))
+    result = await import_catalog(catalog, workspace)
+
+    assert result.content.status == "error"
+    assert result.content.limit == "memory"
+
+
+@pytest.mark.asyncio
+async def test_cpu_limit(catalog, workspace, limited):
+    """Test that a command is stopped at its CPU time."""
+    limited("subprocess", Limits(cpu=1))
+    result = await import_catalog(catalog, workspace)
+
+    assert result.content.status == "error"
+    assert result.content.limit == "cpu"
+
+
+@pytest.mark.asyncio
+async def test_within_limits(catalog, workspace, limited):
+    """Test that a command within its limits runs as without them."""
+    limited("subprocess", Limits(memory=2048 * MB, cpu=60, open_files=256))
+    result = await import_catalog(catalog, workspace)
+
+    assert result.content.status == "success"
+    assert result.content.limit is None
+    assert (workspace / "catalogs" / "big" / "catalog.json").exists()
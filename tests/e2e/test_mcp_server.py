@@ -87,6 +87,22 @@ async def test_trestle_catalog_generate_tool():
             assert len(found_markdown) == len(expected)
             actual = {p.name for p in found_markdown}
             assert actual == expected
+            structured = generate_catalog_resp.structured_content
+            assert structured["status"] == "success"
+            assert structured["outputs"] == ["md_catalog_test"]
+            assert structured["counts"]["files"] == len(expected)
+            assert structured["elapsed"] is not None
+
+            # further pages of generated files are listed without generating again
+            page_resp = await call_tool(
+                client,
+                "trestle_author_catalog_generate",
+                {**generate_catalog_params, "limit": 2, "cursor": "2"},
+            )
+            assert page_resp.structured_content["items"] == [
+                {"path": "md_catalog_test/ac/ac-2.2.md"},
+                {"path": "md_catalog_test/ac/ac-2.md"},
+            ]
 
             generate_profile_params = {
                 "name": "test",
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+import orjson
+import pytest
+from fastmcp.client import Client
+from trestle.oscal.catalog import Catalog
+
+from trestle_mcp.main import mcp
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+async def call_tool(client: Client, name: str, params: dict):
+    return await client.call_tool(name, {"params": params}, raise_on_error=True)
+
+
+@pytest.mark.anyio
+async def test_compact_models(tmp_path):
+    """Test that models are written compact on request and read back the same."""
+    os.chdir(tmp_path)
+    async with Client(mcp) as client:
+        await call_tool(client, "trestle_init", {"mode": "local"})
+        for model, output_format in (("catalog", "compact"), ("profile", None)):
+            result = await call_tool(
+                client,
+                "trestle_import",
+                {
+                    "file": str(DATA / f"test-{model}.json"),
+                    "output": "test",
+                    "output_format": output_format,
+                },
+            )
+            assert result.structured_content["status"] == "success"
+
+        catalog = tmp_path / "catalogs" / "test" / "catalog.json"
+        data = catalog.read_bytes()
+        assert b"\n" not in data
+        assert data == Catalog.oscal_read(catalog).oscal_serialize_json_bytes()
+        # the default format leaves models as trestle writes them
+        assert b"\n" in (tmp_path / "profiles" / "test" / "profile.json").read_bytes()
+
+        result = await call_tool(
+            client,
+            "trestle_author_profile_resolve",
+            {"name": "test", "output": "resolved", "output_format": "compact"},
+        )
+        assert result.structured_content["status"] == "success"
+        resolved = tmp_path / "catalogs" / "resolved" / "catalog.json"
+        assert b"\n" not in resolved.read_bytes()
+        assert orjson.loads(resolved.read_bytes())["catalog"]["groups"]
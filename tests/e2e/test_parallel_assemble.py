@@ -0,0 +1,122 @@
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.author.catalog_assemble import (
+    TrestleAuthorCatalogAssembleInput,
+    trestle_author_catalog_assemble,
+)
+from trestle_mcp.services.author.profile_assemble import (
+    TrestleAuthorProfileAssembleInput,
+    trestle_author_profile_assemble,
+)
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+def cli(root: Path, *args: str) -> None:
+    subprocess.run(
+        [find_trestle_bin(), *args], cwd=root, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    cli(tmp_path, "init", "--local")
+    catalog_dir = tmp_path / "catalogs" / "test"
+    catalog_dir.mkdir(parents=True)
+    (catalog_dir / "catalog.json").write_text((DATA / "test-catalog.json").read_text())
+    profile = json.loads((DATA / "test-profile.json").read_text())
+    profile["profile"]["imports"] = [
+        {
+            "href": "trestle://catalogs/test/catalog.json",
+            "include-controls": [{"with-ids": ["ac-1", "ac-2", "ac-2.1", "ac-2.2"]}],
+        }
+    ]
+    (tmp_path / "profiles" / "test").mkdir(parents=True)
+    (tmp_path / "profiles" / "test" / "profile.json").write_text(json.dumps(profile))
+    cli(tmp_path, "author", "profile-generate", "-n", "test", "-o", "md_profile")
+    cli(tmp_path, "author", "catalog-generate", "-n", "test", "-o", "md_catalog")
+    # additions made by the profile, one per control
+    for path in (tmp_path / "md_profile").rglob("*.md"):
+        path.write_text(
+            path.read_text() + f"\n## Control notes\n\nNotes on {path.stem}.\n"
+        )
+    return tmp_path
+
+
+def load(path: Path) -> dict:
+    """Load a model without its last-modified timestamp."""
+    model = json.loads(path.read_text())
+    next(iter(model.values()))["metadata"].pop("last-modified")
+    return model
+
+
+@pytest.mark.asyncio
+async def test_profile_identical_to_cli(workspace):
+    cli(
+        workspace,
+        *("author", "profile-assemble", "-n", "test", "-m", "md_profile"),
+        *("-o", "cli", "-sp"),
+    )
+    expected = load(workspace / "profiles/cli/profile.json")
+    assert "Notes on ac-2.1." in json.dumps(expected)
+
+    for workers in (1, 3):
+        result = await trestle_author_profile_assemble(
+            TrestleAuthorProfileAssembleInput(
+                markdown_dir="md_profile",
+                output_profile=f"parallel{workers}",
+                name="test",
+                set_parameters=True,
+                trestle_root=str(workspace),
+                workers=workers,
+            )
+        )
+        assert "✅" in result
+        assert result.content.counts["controls"] == 4
+        assert load(workspace / f"profiles/parallel{workers}/profile.json") == expected
+
+
+@pytest.mark.asyncio
+async def test_catalog_identical_to_cli(workspace):
+    path = workspace / "md_catalog" / "ac" / "ac-1.md"
+    path.write_text(path.read_text().replace("Access control policy", "AC policy"))
+    cli(
+        workspace,
+        *("author", "catalog-assemble", "-n", "test", "-m", "md_catalog", "-o", "cli"),
+    )
+    expected = load(workspace / "catalogs/cli/catalog.json")
+    assert "AC policy" in json.dumps(expected)
+
+    for workers in (1, 3):
+        result = await trestle_author_catalog_assemble(
+            TrestleAuthorCatalogAssembleInput(
+                markdown_dir="md_catalog",
+                output_catalog=f"parallel{workers}",
+                name="test",
+                trestle_root=str(workspace),
+                workers=workers,
+            )
+        )
+        assert "✅" in result
+        assert load(workspace / f"catalogs/parallel{workers}/catalog.json") == expected
+
+
+@pytest.mark.asyncio
+async def test_markdown_errors_reported(workspace):
+    path = workspace / "md_catalog" / "ac" / "ac-2.md"
+    path.write_text("no control title\n")
+    result = await trestle_author_catalog_assemble(
+        TrestleAuthorCatalogAssembleInput(
+            markdown_dir="md_catalog",
+            output_catalog="broken",
+            trestle_root=str(workspace),
+            workers=2,
+        )
+    )
+    assert "❌" in result
+    assert "ac-2.md" in result.content.error
@@ -0,0 +1,86 @@
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.author.catalog_generate import (
+    TrestleCatalogGenerateInput,
+    trestle_catalog_generate,
+)
+
+TEST_CATALOG = Path(__file__).parents[1] / "data" / "test-catalog.json"
+
+
+def multi_group_catalog() -> dict:
+    """Clone the ac group of the test catalog into several families."""
+    catalog = json.loads(TEST_CATALOG.read_text())
+    group_json = json.dumps(catalog["catalog"]["groups"][0])
+    catalog["catalog"]["groups"] = [
+        json.loads(group_json.replace('"ac', f'"{family}'))
+        for family in ("ac", "au", "cm", "ia", "sc")
+    ]
+    return catalog
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    catalog_dir = tmp_path / "catalogs" / "multi"
+    catalog_dir.mkdir(parents=True)
+    (catalog_dir / "catalog.json").write_text(json.dumps(multi_group_catalog()))
+    return tmp_path
+
+
+def read_tree(root: Path) -> dict:
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+@pytest.mark.asyncio
+async def test_parallel_output_identical_to_serial(workspace):
+    serial = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="multi", output="md_serial", trestle_root=str(workspace)
+        )
+    )
+    parallel = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="multi", output="md_parallel", trestle_root=str(workspace), workers=3
+        )
+    )
+    assert "✅" in serial
+    assert "✅" in parallel
+    assert "Controls: 20 (shards: 3" in parallel
+
+    serial_tree = read_tree(workspace / "md_serial")
+    assert len(serial_tree) == 20
+    assert read_tree(workspace / "md_parallel") == serial_tree
+
+    # warm workers reuse the catalog they parsed; output must not change
+    await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="multi", output="md_warm", trestle_root=str(workspace), workers=2
+        )
+    )
+    assert read_tree(workspace / "md_warm") == serial_tree
+
+
+@pytest.mark.asyncio
+async def test_parallel_failure(workspace):
+    result = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="missing", output="md", trestle_root=str(workspace), workers=2
+        )
+    )
+    assert "❌" in result
+    assert "missing" in result
@@ -0,0 +1,99 @@
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.author.profile_resolve import (
+    TrestleAuthorProfileResolveControlsInput,
+    trestle_author_profile_resolve_controls,
+)
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    catalog_dir = tmp_path / "catalogs" / "test"
+    catalog_dir.mkdir(parents=True)
+    (catalog_dir / "catalog.json").write_text((DATA / "test-catalog.json").read_text())
+    profile_dir = tmp_path / "profiles" / "test"
+    profile_dir.mkdir(parents=True)
+    profile = json.loads((DATA / "test-profile.json").read_text())
+    profile["profile"]["imports"] = [
+        {
+            "href": "trestle://catalogs/test/catalog.json",
+            "include-controls": [{"with-ids": ["ac-1", "ac-2", "ac-2.1"]}],
+        }
+    ]
+    (profile_dir / "profile.json").write_text(json.dumps(profile))
+    return tmp_path
+
+
+def controls(node: dict) -> dict:
+    """Return the controls under a catalog node by id, without their children."""
+    found = {}
+    for child in node.get("groups", []) + node.get("controls", []):
+        if "groups" not in child and "parts" in child:
+            found[child["id"]] = {k: v for k, v in child.items() if k != "controls"}
+        found.update(controls(child))
+    return found
+
+
+@pytest.mark.asyncio
+async def test_controls_identical_to_cli(workspace):
+    subprocess.run(
+        [find_trestle_bin(), "author", "profile-resolve"]
+        + ["-n", "test", "-o", "full", "--show-values"],
+        cwd=workspace,
+        check=True,
+        capture_output=True,
+    )
+    full = controls(
+        json.loads((workspace / "catalogs/full/catalog.json").read_text())["catalog"]
+    )
+
+    result = await trestle_author_profile_resolve_controls(
+        TrestleAuthorProfileResolveControlsInput(
+            name="test",
+            control_ids=["ac-2.1", "zz-9"],
+            output="partial",
+            show_values=True,
+            trestle_root=str(workspace),
+        )
+    )
+    assert "✅" in result
+    content = result.content
+    assert {c["id"]: c["requested"] for c in content.items} == {
+        "ac-2": False,
+        "ac-2.1": True,
+    }
+    assert content.counts["missing"] == 1
+    assert "Control zz-9 not found in the resolved profile" in content.warnings
+    for item in content.items:
+        assert {k: v for k, v in item["control"].items() if k != "controls"} == full[
+            item["id"]
+        ]
+
+    partial = controls(
+        json.loads((workspace / "catalogs/partial/catalog.json").read_text())["catalog"]
+    )
+    assert partial == {i: full[i] for i in ("ac-2", "ac-2.1")}
+
+
+@pytest.mark.asyncio
+async def test_missing_profile(workspace):
+    result = await trestle_author_profile_resolve_controls(
+        TrestleAuthorProfileResolveControlsInput(
+            name="missing", control_ids=["ac-1"], trestle_root=str(workspace)
+        )
+    )
+    assert "❌" in result
+    assert "does not exist" in result.content.error
@@ -0,0 +1,41 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from fastmcp.client import Client
+
+from trestle_mcp.libs.workspace import workspaces
+from trestle_mcp.main import mcp
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+@pytest.mark.asyncio
+async def test_read_resources(tmp_path):
+    catalog = tmp_path / "catalogs" / "test" / "catalog.json"
+    catalog.parent.mkdir(parents=True)
+    shutil.copy(DATA / "test-catalog.json", catalog)
+    profile = tmp_path / "profiles" / "test" / "profile.json"
+    profile.parent.mkdir(parents=True)
+    shutil.copy(DATA / "test-profile.json", profile)
+    os.chdir(tmp_path)
+    workspaces.clear()
+
+    async with Client(mcp) as client:
+        templates = {t.uriTemplate for t in await client.list_resource_templates()}
+        assert "trestle://catalogs/{name}/controls/{control_id}" in templates
+        assert "trestle://profiles/{name}/imports" in templates
+
+        listing = await client.read_resource("trestle://catalogs/test/controls")
+        controls = {c["id"]: c for c in json.loads(listing[0].text)}
+        assert set(controls) == {"ac-1", "ac-2", "ac-2.1", "ac-2.2"}
+
+        contents = await client.read_resource("trestle://catalogs/test/controls/ac-1")
+        assert json.loads(contents[0].text)["id"] == "ac-1"
+        assert contents[0].meta["etag"] == controls["ac-1"]["etag"]
+        assert len(contents[0].text.encode()) == controls["ac-1"]["length"]
+
+        imports = await client.read_resource("trestle://profiles/test/imports")
+        assert json.loads(imports[0].text)[0]["href"]
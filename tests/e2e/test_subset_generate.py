@@ -0,0 +1,142 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.author.catalog_generate import (
+    TrestleCatalogGenerateInput,
+    trestle_catalog_generate,
+)
+from trestle_mcp.services.author.profile_generate import (
+    TrestleAuthorProfileGenerateInput,
+    trestle_author_profile_generate,
+)
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    catalog_dir = tmp_path / "catalogs" / "test"
+    catalog_dir.mkdir(parents=True)
+    (catalog_dir / "catalog.json").write_text((DATA / "test-catalog.json").read_text())
+    profile = json.loads((DATA / "test-profile.json").read_text())
+    profile["profile"]["imports"] = [
+        {
+            "href": "trestle://catalogs/test/catalog.json",
+            "include-controls": [{"with-ids": ["ac-1", "ac-2", "ac-2.1", "ac-2.2"]}],
+        }
+    ]
+    (tmp_path / "profiles" / "test").mkdir(parents=True)
+    (tmp_path / "profiles" / "test" / "profile.json").write_text(json.dumps(profile))
+    return tmp_path
+
+
+def cli(root: Path, *args: str) -> None:
+    subprocess.run(
+        [find_trestle_bin(), "author", *args], cwd=root, check=True, capture_output=True
+    )
+
+
+def read_tree(root: Path) -> dict:
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+def edit(markdown: Path, names: list[str]) -> None:
+    for name in names:
+        path = markdown / "ac" / name
+        path.write_text(path.read_text() + "\nEdited.\n")
+
+
+@pytest.mark.asyncio
+async def test_catalog_subset(workspace):
+    cli(workspace, "catalog-generate", "-n", "test", "-o", "full")
+    shutil.copytree(workspace / "full", workspace / "subset")
+    edit(workspace / "subset", ["ac-1.md", "ac-2.1.md"])
+    expected = read_tree(workspace / "subset")
+    expected["ac/ac-2.1.md"] = read_tree(workspace / "full")["ac/ac-2.1.md"]
+
+    result = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="test",
+            output="subset",
+            control_ids=["ac-2.*"],
+            force_overwrite=True,
+            trestle_root=str(workspace),
+        )
+    )
+    assert "✅" in result
+    assert result.content.counts["controls"] == 2
+    # ac-1 kept its edit, the regenerated ac-2.1 is the CLI output
+    assert read_tree(workspace / "subset") == expected
+
+
+@pytest.mark.asyncio
+async def test_catalog_subset_from_scratch(workspace):
+    cli(workspace, "catalog-generate", "-n", "test", "-o", "full")
+
+    result = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="test",
+            output="subset",
+            group_ids=["a*"],
+            control_ids=["ac-1"],
+            trestle_root=str(workspace),
+        )
+    )
+    assert "✅" in result
+    assert read_tree(workspace / "subset") == {
+        "ac/ac-1.md": read_tree(workspace / "full")["ac/ac-1.md"]
+    }
+
+
+@pytest.mark.asyncio
+async def test_catalog_subset_no_match(workspace):
+    result = await trestle_catalog_generate(
+        TrestleCatalogGenerateInput(
+            name="test",
+            output="subset",
+            group_ids=["zz"],
+            trestle_root=str(workspace),
+        )
+    )
+    assert "✅" in result
+    assert result.content.counts["controls"] == 0
+    assert result.content.warnings == [
+        "No control matches the group and control filters"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_profile_subset(workspace):
+    cli(workspace, "profile-generate", "-n", "test", "-o", "full")
+    shutil.copytree(workspace / "full", workspace / "subset")
+    edit(workspace / "subset", ["ac-1.md", "ac-2.md"])
+    expected = read_tree(workspace / "subset")
+    expected["ac/ac-2.md"] = read_tree(workspace / "full")["ac/ac-2.md"]
+
+    result = await trestle_author_profile_generate(
+        TrestleAuthorProfileGenerateInput(
+            name="test",
+            output="subset",
+            control_ids=["ac-2"],
+            force_overwrite=True,
+            trestle_root=str(workspace),
+        )
+    )
+    assert "✅" in result
+    assert result.content.counts["controls"] == 1
+    assert read_tree(workspace / "subset") == expected
@@ -0,0 +1,181 @@
+import json
+import os
+import subprocess
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.trestle import find_trestle_bin
+from trestle_mcp.services.validate import TrestleValidateInput, trestle_validate
+
+DATA = Path(__file__).parents[1] / "data"
+COMPONENTS = 40
+
+
+def component_definition(index: int) -> dict:
+    return {
+        "component-definition": {
+            "uuid": str(uuid.uuid4()),
+            "metadata": {
+                "title": f"Component {index}",
+                "last-modified": "2024-01-01T00:00:00+00:00",
+                "version": "1.0",
+                "oscal-version": "1.1.2",
+            },
+            "components": [
+                {
+                    "uuid": str(uuid.uuid4()),
+                    "type": "service",
+                    "title": f"Service {index}",
+                    "description": "A service",
+                    "control-implementations": [
+                        {
+                            "uuid": str(uuid.uuid4()),
+                            "source": "trestle://profiles/test/profile.json",
+                            "description": "Controls",
+                            "implemented-requirements": [
+                                {
+                                    "uuid": str(uuid.uuid4()),
+                                    "control-id": "ac-1",
+                                    "description": "Implemented",
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
+    }
+
+
+def write(path: Path, content: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(content, indent=2))
+
+
+def touch(path: Path) -> None:
+    # make sure the change is seen even on coarse mtime resolution
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    subprocess.run(
+        [find_trestle_bin(), "init", "--local"],
+        cwd=tmp_path,
+        check=True,
+        capture_output=True,
+    )
+    for name in ("test", "other"):
+        write(
+            tmp_path / "catalogs" / name / "catalog.json",
+            json.loads((DATA / "test-catalog.json").read_text()),
+        )
+        prof = json.loads((DATA / "test-profile.json").read_text())
+        prof["profile"]["imports"][0][
+            "href"
+        ] = f"trestle://catalogs/{name}/catalog.json"
+        write(tmp_path / "profiles" / name / "profile.json", prof)
+    for i in range(COMPONENTS):
+        write(
+            tmp_path / "component-definitions" / f"cd{i}" / "component-definition.json",
+            component_definition(i),
+        )
+    return tmp_path
+
+
+async def validate(workspace: Path, **kwargs) -> str:
+    return await trestle_validate(
+        TrestleValidateInput(trestle_root=str(workspace), **kwargs)
+    )
+
+
+@pytest.mark.asyncio
+async def test_incremental_validation(workspace):
+    total = COMPONENTS + 4
+    result = await validate(workspace, workers=4)
+    assert result.startswith("✅ All models are valid")
+    assert f"Models: {total}, invalid: 0 (validated: {total}, cached: 0" in result
+    assert "✅ profiles/test/profile.json" in result.splitlines()
+
+    # nothing changed: every result comes from the cache
+    result = await validate(workspace)
+    assert f"(validated: 0, cached: {total}" in result
+    assert "✅ profiles/test/profile.json (cached)" in result
+
+    # one component definition edited: only it is validated again
+    cd = workspace / "component-definitions" / "cd3" / "component-definition.json"
+    cd.write_text(cd.read_text().replace("Implemented", "Implemented by cd3"))
+    touch(cd)
+    started = time.perf_counter()
+    result = await validate(workspace)
+    assert time.perf_counter() - started < 1
+    assert f"(validated: 1, cached: {total - 1}" in result
+    assert (
+        "✅ component-definitions/cd3/component-definition.json" in result.splitlines()
+    )
+
+    # the catalog changed: the profile importing it and the component
+    # definitions built on that profile are stale, the other models are not
+    catalog = workspace / "catalogs" / "test" / "catalog.json"
+    catalog.write_text(catalog.read_text().replace("Access Control", "Access"))
+    touch(catalog)
+    result = await validate(workspace)
+    assert f"(validated: {COMPONENTS + 2}, cached: 2" in result
+    assert "✅ profiles/other/profile.json (cached)" in result
+
+
+@pytest.mark.asyncio
+async def test_changes_seen_by_later_selection(workspace):
+    # in a git work tree, a change consumed by a call validating other models
+    # still invalidates the result of the changed model
+    for args in (["init", "-q"], ["add", "-A"], ["commit", "-qm", "init"]):
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            cwd=workspace,
+            check=True,
+        )
+    result = await validate(workspace, type="catalog")
+    assert "Models: 2, invalid: 0 (validated: 2" in result
+    result = await validate(workspace, type="catalog", name="test")
+    assert "(validated: 0, cached: 1" in result
+
+    catalog = workspace / "catalogs" / "other" / "catalog.json"
+    content = json.loads(catalog.read_text())
+    content["catalog"]["uuid"] = "not-a-uuid"
+    write(catalog, content)
+    touch(catalog)
+    result = await validate(workspace, type="catalog", name="test")
+    assert "(validated: 0, cached: 1" in result
+
+    result = await validate(workspace, type="catalog")
+    assert "❌ catalogs/other/catalog.json: " in result
+
+
+@pytest.mark.asyncio
+async def test_invalid_model(workspace):
+    cd = workspace / "component-definitions" / "cd0" / "component-definition.json"
+    content = json.loads(cd.read_text())
+    del content["component-definition"]["metadata"]["title"]
+    write(cd, content)
+
+    result = await validate(workspace, type="component-definition")
+    assert result.startswith("❌ Validation failed")
+    assert f"Models: {COMPONENTS}, invalid: 1" in result
+    assert "❌ component-definitions/cd0/component-definition.json: " in result
+
+    # invalid results are cached too
+    result = await validate(workspace, files=[str(cd.relative_to(workspace))])
+    assert "❌ component-definitions/cd0/component-definition.json (cached): " in result
+
+
+@pytest.mark.asyncio
+async def test_selection_errors(workspace):
+    result = await validate(workspace, type="profile", name="missing")
+    assert "❌ Failed to validate models" in result
+    assert "profiles/missing not found" in result
+    result = await validate(workspace, name="test")
+    assert "name requires type" in result
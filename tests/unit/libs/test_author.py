@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/author.py."""
+
+import json
+from pathlib import Path
+
+from trestle.oscal import catalog as cat
+
+from trestle_mcp.libs.author import (
+    _keep_groups,
+    _profile_import_hrefs,
+    catalog_group_shards,
+    control_matches,
+    control_selection,
+    load_yaml_header,
+    markdown_files,
+    reduce_catalog,
+    remove_control_markdown,
+)
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+TEST_PROFILE = Path("tests/data/test-profile.json")
+
+
+class TestCatalogGroupShards:
+    """Test suite for catalog_group_shards function."""
+
+    def test_one_shard_per_group(self):
+        """Test that controls and sub-controls are grouped by top level group."""
+        assert catalog_group_shards(TEST_CATALOG) == [
+            ["ac-1", "ac-2", "ac-2.1", "ac-2.2"]
+        ]
+
+    def test_ungrouped_controls(self, tmp_path):
+        """Test that controls outside groups form their own shard."""
+        catalog = {
+            "catalog": {
+                "groups": [
+                    {"id": "g1", "controls": [{"id": "g1-1"}]},
+                    {"id": "g2", "groups": [{"id": "g2a", "controls": [{"id": "x"}]}]},
+                    {"id": "empty"},
+                ],
+                "controls": [{"id": "top", "controls": [{"id": "top.1"}]}],
+            }
+        }
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps(catalog))
+        assert catalog_group_shards(path) == [["g1-1"], ["x"], ["top", "top.1"]]
+        assert catalog_group_shards(path, group_ids=["g2a"]) == [["x"]]
+        assert catalog_group_shards(path, control_ids=["top*", "x"]) == [
+            ["x"],
+            ["top", "top.1"],
+        ]
+
+    def test_filtered_shards(self):
+        """Test that only the controls passing the filters are kept."""
+        assert catalog_group_shards(TEST_CATALOG, control_ids=["ac-2.*"]) == [
+            ["ac-2.1", "ac-2.2"]
+        ]
+        assert catalog_group_shards(TEST_CATALOG, group_ids=["zz"]) == []
+
+
+class TestControlMatches:
+    """Test suite for control_matches function."""
+
+    def test_no_filter(self):
+        """Test that every control matches without filters."""
+        assert control_matches("ac-1", [], None, None)
+
+    def test_group_filter(self):
+        """Test that a control matches when one of its groups does."""
+        assert control_matches("x", ["g2", "g2a"], ["g2a"], None)
+        assert control_matches("x", ["g2", "g2a"], ["g*"], None)
+        assert not control_matches("top", [], ["g*"], None)
+
+    def test_both_filters(self):
+        """Test that a control must pass both filters."""
+        assert control_matches("ac-2.1", ["ac"], ["ac"], ["ac-2*"])
+        assert not control_matches("ac-1", ["ac"], ["ac"], ["ac-2*"])
+        assert not control_matches("ac-2", ["au"], ["ac"], ["ac-2"])
+
+
+class TestRemoveControlMarkdown:
+    """Test suite for remove_control_markdown function."""
+
+    def test_removes_matching_controls_only(self, tmp_path):
+        """Test that other markdown files are left untouched."""
+        for name in ("ac/ac-1.md", "ac/ac-2.md", "au/au-2.md", "ac/notes.txt"):
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text("x")
+        assert remove_control_markdown(tmp_path, None, ["*-2"]) == 2
+        assert sorted(
+            p.relative_to(tmp_path).as_posix()
+            for p in tmp_path.rglob("*")
+            if p.is_file()
+        ) == ["ac/ac-1.md", "ac/notes.txt"]
+
+
+class TestLoadYamlHeader:
+    """Test suite for load_yaml_header function."""
+
+    def test_no_header(self):
+        """Test that no header file gives an empty header."""
+        assert load_yaml_header(None) == {}
+
+    def test_header_file(self, tmp_path):
+        """Test that the header file is loaded as a dict."""
+        path = tmp_path / "header.yaml"
+        path.write_text("x-trestle-global:\n  sort-id: ac-01\n")
+        assert load_yaml_header(str(path)) == {"x-trestle-global": {"sort-id": "ac-01"}}
+
+
+class TestProfileImportHrefs:
+    """Test suite for _profile_import_hrefs function."""
+
+    def test_profile_imports(self):
+        """Test that the hrefs of the profile imports are returned."""
+        assert _profile_import_hrefs(TEST_PROFILE) == ["catalogs/test/catalog.json"]
+
+    def test_skips_back_matter_references(self, tmp_path):
+        """Test that imports through back-matter resources are skipped."""
+        path = tmp_path / "profile.json"
+        path.write_text(
+            json.dumps(
+                {"profile": {"imports": [{"href": "#1234"}, {"href": "a.json"}]}}
+            )
+        )
+        assert _profile_import_hrefs(path) == ["a.json"]
+
+    def test_missing_profile(self, tmp_path):
+        """Test that a missing profile has no imports."""
+        assert _profile_import_hrefs(tmp_path / "missing.json") == []
+
+
+def load_catalog() -> cat.Catalog:
+    return cat.Catalog.oscal_read(TEST_CATALOG)
+
+
+def find_control(controls, control_id):
+    for control in controls or []:
+        if control.id == control_id:
+            return control
+        found = find_control(control.controls, control_id)
+        if found is not None:
+            return found
+    return None
+
+
+class TestControlSelection:
+    """Test suite for control_selection function."""
+
+    def test_adds_ancestors(self):
+        """Test that the parent of a control enhancement is selected."""
+        assert control_selection(load_catalog(), {"ac-2.1"}) == {"ac-2", "ac-2.1"}
+
+    def test_ignores_unknown_ids(self):
+        """Test that ids missing from the catalog are not selected."""
+        assert control_selection(load_catalog(), {"ac-1", "zz-9"}) == {"ac-1"}
+
+    def test_adds_owners_of_inserted_params(self):
+        """Test that a control whose parameter is inserted is selected too."""
+        catalog = load_catalog()
+        control = find_control(catalog.groups[0].controls, "ac-2.2")
+        control.parts[0].prose = "Use {{ insert: param, ac-1_prm_1 }}."
+        assert control_selection(catalog, {"ac-2.2"}) == {"ac-1", "ac-2", "ac-2.2"}
+
+
+class TestReduceCatalog:
+    """Test suite for reduce_catalog function."""
+
+    def test_unselected_controls_are_stubs(self):
+        """Test that only selected controls keep their prose."""
+        catalog = load_catalog()
+        reduced = reduce_catalog(catalog, {"ac-2", "ac-2.1"})
+        controls = reduced.groups[0].controls
+        stub = find_control(controls, "ac-1")
+        assert stub.parts is None
+        assert [p.id for p in stub.params] == [
+            p.id for p in find_control(catalog.groups[0].controls, "ac-1").params
+        ]
+        assert find_control(controls, "ac-2.1").parts
+        assert find_control(controls, "ac-2.2").parts is None
+
+    def test_catalog_unchanged(self):
+        """Test that the reduced catalog shares nothing modifiable with the original."""
+        catalog = load_catalog()
+        before = catalog.oscal_serialize_json()
+        reduced = reduce_catalog(catalog, {"ac-1"})
+        find_control(reduced.groups[0].controls, "ac-1").parts[0].prose = "changed"
+        find_control(reduced.groups[0].controls, "ac-2").params[0].label = "changed"
+        assert catalog.oscal_serialize_json() == before
+
+    def test_keep_groups_drops_stubs(self):
+        """Test that stubs are removed from the groups once resolved."""
+        reduced = reduce_catalog(load_catalog(), {"ac-2", "ac-2.1"})
+        groups = _keep_groups(reduced.groups, {"ac-2", "ac-2.1"})
+        assert [c.id for c in groups[0].controls] == ["ac-2"]
+        assert [c.id for c in groups[0].controls[0].controls] == ["ac-2.1"]
+        assert _keep_groups(reduced.groups, set()) is None
+
+
+class TestMarkdownFiles:
+    """Test suite for markdown_files function."""
+
+    def test_files_by_group(self, tmp_path):
+        """Test that top level files come first, then groups sorted by id."""
+        for name in ("zz/zz-1.md", "ac/ac-1.md", "top.md", "ac/notes.txt"):
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text("x")
+        assert [
+            p.relative_to(tmp_path).as_posix() for p in markdown_files(tmp_path)
+        ] == [
+            "top.md",
+            "ac/ac-1.md",
+            "zz/zz-1.md",
+        ]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/cache.py."""
+
+import os
+
+import pytest
+
+from trestle_mcp.libs.cache import LRUCache, file_key
+
+
+class TestLRUCache:
+    """Test suite for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "b" not in cache
+        assert cache.keys() == ["a", "c"]
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted."""
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.get("a")
+        assert cache.get("missing", "default") == "default"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_by_weight(self):
+        """Test that entries are evicted once their total weight is too high."""
+        cache = LRUCache(maxsize=10, maxweight=10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 4)
+        cache.put("c", 3, 4)
+        assert cache.keys() == ["b", "c"]
+        assert cache.weight == 8
+        cache.put("b", 2, 1)
+        assert cache.weight == 5
+        cache.pop("c")
+        assert cache.weight == 1
+
+    def test_too_heavy_entry_not_kept(self):
+        """Test that an entry heavier than the limit is dropped at once."""
+        cache = LRUCache(maxweight=10)
+        cache.put("a", 1, 11)
+        assert "a" not in cache
+        assert cache.weight == 0
+
+    def test_invalid_size(self):
+        """Test that an empty cache is rejected."""
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestFileKey:
+    """Test suite for file_key function."""
+
+    def test_changes_with_content(self, tmp_path):
+        """Test that the key changes when the file is modified."""
+        path = tmp_path / "model.json"
+        path.write_text("{}")
+        before = file_key(path)
+        path.write_text('{"a": 1}')
+        os.utime(path, ns=(before[1] + 1, before[1] + 1))
+        assert file_key(path) != before
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file has no key."""
+        assert file_key(tmp_path / "missing.json") is None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/changes.py."""
+
+import subprocess
+
+import pytest
+
+from trestle_mcp.libs.changes import (
+    WorkspaceChanges,
+    content_hash,
+    git_toplevel,
+    touched,
+)
+from trestle_mcp.libs.workspace import Workspace
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "dev")
+    root = tmp_path / "workspace"
+    (root / "catalogs" / "nist").mkdir(parents=True)
+    (root / "catalogs" / "nist" / "catalog.json").write_text("{}")
+    (root / "md").mkdir()
+    (root / "md" / "ac-1.md").write_text("# ac-1\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return root.resolve()
+
+
+class TestWorkspaceChanges:
+    """Test suite for WorkspaceChanges."""
+
+    def test_outside_git(self, tmp_path):
+        """Test that consumers scan everything outside a git work tree."""
+        changes = WorkspaceChanges(tmp_path)
+        assert changes.provider == "scan"
+        assert changes.changes("a") is None
+        assert changes.position() is None
+
+    def test_working_tree(self, repo):
+        """Test that edits, additions and deletions are reported once."""
+        changes = WorkspaceChanges(repo)
+        assert changes.provider == "git"
+        assert git_toplevel(repo) == repo.parent
+        assert changes.changes("a") is None
+        assert changes.changes("a") == set()
+
+        (repo / "md" / "ac-1.md").write_text("# edited\n")
+        (repo / "md" / "ac-2.md").write_text("# ac-2\n")
+        (repo / "catalogs" / "nist" / "catalog.json").unlink()
+        assert changes.changes("a") == {
+            repo / "md" / "ac-1.md",
+            repo / "md" / "ac-2.md",
+            repo / "catalogs" / "nist" / "catalog.json",
+        }
+        # still dirty but not changed again
+        assert changes.changes("a") == set()
+        (repo / "md" / "ac-2.md").write_text("# ac-2 edited\n")
+        assert changes.changes("a") == {repo / "md" / "ac-2.md"}
+
+    def test_commits(self, repo):
+        """Test that files changed by commits since the last poll are reported."""
+        changes = WorkspaceChanges(repo)
+        changes.changes("a")
+        (repo / "md" / "ac-1.md").write_text("# edited\n")
+        git(repo, "commit", "-q", "-am", "edit")
+        (repo / "catalogs" / "nist" / "catalog.json").write_text('{"a": 1}')
+        git(repo, "commit", "-q", "-am", "edit catalog")
+        assert changes.changes("a") == {
+            repo / "md" / "ac-1.md",
+            repo / "catalogs" / "nist" / "catalog.json",
+        }
+
+    def test_consumers(self, repo):
+        """Test that each consumer gets what changed since it last looked."""
+        changes = WorkspaceChanges(repo)
+        changes.changes("a")
+        position = changes.position()
+        (repo / "md" / "ac-1.md").write_text("# edited\n")
+        assert changes.changes("a") == {repo / "md" / "ac-1.md"}
+        assert changes.changes("b") is None
+        assert changes.since(position) == {repo / "md" / "ac-1.md"}
+        changes.forget("a")
+        assert changes.changes("a") is None
+
+    def test_server_state_excluded(self, repo):
+        """Test that files under .trestle/mcp are never reported."""
+        changes = WorkspaceChanges(repo)
+        changes.changes("a")
+        (repo / ".trestle" / "mcp").mkdir(parents=True)
+        (repo / ".trestle" / "mcp" / "validate.json").write_text("{}")
+        assert changes.changes("a") == set()
+
+    def test_ignored(self, repo):
+        """Test that the files ignored by git are listed."""
+        changes = WorkspaceChanges(repo)
+        (repo / ".gitignore").write_text("build/\n")
+        (repo / "build").mkdir()
+        (repo / "build" / "out.json").write_text("{}")
+        assert changes.ignored([repo / "build", repo / "md"]) == [
+            repo / "build" / "out.json"
+        ]
+        assert changes.ignored([]) == []
+        assert WorkspaceChanges(repo.parent.parent).ignored([repo]) is None
+
+
+class TestTouched:
+    """Test suite for touched function."""
+
+    def test_files_and_directories(self, tmp_path):
+        """Test that a change to a file or under a directory is found."""
+        changed = [tmp_path / "md" / "ac" / "ac-1.md"]
+        assert touched(changed, [tmp_path / "md"])
+        assert touched(changed, [tmp_path / "md" / "ac" / "ac-1.md"])
+        assert not touched(changed, [tmp_path / "profiles"])
+        assert not touched([], [tmp_path / "md"])
+
+
+class TestContentHash:
+    """Test suite for content_hash function."""
+
+    def test_hash_follows_content(self, tmp_path):
+        """Test that equal content hashes equally and a change is detected."""
+        workspace = Workspace(tmp_path)
+        a, b = tmp_path / "a.json", tmp_path / "b.json"
+        a.write_text("same")
+        b.write_text("same")
+        assert content_hash(workspace, a) == content_hash(workspace, b)
+        b.write_text("different")
+        assert content_hash(workspace, a) != content_hash(workspace, b)
+        assert content_hash(workspace, tmp_path / "missing") == "missing"
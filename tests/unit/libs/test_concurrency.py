@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/concurrency.py."""
+
+import asyncio
+import threading
+
+import pytest
+
+from trestle_mcp.libs import concurrency
+from trestle_mcp.libs.concurrency import (
+    BATCH,
+    INTERACTIVE,
+    INTERACTIVE_BURST,
+    ExecutionLimiter,
+    QueueFullError,
+    current_client,
+)
+
+
+async def _track(limiter, client, peaks, hold=0.02):
+    async with limiter.slot(client):
+        peaks["total"] = max(peaks.get("total", 0), limiter.active())
+        peaks[client] = max(peaks.get(client, 0), limiter.active(client))
+        await asyncio.sleep(hold)
+
+
+class TestExecutionLimiter:
+    """Test suite for ExecutionLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_global_limit(self):
+        """Test that total concurrency never exceeds max_concurrency."""
+        limiter = ExecutionLimiter(max_concurrency=3)
+        peaks = {}
+        await asyncio.gather(*[_track(limiter, f"c{i}", peaks) for i in range(10)])
+        assert peaks["total"] == 3
+        assert limiter.active() == 0
+
+    @pytest.mark.asyncio
+    async def test_per_client_limit(self):
+        """Test that one client cannot exceed max_per_client."""
+        limiter = ExecutionLimiter(max_concurrency=4, max_per_client=2)
+        peaks = {}
+        await asyncio.gather(*[_track(limiter, "greedy", peaks) for _ in range(8)])
+        assert peaks["greedy"] == 2
+
+    @pytest.mark.asyncio
+    async def test_other_client_not_starved(self):
+        """Test that a late client runs before a busy client's backlog drains."""
+        limiter = ExecutionLimiter(max_concurrency=2, max_per_client=1)
+        order = []
+
+        async def job(client, name):
+            async with limiter.slot(client):
+                order.append(name)
+                await asyncio.sleep(0.02)
+
+        greedy = [asyncio.create_task(job("a", f"a{i}")) for i in range(5)]
+        await asyncio.sleep(0)
+        await job("b", "b0")
+        await asyncio.gather(*greedy)
+        assert order.index("b0") <= 1
+
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            ExecutionLimiter(max_concurrency=-1)
+        with pytest.raises(ValueError):
+            ExecutionLimiter(max_concurrency=2, max_per_client=0)
+
+    def test_per_client_capped_by_global(self):
+        """Test that max_per_client never exceeds max_concurrency."""
+        limiter = ExecutionLimiter(max_concurrency=2, max_per_client=5)
+        assert limiter.max_per_client == 2
+
+
+async def _job(limiter, order, client, name, priority=INTERACTIVE, hold=0.01):
+    async with limiter.slot(client, priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+class TestScheduling:
+    """Test suite for priority classes, fair share and queue limits."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_before_batch(self):
+        """Test that a queued interactive call runs before queued batch calls."""
+        limiter = ExecutionLimiter(max_concurrency=1)
+        order = []
+        batch = [
+            asyncio.create_task(_job(limiter, order, "agent", f"b{i}", BATCH))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0)
+        await _job(limiter, order, "user", "init")
+        await asyncio.gather(*batch)
+        assert order.index("init") == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_not_starved(self):
+        """Test that batch calls still run under a stream of interactive calls."""
+        limiter = ExecutionLimiter(max_concurrency=1)
+        order = []
+        tasks = [asyncio.create_task(_job(limiter, order, "agent", "b0", BATCH))]
+        tasks.append(asyncio.create_task(_job(limiter, order, "agent", "b1", BATCH)))
+        await asyncio.sleep(0)
+        tasks += [
+            asyncio.create_task(_job(limiter, order, "user", f"i{i}"))
+            for i in range(10)
+        ]
+        await asyncio.gather(*tasks)
+        assert order.index("b1") == INTERACTIVE_BURST + 1
+
+    @pytest.mark.asyncio
+    async def test_fair_share(self):
+        """Test that a client with a backlog shares slots with a newcomer."""
+        limiter = ExecutionLimiter(max_concurrency=2)
+        order = []
+        tasks = [
+            asyncio.create_task(_job(limiter, order, "a", f"a{i}")) for i in range(4)
+        ]
+        await asyncio.sleep(0)
+        tasks += [
+            asyncio.create_task(_job(limiter, order, "b", f"b{i}")) for i in range(2)
+        ]
+        await asyncio.gather(*tasks)
+        # b gets a slot as soon as one frees up, then the clients share evenly
+        assert order[:3] == ["a0", "a1", "b0"]
+        assert order.index("b1") < order.index("a3")
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        """Test that calls beyond the queue limits are rejected at once."""
+        limiter = ExecutionLimiter(
+            max_concurrency=1, max_queue=3, max_queue_per_client=2
+        )
+        order = []
+        tasks = [
+            asyncio.create_task(_job(limiter, order, "a", f"a{i}", hold=0.05))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await _job(limiter, order, "a", "rejected")
+        tasks.append(asyncio.create_task(_job(limiter, order, "b", "b0")))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await _job(limiter, order, "c", "rejected")
+        await asyncio.gather(*tasks)
+        assert "rejected" not in order
+        assert limiter.metrics()["classes"][INTERACTIVE]["rejected"] == 2
+
+    @pytest.mark.asyncio
+    async def test_no_queue(self):
+        """Test that without a queue, calls run while a slot is free and are rejected otherwise."""
+        limiter = ExecutionLimiter(max_concurrency=2, max_queue=0)
+        order = []
+        await _job(limiter, order, "a", "a0")
+        tasks = [
+            asyncio.create_task(_job(limiter, order, c, f"{c}0", hold=0.05))
+            for c in ("b", "c")
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError, match="0 calls queued"):
+            await _job(limiter, order, "d", "rejected")
+        await asyncio.gather(*tasks)
+        assert order == ["a0", "b0", "c0"]
+        assert limiter.metrics()["classes"][INTERACTIVE]["admitted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_client_state_dropped(self):
+        """Test that nothing is kept for a client with no running or queued call."""
+        limiter = ExecutionLimiter(max_concurrency=1)
+        order = []
+        await asyncio.gather(*[_job(limiter, order, f"c{i}", str(i)) for i in range(5)])
+        assert limiter.metrics()["clients"] == {}
+        assert limiter._active == {} and limiter._waiters == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled call gives up its place in the queue."""
+        limiter = ExecutionLimiter(max_concurrency=1)
+        order = []
+        running = asyncio.create_task(_job(limiter, order, "a", "a0", hold=0.02))
+        waiting = asyncio.create_task(_job(limiter, order, "a", "a1"))
+        await asyncio.sleep(0)
+        assert limiter.queued() == 1
+        waiting.cancel()
+        await asyncio.gather(running, waiting, return_exceptions=True)
+        assert limiter.queued() == 0
+        assert limiter.active() == 0
+        assert order == ["a0"]
+
+    @pytest.mark.asyncio
+    async def test_metrics(self):
+        """Test queue depth and wait times reported in the metrics."""
+        limiter = ExecutionLimiter(max_concurrency=1)
+        order = []
+        tasks = [
+            asyncio.create_task(_job(limiter, order, "a", f"a{i}", BATCH, 0.02))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        metrics = limiter.metrics()
+        assert metrics["active"] == 1
+        assert metrics["queued"] == 2
+        assert metrics["classes"][BATCH]["queued"] == 2
+        assert metrics["clients"]["a"] == {"active": 1, "queued": 2}
+        await asyncio.gather(*tasks)
+        batch = limiter.metrics()["classes"][BATCH]
+        assert batch["admitted"] == 3
+        assert batch["wait_ms"]["max"] >= 30
+        assert batch["wait_ms"]["p50"] <= batch["wait_ms"]["p95"]
+
+    def test_invalid_queue_limits(self):
+        """Test that negative queue limits are rejected."""
+        with pytest.raises(ValueError):
+            ExecutionLimiter(max_queue=-1)
+        limiter = ExecutionLimiter(max_queue=4, max_queue_per_client=10)
+        assert limiter.max_queue_per_client == 4
+
+
+class TestRunLimited:
+    """Test suite for run_limited function."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_worker_pool(self):
+        """Test the function runs off the event loop thread and returns its value."""
+        loop_thread = threading.get_ident()
+
+        def work(x, y=0):
+            return threading.get_ident(), x + y
+
+        thread_id, value = await concurrency.run_limited(work, 1, y=2)
+        assert value == 3
+        assert thread_id != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_accounts_to_current_client(self, monkeypatch):
+        """Test that executions are accounted to the bound client."""
+        limiter = ExecutionLimiter(max_concurrency=2)
+        monkeypatch.setattr(concurrency, "limiter", limiter)
+        seen = []
+
+        def work():
+            seen.append(limiter.active("agent-1"))
+
+        token = current_client.set("agent-1")
+        try:
+            await concurrency.run_limited(work)
+        finally:
+            current_client.reset(token)
+        assert seen == [1]
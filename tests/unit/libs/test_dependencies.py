@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/dependencies.py."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.dependencies import (
+    DependencyGraph,
+    href_path,
+    model_hrefs,
+    workspace_graph,
+)
+from trestle_mcp.libs.workspace import Workspace
+
+
+def write_model(root: Path, model_dir: str, name: str, model_type: str, body: dict):
+    path = root / model_dir / name / f"{model_type}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({model_type: body}))
+    return path.resolve()
+
+
+def profile(*hrefs: str) -> dict:
+    return {"imports": [{"href": href} for href in hrefs]}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """catalog <- base <- overlay <- ssp, and catalog <- other, run from the root."""
+    monkeypatch.chdir(tmp_path)
+    paths = {
+        "catalog": write_model(tmp_path, "catalogs", "nist", "catalog", {}),
+        "base": write_model(
+            tmp_path,
+            "profiles",
+            "base",
+            "profile",
+            profile("trestle://catalogs/nist/catalog.json"),
+        ),
+        "overlay": write_model(
+            tmp_path,
+            "profiles",
+            "overlay",
+            "profile",
+            profile("profiles/base/profile.json", "https://example.com/c.json"),
+        ),
+        "other": write_model(
+            tmp_path,
+            "profiles",
+            "other",
+            "profile",
+            profile("trestle://catalogs/nist/catalog.json"),
+        ),
+        "ssp": write_model(
+            tmp_path,
+            "system-security-plans",
+            "ssp",
+            "system-security-plan",
+            {"import-profile": {"href": "trestle://profiles/overlay/profile.json"}},
+        ),
+    }
+    return tmp_path, paths
+
+
+class TestModelHrefs:
+    """Test suite for model_hrefs function."""
+
+    def test_back_matter_reference(self):
+        """Test that #uuid hrefs are replaced by the rlink of the resource."""
+        model = {
+            "imports": [{"href": "#abc"}, {"href": "x.json"}],
+            "back-matter": {
+                "resources": [{"uuid": "abc", "rlinks": [{"href": "cat.json"}]}]
+            },
+        }
+        assert model_hrefs("profile", model) == ["cat.json", "x.json"]
+
+    def test_component_definition_sources(self):
+        """Test that control implementation sources are dependencies."""
+        model = {
+            "components": [
+                {
+                    "control-implementations": [
+                        {"source": "a.json"},
+                        {"source": "a.json"},
+                    ]
+                }
+            ]
+        }
+        assert model_hrefs("component-definition", model) == ["a.json"]
+
+    def test_catalog_imports_nothing(self):
+        """Test that catalogs have no dependencies."""
+        assert model_hrefs("catalog", {"groups": []}) == []
+
+
+class TestHrefPath:
+    """Test suite for href_path function."""
+
+    def test_href_forms(self, tmp_path):
+        """Test trestle, file, relative and remote hrefs."""
+        root = tmp_path.resolve()
+        assert href_path(root, "trestle://catalogs/a.json") == root / "catalogs/a.json"
+        assert href_path(root, "catalogs/a.json", root) == root / "catalogs/a.json"
+        assert href_path(root, f"file://{root}/b.json") == root / "b.json"
+        assert href_path(root, "https://example.com/c.json") is None
+
+    def test_relative_to_working_directory(self, tmp_path, monkeypatch):
+        """Test that relative hrefs resolve against the working directory, as in trestle."""
+        root = (tmp_path / "root").resolve()
+        monkeypatch.chdir(tmp_path)
+        assert (
+            href_path(root, "catalogs/a.json") == tmp_path.resolve() / "catalogs/a.json"
+        )
+        assert href_path(root, "trestle://catalogs/a.json") == root / "catalogs/a.json"
+
+
+class TestDependencyGraph:
+    """Test suite for DependencyGraph."""
+
+    def test_dependencies(self, workspace):
+        """Test that dependencies are transitive."""
+        root, paths = workspace
+        graph = DependencyGraph(root)
+        assert graph.imports(paths["overlay"]) == {paths["base"]}
+        assert graph.dependencies(paths["ssp"]) == {
+            paths["overlay"],
+            paths["base"],
+            paths["catalog"],
+        }
+        assert graph.dependencies(paths["catalog"]) == set()
+
+    def test_affected(self, workspace):
+        """Test what is stale when a file changes."""
+        root, paths = workspace
+        graph = DependencyGraph(root)
+        assert graph.affected(paths["catalog"]) == set(paths.values())
+        assert graph.affected(paths["base"]) == {
+            paths["base"],
+            paths["overlay"],
+            paths["ssp"],
+        }
+        assert graph.affected(paths["other"]) == {paths["other"]}
+        assert graph.stale([paths["other"], paths["overlay"]]) == {
+            paths["other"],
+            paths["overlay"],
+            paths["ssp"],
+        }
+
+    def test_unknown_file(self, workspace):
+        """Test that a file nothing imports only affects itself."""
+        root, _ = workspace
+        graph = DependencyGraph(root)
+        assert graph.affected(root / "README.md") == {(root / "README.md").resolve()}
+
+    def test_refresh_detects_changes(self, workspace):
+        """Test that a refresh re-reads changed models and rebuilds the graph."""
+        root, paths = workspace
+        graph = DependencyGraph(root)
+        assert graph.refresh() == set()
+
+        paths["overlay"].write_text(json.dumps({"profile": profile("x/other.json")}))
+        stat = paths["overlay"].stat()
+        os.utime(paths["overlay"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert graph.refresh() == {paths["overlay"]}
+        assert paths["overlay"] not in graph.affected(paths["catalog"])
+        assert graph.dependencies(paths["ssp"]) == {
+            paths["overlay"],
+            (root / "x/other.json").resolve(),
+        }
+
+    def test_refresh_removed_model(self, workspace):
+        """Test that removed models leave the graph."""
+        root, paths = workspace
+        graph = DependencyGraph(root)
+        paths["other"].unlink()
+        assert graph.refresh([paths["other"]]) == {paths["other"]}
+        assert paths["other"] not in graph.models()
+        assert paths["other"] not in graph.affected(paths["catalog"])
+
+    def test_cycle(self, tmp_path):
+        """Test that circular imports do not break the closure."""
+        a = write_model(
+            tmp_path, "profiles", "a", "profile", profile("profiles/b/profile.json")
+        )
+        b = write_model(
+            tmp_path, "profiles", "b", "profile", profile("profiles/a/profile.json")
+        )
+        graph = DependencyGraph(tmp_path, cwd=tmp_path)
+        assert graph.affected(a) == {a, b}
+        assert graph.dependencies(a) == {b}
+
+    def test_working_directory_outside_root(self, workspace, tmp_path_factory):
+        """Test that a relative href follows the working directory of the server."""
+        root, paths = workspace
+        cwd = tmp_path_factory.mktemp("cwd")
+        elsewhere = write_model(cwd, "profiles", "base", "profile", {})
+        graph = DependencyGraph(root, cwd=cwd)
+        assert graph.imports(paths["overlay"]) == {elsewhere}
+        assert paths["overlay"] not in graph.affected(paths["base"])
+        assert paths["overlay"] in graph.affected(elsewhere)
+
+    def test_workspace_component(self, workspace):
+        """Test that a workspace keeps a single graph."""
+        root, paths = workspace
+        ws = Workspace(root)
+        graph = workspace_graph(ws)
+        assert workspace_graph(ws) is graph
+        assert graph.affected(paths["base"]) == {
+            paths["base"],
+            paths["overlay"],
+            paths["ssp"],
+        }
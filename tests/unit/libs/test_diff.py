@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/diff.py."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.diff import Document, diff_documents, diff_files
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+
+
+@pytest.fixture
+def catalog():
+    return json.loads(TEST_CATALOG.read_text())
+
+
+def diff(old: dict, new: dict) -> list[dict]:
+    return diff_documents(Document(old), Document(new))
+
+
+class TestDocument:
+    """Test suite for Document digests."""
+
+    def test_equal_content_equal_digest(self, catalog):
+        """Test that digests depend on content, not on key order."""
+        reordered = json.loads(json.dumps(catalog, sort_keys=True))
+        assert Document(catalog).digest(catalog) == Document(reordered).digest(
+            reordered
+        )
+
+    def test_types_are_distinguished(self):
+        """Test that a string and a number with the same text differ."""
+        assert Document({"a": "1"}).digest({"a": "1"}) != Document({"a": 1}).digest(
+            {"a": 1}
+        )
+
+
+class TestDiff:
+    """Test suite for diff_documents function."""
+
+    def test_no_changes(self, catalog):
+        """Test that identical models have no changes."""
+        assert diff(catalog, copy.deepcopy(catalog)) == []
+
+    def test_changes_by_identity(self, catalog):
+        """Test added, removed and modified entities, whatever their position."""
+        new = copy.deepcopy(catalog)
+        controls = new["catalog"]["groups"][0]["controls"]
+        controls[0]["title"] = "Changed"
+        controls[1]["params"][0]["label"] = "New label"
+        del controls[1]["controls"][0]
+        controls.append({"id": "ac-9", "title": "New"})
+        controls.reverse()
+
+        changes = diff(catalog, new)
+        assert {(c["change"], c["kind"], c["id"]) for c in changes} == {
+            ("added", "control", "ac-9"),
+            ("removed", "control", "ac-2.1"),
+            ("modified", "param", "ac-02_odp.01"),
+            ("modified", "control", "ac-1"),
+        }
+        modified = next(c for c in changes if c["id"] == "ac-1")
+        assert modified["fields"] == ["title"]
+        assert modified["path"] == "catalog/groups[ac]/controls[ac-1]"
+
+    def test_nested_fields(self, catalog):
+        """Test that fields of plain objects are reported with their path."""
+        new = copy.deepcopy(catalog)
+        new["catalog"]["metadata"]["title"] = "Other"
+        changes = diff(catalog, new)
+        assert changes == [
+            {
+                "change": "modified",
+                "kind": "catalog",
+                "id": catalog["catalog"]["uuid"],
+                "path": "catalog",
+                "fields": ["metadata.title"],
+            }
+        ]
+
+    def test_profile_entities(self):
+        """Test that set-parameters are matched by param-id."""
+        old = {
+            "profile": {
+                "uuid": "u",
+                "modify": {"set-parameters": [{"param-id": "p1", "values": ["a"]}]},
+            }
+        }
+        new = copy.deepcopy(old)
+        new["profile"]["modify"]["set-parameters"][0]["values"] = ["b"]
+        new["profile"]["modify"]["set-parameters"].append({"param-id": "p2"})
+        assert diff(old, new) == [
+            {
+                "change": "modified",
+                "kind": "param",
+                "id": "p1",
+                "path": "profile/modify/set-parameters[p1]",
+                "fields": ["values"],
+            },
+            {
+                "change": "added",
+                "kind": "param",
+                "id": "p2",
+                "path": "profile/modify/set-parameters[p2]",
+            },
+        ]
+
+    def test_different_models(self, catalog):
+        """Test that models of different types cannot be compared."""
+        with pytest.raises(ValueError):
+            diff(catalog, {"profile": {}})
+
+    def test_diff_files(self, catalog, tmp_path):
+        """Test the comparison of two files."""
+        new = copy.deepcopy(catalog)
+        del new["catalog"]["groups"][0]["controls"][0]
+        (tmp_path / "new.json").write_text(json.dumps(new))
+        changes = diff_files(TEST_CATALOG, tmp_path / "new.json")
+        assert [(c["change"], c["id"]) for c in changes] == [("removed", "ac-1")]
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/fsio.py."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.cache import file_key
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for group in ("ac", "au", "ac/nested"):
+        (tmp_path / group).mkdir(parents=True)
+        for i in range(3):
+            (tmp_path / group / f"{i}.md").write_text(f"# {group} {i}\n")
+    (tmp_path / "ac" / "notes.txt").write_text("notes")
+    return tmp_path
+
+
+class TestScan:
+    """Test suite for scan."""
+
+    def test_keys_as_os_walk(self, tree):
+        """Test that a scan finds the files and keys os.walk and file_key do."""
+        expected = sorted(
+            file_key(os.path.join(parent, name))
+            for parent, _, names in os.walk(tree)
+            for name in names
+        )
+        assert fsio.scan(tree) == expected
+
+    def test_suffix(self, tree):
+        """Test that only files with the suffix are kept."""
+        keys = fsio.scan(tree, ".md")
+        assert len(keys) == 9
+        assert all(key[0].endswith(".md") for key in keys)
+
+    def test_missing_directory(self, tmp_path):
+        """Test that a missing directory or a file has no files."""
+        assert fsio.scan(tmp_path / "missing") == []
+        (tmp_path / "file.md").write_text("")
+        assert fsio.scan(tmp_path / "file.md") == []
+
+    def test_directory_links_not_followed(self, tree):
+        """Test that a link to a directory is not scanned, as with os.walk."""
+        (tree / "link").symlink_to(tree / "au")
+        assert not any("/link/" in key[0] for key in fsio.scan(tree))
+
+
+class TestReadFiles:
+    """Test suite for read_files and map_files."""
+
+    def test_read_in_order(self, tree):
+        """Test that files are read concurrently and returned in order."""
+        paths = [key[0] for key in fsio.scan(tree, ".md")]
+        contents = fsio.read_files([*paths, str(tree / "missing.md")])
+        assert contents[:-1] == [Path(p).read_bytes() for p in paths]
+        assert contents[-1] is None
+
+    def test_map_files(self, tree):
+        """Test that a function runs on every file."""
+        paths = [key[0] for key in fsio.scan(tree)]
+        assert fsio.map_files(os.path.getsize, paths) == [
+            os.path.getsize(p) for p in paths
+        ]
+
+    def test_configure(self):
+        """Test that the pool size is checked."""
+        with pytest.raises(ValueError):
+            fsio.configure(0)
+        fsio.configure(2)
+        try:
+            assert fsio.map_files(len, ["a", "bb", "ccc"]) == [1, 2, 3]
+        finally:
+            fsio.configure()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/idempotency.py."""
+
+import time
+
+import pytest
+
+from trestle_mcp.libs import idempotency
+from trestle_mcp.libs.idempotency import (
+    IdempotencyError,
+    IdempotencyStore,
+    fingerprint,
+    run_idempotent,
+)
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+from trestle_mcp.services.import_ import TrestleImportInput
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    token = current_workspace.set(workspaces.get(tmp_path))
+    yield tmp_path
+    current_workspace.reset(token)
+
+
+def params(**kwargs) -> TrestleImportInput:
+    return TrestleImportInput(
+        **{"file": "nist.json", "output": "nist", "idempotency_key": "k1", **kwargs}
+    )
+
+
+class TestIdempotencyStore:
+    """Test suite for IdempotencyStore."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a stored result is returned with its structured content."""
+        store = IdempotencyStore(tmp_path)
+        call = fingerprint("import", params())
+        assert store.lookup("k1", call) is None
+        store.save("k1", call, success("✅ Imported", outputs=["catalogs/nist"]))
+        result = store.lookup("k1", call)
+        assert result == "✅ Imported"
+        assert result.content.outputs == ["catalogs/nist"]
+
+    def test_conflict(self, tmp_path):
+        """Test that a key reused with other parameters is an error."""
+        store = IdempotencyStore(tmp_path)
+        store.save("k1", fingerprint("import", params()), success("✅ Imported"))
+        with pytest.raises(IdempotencyError):
+            store.lookup("k1", fingerprint("import", params(output="other")))
+        with pytest.raises(IdempotencyError):
+            store.lookup("k1", fingerprint("init", params()))
+
+    def test_fingerprint_ignores_key_and_root(self):
+        """Test that the fingerprint only depends on the tool and its parameters."""
+        assert fingerprint("import", params()) == fingerprint(
+            "import", params(idempotency_key="k2", trestle_root="/tmp")
+        )
+
+    def test_expiry(self, tmp_path):
+        """Test that results are dropped after their TTL."""
+        store = IdempotencyStore(tmp_path, ttl=60)
+        call = fingerprint("import", params())
+        store.save("k1", call, success("✅ Imported"))
+        store.save("k2", call, success("✅ Imported"))
+        assert store.purge(time.time() + 30) == 0
+        assert store.purge(time.time() + 61) == 2
+        store.save("k1", call, success("✅ Imported"))
+        expired = IdempotencyStore(tmp_path, ttl=0.01)
+        time.sleep(0.02)
+        assert expired.lookup("k1", call) is None
+        assert list(store.store.keys()) == []
+
+    def test_invalid_ttl(self):
+        """Test that the TTL must be positive."""
+        with pytest.raises(ValueError):
+            idempotency.configure(0)
+
+
+class TestRunIdempotent:
+    """Test suite for run_idempotent function."""
+
+    @pytest.mark.asyncio
+    async def test_retry_returns_stored_result(self, workspace):
+        """Test that a retried key returns the first result without running."""
+        runs = []
+
+        async def service(p):
+            runs.append(p)
+            return success("✅ Imported", outputs=["catalogs/nist"])
+
+        first = await run_idempotent("import", params(), service)
+        retry = await run_idempotent("import", params(), service)
+        assert len(runs) == 1
+        assert retry == first
+        assert retry.content.warnings == ["Result stored for idempotency key k1"]
+
+    @pytest.mark.asyncio
+    async def test_failures_not_stored(self, workspace):
+        """Test that a failed call runs again when retried."""
+        runs = []
+
+        async def service(p):
+            runs.append(p)
+            return failure("❌ Failed to import", "timeout")
+
+        await run_idempotent("import", params(), service)
+        await run_idempotent("import", params(), service)
+        assert len(runs) == 2
+
+    @pytest.mark.asyncio
+    async def test_without_key(self, workspace):
+        """Test that calls without a key always run."""
+        runs = []
+
+        async def service(p):
+            runs.append(p)
+            return success("✅ Imported")
+
+        for _ in range(2):
+            await run_idempotent("import", params(idempotency_key=None), service)
+        assert len(runs) == 2
+        assert not (workspace / idempotency.IDEMPOTENCY_DIR).exists()
+
+    @pytest.mark.asyncio
+    async def test_conflict(self, workspace):
+        """Test that reusing a key with other parameters raises."""
+
+        async def service(p):
+            return success("✅ Imported")
+
+        await run_idempotent("import", params(), service)
+        with pytest.raises(IdempotencyError):
+            await run_idempotent("import", params(output="other"), service)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/incremental.py."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp.libs.incremental import run_incremental
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+from trestle_mcp.services.author.profile_assemble import (
+    TrestleAuthorProfileAssembleInput,
+    trestle_author_profile_assemble,
+)
+from trestle_mcp.services.author.profile_generate import (
+    TrestleAuthorProfileGenerateInput,
+    trestle_author_profile_generate,
+)
+
+MOCK_RUN_MODULE = "trestle_mcp.services.author.profile_assemble.run_trestle_command"
+MOCK_GENERATE_MODULE = (
+    "trestle_mcp.services.author.profile_generate.run_trestle_command"
+)
+TOOL = "trestle_author_profile_assemble"
+
+
+def make_workspace(root):
+    (root / "md" / "ac").mkdir(parents=True)
+    (root / "md" / "ac" / "ac-1.md").write_text("# ac-1\n")
+    (root / "profiles" / "prof").mkdir(parents=True)
+    (root / "profiles" / "prof" / "profile.json").write_text('{"profile": {}}')
+    return root
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    yield make_workspace(tmp_path)
+    workspaces.clear()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = make_workspace(tmp_path)
+    for args in (
+        ["init", "-q"],
+        ["config", "user.email", "dev@example.com"],
+        ["config", "user.name", "dev"],
+        ["add", "."],
+        ["commit", "-q", "-m", "initial"],
+    ):
+        subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+    yield root
+    workspaces.clear()
+
+
+def git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+async def assemble(root, **kwargs):
+    current_workspace.set(workspaces.get(root))
+    params = TrestleAuthorProfileAssembleInput(
+        **{"markdown_dir": "md", "output_profile": "prof", **kwargs}
+    )
+    return await run_incremental(TOOL, trestle_author_profile_assemble, params)
+
+
+def ok():
+    return {"success": True, "stdout": "", "stderr": "", "returncode": 0}
+
+
+class TestRunIncremental:
+    """Test suite for run_incremental function."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("root", ["workspace", "repo"])
+    async def test_skip_until_changed(self, root, request):
+        """Test that a call runs again only after its inputs or outputs change."""
+        root = request.getfixturevalue(root)
+        with patch(MOCK_RUN_MODULE, return_value=ok()) as mock_run:
+            first = await assemble(root)
+            assert first.startswith("✅")
+            second = await assemble(root)
+            assert mock_run.call_count == 1
+            assert str(second) == str(first)
+            assert any("Skipped" in w for w in second.content.warnings)
+
+            (root / "md" / "ac" / "ac-1.md").write_text("# ac-1 edited\n")
+            await assemble(root)
+            assert mock_run.call_count == 2
+
+            (root / "profiles" / "prof" / "profile.json").write_text("{}")
+            await assemble(root)
+            assert mock_run.call_count == 3
+            await assemble(root)
+            assert mock_run.call_count == 3
+
+            # other parameters are another call
+            await assemble(root, version="2.0")
+            assert mock_run.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_regenerate_always_runs(self, workspace):
+        """Test that calls regenerating UUIDs are never skipped."""
+        with patch(MOCK_RUN_MODULE, return_value=ok()) as mock_run:
+            await assemble(workspace, regenerate=True)
+            await assemble(workspace, regenerate=True)
+            assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_not_recorded(self, workspace):
+        """Test that a failed call runs again."""
+        failed = {"success": False, "stdout": "", "stderr": "bad", "returncode": 1}
+        with patch(MOCK_RUN_MODULE, return_value=failed) as mock_run:
+            assert (await assemble(workspace)).startswith("❌")
+            await assemble(workspace)
+            assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_absolute_input(self, repo):
+        """Test that an input given as an absolute path in the workspace is tracked."""
+        with patch(MOCK_RUN_MODULE, return_value=ok()) as mock_run:
+            await assemble(repo, markdown_dir=str(repo / "md"))
+            await assemble(repo, markdown_dir=str(repo / "md"))
+            assert mock_run.call_count == 1
+            (repo / "md" / "ac" / "ac-1.md").write_text("# ac-1 edited\n")
+            await assemble(repo, markdown_dir=str(repo / "md"))
+            assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ignored_output(self, repo):
+        """Test that an output ignored by git is compared by content."""
+        (repo / ".gitignore").write_text("profiles/\n")
+        git(repo, "rm", "-r", "-q", "--cached", "profiles")
+        git(repo, "add", ".gitignore")
+        git(repo, "commit", "-q", "-m", "ignore profiles")
+        with patch(MOCK_RUN_MODULE, return_value=ok()) as mock_run:
+            await assemble(repo)
+            await assemble(repo)
+            assert mock_run.call_count == 1
+            (repo / "profiles" / "prof" / "profile.json").write_text("{}")
+            await assemble(repo)
+            assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_input_outside_workspace(self, repo, tmp_path_factory):
+        """Test that an input file outside the workspace is compared by content."""
+        header = tmp_path_factory.mktemp("headers") / "header.yaml"
+        header.write_text("a: 1\n")
+        current_workspace.set(workspaces.get(repo))
+        params = TrestleAuthorProfileGenerateInput(
+            name="prof", output="md", yaml_header=str(header)
+        )
+        tool = "trestle_author_profile_generate"
+        with patch(MOCK_GENERATE_MODULE, return_value=ok()) as mock_run:
+            await run_incremental(tool, trestle_author_profile_generate, params)
+            await run_incremental(tool, trestle_author_profile_generate, params)
+            assert mock_run.call_count == 1
+            header.write_text("a: 2\n")
+            await run_incremental(tool, trestle_author_profile_generate, params)
+            assert mock_run.call_count == 2
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/limits.py."""
+
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from trestle_mcp.libs.limits import CPU_TOLERANCE, MB, Limits, run
+
+
+class TestLimits:
+    """Test suite for Limits."""
+
+    def test_no_limits(self):
+        """Test that no limit is set by default."""
+        assert not Limits().active
+        assert Limits().rlimits() == []
+
+    def test_rlimits(self):
+        """Test the resource limits set for each limit."""
+        limits = Limits(memory=256 * MB, cpu=10, open_files=64, output=MB)
+        assert limits.active
+        assert limits.rlimits() == [
+            ("RLIMIT_AS", 256 * MB, 256 * MB),
+            ("RLIMIT_CPU", 10, 11),
+            ("RLIMIT_NOFILE", 64, 64),
+            ("RLIMIT_FSIZE", MB, MB),
+        ]
+
+    def test_rlimits_lowered_to_hard_limit(self):
+        """Test that a limit above the hard limit of the server is lowered."""
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limits = Limits(open_files=hard + 1)
+        assert limits.rlimits() == [("RLIMIT_NOFILE", hard, hard)]
+
+    def test_breach(self):
+        """Test that failures are told apart by the limit they exceeded."""
+        limits = Limits(memory=256 * MB, cpu=10, open_files=64, output=MB)
+        assert limits.breach(0, "MemoryError") is None
+        assert limits.breach(-signal.SIGXCPU, "") == "cpu"
+        assert limits.breach(-signal.SIGXFSZ, "") == "output"
+        assert limits.breach(1, "OSError: [Errno 27] File too large") == "output"
+        assert (
+            limits.breach(1, "[Errno 24] Too many open files: 'a.md'") == "open_files"
+        )
+        assert limits.breach(1, "Traceback\nMemoryError\n") == "memory"
+        assert limits.breach(-signal.SIGABRT, "memory allocation of 8 bytes failed")
+        assert (
+            limits.breach(1, "trestle ERROR: Error while importing OSCAL file: \n")
+            == "memory"
+        )
+        wrapped = "import_:95 ERROR: Error while importing: Cache get failure: .\n"
+        assert limits.breach(1, wrapped) == "memory"
+        assert limits.breach(1, "trestle ERROR: Invalid catalog\n") is None
+
+    def test_breach_needs_evidence(self):
+        """Test that a failure without a trace of a limit is not blamed on one."""
+        limits = Limits(memory=256 * MB, cpu=10)
+        assert limits.breach(1, "") is None
+        assert limits.breach(-signal.SIGSEGV, "") is None
+        # killed by the OOM killer, or by the CPU hard limit once time is up
+        assert limits.breach(-signal.SIGKILL, "") is None
+        assert limits.breach(-signal.SIGKILL, "", cpu_time=0.5) is None
+        assert limits.breach(-signal.SIGKILL, "", cpu_time=10.9) == "cpu"
+        # rusage may account a little less than the limit
+        assert limits.breach(-signal.SIGKILL, "", cpu_time=9.99) == "cpu"
+
+    def test_breach_of_unset_limit(self):
+        """Test that a failure is not blamed on a limit that is not set."""
+        assert Limits(cpu=10).breach(1, "MemoryError") is None
+        assert Limits().breach(-signal.SIGXCPU, "") is None
+
+
+class TestRun:
+    """Test suite for run."""
+
+    def test_output(self):
+        """Test that the output of a command is returned as text."""
+        script = "import sys; print('out'); print('err', file=sys.stderr)"
+        result = run([sys.executable, "-c", script], ".", 30, Limits(open_files=64))
+        assert (result.returncode, result.stdout, result.stderr) == (
+            0,
+            "out\n",
+            "err\n",
+        )
+
+    def test_cpu_limit(self):
+        """Test that a command is stopped at its CPU time."""
+        limits = Limits(cpu=1)
+        result = run([sys.executable, "-c", "while True: pass"], ".", 30, limits)
+        assert limits.breach(result.returncode, result.stderr) == "cpu"
+        assert result.cpu_time >= CPU_TOLERANCE
+
+    def test_cpu_limit_ignored_signal(self):
+        """Test that a command ignoring SIGXCPU is killed at the hard CPU limit."""
+        limits = Limits(cpu=1)
+        script = (
+            "import signal; signal.signal(signal.SIGXCPU, signal.SIG_IGN)\n"
+            "while True: pass"
+        )
+        result = run([sys.executable, "-c", script], ".", 30, limits)
+        assert result.returncode == -signal.SIGKILL
+        assert limits.breach(result.returncode, result.stderr, result.cpu_time) == "cpu"
+
+    def test_timeout_kills_group(self, tmp_path):
+        """Test that a timeout kills the children of the command too."""
+        pid_file = tmp_path / "pid"
+        script = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            "time.sleep(60)"
+        )
+        with pytest.raises(subprocess.TimeoutExpired):
+            run([sys.executable, "-c", script], ".", 1, Limits(open_files=64))
+        pid = int(pid_file.read_text())
+        for _ in range(100):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.02)
+        else:
+            pytest.fail("child of the timed out command still running")
+
+    def test_output_limit(self):
+        """Test that the output limit bounds the standard output of a command."""
+        limits = Limits(output=MB)
+        result = run(
+            [sys.executable, "-c", "print('x' * 2 * 1024 * 1024)"], ".", 30, limits
+        )
+        assert limits.breach(result.returncode, result.stderr) == "output"
+        assert len(result.stdout) <= MB
+
+    def test_open_files_limit(self):
+        """Test that a command cannot open more files than its limit."""
+        limits = Limits(open_files=16)
+        result = run(
+            [sys.executable, "-c", "files = [open('/dev/null') for _ in range(32)]"],
+            ".",
+            30,
+            limits,
+        )
+        assert limits.breach(result.returncode, result.stderr) == "open_files"
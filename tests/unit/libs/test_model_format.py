@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/model_format.py."""
+
+import json
+
+import orjson
+import pytest
+
+from trestle_mcp.libs import model_format
+from trestle_mcp.libs.model_format import format_model, run_formatted
+from trestle_mcp.libs.results import success
+from trestle_mcp.services.import_ import TrestleImportInput
+
+MODEL = {"catalog": {"uuid": "u", "metadata": {"title": "A\nB"}, "groups": []}}
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_bytes(orjson.dumps(MODEL, option=orjson.OPT_INDENT_2))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def default_format():
+    yield
+    model_format.configure()
+
+
+class TestFormatModel:
+    """Test suite for format_model."""
+
+    def test_compact(self, model):
+        """Test that an indented model is rewritten as compact JSON."""
+        assert format_model(model, "compact")
+        assert model.read_bytes() == orjson.dumps(MODEL)
+        assert not format_model(model, "compact")
+
+    def test_pretty_leaves_model(self, model):
+        """Test that the pretty format keeps the file trestle wrote."""
+        before = model.read_bytes()
+        assert not format_model(model, "pretty")
+        assert model.read_bytes() == before
+
+    def test_auto(self, model):
+        """Test that auto writes compact JSON only from the threshold."""
+        size = len(orjson.dumps(MODEL))
+        model_format.configure("pretty", size + 1)
+        assert not format_model(model, "auto")
+        model_format.configure("pretty", size)
+        assert format_model(model, "auto")
+        assert model.read_bytes() == orjson.dumps(MODEL)
+        model_format.configure("pretty", size + 1)
+        assert format_model(model, "auto")
+        assert model.read_bytes() == orjson.dumps(MODEL, option=orjson.OPT_INDENT_2)
+
+    def test_server_format(self, model):
+        """Test that the server format applies when the call chose none."""
+        model_format.configure("compact")
+        assert format_model(model)
+        assert json.loads(model.read_text()) == MODEL
+
+    def test_not_a_model(self, tmp_path):
+        """Test that directories and other files are left alone."""
+        (tmp_path / "notes.md").write_text("# notes\n")
+        assert not format_model(tmp_path / "notes.md", "compact")
+        assert not format_model(tmp_path, "compact")
+        assert not format_model(tmp_path / "missing.json", "compact")
+
+    def test_unknown_format(self):
+        """Test that an unknown server format is rejected."""
+        with pytest.raises(ValueError):
+            model_format.configure("minified")
+
+
+class TestRunFormatted:
+    """Test suite for run_formatted."""
+
+    @pytest.mark.asyncio
+    async def test_outputs_rewritten(self, model, tmp_path):
+        """Test that the models written by a call are rewritten."""
+
+        async def service(params):
+            return success("✅ imported", outputs=["catalog.json", "markdown"])
+
+        params = TrestleImportInput(
+            file="c.json",
+            output="c",
+            trestle_root=str(tmp_path),
+            output_format="compact",
+        )
+        result = await run_formatted(service, params)
+        assert result == "✅ imported"
+        assert model.read_bytes() == orjson.dumps(MODEL)
+
+    @pytest.mark.asyncio
+    async def test_invalid_model_warned(self, tmp_path):
+        """Test that a model that cannot be rewritten is reported as a warning."""
+        (tmp_path / "catalog.json").write_text("{\n  not json")
+
+        async def service(params):
+            return success("✅ imported", outputs=["catalog.json"])
+
+        params = TrestleImportInput(
+            file="c.json",
+            output="c",
+            trestle_root=str(tmp_path),
+            output_format="compact",
+        )
+        result = await run_formatted(service, params)
+        assert result.content.status == "success"
+        assert result.content.warnings[0].startswith("Models not written as compact")
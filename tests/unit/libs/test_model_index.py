@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/model_index.py."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.model_index import (
+    INDEX_DIR,
+    control_index,
+    etag,
+    read_range,
+    scan_controls,
+)
+from trestle_mcp.libs.storage import CompressedStore
+from trestle_mcp.libs.workspace import Workspace
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+
+
+def control_slice(data: bytes, entry: dict) -> dict:
+    return json.loads(data[entry["offset"] : entry["offset"] + entry["length"]])
+
+
+class TestScanControls:
+    """Test suite for the control scanner."""
+
+    def test_test_catalog(self):
+        """Test that every control is found with its exact byte range."""
+        data = TEST_CATALOG.read_bytes()
+        controls = scan_controls(data)
+        assert list(controls) == ["ac-1", "ac-2", "ac-2.1", "ac-2.2"]
+        assert controls["ac-2"]["title"] == "Account Management"
+        assert controls["ac-2.1"]["parent"] == "ac-2"
+        assert controls["ac-1"]["parent"] is None
+        for control_id, entry in controls.items():
+            assert control_slice(data, entry)["id"] == control_id
+
+    def test_strings_with_escapes_and_structure(self):
+        """Test that braces and quotes inside strings do not confuse the scanner."""
+        catalog = {
+            "catalog": {
+                "controls": [
+                    {"title": 'Say "{hi}" [x]', "id": "c-1", "params": [{"id": "p"}]},
+                    {"id": "c-é", "parts": [{"id": "c-2_smt", "title": "x"}]},
+                ]
+            }
+        }
+        data = json.dumps(catalog, ensure_ascii=False).encode()
+        controls = scan_controls(data)
+        assert list(controls) == ["c-1", "c-é"]
+        assert controls["c-1"]["title"] == 'Say "{hi}" [x]'
+        assert control_slice(data, controls["c-é"])["parts"][0]["id"] == "c-2_smt"
+
+    def test_etag(self):
+        """Test that the ETag is the hash of the control bytes."""
+        data = TEST_CATALOG.read_bytes()
+        entry = scan_controls(data)["ac-1"]
+        assert entry["etag"] == etag(
+            data[entry["offset"] : entry["offset"] + entry["length"]]
+        )
+        assert etag("abc") == etag(b"abc")
+
+
+class TestControlIndex:
+    """Test suite for the per-workspace control index."""
+
+    def test_index_is_stored_and_refreshed(self, tmp_path):
+        """Test that indexes are kept on disk and rebuilt when the catalog changes."""
+        catalog = tmp_path / "catalogs" / "test" / "catalog.json"
+        catalog.parent.mkdir(parents=True)
+        catalog.write_bytes(TEST_CATALOG.read_bytes())
+        controls = control_index(Workspace(tmp_path), catalog)
+        assert "catalogs/test/catalog.json" in CompressedStore(tmp_path / INDEX_DIR)
+
+        # a new workspace (e.g. after a restart) loads the stored index
+        assert control_index(Workspace(tmp_path), catalog) == controls
+
+        content = json.loads(catalog.read_text())
+        content["catalog"]["groups"][0]["controls"].pop(0)
+        catalog.write_text(json.dumps(content))
+        stat = catalog.stat()
+        os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        controls = control_index(Workspace(tmp_path), catalog)
+        assert "ac-1" not in controls
+        entry = controls["ac-2"]
+        data = read_range(catalog, entry["offset"], entry["length"])
+        assert json.loads(data)["id"] == "ac-2"
+
+    def test_yaml_catalog(self, tmp_path):
+        """Test that only JSON catalogs are indexed."""
+        catalog = tmp_path / "catalog.yaml"
+        catalog.write_text("catalog: {}")
+        with pytest.raises(ValueError):
+            control_index(Workspace(tmp_path), catalog)
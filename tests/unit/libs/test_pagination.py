@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/pagination.py."""
+
+import pytest
+
+from trestle_mcp.libs.pagination import paginate, parse_cursor
+
+
+class TestPaginate:
+    """Test suite for paginate function."""
+
+    def test_pages(self):
+        """Test that following cursors returns every item once."""
+        items = list(range(7))
+        page, offset, cursor = paginate(items, None, 3)
+        assert (page, offset) == ([0, 1, 2], 0)
+        page, offset, cursor = paginate(items, cursor, 3)
+        assert (page, offset) == ([3, 4, 5], 3)
+        page, offset, cursor = paginate(items, cursor, 3)
+        assert (page, offset, cursor) == ([6], 6, None)
+
+    def test_empty(self):
+        """Test that an empty result is a single empty page."""
+        assert paginate([], None, 10) == ([], 0, None)
+
+    @pytest.mark.parametrize("cursor", ["abc", "-1", "99"])
+    def test_invalid_cursor(self, cursor):
+        """Test that invalid cursors are rejected."""
+        with pytest.raises(ValueError):
+            paginate([1, 2], cursor, 1)
+
+
+class TestParseCursor:
+    """Test suite for parse_cursor function."""
+
+    def test_offsets(self):
+        """Test that cursors are offsets and no cursor is the first page."""
+        assert parse_cursor(None) == 0
+        assert parse_cursor("12") == 12
+        with pytest.raises(ValueError):
+            parse_cursor("-3")
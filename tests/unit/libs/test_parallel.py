@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/parallel.py."""
+
+import pytest
+
+from trestle_mcp.libs import parallel
+
+_shared = {"items": ["parent"]}
+
+
+def _append(item: str) -> list[str]:
+    _shared["items"].append(item)
+    return _shared["items"]
+
+
+class TestBalance:
+    """Test suite for balance function."""
+
+    def test_never_splits_shards(self):
+        """Test that each shard lands whole in one batch."""
+        shards = [["a1", "a2", "a3"], ["b1"], ["c1", "c2"], ["d1"]]
+        batches = parallel.balance(shards, 2)
+        assert len(batches) == 2
+        for shard in shards:
+            assert any(all(item in batch for item in shard) for batch in batches)
+        assert sorted(sum(batches, [])) == sorted(sum(shards, []))
+
+    def test_balances_sizes(self):
+        """Test that batches get a similar number of items."""
+        shards = [["x"] * 5, ["y"] * 4, ["z"] * 3, ["w"] * 2]
+        sizes = sorted(len(batch) for batch in parallel.balance(shards, 2))
+        assert sizes == [7, 7]
+
+    def test_keeps_shard_order_within_batch(self):
+        """Test that shards keep their original order inside a batch."""
+        assert parallel.balance([["a"], ["b"], ["c"]], 1) == [["a", "b", "c"]]
+
+    def test_fewer_shards_than_bins(self):
+        """Test that no empty batches are produced."""
+        assert parallel.balance([["a"], ["b"]], 8) == [["a"], ["b"]]
+        assert parallel.balance([], 4) == []
+
+
+class TestForkMap:
+    """Test suite for fork_map function."""
+
+    def test_each_call_starts_from_parent_state(self):
+        """Test that calls see the parent memory but not each other's changes."""
+        results = parallel.fork_map(_append, [("a",), ("b",), ("c",)], 2)
+        assert results == [["parent", "a"], ["parent", "b"], ["parent", "c"]]
+        assert _shared["items"] == ["parent"]
+
+    def test_no_calls(self):
+        """Test that no child is started without calls."""
+        assert parallel.fork_map(_append, [], 4) == []
+
+
+class TestConfigure:
+    """Test suite for pool configuration."""
+
+    def test_configure_workers(self):
+        """Test that the pool size can be configured."""
+        try:
+            parallel.configure(3)
+            assert parallel.max_workers() == 3
+        finally:
+            parallel.configure()
+
+    def test_invalid_workers(self):
+        """Test that a non-positive pool size is rejected."""
+        with pytest.raises(ValueError):
+            parallel.configure(0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/results.py."""
+
+from trestle_mcp.libs.results import (
+    ResultContent,
+    failure,
+    files_page,
+    success,
+    to_call_result,
+)
+
+
+class TestToolResult:
+    """Test suite for service results."""
+
+    def test_success(self):
+        """Test that a result is its message and carries structured content."""
+        result = success("✅ Done\n\nOutput: x", outputs=["x"], counts={"files": 2})
+        assert result.startswith("✅ Done")
+        assert result.content.status == "success"
+        assert result.content.message == "Done"
+        assert result.content.outputs == ["x"]
+        assert result.content.counts == {"files": 2}
+
+    def test_failure(self):
+        """Test that failures carry the error."""
+        result = failure("❌ Failed\n\nError: boom", "boom")
+        assert result.content.status == "error"
+        assert result.content.message == "Failed"
+        assert result.content.error == "boom"
+
+
+class TestToCallResult:
+    """Test suite for the conversion to tool call results."""
+
+    def test_structured_content(self):
+        """Test that the message and the structure are both sent."""
+        call = to_call_result(success("✅ Done", elapsed=1.5), elapsed=2.0)
+        assert call.content[0].text == "✅ Done"
+        assert call.structuredContent["status"] == "success"
+        assert call.structuredContent["elapsed"] == 1.5
+        assert not call.isError
+        ResultContent.model_validate(call.structuredContent)
+
+    def test_plain_message(self):
+        """Test that plain messages get a status and the call duration."""
+        call = to_call_result("❌ Failed\n\nError: boom", elapsed=0.25)
+        assert call.structuredContent["status"] == "error"
+        assert call.structuredContent["message"] == "Failed"
+        assert call.structuredContent["elapsed"] == 0.25
+
+
+class TestFilesPage:
+    """Test suite for the listing of generated files."""
+
+    def test_pages(self, tmp_path):
+        """Test that generated files are listed one page at a time."""
+        for name in ("ac-1.md", "ac-2.md", "ac-3.md"):
+            (tmp_path / "md" / "ac").mkdir(parents=True, exist_ok=True)
+            (tmp_path / "md" / "ac" / name).write_text("x")
+        result = files_page(tmp_path, "md", "1", 1)
+        assert "Showing 2-2 of 3" in result
+        assert "md/ac/ac-2.md" in result
+        assert result.content.items == [{"path": "md/ac/ac-2.md"}]
+        assert result.content.next_cursor == "2"
+        assert result.content.counts == {"files": 3}
+
+    def test_invalid_cursor(self, tmp_path):
+        """Test that an invalid cursor is an error result."""
+        result = files_page(tmp_path, "md", "x", 10)
+        assert result.startswith("❌ Failed to list generated files")
+        assert result.content.status == "error"
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/search.py."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.search import SearchIndex, Segment, tokenize
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+
+
+def control(control_id, title, statement="", guidance="", controls=()):
+    parts = [
+        {"id": f"{control_id}_smt", "name": "statement", "prose": statement},
+        {"id": f"{control_id}_gdn", "name": "guidance", "prose": guidance},
+    ]
+    return {
+        "id": control_id,
+        "title": title,
+        "parts": parts,
+        "controls": list(controls),
+    }
+
+
+def write_catalog(root: Path, name: str, controls: list) -> Path:
+    path = root / "catalogs" / name / "catalog.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"catalog": {"groups": [{"controls": controls}]}}))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    write_catalog(
+        tmp_path,
+        "nist",
+        [
+            control(
+                "sc-28", "Protection of Information at Rest", "Protect data at rest."
+            ),
+            control(
+                "sc-13",
+                "Cryptographic Protection",
+                "Implement encryption of data.",
+                "Encryption at rest and in transit.",
+            ),
+            control("ac-1", "Policy and Procedures", "Develop a policy."),
+        ],
+    )
+    write_catalog(
+        tmp_path,
+        "custom",
+        [control("x-1", "Disk encryption", "Encrypt laptops.")],
+    )
+    return tmp_path
+
+
+class TestTokenize:
+    """Test suite for tokenize function."""
+
+    def test_terms(self):
+        """Test that text is lower cased and stopwords and params are dropped."""
+        assert tokenize("Encryption of the {{ insert: param, x }} data-at-REST") == [
+            "encryption",
+            "data",
+            "rest",
+        ]
+
+
+class TestSegment:
+    """Test suite for catalog segments."""
+
+    def test_test_catalog(self):
+        """Test that every control and enhancement is indexed with its parent."""
+        segment = Segment("test", json.loads(TEST_CATALOG.read_text())["catalog"])
+        assert [doc["id"] for doc in segment.docs] == [
+            "ac-1",
+            "ac-2",
+            "ac-2.1",
+            "ac-2.2",
+        ]
+        assert segment.docs[2]["parent"] == "ac-2"
+        assert "emergency" in segment.postings
+
+
+class TestSearchIndex:
+    """Test suite for SearchIndex."""
+
+    def test_ranked_matches(self, workspace):
+        """Test that matches on every word and in titles rank first."""
+        index = SearchIndex(workspace)
+        index.refresh()
+        total, matches = index.search("encryption at rest")
+        assert total == 3
+        assert [m["id"] for m in matches][:1] == ["sc-13"]
+        assert {m["id"] for m in matches} == {"sc-13", "sc-28", "x-1"}
+        assert "rest" in matches[0]["snippet"].lower()
+
+    def test_filters_and_pages(self, workspace):
+        """Test that catalogs filter matches and pages follow the ranking."""
+        index = SearchIndex(workspace)
+        index.refresh()
+        total, matches = index.search("encryption", catalogs=["custom"])
+        assert (total, [m["id"] for m in matches]) == (1, ["x-1"])
+        _, first = index.search("encryption at rest", limit=2)
+        _, second = index.search("encryption at rest", offset=2, limit=2)
+        _, everything = index.search("encryption at rest")
+        assert first + second == everything
+        with pytest.raises(ValueError):
+            index.search("encryption", catalogs=["missing"])
+
+    def test_no_match(self, workspace):
+        """Test queries without indexed terms."""
+        index = SearchIndex(workspace)
+        index.refresh()
+        assert index.search("zebra") == (0, [])
+        assert index.search("the of") == (0, [])
+
+    def test_incremental_refresh(self, workspace):
+        """Test that only changed, added or removed catalogs are indexed again."""
+        index = SearchIndex(workspace)
+        assert sorted(index.refresh()) == ["custom", "nist"]
+        assert index.refresh() == []
+
+        path = write_catalog(workspace, "custom", [control("x-2", "Backups")])
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        write_catalog(workspace, "new", [control("n-1", "Encryption keys")])
+        assert sorted(index.refresh()) == ["custom", "new"]
+        _, matches = index.search("encryption")
+        assert {m["id"] for m in matches} == {"sc-13", "n-1"}
+
+        (workspace / "catalogs" / "new" / "catalog.json").unlink()
+        index.refresh()
+        assert index.catalogs == ["custom", "nist"]
+
+    def test_refresh_changed_files(self, workspace):
+        """Test that a refresh given the changed files checks only their catalogs."""
+        index = SearchIndex(workspace)
+        index.refresh()
+        root = workspace.resolve()
+        write_catalog(workspace, "new", [control("n-1", "Encryption keys")])
+        path = write_catalog(workspace, "custom", [control("x-2", "Backups")])
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        # custom changed too, but only new is reported
+        assert index.refresh([root / "catalogs" / "new" / "catalog.json"]) == ["new"]
+        assert index.refresh([root / "md" / "ac-1.md"]) == []
+
+        (workspace / "catalogs" / "new" / "catalog.json").unlink()
+        index.refresh([root / "catalogs" / "new" / "catalog.json"])
+        assert index.catalogs == ["custom", "nist"]
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/singleflight.py."""
+
+import asyncio
+import os
+
+import pytest
+
+from trestle_mcp.libs.singleflight import (
+    SingleFlight,
+    external_files,
+    input_files,
+    request_key,
+)
+from trestle_mcp.services.author.profile_generate import (
+    ProfileOutput,
+    TrestleAuthorProfileGenerateBatchInput,
+    TrestleAuthorProfileGenerateInput,
+)
+from trestle_mcp.services.author.profile_resolve import (
+    TrestleAuthorProfileResolveInput,
+)
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_share_one_execution(self):
+        """Test that concurrent calls with one key run once."""
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.02)
+            return "done"
+
+        results = await asyncio.gather(*[flights.run("k", work) for _ in range(5)])
+        assert results == ["done"] * 5
+        assert len(runs) == 1
+        assert flights.coalesced == 4
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that calls with different keys, or no key, are not shared."""
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(
+            flights.run("a", work), flights.run("b", work), flights.run(None, work)
+        )
+        assert len(runs) == 3
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_run_again(self):
+        """Test that a finished execution is not reused."""
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+
+        await flights.run("k", work)
+        await flights.run("k", work)
+        assert len(runs) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_shared(self):
+        """Test that every caller receives the failure of the execution."""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flights.run("k", work), flights.run("k", work), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the execution survives the cancellation of its first caller."""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flights.run("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flights.run("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "done"
+
+
+class TestRequestKey:
+    """Test suite for request keys."""
+
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        profile = tmp_path / "profiles" / "base" / "profile.json"
+        profile.parent.mkdir(parents=True)
+        profile.write_text("{}")
+        return tmp_path
+
+    def test_normalised_input(self, workspace):
+        """Test that equivalent inputs share a key."""
+        a = TrestleAuthorProfileResolveInput(name=" base ", output="out")
+        b = TrestleAuthorProfileResolveInput(
+            name="base", output="out", show_values=False, trestle_root=str(workspace)
+        )
+        assert request_key("resolve", a, workspace) == request_key(
+            "resolve", b, workspace
+        )
+        assert request_key("resolve", a, workspace) != request_key(
+            "generate", a, workspace
+        )
+
+    def test_input_file_version(self, workspace):
+        """Test that changing a model named by the input changes the key."""
+        params = TrestleAuthorProfileResolveInput(name="base", output="out")
+        profile = workspace / "profiles" / "base" / "profile.json"
+        assert [k[0] for k in input_files(workspace, params)] == [
+            str(profile.resolve())
+        ]
+        before = request_key("resolve", params, workspace)
+        stat = profile.stat()
+        os.utime(profile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert request_key("resolve", params, workspace) != before
+
+    def test_outputs_ignored(self, workspace):
+        """Test that files written by the call do not change its key."""
+        params = TrestleAuthorProfileResolveInput(name="base", output="out")
+        before = request_key("resolve", params, workspace)
+        catalog = workspace / "catalogs" / "out" / "catalog.json"
+        catalog.parent.mkdir(parents=True)
+        catalog.write_text("{}")
+        assert request_key("resolve", params, workspace) == before
+
+    def test_paths_outside_workspace_ignored(self, workspace):
+        """Test that paths escaping the workspace are not read."""
+        params = TrestleAuthorProfileResolveInput(name="..", output="out")
+        assert input_files(workspace, params) == []
+
+    def test_absolute_paths_in_workspace(self, workspace):
+        """Test that an absolute path in the workspace is an input file."""
+        profile = workspace / "profiles" / "base" / "profile.json"
+        params = TrestleAuthorProfileResolveInput(name=str(profile), output="out")
+        assert [k[0] for k in input_files(workspace, params)] == [
+            str(profile.resolve())
+        ]
+
+    def test_external_files(self, workspace, tmp_path_factory):
+        """Test that files outside the workspace are listed apart."""
+        header = tmp_path_factory.mktemp("headers") / "header.yaml"
+        header.write_text("a: 1\n")
+        params = TrestleAuthorProfileGenerateInput(
+            name="base", output="md", yaml_header=str(header)
+        )
+        assert external_files(workspace, params) == [header.resolve()]
+        assert input_files(workspace, params)[0][0].endswith("profile.json")
+        assert len(input_files(workspace, params)) == 1
+
+    def test_nested_inputs(self, workspace):
+        """Test that the models named inside nested inputs are input files."""
+        (workspace / "md_base").mkdir()
+        (workspace / "md_base" / "ac-1.md").write_text("# ac-1\n")
+        params = TrestleAuthorProfileGenerateBatchInput(
+            profiles=[ProfileOutput(name="base", output="md_base")]
+        )
+        profile = workspace / "profiles" / "base" / "profile.json"
+        assert [k[0] for k in input_files(workspace, params)] == [
+            str(profile.resolve())
+        ]
+        before = request_key("batch", params, workspace)
+        profile.write_text('{"edited": true}')
+        assert request_key("batch", params, workspace) != before
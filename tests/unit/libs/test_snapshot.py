@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/snapshot.py."""
+
+import asyncio
+
+import pytest
+
+from trestle_mcp.libs.snapshot import (
+    SnapshotStore,
+    output_paths,
+    protect_outputs,
+    run_locked,
+    workspace_files,
+)
+from trestle_mcp.services.author.profile_assemble import (
+    TrestleAuthorProfileAssembleInput,
+)
+from trestle_mcp.services.author.profile_generate import (
+    ProfileOutput,
+    TrestleAuthorProfileGenerateBatchInput,
+)
+from trestle_mcp.libs.workspace import WorkspaceRegistry
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "catalogs" / "nist").mkdir(parents=True)
+    (tmp_path / "catalogs" / "nist" / "catalog.json").write_text('{"a": 1}')
+    (tmp_path / "md" / "ac").mkdir(parents=True)
+    (tmp_path / "md" / "ac" / "ac-1.md").write_text("# ac-1\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref")
+    return tmp_path
+
+
+class TestSnapshotStore:
+    """Test suite for SnapshotStore."""
+
+    def test_create_restore(self, workspace):
+        """Test that a restore undoes edits, additions and deletions."""
+        store = SnapshotStore(workspace)
+        manifest = store.create("before", mode="hardlink")
+        assert set(manifest["files"]) == {"catalogs/nist/catalog.json", "md/ac/ac-1.md"}
+        assert manifest["methods"] == {"hardlink": 2}
+
+        (workspace / "md" / "ac" / "ac-1.md").unlink()
+        (workspace / "md" / "ac" / "ac-1.md").write_text("# edited\n")
+        (workspace / "catalogs" / "nist" / "catalog.json").unlink()
+        (workspace / "md" / "new").mkdir()
+        (workspace / "md" / "new" / "x.md").write_text("# new\n")
+
+        report = store.restore("before")
+        assert sorted(report["restored"]) == [
+            "catalogs/nist/catalog.json",
+            "md/ac/ac-1.md",
+        ]
+        assert report["removed"] == ["md/new/x.md"]
+        assert report["damaged"] == []
+        assert (workspace / "md" / "ac" / "ac-1.md").read_text() == "# ac-1\n"
+        assert (workspace / "catalogs" / "nist" / "catalog.json").exists()
+        assert not (workspace / "md" / "new").exists()
+        assert (workspace / ".git" / "HEAD").read_text() == "ref"
+
+    def test_restore_unchanged(self, workspace):
+        """Test that files still shared with the snapshot are left alone."""
+        store = SnapshotStore(workspace)
+        store.create("s", mode="hardlink")
+        report = store.restore("s")
+        assert report["restored"] == []
+        assert len(report["unchanged"]) == 2
+
+    def test_copy_mode(self, workspace):
+        """Test that a copy snapshot is independent of in-place writes."""
+        store = SnapshotStore(workspace)
+        assert store.create("s", mode="copy")["methods"] == {"copy": 2}
+        (workspace / "md" / "ac" / "ac-1.md").write_text("# in place\n")
+        report = store.restore("s")
+        assert report["restored"] == ["md/ac/ac-1.md"]
+        assert (workspace / "md" / "ac" / "ac-1.md").read_text() == "# ac-1\n"
+
+    def test_damaged(self, workspace):
+        """Test that an in-place write through a hard link is reported."""
+        store = SnapshotStore(workspace)
+        store.create("s", mode="hardlink")
+        with open(workspace / "md" / "ac" / "ac-1.md", "a") as f:
+            f.write("more\n")
+        assert store.restore("s")["damaged"] == ["md/ac/ac-1.md"]
+
+    def test_protect(self, workspace):
+        """Test that written outputs stop sharing their files with snapshots."""
+        store = SnapshotStore(workspace)
+        store.create("s", mode="hardlink")
+        params = TrestleAuthorProfileAssembleInput(
+            markdown_dir="md", output_profile="nist"
+        )
+        assert output_paths(workspace, params) == [workspace / "catalogs" / "nist"]
+        assert protect_outputs(workspace, params) == 1
+        catalog = workspace / "catalogs" / "nist" / "catalog.json"
+        assert catalog.stat().st_nlink == 1
+        catalog.write_text('{"a": 2}')
+        report = store.restore("s")
+        assert report["damaged"] == []
+        assert catalog.read_text() == '{"a": 1}'
+
+    def test_nested_outputs(self, workspace):
+        """Test that the outputs of the profiles of a batch are protected."""
+        SnapshotStore(workspace).create("s", mode="hardlink")
+        params = TrestleAuthorProfileGenerateBatchInput(
+            profiles=[ProfileOutput(name="nist", output="md")]
+        )
+        assert output_paths(workspace, params) == [workspace / "md"]
+        assert protect_outputs(workspace, params) == 1
+        assert (workspace / "md" / "ac" / "ac-1.md").stat().st_nlink == 1
+
+    def test_protect_without_snapshots(self, workspace):
+        """Test that nothing is copied when the workspace has no snapshot."""
+        params = TrestleAuthorProfileAssembleInput(
+            markdown_dir="md", output_profile="nist"
+        )
+        assert protect_outputs(workspace, params) == 0
+
+    @pytest.mark.asyncio
+    async def test_run_locked(self, workspace):
+        """Test that calls writing the same output run one at a time."""
+        order = []
+
+        async def service(params):
+            order.append(f"{params.markdown_dir}-in")
+            await asyncio.sleep(0.01)
+            order.append(f"{params.markdown_dir}-out")
+            return params.markdown_dir
+
+        ws = WorkspaceRegistry().get(workspace)
+        first = TrestleAuthorProfileAssembleInput(markdown_dir="md", output_profile="nist")
+        second = first.model_copy(update={"markdown_dir": "other"})
+        results = await asyncio.gather(
+            run_locked(ws, service, first), run_locked(ws, service, second)
+        )
+        assert results == ["md", "other"]
+        # either call may take the lock first, but they never interleave
+        assert order in (
+            ["md-in", "md-out", "other-in", "other-out"],
+            ["other-in", "other-out", "md-in", "md-out"],
+        )
+
+    def test_names(self, workspace):
+        """Test that names are validated and unique."""
+        store = SnapshotStore(workspace)
+        store.create("s")
+        with pytest.raises(ValueError):
+            store.create("s")
+        with pytest.raises(ValueError):
+            store.create("../escape")
+        assert store.create()["id"] in store.ids()
+
+    def test_ids_without_walking_files(self, workspace, monkeypatch):
+        """Test that listing snapshots does not walk their file trees."""
+        store = SnapshotStore(workspace)
+        store.create("a", mode="hardlink")
+        store.create("b", mode="hardlink")
+
+        def walk(*args):
+            raise AssertionError("file trees walked")
+
+        monkeypatch.setattr(store.manifests, "keys", walk)
+        monkeypatch.setattr("os.walk", walk)
+        assert store.ids() == ["a", "b"]
+
+    def test_excluded(self, workspace):
+        """Test that snapshots leave out .git and the server state."""
+        store = SnapshotStore(workspace)
+        store.create("s")
+        files = {p.as_posix() for p in workspace_files(workspace)}
+        assert files == {"catalogs/nist/catalog.json", "md/ac/ac-1.md"}
+
+    def test_delete(self, workspace):
+        """Test that a deleted snapshot is gone."""
+        store = SnapshotStore(workspace)
+        store.create("s")
+        store.delete("s")
+        assert store.ids() == []
+        with pytest.raises(KeyError):
+            store.delete("s")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/storage.py."""
+
+import gzip
+import io
+
+import pytest
+
+from trestle_mcp.libs import storage
+from trestle_mcp.libs.storage import CompressedStore
+
+CODECS = storage.available_codecs()
+
+
+class TestCompressedStore:
+    """Test suite for CompressedStore."""
+
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_round_trip(self, tmp_path, codec):
+        """Test that entries are read back as written, with every codec."""
+        store = CompressedStore(tmp_path, codec)
+        data = {"catalog": {"controls": [{"id": f"ac-{i}"} for i in range(100)]}}
+        store.write_json("catalogs/test.json", data)
+        assert store.read_json("catalogs/test.json") == data
+        assert "catalogs/test.json" in store
+        assert list(store.keys()) == ["catalogs/test.json"]
+
+    def test_gzip_entries_are_compressed(self, tmp_path):
+        """Test that gzip entries are standard gzip files, smaller than the content."""
+        content = b"control " * 10000
+        store = CompressedStore(tmp_path, "gzip")
+        assert store.write("entry", content) < len(content)
+        with gzip.open(tmp_path / "entry.gz") as f:
+            assert f.read() == content
+
+    def test_streaming_reads(self, tmp_path):
+        """Test that entries are read and copied by chunks from a stream."""
+        content = bytes(range(256)) * 20000
+        store = CompressedStore(tmp_path, "gzip")
+        store.write("entry", io.BytesIO(content))
+        with store.open("entry") as f:
+            assert f.read(1000) == content[:1000]
+        store.copy_to("entry", tmp_path / "restored")
+        assert (tmp_path / "restored").read_bytes() == content
+
+    def test_codec_change(self, tmp_path):
+        """Test that entries written with another codec are still read, then replaced."""
+        CompressedStore(tmp_path, "none").write("entry", b"old")
+        store = CompressedStore(tmp_path, "gzip")
+        assert store.read("entry") == b"old"
+        store.write("entry", b"new")
+        assert not (tmp_path / "entry").exists()
+        assert CompressedStore(tmp_path, "none").read("entry") == b"new"
+
+    def test_missing_and_deleted(self, tmp_path):
+        """Test that missing entries raise KeyError."""
+        store = CompressedStore(tmp_path, "gzip")
+        with pytest.raises(KeyError):
+            store.open("missing")
+        store.write("entry", b"x")
+        store.delete("entry")
+        assert "entry" not in store
+        assert list(store.keys()) == []
+
+    def test_invalid_key(self, tmp_path):
+        """Test that keys cannot escape the store directory."""
+        with pytest.raises(ValueError):
+            CompressedStore(tmp_path).write("../outside", b"x")
+
+
+class TestConfigure:
+    """Test suite for the codec configuration."""
+
+    def test_default_codec(self, tmp_path):
+        """Test that stores use the configured codec by default."""
+        try:
+            storage.configure("gzip")
+            assert CompressedStore(tmp_path).codec == "gzip"
+        finally:
+            storage.configure()
+        assert CompressedStore(tmp_path).codec == "none"
+
+    def test_unsupported_codec(self):
+        """Test that unknown or unavailable codecs are rejected."""
+        with pytest.raises(ValueError):
+            storage.configure("lz4")
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """Unit tests for libs/trestle.py."""
 
+import signal
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from trestle_mcp.libs import trestle
+from trestle_mcp.libs.limits import Limits
 from trestle_mcp.libs.trestle import find_trestle_bin, run_trestle_command
 
 
@@ -82,6 +87,7 @@ class TestRunTrestleCommand:
                 assert result["success"] is False
                 assert "timed out" in result["stderr"]
                 assert result["returncode"] == -1
+                assert result["limit"] == "timeout"
 
     def test_command_exception(self):
         """Test command exception handling."""
@@ -117,3 +123,53 @@ class TestRunTrestleCommand:
                 mock_run.assert_called_once()
                 call_kwargs = mock_run.call_args[1]
                 assert call_kwargs["cwd"] == "/custom/path"
+
+    def test_forkserver_runner(self):
+        """Test that the forkserver runner replaces the subprocess."""
+        from subprocess import CompletedProcess
+
+        forkserver = MagicMock()
+        forkserver.run.return_value = CompletedProcess(["trestle"], 0, "out", "")
+        with patch.object(trestle, "_forkserver", forkserver):
+            with patch("trestle_mcp.libs.trestle.subprocess.run") as mock_run:
+                with patch(
+                    "trestle_mcp.libs.trestle.find_trestle_bin", return_value="trestle"
+                ):
+                    result = run_trestle_command(["validate", "-a"], cwd="/ws")
+
+        mock_run.assert_not_called()
+        forkserver.run.assert_called_once_with(
+            ["trestle", "validate", "-a"], "/ws", trestle.COMMAND_TIMEOUT, Limits()
+        )
+        assert result == {
+            "success": True,
+            "stdout": "out",
+            "stderr": "",
+            "returncode": 0,
+            "limit": None,
+        }
+
+    def test_resource_limit_exceeded(self):
+        """Test that a command stopped by a resource limit reports the limit."""
+        from subprocess import CompletedProcess
+
+        limits = Limits(cpu=5)
+        with patch.object(trestle, "_limits", limits):
+            with patch(
+                "trestle_mcp.libs.trestle.resource_limits.run",
+                return_value=CompletedProcess(["trestle"], -signal.SIGXCPU, "", ""),
+            ) as mock_run:
+                with patch(
+                    "trestle_mcp.libs.trestle.find_trestle_bin", return_value="trestle"
+                ):
+                    result = run_trestle_command(["import", "-f", "big.json"])
+
+        assert mock_run.call_args[0][3] is limits
+        assert result["success"] is False
+        assert result["limit"] == "cpu"
+        assert result["stderr"].startswith("Resource limit exceeded: CPU time (5 s)")
+
+    def test_unknown_runner(self):
+        """Test that an unknown runner is rejected."""
+        with pytest.raises(ValueError):
+            trestle.configure("threads")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/validate.py."""
+
+import json
+
+from trestle_mcp.libs.validate import (
+    CACHE_FILE,
+    _load_cache,
+    _model_files,
+    _save_cache,
+)
+
+
+class TestModelFiles:
+    """Test suite for _model_files function."""
+
+    def test_single_file(self, tmp_path):
+        """Test a model stored in one file."""
+        path = tmp_path / "profile.json"
+        path.write_text("{}")
+        assert _model_files(path) == [path]
+
+    def test_split_model(self, tmp_path):
+        """Test that the files of a split model are included."""
+        path = tmp_path / "profile.json"
+        path.write_text("{}")
+        (tmp_path / "profile" / "imports").mkdir(parents=True)
+        (tmp_path / "profile" / "metadata.json").write_text("{}")
+        (tmp_path / "profile" / "imports" / "00000__import.json").write_text("{}")
+        assert _model_files(path) == [
+            path,
+            tmp_path / "profile" / "imports" / "00000__import.json",
+            tmp_path / "profile" / "metadata.json",
+        ]
+
+
+class TestResultStore:
+    """Test suite for the stored validation results."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that saved results are loaded back."""
+        results = {"profiles/a/profile.json": {"key": "k", "result": {"valid": True}}}
+        _save_cache(tmp_path, results)
+        assert _load_cache(tmp_path) == results
+
+    def test_missing_or_outdated(self, tmp_path):
+        """Test that a missing or outdated store is ignored."""
+        assert _load_cache(tmp_path) == {}
+        (tmp_path / CACHE_FILE).parent.mkdir(parents=True)
+        (tmp_path / CACHE_FILE).write_text(
+            json.dumps({"version": 0, "results": {"x": 1}})
+        )
+        assert _load_cache(tmp_path) == {}
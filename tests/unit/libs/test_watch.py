@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/watch.py."""
+
+import asyncio
+import os
+
+import pytest
+
+from trestle_mcp.libs import watch as watch_lib
+from trestle_mcp.libs.concurrency import BATCH, current_priority
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.watch import Watch, WatchRegistry, scan
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+
+DEBOUNCE = 0.1
+
+
+@pytest.fixture
+def markdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_lib, "watchfiles", None)
+    monkeypatch.setattr(watch_lib, "POLL_INTERVAL", 0.02)
+    directory = tmp_path / "md" / "ac"
+    directory.mkdir(parents=True)
+    for name in ("ac-1", "ac-2"):
+        (directory / f"{name}.md").write_text(f"# {name}\n")
+    return tmp_path
+
+
+def make_watch(root, calls, result=None):
+    async def assemble():
+        calls.append(current_priority.get())
+        return result or success("✅ Profile assembled from markdown successfully")
+
+    return Watch("w1", root, "md", "prof", assemble, DEBOUNCE)
+
+
+async def wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+class TestWatch:
+    """Test suite for Watch."""
+
+    def test_scan(self, markdown):
+        """Test that only markdown files are scanned."""
+        (markdown / "md" / "notes.txt").write_text("x")
+        assert sorted(os.path.basename(p) for p in scan(markdown / "md")) == [
+            "ac-1.md",
+            "ac-2.md",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_burst_assembled_once(self, markdown):
+        """Test that a burst of edits triggers one assembly after the debounce."""
+        calls = []
+        watch = make_watch(markdown, calls)
+        watch.start()
+        await watch.ready()
+        for i in range(3):
+            (markdown / "md" / "ac" / "ac-1.md").write_text(f"# ac-1 edit {i}\n")
+            (markdown / "md" / "ac" / "ac-3.md").write_text(f"# ac-3 {i}\n")
+            await asyncio.sleep(0.02)
+        await wait_for(lambda: watch.runs == 1)
+        await asyncio.sleep(DEBOUNCE * 2)
+        await watch.stop()
+        assert calls == [BATCH]
+        assert watch.last_run["status"] == "success"
+        assert watch.last_run["changed"] == ["md/ac/ac-1.md", "md/ac/ac-3.md"]
+        assert watch.status()["state"] == "stopped"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_content_skipped(self, markdown):
+        """Test that touching a file without changing it does not assemble."""
+        calls = []
+        watch = make_watch(markdown, calls)
+        watch.start()
+        await watch.ready()
+        path = markdown / "md" / "ac" / "ac-2.md"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        await wait_for(lambda: watch.skipped == 1)
+        await watch.stop()
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_failed_assembly_reported(self, markdown):
+        """Test that the error of the last assembly is kept in the status."""
+        calls = []
+        result = failure("❌ Failed to assemble profile from markdown", "bad header")
+        watch = make_watch(markdown, calls, result)
+        watch.start()
+        await watch.ready()
+        (markdown / "md" / "ac" / "ac-1.md").write_text("# changed\n")
+        await wait_for(lambda: watch.runs == 1)
+        await watch.stop()
+        assert watch.last_run["status"] == "error"
+        assert watch.last_run["error"] == "bad header"
+
+    @pytest.mark.asyncio
+    async def test_live_workspace(self, markdown):
+        """Test that each assembly runs in the live workspace, kept in use."""
+        used = []
+
+        async def assemble():
+            workspace = current_workspace.get()
+            used.append((workspace, workspace.busy))
+            return success("✅ Profile assembled from markdown successfully")
+
+        watch = Watch("w1", markdown, "md", "prof", assemble, DEBOUNCE)
+        watch.start()
+        await watch.ready()
+        try:
+            for runs in (1, 2):
+                # evicted between the runs: the next one gets a new workspace
+                workspaces.clear()
+                (markdown / "md" / "ac" / "ac-1.md").write_text(f"# edit {runs}\n")
+                await wait_for(lambda: watch.runs == runs)
+                assert used[-1] == (workspaces.get(markdown), True)
+            assert used[0][0] is not used[1][0]
+        finally:
+            await watch.stop()
+            workspaces.clear()
+
+
+class TestWatchRegistry:
+    """Test suite for WatchRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_start_replace_stop(self, markdown):
+        """Test that starting a watch with the same id replaces the previous one."""
+        registry = WatchRegistry()
+        first = await registry.start(make_watch(markdown, []))
+        second = await registry.start(make_watch(markdown, []))
+        assert first.state == "stopped"
+        assert registry.list() == [second]
+        assert registry.get("w1") is second
+        await registry.stop("w1")
+        assert registry.list() == []
+        with pytest.raises(KeyError):
+            await registry.stop("w1")
+
+    def test_watch_id(self, tmp_path):
+        """Test that ids are stable per directory and profile."""
+        assert WatchRegistry.watch_id(tmp_path, "md", "a") == WatchRegistry.watch_id(
+            tmp_path, "md", "a"
+        )
+        assert WatchRegistry.watch_id(tmp_path, "md", "a") != WatchRegistry.watch_id(
+            tmp_path, "md", "b"
+        )
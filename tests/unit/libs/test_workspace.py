@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/workspace.py."""
+
+import asyncio
+import subprocess
+import threading
+import time
+
+import pytest
+
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.workspace import (
+    STATE_DIR,
+    WorkspaceRegistry,
+    current_workspace,
+    state_dir,
+)
+
+
+class TestWorkspaceRegistry:
+    """Test suite for WorkspaceRegistry."""
+
+    def test_routes_by_resolved_root(self, tmp_path):
+        """Test that equivalent paths map to the same workspace."""
+        registry = WorkspaceRegistry()
+        first = registry.get(str(tmp_path))
+        assert registry.get(str(tmp_path / "sub" / "..")) is first
+        assert registry.get(str(tmp_path / "other")) is not first
+        assert len(registry) == 2
+
+    def test_default_root_is_cwd(self, tmp_path, monkeypatch):
+        """Test that a missing trestle_root means the current directory."""
+        monkeypatch.chdir(tmp_path)
+        registry = WorkspaceRegistry()
+        assert registry.get(None).root == tmp_path.resolve()
+
+    def test_caches_are_isolated(self, tmp_path):
+        """Test that one workspace's cache never evicts another's entries."""
+        registry = WorkspaceRegistry()
+        hot = registry.get(str(tmp_path / "hot")).cache("models", maxsize=2)
+        big = registry.get(str(tmp_path / "big")).cache("models", maxsize=2)
+        hot.put("catalog", "hot data")
+        for i in range(10):
+            big.put(i, "giant catalog")
+        assert hot.get("catalog") == "hot data"
+
+    def test_evicts_idle_workspaces(self, tmp_path):
+        """Test that idle workspaces are evicted and their state released."""
+        registry = WorkspaceRegistry(idle_timeout=10)
+        idle = registry.get(str(tmp_path / "idle"))
+        idle.cache("models").put("k", "v")
+        registry.get(str(tmp_path / "active"))
+
+        evicted = registry.evict_idle(now=time.monotonic() + 60)
+        assert set(evicted) == {idle.root, (tmp_path / "active").resolve()}
+        assert len(idle.cache("models")) == 0
+        assert len(registry) == 0
+
+    def test_busy_workspace_not_evicted(self, tmp_path):
+        """Test that a workspace in use survives eviction."""
+        registry = WorkspaceRegistry(idle_timeout=10)
+        workspace = registry.get(str(tmp_path))
+        with workspace.use():
+            assert registry.evict_idle(now=time.monotonic() + 60) == []
+        assert tmp_path in registry
+
+    def test_components_created_once(self, tmp_path):
+        """Test that per-workspace components are built once and closed on eviction."""
+        registry = WorkspaceRegistry()
+        workspace = registry.get(str(tmp_path))
+        closed = []
+
+        class Index:
+            def __init__(self, ws):
+                self.root = ws.root
+
+            def close(self):
+                closed.append(self.root)
+
+        index = workspace.component("index", Index)
+        assert workspace.component("index", Index) is index
+        registry.clear()
+        assert closed == [tmp_path.resolve()]
+
+    @pytest.mark.asyncio
+    async def test_lock_domain_per_workspace(self, tmp_path):
+        """Test that locks are scoped to their workspace."""
+        registry = WorkspaceRegistry()
+        a = registry.get(str(tmp_path / "a"))
+        b = registry.get(str(tmp_path / "b"))
+        assert a.lock("output") is a.lock("output")
+        async with a.lock("output"):
+            assert not b.lock("output").locked()
+
+    @pytest.mark.asyncio
+    async def test_locked_serializes_shared_names(self, tmp_path):
+        """Test that blocks holding a common lock name run one at a time."""
+        workspace = WorkspaceRegistry().get(str(tmp_path))
+        order = []
+
+        async def hold(names, tag):
+            async with workspace.locked(names):
+                order.append(f"{tag}-in")
+                await asyncio.sleep(0.01)
+                order.append(f"{tag}-out")
+
+        await asyncio.gather(hold(["b", "a"], "x"), hold(["a", "c"], "y"))
+        assert order == ["x-in", "x-out", "y-in", "y-out"]
+        assert not workspace.lock("a").locked()
+
+    def test_client_binding(self, tmp_path, monkeypatch):
+        """Test that a client reads from the workspace of its last call."""
+        monkeypatch.chdir(tmp_path)
+        registry = WorkspaceRegistry()
+        registry.bind("a", tmp_path / "a")
+        assert registry.bound("a").root == (tmp_path / "a").resolve()
+        assert registry.bound("b").root == tmp_path.resolve()
+
+    def test_find(self, tmp_path):
+        """Test that a file maps to the deepest live workspace holding it."""
+        registry = WorkspaceRegistry()
+        outer = registry.get(str(tmp_path))
+        inner = registry.get(str(tmp_path / "inner"))
+        assert registry.find(tmp_path / "a.md") is outer
+        assert registry.find(tmp_path / "inner" / "md" / "a.md") is inner
+        assert registry.find(tmp_path.parent / "other.md") is None
+        assert len(registry) == 2
+
+    def test_invalid_configuration(self):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            WorkspaceRegistry(idle_timeout=0)
+        with pytest.raises(ValueError):
+            WorkspaceRegistry(workers=-1)
+
+
+class TestStateDir:
+    """Test suite for state_dir."""
+
+    def test_ignored_by_git(self, tmp_path):
+        """Test that the server state is not reported as untracked by git."""
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        directory = state_dir(tmp_path)
+        assert directory == tmp_path / STATE_DIR
+        (directory / "validate.json").write_text("{}")
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=all"],
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        assert status.stdout == ""
+
+    def test_existing_ignore_kept(self, tmp_path):
+        """Test that an existing .gitignore is not rewritten."""
+        ignore = tmp_path / STATE_DIR / ".gitignore"
+        ignore.parent.mkdir(parents=True)
+        ignore.write_text("*\n!keep\n")
+        state_dir(tmp_path)
+        assert ignore.read_text() == "*\n!keep\n"
+
+
+class TestWorkspaceAffinity:
+    """Test suite for dedicated workspace workers."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_dedicated_workers(self, tmp_path):
+        """Test that executions run on the workspace's own threads."""
+        registry = WorkspaceRegistry(workers=1)
+        workspace = registry.get(str(tmp_path))
+        token = current_workspace.set(workspace)
+        try:
+            name = await run_limited(lambda: threading.current_thread().name)
+        finally:
+            current_workspace.reset(token)
+            registry.clear()
+        assert name.startswith(f"trestle-{tmp_path.name}")
+
+    @pytest.mark.asyncio
+    async def test_shared_pool_without_affinity(self, tmp_path):
+        """Test that workspaces share the global pool by default."""
+        registry = WorkspaceRegistry()
+        token = current_workspace.set(registry.get(str(tmp_path)))
+        try:
+            name = await run_limited(lambda: threading.current_thread().name)
+        finally:
+            current_workspace.reset(token)
+        assert name.startswith("trestle_")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Unit tests for libs/yaml_cache.py."""
+
+import math
+import os
+
+import pytest
+from ruamel.yaml import YAML
+from trestle.core.markdown.markdown_processor import MarkdownProcessor
+
+from trestle_mcp.libs import yaml_cache
+from trestle_mcp.libs.workspace import workspaces
+from trestle_mcp.libs.yaml_cache import (
+    FastLoader,
+    add_markdown_entries,
+    cached_frontmatter,
+    load_yaml,
+    markdown_entries,
+)
+
+SCALARS = """\
+values: [010, 0o10, 0x1F, 0b11, 1_000, +5, -7, .inf, -.INF, 1e3, 1.5e3,
+  2020-01-01, 2020-01-01T10:00:00Z, ~, null, '', Null, TRUE, 0., yes, on, 1:30,
+  y, no, "x", 0]
+base: &base {k: v}
+merged:
+  <<: *base
+  d: 1
+"""
+
+MARKDOWN = """\
+---
+x-trestle-global:
+  sort-id: ac-01
+---
+
+# ac-1 - Policy
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yaml_cache.clear()
+    yield
+    yaml_cache.clear()
+
+
+def touch(path, content: str) -> None:
+    """Rewrite a file and move its mtime forward, so its key changes."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(content)
+    os.utime(path, ns=(mtime + 1_000_000, mtime + 1_000_000))
+
+
+class TestLoadYaml:
+    """Test suite for load_yaml."""
+
+    def test_parsed_once_per_version(self, tmp_path):
+        """Test that a file is parsed again only once it changed."""
+        path = tmp_path / "header.yaml"
+        path.write_text("a: 1\n")
+        assert load_yaml(path) == {"a": 1}
+        hits = yaml_cache.cache_info()["hits"]
+        assert load_yaml(path) == {"a": 1}
+        assert yaml_cache.cache_info()["hits"] == hits + 1
+        touch(path, "a: 2\n")
+        assert load_yaml(path) == {"a": 2}
+
+    def test_copies_unless_shared(self, tmp_path):
+        """Test that callers modify their own copy, not the cached value."""
+        path = tmp_path / "header.yaml"
+        path.write_text("a: [1]\n")
+        load_yaml(path)["a"].append(2)
+        assert load_yaml(path) == {"a": [1]}
+        assert load_yaml(path, shared=True) is load_yaml(path, shared=True)
+
+    def test_round_trip_keeps_comments(self, tmp_path):
+        """Test that the round-trip loader returns a copy that dumps the same."""
+        path = tmp_path / "header.yaml"
+        path.write_text("# top\nkey: value  # note\n")
+        load_yaml(path, "round-trip")
+        header = load_yaml(path, "round-trip")
+        with open(tmp_path / "out.yaml", "w") as f:
+            YAML().dump(header, f)
+        assert (tmp_path / "out.yaml").read_text() == path.read_text()
+
+    @pytest.mark.skipif(FastLoader is None, reason="PyYAML without libyaml")
+    def test_fast_loader_matches_safe_loader(self, tmp_path):
+        """Test that the fast loader reads scalars with the YAML 1.2 rules of ruamel."""
+        path = tmp_path / "model.yaml"
+        path.write_text(SCALARS)
+        fast = load_yaml(path, "fast")
+        safe = load_yaml(path, "safe")
+        assert fast["merged"] == safe["merged"] == {"k": "v", "d": 1}
+        for got, expected in zip(fast["values"], safe["values"]):
+            if isinstance(expected, float) and math.isnan(expected):
+                continue
+            assert (got, type(got)) == (expected, type(expected))
+        assert fast["values"][-7:-3] == ["yes", "on", "1:30", "y"]
+
+    def test_large_files_not_cached(self, tmp_path, monkeypatch):
+        """Test that files above the size limit are parsed every time."""
+        monkeypatch.setattr(yaml_cache, "MAX_FILE_SIZE", 4)
+        path = tmp_path / "header.yaml"
+        path.write_text("a: 1\n")
+        load_yaml(path)
+        assert yaml_cache.cache_info()["entries"] == 0
+
+    def test_cached_per_workspace(self, tmp_path):
+        """Test that files of each workspace are cached in that workspace."""
+        a = workspaces.get(tmp_path / "a")
+        b = workspaces.get(tmp_path / "b")
+        try:
+            for workspace in (a, b):
+                workspace.root.mkdir()
+                (workspace.root / "header.yaml").write_text("a: 1\n")
+                load_yaml(workspace.root / "header.yaml")
+            assert len(a.cache(yaml_cache.NAMESPACE)) == 1
+            assert len(b.cache(yaml_cache.NAMESPACE)) == 1
+            assert len(yaml_cache._parsed) == 0
+            assert yaml_cache.cache_info()["entries"] == 2
+        finally:
+            workspaces.clear()
+
+    def test_unknown_loader(self, tmp_path):
+        """Test that an unknown loader is rejected."""
+        with pytest.raises(ValueError):
+            load_yaml(tmp_path / "header.yaml", "fastest")
+
+
+class TestCachedFrontmatter:
+    """Test suite for cached_frontmatter."""
+
+    def test_serves_unchanged_markdown(self, tmp_path):
+        """Test that markdown is parsed again only once it changed."""
+        path = tmp_path / "ac-1.md"
+        path.write_text(MARKDOWN)
+        processor = MarkdownProcessor()
+        expected = processor.read_markdown_wo_processing(path)
+        hits = yaml_cache.cache_info()["hits"]
+        with cached_frontmatter():
+            header, body = processor.read_markdown_wo_processing(path)
+            header["x-trestle-global"]["sort-id"] = "changed"
+            assert processor.read_markdown_wo_processing(path) == expected
+            assert processor.read_markdown_wo_processing(path, read_body=False) == (
+                expected[0],
+                "",
+            )
+            assert yaml_cache.cache_info()["hits"] == hits + 2
+            touch(path, MARKDOWN.replace("ac-01", "ac-02"))
+            header, _ = processor.read_markdown_wo_processing(path)
+        assert header["x-trestle-global"]["sort-id"] == "ac-02"
+
+    def test_entries_handed_over(self, tmp_path):
+        """Test that markdown parsed elsewhere can be added to the cache."""
+        path = tmp_path / "ac-1.md"
+        path.write_text(MARKDOWN)
+        with cached_frontmatter():
+            MarkdownProcessor().read_markdown_wo_processing(path)
+        entries = markdown_entries([path, tmp_path / "missing.md"])
+        assert len(entries) == 1
+        yaml_cache.clear()
+        add_markdown_entries(entries)
+        assert markdown_entries([path]) == entries
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Unit tests for services/author/catalog_assemble.py."""
+
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp.services.author.catalog_assemble import (
+    TrestleAuthorCatalogAssembleInput,
+    trestle_author_catalog_assemble,
+)
+
+MODULE_NAME = "trestle_mcp.services.author.catalog_assemble"
+MOCK_RUN_MODULE = f"{MODULE_NAME}.run_trestle_command"
+MOCK_ENGINE = f"{MODULE_NAME}.assemble_catalog_markdown"
+
+
+class TestTrestleAuthorCatalogAssemble:
+    """Test suite for trestle_author_catalog_assemble tool."""
+
+    @pytest.mark.asyncio
+    async def test_basic_assemble(self):
+        with patch(MOCK_RUN_MODULE) as mock_run:
+            mock_run.return_value = {
+                "success": True,
+                "stdout": "",
+                "stderr": "",
+                "returncode": 0,
+            }
+            params = TrestleAuthorCatalogAssembleInput(
+                markdown_dir="md_catalog", output_catalog="cat1"
+            )
+            result = await trestle_author_catalog_assemble(params)
+            assert "✅" in result
+            assert result.content.outputs == ["catalogs/cat1/catalog.json"]
+            args = mock_run.call_args[0][0]
+            assert args == [
+                "author",
+                "catalog-assemble",
+                "--markdown",
+                "md_catalog",
+                "--output",
+                "cat1",
+            ]
+
+    @pytest.mark.asyncio
+    async def test_with_options(self):
+        with patch(MOCK_RUN_MODULE) as mock_run:
+            mock_run.return_value = {
+                "success": True,
+                "stdout": "",
+                "stderr": "",
+                "returncode": 0,
+            }
+            params = TrestleAuthorCatalogAssembleInput(
+                markdown_dir="md",
+                output_catalog="out",
+                name="parent",
+                set_parameters=True,
+                regenerate=True,
+                version="1.1",
+                trestle_root="/ws",
+            )
+            await trestle_author_catalog_assemble(params)
+            args = mock_run.call_args[0][0]
+            for flag in ("--set-parameters", "--regenerate"):
+                assert flag in args
+            assert args[args.index("--name") + 1] == "parent"
+            assert args[args.index("--version") + 1] == "1.1"
+            assert args[args.index("--trestle-root") + 1] == "/ws"
+
+    @pytest.mark.asyncio
+    async def test_failure(self):
+        with patch(MOCK_RUN_MODULE) as mock_run:
+            mock_run.return_value = {
+                "success": False,
+                "stdout": "",
+                "stderr": "Markdown directory md does not exist.",
+                "returncode": 1,
+            }
+            params = TrestleAuthorCatalogAssembleInput(
+                markdown_dir="md", output_catalog="out"
+            )
+            result = await trestle_author_catalog_assemble(params)
+            assert "❌" in result
+            assert result.content.error == "Markdown directory md does not exist."
+
+    @pytest.mark.asyncio
+    async def test_workers_use_engine(self):
+        with patch(MOCK_ENGINE) as mock_engine, patch(MOCK_RUN_MODULE) as mock_run:
+            mock_engine.return_value = {
+                "controls": 12,
+                "workers": 4,
+                "updated": True,
+                "warnings": [],
+                "elapsed": 0.5,
+            }
+            params = TrestleAuthorCatalogAssembleInput(
+                markdown_dir="md", output_catalog="out", workers=4
+            )
+            result = await trestle_author_catalog_assemble(params)
+            assert "✅" in result
+            assert result.content.counts == {"controls": 12, "workers": 4}
+            assert mock_engine.call_args.kwargs["workers"] == 4
+            mock_run.assert_not_called()
@@ -82,3 +82,41 @@ class TestTrestleCatalogGenerate:
             assert "❌" in result
             assert "xxx" in result
             assert "not found" in result
+
+    @pytest.mark.asyncio
+    async def test_catalog_generate_parallel(self):
+        """Test that workers switches to the sharded in-process engine."""
+        with patch(f"{MODULE_NAME}.generate_catalog_markdown") as mock_generate:
+            with patch(MOCK_RUN_MODULE) as mock_run:
+                mock_generate.return_value = {
+                    "controls": 1200,
+                    "shards": 8,
+                    "workers": 8,
+                    "warnings": ["Model fails validation"],
+                    "elapsed": 1.5,
+                }
+                params = catalog_generate.TrestleCatalogGenerateInput(
+                    name="nist", output="md", workers=8, trestle_root="/x/y"
+                )
+                result = await catalog_generate.trestle_catalog_generate(params)
+                mock_run.assert_not_called()
+            assert "✅" in result
+            assert "Controls: 1200 (shards: 8, workers: 8" in result
+            assert "Warning: Model fails validation" in result
+            args, kwargs = mock_generate.call_args
+            assert str(args[0]) == "/x/y"
+            assert args[1:] == ("nist", "md")
+            assert kwargs["workers"] == 8
+
+    @pytest.mark.asyncio
+    async def test_catalog_generate_parallel_failure(self):
+        """Test that engine errors are reported as failures."""
+        with patch(f"{MODULE_NAME}.generate_catalog_markdown") as mock_generate:
+            mock_generate.side_effect = Exception("Catalog not found")
+            params = catalog_generate.TrestleCatalogGenerateInput(
+                name="xxx", output="md", workers=2
+            )
+            result = await catalog_generate.trestle_catalog_generate(params)
+            assert "❌" in result
+            assert "xxx" in result
+            assert "Catalog not found" in result
@@ -4,6 +4,7 @@
 from unittest.mock import patch
 
 import pytest
+from pydantic import ValidationError
 
 from trestle_mcp.services.author import profile_generate
 
@@ -113,3 +114,101 @@ class TestTrestleAuthorProfileGenerate:
             assert "--sections" in args
             assert "implementation" in args
             assert "--verbose" in args
+
+
+class TestTrestleAuthorProfileGenerateBatch:
+    """Test suite for trestle_author_profile_generate_batch tool."""
+
+    @staticmethod
+    def _result(name, output, success=True, error=None, warnings=()):
+        return {
+            "name": name,
+            "output": output,
+            "success": success,
+            "error": error,
+            "warnings": list(warnings),
+        }
+
+    @pytest.mark.asyncio
+    async def test_profile_generate_batch(self):
+        """Test that all pairs are generated by the in-process engine."""
+        with patch(f"{MODULE_NAME}.generate_profiles_markdown") as mock_generate:
+            with patch(MOCK_RUN_MODULE) as mock_run:
+                mock_generate.return_value = {
+                    "profiles": [
+                        self._result("low", "md_low"),
+                        self._result("high", "md_high", warnings=["No params"]),
+                    ],
+                    "imports": 1,
+                    "workers": 2,
+                    "elapsed": 0.5,
+                }
+                params = profile_generate.TrestleAuthorProfileGenerateBatchInput(
+                    profiles=[
+                        {"name": "low", "output": "md_low"},
+                        {"name": "high", "output": "md_high"},
+                    ],
+                    sections="guidance:Guidance",
+                    trestle_root="/x/y",
+                    workers=2,
+                )
+                result = await profile_generate.trestle_author_profile_generate_batch(
+                    params
+                )
+                mock_run.assert_not_called()
+            assert "✅" in result
+            assert "Profiles: 2 generated, 0 failed (shared imports: 1" in result
+            assert "✅ low: md_low" in result
+            assert "✅ high: md_high" in result
+            assert "Warning: No params" in result
+            args, kwargs = mock_generate.call_args
+            assert str(args[0]) == "/x/y"
+            assert args[1] == [("low", "md_low"), ("high", "md_high")]
+            assert kwargs["sections"] == "guidance:Guidance"
+            assert kwargs["workers"] == 2
+
+    @pytest.mark.asyncio
+    async def test_profile_generate_batch_partial_failure(self):
+        """Test that one failed profile fails the batch but is reported alone."""
+        with patch(f"{MODULE_NAME}.generate_profiles_markdown") as mock_generate:
+            mock_generate.return_value = {
+                "profiles": [
+                    self._result("low", "md_low"),
+                    self._result("bad", "md_bad", False, "Profile not found"),
+                ],
+                "imports": 1,
+                "workers": 2,
+                "elapsed": 0.5,
+            }
+            params = profile_generate.TrestleAuthorProfileGenerateBatchInput(
+                profiles=[
+                    {"name": "low", "output": "md_low"},
+                    {"name": "bad", "output": "md_bad"},
+                ]
+            )
+            result = await profile_generate.trestle_author_profile_generate_batch(
+                params
+            )
+            assert result.startswith("❌")
+            assert "Profiles: 1 generated, 1 failed" in result
+            assert "✅ low: md_low" in result
+            assert "❌ bad: Profile not found" in result
+
+    @pytest.mark.asyncio
+    async def test_profile_generate_batch_failure(self):
+        """Test that engine errors are reported as failures."""
+        with patch(f"{MODULE_NAME}.generate_profiles_markdown") as mock_generate:
+            mock_generate.side_effect = Exception("Output folder used by several")
+            params = profile_generate.TrestleAuthorProfileGenerateBatchInput(
+                profiles=[{"name": "a", "output": "md"}, {"name": "b", "output": "md"}]
+            )
+            result = await profile_generate.trestle_author_profile_generate_batch(
+                params
+            )
+            assert "❌" in result
+            assert "Output folder used by several" in result
+
+    def test_profile_generate_batch_requires_profiles(self):
+        """Test that an empty batch is rejected."""
+        with pytest.raises(ValidationError):
+            profile_generate.TrestleAuthorProfileGenerateBatchInput(profiles=[])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Unit tests for services/diff.py."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.services.diff import TrestleDiffInput, trestle_diff
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+
+
+@pytest.fixture
+def versions(tmp_path):
+    old = json.loads(TEST_CATALOG.read_text())
+    new = copy.deepcopy(old)
+    controls = new["catalog"]["groups"][0]["controls"]
+    controls[0]["title"] = "Changed"
+    controls.extend({"id": f"ac-{i}", "title": "New"} for i in range(10, 13))
+    (tmp_path / "old.json").write_text(json.dumps(old))
+    (tmp_path / "new.json").write_text(json.dumps(new))
+    return tmp_path
+
+
+class TestTrestleDiff:
+    """Test suite for trestle_diff tool."""
+
+    @pytest.mark.asyncio
+    async def test_diff_pages(self, versions):
+        """Test that changes are returned one page at a time."""
+        params = TrestleDiffInput(
+            left="old.json", right="new.json", limit=3, trestle_root=str(versions)
+        )
+        result = await trestle_diff(params)
+        assert "✅ Models compared" in result
+        assert "Changes: 4 (added: 3, removed: 0, modified: 1)" in result
+        assert "Showing 1-3 of 4" in result
+        assert "~ control ac-1 (catalog/groups[ac]/controls[ac-1]): title" in result
+        assert "Next cursor: 3" in result
+
+        params.cursor = "3"
+        result = await trestle_diff(params)
+        assert "Showing 4-4 of 4" in result
+        assert "+ control ac-12 (catalog/groups[ac]/controls[ac-12])" in result
+        assert "Next cursor" not in result
+
+    @pytest.mark.asyncio
+    async def test_diff_identical(self, versions):
+        """Test that identical files have no changes."""
+        result = await trestle_diff(
+            TrestleDiffInput(
+                left="old.json", right="old.json", trestle_root=str(versions)
+            )
+        )
+        assert "✅" in result
+        assert "Changes: 0" in result
+
+    @pytest.mark.asyncio
+    async def test_diff_missing_file(self, versions):
+        """Test that a missing file is reported as an error."""
+        result = await trestle_diff(
+            TrestleDiffInput(
+                left="old.json", right="x.json", trestle_root=str(versions)
+            )
+        )
+        assert "❌ Failed to compare models" in result
+        assert "not found" in result
+
+    @pytest.mark.asyncio
+    async def test_diff_outside_workspace(self, versions):
+        """Test that files outside the workspace are rejected."""
+        result = await trestle_diff(
+            TrestleDiffInput(
+                left="../old.json", right="new.json", trestle_root=str(versions)
+            )
+        )
+        assert "❌" in result
+
+    @pytest.mark.asyncio
+    async def test_diff_invalid_cursor(self, versions):
+        """Test that an invalid cursor is reported as an error."""
+        result = await trestle_diff(
+            TrestleDiffInput(
+                left="old.json",
+                right="new.json",
+                cursor="x",
+                trestle_root=str(versions),
+            )
+        )
+        assert "❌" in result
+        assert "Invalid cursor" in result
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for services/resources.py."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+from trestle_mcp.services.resources import (
+    catalog_control,
+    catalog_controls,
+    markdown_control,
+    profile_imports,
+    server_metrics,
+)
+
+DATA = Path("tests/data")
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    catalog = tmp_path / "catalogs" / "test" / "catalog.json"
+    catalog.parent.mkdir(parents=True)
+    catalog.write_bytes((DATA / "test-catalog.json").read_bytes())
+    profile = tmp_path / "profiles" / "test" / "profile.json"
+    profile.parent.mkdir(parents=True)
+    content = json.loads((DATA / "test-profile.json").read_text())
+    content["profile"]["imports"][0]["href"] = "trestle://catalogs/test/catalog.json"
+    profile.write_text(json.dumps(content))
+    markdown = tmp_path / "md" / "ac" / "ac-1.md"
+    markdown.parent.mkdir(parents=True)
+    markdown.write_text("# ac-1 - Policy\n")
+    token = current_workspace.set(workspaces.get(tmp_path))
+    yield tmp_path
+    current_workspace.reset(token)
+
+
+class TestResources:
+    """Test suite for the workspace resources."""
+
+    @pytest.mark.asyncio
+    async def test_catalog_controls(self, workspace):
+        """Test that the control list comes from the index."""
+        controls = json.loads(await catalog_controls("test"))
+        assert [c["id"] for c in controls] == ["ac-1", "ac-2", "ac-2.1", "ac-2.2"]
+        assert controls[2]["parent"] == "ac-2"
+        assert all(c["etag"] for c in controls)
+
+    @pytest.mark.asyncio
+    async def test_catalog_control(self, workspace):
+        """Test that one control is read as JSON."""
+        control = json.loads(await catalog_control("test", "ac-2.1"))
+        assert control["id"] == "ac-2.1"
+        assert control["title"] == "Automated System Account Management"
+        with pytest.raises(KeyError):
+            await catalog_control("test", "ac-99")
+
+    @pytest.mark.asyncio
+    async def test_catalog_control_after_edit(self, workspace):
+        """Test that a catalog rewritten with the same size and mtime is indexed again."""
+        await catalog_controls("test")
+        catalog = workspace / "catalogs" / "test" / "catalog.json"
+        stat = catalog.stat()
+        content = catalog.read_bytes()
+        # move the controls by one byte without changing the size or the mtime
+        catalog.write_bytes(b" " + content.rstrip(b"\n"))
+        os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        control = json.loads(await catalog_control("test", "ac-1"))
+        assert control["id"] == "ac-1"
+
+    @pytest.mark.asyncio
+    async def test_profile_imports(self, workspace):
+        """Test that imports are listed with the file they resolve to."""
+        imports = json.loads(await profile_imports("test"))
+        assert imports[0]["href"] == "trestle://catalogs/test/catalog.json"
+        assert imports[0]["path"] == "catalogs/test/catalog.json"
+
+    @pytest.mark.asyncio
+    async def test_markdown_control(self, workspace):
+        """Test that generated markdown controls are found below their group."""
+        assert (await markdown_control("md", "ac-1")).startswith("# ac-1")
+        with pytest.raises(FileNotFoundError):
+            await markdown_control("md", "ac-2")
+
+    @pytest.mark.asyncio
+    async def test_outside_workspace(self, workspace):
+        """Test that names cannot escape the workspace."""
+        with pytest.raises(Exception):
+            await catalog_controls("..")
+        with pytest.raises(Exception):
+            await markdown_control("..", "ac-1")
+
+    @pytest.mark.asyncio
+    async def test_server_metrics(self, workspace):
+        """Test that the metrics report the queues by priority class."""
+        await catalog_controls("test")
+        metrics = json.loads(await server_metrics())
+        assert metrics["queued"] == 0
+        assert set(metrics["classes"]) == {"interactive", "batch"}
+        assert metrics["classes"]["interactive"]["admitted"] >= 1
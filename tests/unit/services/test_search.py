@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Unit tests for services/search.py."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from trestle_mcp.services.search import (
+    TrestleSearchControlsInput,
+    trestle_search_controls,
+)
+
+TEST_CATALOG = Path("tests/data/test-catalog.json")
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    for name in ("low", "high"):
+        path = tmp_path / "catalogs" / name / "catalog.json"
+        path.parent.mkdir(parents=True)
+        shutil.copy(TEST_CATALOG, path)
+    return tmp_path
+
+
+async def search(workspace: Path, **kwargs) -> str:
+    return await trestle_search_controls(
+        TrestleSearchControlsInput(trestle_root=str(workspace), **kwargs)
+    )
+
+
+class TestTrestleSearchControls:
+    """Test suite for trestle_search_controls tool."""
+
+    @pytest.mark.asyncio
+    async def test_search_pages(self, workspace):
+        """Test that ranked matches are returned one page at a time."""
+        result = await search(workspace, query="emergency accounts", limit=2)
+        assert result.startswith("✅ Controls found")
+        assert "Matches: 6 (controls indexed: 8" in result
+        assert "Showing 1-2 of 6" in result
+        assert "1. high/ac-2.2 Automated Temporary and Emergency Account" in result
+        assert "Next cursor: 2" in result
+        assert result.content.items[1]["id"] == "ac-2.2"
+
+        result = await search(workspace, query="emergency accounts", cursor="2")
+        assert "Showing 3-6 of 6" in result
+        assert result.content.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_catalog_filter(self, workspace):
+        """Test that matches come from the selected catalogs only."""
+        result = await search(workspace, query="emergency", catalogs=["low"])
+        assert {m["catalog"] for m in result.content.items} == {"low"}
+
+    @pytest.mark.asyncio
+    async def test_no_match(self, workspace):
+        """Test a query matching nothing."""
+        result = await search(workspace, query="quantum")
+        assert result.startswith("✅ No controls found")
+        assert result.content.counts["matches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors(self, workspace):
+        """Test unknown catalogs and invalid cursors."""
+        result = await search(workspace, query="account", catalogs=["missing"])
+        assert "❌ Failed to search controls" in result
+        assert "Catalogs not found: missing" in result
+        result = await search(workspace, query="account", cursor="x")
+        assert "Invalid cursor" in result
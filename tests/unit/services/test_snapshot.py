@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Unit tests for services/snapshot.py."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+from trestle_mcp.services.resources import snapshot_list
+from trestle_mcp.services.snapshot import (
+    TrestleSnapshotCreateInput,
+    TrestleSnapshotDeleteInput,
+    TrestleSnapshotRestoreInput,
+    trestle_snapshot_create,
+    trestle_snapshot_delete,
+    trestle_snapshot_restore,
+)
+
+MODULE_NAME = "trestle_mcp.services.snapshot"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "md").mkdir()
+    (tmp_path / "md" / "ac-1.md").write_text("# ac-1\n")
+    token = current_workspace.set(workspaces.get(tmp_path))
+    yield tmp_path
+    current_workspace.reset(token)
+
+
+class TestTrestleSnapshot:
+    """Test suite for the snapshot tools."""
+
+    @pytest.mark.asyncio
+    async def test_create_restore_delete(self, workspace):
+        """Test a speculative edit undone through a snapshot."""
+        root = str(workspace)
+        result = await trestle_snapshot_create(
+            TrestleSnapshotCreateInput(snapshot="try", trestle_root=root)
+        )
+        assert result.startswith("✅ Snapshot created")
+        assert result.content.items == [{"snapshot": "try"}]
+
+        listed = json.loads(await snapshot_list())
+        assert [s["snapshot"] for s in listed] == ["try"]
+        assert listed[0]["files"] == 1
+
+        (workspace / "md" / "ac-1.md").unlink()
+        (workspace / "md" / "ac-2.md").write_text("# ac-2\n")
+        params = TrestleSnapshotRestoreInput(snapshot="try", trestle_root=root)
+        result = await trestle_snapshot_restore(params)
+        assert result.startswith("✅ Snapshot restored")
+        assert result.content.counts["restored"] == 1
+        assert result.content.counts["removed"] == 1
+        assert {"path": "md/ac-2.md", "action": "removed"} in result.content.items
+        assert (workspace / "md" / "ac-1.md").exists()
+        assert not (workspace / "md" / "ac-2.md").exists()
+
+        result = await trestle_snapshot_delete(
+            TrestleSnapshotDeleteInput(snapshot="try", trestle_root=root)
+        )
+        assert result.startswith("✅ Snapshot deleted")
+        assert json.loads(await snapshot_list()) == []
+
+    @pytest.mark.asyncio
+    async def test_failures(self, workspace):
+        """Test that unknown and duplicate snapshots are reported."""
+        root = str(workspace)
+        params = TrestleSnapshotRestoreInput(snapshot="nope", trestle_root=root)
+        result = await trestle_snapshot_restore(params)
+        assert result.startswith("❌")
+        assert "Snapshot nope not found" in result
+
+        create = TrestleSnapshotCreateInput(snapshot="s", trestle_root=root)
+        await trestle_snapshot_create(create)
+        result = await trestle_snapshot_create(create)
+        assert result.startswith("❌ Failed to create snapshot")
+        assert "already exists" in result.content.error
+
+    @pytest.mark.asyncio
+    async def test_delete_error(self, workspace):
+        """Test that a snapshot that cannot be removed is reported."""
+        root = str(workspace)
+        await trestle_snapshot_create(
+            TrestleSnapshotCreateInput(snapshot="s", trestle_root=root)
+        )
+        params = TrestleSnapshotDeleteInput(snapshot="s", trestle_root=root)
+        with patch(f"{MODULE_NAME}.SnapshotStore.delete") as mock_delete:
+            mock_delete.side_effect = PermissionError("Permission denied")
+            result = await trestle_snapshot_delete(params)
+        assert result.startswith("❌ Failed to delete snapshot")
+        assert result.content.error == "Permission denied"
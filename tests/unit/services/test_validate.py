@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Unit tests for services/validate.py."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp.services.validate import (
+    ModelType,
+    TrestleValidateInput,
+    trestle_validate,
+)
+
+MODULE_NAME = "trestle_mcp.services.validate"
+
+
+def model_result(path, valid=True, cached=False, error=None):
+    return {
+        "path": path,
+        "valid": valid,
+        "error": error,
+        "warnings": [],
+        "cached": cached,
+    }
+
+
+class TestTrestleValidate:
+    """Test suite for trestle_validate tool."""
+
+    @pytest.mark.asyncio
+    async def test_validate_all(self, tmp_path):
+        """Test a compact summary of valid models."""
+        with patch(f"{MODULE_NAME}.validate_models") as mock_validate:
+            mock_validate.return_value = {
+                "results": [
+                    model_result("catalogs/nist/catalog.json", cached=True),
+                    model_result("profiles/low/profile.json"),
+                ],
+                "validated": 1,
+                "cached": 1,
+                "workers": 1,
+                "elapsed": 0.1,
+            }
+            result = await trestle_validate(
+                TrestleValidateInput(trestle_root=str(tmp_path), force=True)
+            )
+            assert result.startswith("✅ All models are valid")
+            assert "Models: 2, invalid: 0 (validated: 1, cached: 1" in result
+            assert "✅ catalogs/nist/catalog.json (cached)" in result
+            assert "✅ profiles/low/profile.json" in result
+            args = mock_validate.call_args[0]
+            assert args[1] == []
+            assert args[2] is True
+
+    @pytest.mark.asyncio
+    async def test_validate_invalid(self, tmp_path):
+        """Test that invalid models fail the call and show their error."""
+        with patch(f"{MODULE_NAME}.validate_models") as mock_validate:
+            mock_validate.return_value = {
+                "results": [
+                    model_result("profiles/low/profile.json", False, error="Bad ref")
+                ],
+                "validated": 1,
+                "cached": 0,
+                "workers": 1,
+                "elapsed": 0.1,
+            }
+            result = await trestle_validate(
+                TrestleValidateInput(trestle_root=str(tmp_path))
+            )
+            assert result.startswith("❌ Validation failed")
+            assert "❌ profiles/low/profile.json: Bad ref" in result
+
+    @pytest.mark.asyncio
+    async def test_validate_selection(self, tmp_path):
+        """Test that type and name select the models."""
+        with patch(f"{MODULE_NAME}.select_models") as mock_select:
+            with patch(f"{MODULE_NAME}.validate_models") as mock_validate:
+                mock_select.return_value = [Path("/x/profiles/low/profile.json")]
+                mock_validate.return_value = {
+                    "results": [],
+                    "validated": 0,
+                    "cached": 0,
+                    "workers": 0,
+                    "elapsed": 0.0,
+                }
+                await trestle_validate(
+                    TrestleValidateInput(
+                        type=ModelType.PROFILE,
+                        name="low",
+                        workers=2,
+                        trestle_root=str(tmp_path),
+                    )
+                )
+                assert mock_select.call_args[0][1:] == (None, "profile", "low")
+                args = mock_validate.call_args[0]
+                assert args[1] == [Path("/x/profiles/low/profile.json")]
+                assert args[3] == 2
+
+    @pytest.mark.asyncio
+    async def test_validate_missing_file(self, tmp_path):
+        """Test that a missing file is reported as an error."""
+        result = await trestle_validate(
+            TrestleValidateInput(
+                files=["profiles/x/profile.json"], trestle_root=str(tmp_path)
+            )
+        )
+        assert "❌ Failed to validate models" in result
+        assert "not found" in result
+
+    @pytest.mark.asyncio
+    async def test_validate_outside_workspace(self, tmp_path):
+        """Test that a file outside the workspace is rejected, not validated."""
+        root = tmp_path / "root"
+        root.mkdir()
+        (tmp_path / "outside.json").write_text("{}")
+        with patch(f"{MODULE_NAME}.validate_models") as mock_validate:
+            result = await trestle_validate(
+                TrestleValidateInput(files=["../outside.json"], trestle_root=str(root))
+            )
+        assert "❌ Failed to validate models" in result
+        assert "Path traversal blocked" in result
+        mock_validate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_validate_name_requires_type(self):
+        """Test that a name without type is rejected."""
+        result = await trestle_validate(TrestleValidateInput(name="low"))
+        assert "❌" in result
+        assert "name requires type" in result
+
+    @pytest.mark.asyncio
+    async def test_validate_pages(self, tmp_path):
+        """Test that results are paginated, invalid models first, with structured content."""
+        with patch(f"{MODULE_NAME}.validate_models") as mock_validate:
+            mock_validate.return_value = {
+                "results": [
+                    model_result("profiles/a/profile.json"),
+                    model_result("profiles/b/profile.json", False, error="Bad ref"),
+                    model_result("profiles/c/profile.json"),
+                ],
+                "validated": 3,
+                "cached": 0,
+                "workers": 1,
+                "elapsed": 0.1,
+            }
+            result = await trestle_validate(
+                TrestleValidateInput(trestle_root=str(tmp_path), limit=2)
+            )
+            assert "Showing 1-2 of 3" in result
+            assert "Next cursor: 2" in result
+            assert "profiles/c/profile.json" not in result
+            content = result.content
+            assert content.status == "error"
+            assert content.counts["invalid"] == 1
+            assert content.items[0]["path"] == "profiles/b/profile.json"
+            assert (content.total, content.next_cursor) == (3, "2")
+
+            result = await trestle_validate(
+                TrestleValidateInput(trestle_root=str(tmp_path), limit=2, cursor="2")
+            )
+            assert "✅ profiles/c/profile.json" in result
+            assert result.content.next_cursor is None
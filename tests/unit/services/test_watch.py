@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Unit tests for services/watch.py."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp.libs import watch as watch_lib
+from trestle_mcp.libs.watch import watches
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+from trestle_mcp.services.resources import watch_list, watch_status
+from trestle_mcp.services.watch import (
+    TrestleWatchStartInput,
+    TrestleWatchStopInput,
+    trestle_watch_start,
+    trestle_watch_stop,
+)
+
+MOCK_RUN_MODULE = "trestle_mcp.services.author.profile_assemble.run_trestle_command"
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_lib, "watchfiles", None)
+    monkeypatch.setattr(watch_lib, "POLL_INTERVAL", 0.02)
+    directory = tmp_path / "md" / "ac"
+    directory.mkdir(parents=True)
+    (directory / "ac-1.md").write_text("# ac-1\n")
+    token = current_workspace.set(workspaces.get(tmp_path))
+    yield tmp_path
+    current_workspace.reset(token)
+
+
+class TestTrestleWatch:
+    """Test suite for trestle_watch_start and trestle_watch_stop tools."""
+
+    @pytest.mark.asyncio
+    async def test_start_assemble_stop(self, workspace):
+        """Test that an edit assembles the profile with the watch options."""
+        with patch(MOCK_RUN_MODULE) as mock_run:
+            mock_run.return_value = {
+                "success": True,
+                "stdout": "",
+                "stderr": "",
+                "returncode": 0,
+            }
+            result = await trestle_watch_start(
+                TrestleWatchStartInput(
+                    markdown_dir="md",
+                    output_profile="prof",
+                    set_parameters=True,
+                    debounce=0.05,
+                    trestle_root=str(workspace),
+                )
+            )
+            assert result.startswith("✅ Watch started")
+            watch_id = result.content.items[0]["id"]
+            assert f"Status: trestle://watches/{watch_id}" in result
+
+            (workspace / "md" / "ac" / "ac-1.md").write_text("# ac-1 edited\n")
+            for _ in range(150):
+                status = json.loads(await watch_status(watch_id))
+                if status["runs"]:
+                    break
+                await asyncio.sleep(0.02)
+            assert status["last_run"]["status"] == "success"
+            args = mock_run.call_args[0][0]
+            assert args[:2] == ["author", "profile-assemble"]
+            assert "--set-parameters" in args
+            assert "--regenerate" not in args
+            assert [w["id"] for w in json.loads(await watch_list())] == [watch_id]
+
+            result = await trestle_watch_stop(
+                TrestleWatchStopInput(watch_id=watch_id, trestle_root=str(workspace))
+            )
+            assert result.startswith("✅ Watch stopped")
+            assert result.content.counts["runs"] == 1
+        assert watches.list() == []
+
+    @pytest.mark.asyncio
+    async def test_other_workspace_hidden(self, workspace, tmp_path_factory):
+        """Test that the watches of another workspace are hidden and kept running."""
+        result = await trestle_watch_start(
+            TrestleWatchStartInput(
+                markdown_dir="md", output_profile="prof", trestle_root=str(workspace)
+            )
+        )
+        watch_id = result.content.items[0]["id"]
+        try:
+            other = workspaces.get(tmp_path_factory.mktemp("other"))
+            token = current_workspace.set(other)
+            try:
+                assert json.loads(await watch_list()) == []
+                with pytest.raises(KeyError):
+                    await watch_status(watch_id)
+            finally:
+                current_workspace.reset(token)
+            assert json.loads(await watch_status(watch_id))["id"] == watch_id
+            result = await trestle_watch_stop(
+                TrestleWatchStopInput(watch_id=watch_id, trestle_root=str(other.root))
+            )
+            assert "❌ Failed to stop watch" in result
+            assert watches.get(watch_id).state != "stopped"
+        finally:
+            await trestle_watch_stop(
+                TrestleWatchStopInput(watch_id=watch_id, trestle_root=str(workspace))
+            )
+
+    @pytest.mark.asyncio
+    async def test_missing_directory(self, workspace):
+        """Test that a watch needs an existing markdown directory in the workspace."""
+        result = await trestle_watch_start(
+            TrestleWatchStartInput(
+                markdown_dir="missing", output_profile="p", trestle_root=str(workspace)
+            )
+        )
+        assert result.startswith("❌ Failed to start watch")
+        result = await trestle_watch_start(
+            TrestleWatchStartInput(
+                markdown_dir="..", output_profile="p", trestle_root=str(workspace)
+            )
+        )
+        assert result.startswith("❌ Failed to start watch")
+
+    @pytest.mark.asyncio
+    async def test_stop_unknown(self):
+        """Test stopping a watch that does not exist."""
+        result = await trestle_watch_stop(TrestleWatchStopInput(watch_id="nope"))
+        assert "❌ Failed to stop watch" in result
+        with pytest.raises(KeyError):
+            await watch_status("nope")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Unit tests for main.py."""
+
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from trestle_mcp import services
+from trestle_mcp.libs import fsio, idempotency, model_format, storage, trestle
+from trestle_mcp.libs.concurrency import (
+    BATCH,
+    QueueFullError,
+    current_priority,
+    limiter,
+)
+from trestle_mcp.libs.limits import MB, Limits
+from trestle_mcp.libs.results import success
+from trestle_mcp.libs.snapshot import SnapshotStore
+from trestle_mcp.libs.workspace import DEFAULT_IDLE_TIMEOUT, workspaces
+
+# trestle_mcp re-exports main(), which shadows the module attribute
+server = importlib.import_module("trestle_mcp.main")
+
+
+class TestMain:
+    """Test suite for the server entry point."""
+
+    def test_default_stdio(self):
+        """Test that the default transport is stdio."""
+        with patch.object(server.mcp, "run") as mock_run:
+            server.main([])
+            mock_run.assert_called_once_with(transport="stdio")
+
+    def test_streamable_http(self):
+        """Test that HTTP options configure the server and the limiter."""
+        host, port = server.mcp.settings.host, server.mcp.settings.port
+        try:
+            with patch.object(server.mcp, "run") as mock_run:
+                server.main(
+                    [
+                        "--transport",
+                        "streamable-http",
+                        "--host",
+                        "0.0.0.0",
+                        "--port",
+                        "9000",
+                        "--max-concurrency",
+                        "6",
+                        "--max-per-client",
+                        "2",
+                        "--max-queue",
+                        "10",
+                        "--max-queue-per-client",
+                        "3",
+                        "--workspace-idle-timeout",
+                        "60",
+                        "--workspace-workers",
+                        "1",
+                    ]
+                )
+                mock_run.assert_called_once_with(transport="streamable-http")
+            assert server.mcp.settings.host == "0.0.0.0"
+            assert server.mcp.settings.port == 9000
+            assert limiter.max_concurrency == 6
+            assert limiter.max_per_client == 2
+            assert limiter.max_queue == 10
+            assert limiter.max_queue_per_client == 3
+            assert workspaces.idle_timeout == 60
+            assert workspaces.workers == 1
+        finally:
+            server.mcp.settings.host, server.mcp.settings.port = host, port
+            limiter.configure()
+            workspaces.configure(DEFAULT_IDLE_TIMEOUT, 0)
+
+    def test_storage_compression(self):
+        """Test that the storage codec is configured from the command line."""
+        try:
+            with patch.object(server.mcp, "run"):
+                server.main(["--storage-compression", "gzip"])
+            assert storage.default_codec() == "gzip"
+        finally:
+            storage.configure()
+
+    def test_idempotency_ttl(self):
+        """Test that the idempotency TTL is configured from the command line."""
+        try:
+            with patch.object(server.mcp, "run"):
+                server.main(["--idempotency-ttl", "60"])
+            assert idempotency._ttl == 60
+        finally:
+            idempotency.configure()
+
+    def test_trestle_runner(self):
+        """Test that the trestle runner is configured from the command line."""
+        try:
+            with (
+                patch.object(server.mcp, "run"),
+                patch.object(trestle.ForkServer, "start") as mock_start,
+            ):
+                server.main(
+                    ["--trestle-runner", "forkserver", "--preload-model", "cat.json"]
+                )
+            mock_start.assert_called_once()
+            assert trestle._forkserver.preload == ["cat.json"]
+        finally:
+            trestle.configure()
+
+    def test_resource_limits(self):
+        """Test that the resource limits of trestle commands are configured."""
+        try:
+            with patch.object(server.mcp, "run"):
+                server.main(["--limit-memory", "512", "--limit-cpu", "30"])
+            assert trestle._limits == Limits(memory=512 * MB, cpu=30)
+        finally:
+            trestle.configure()
+
+    def test_io_workers(self):
+        """Test that the I/O pool size is configured from the command line."""
+        try:
+            with patch.object(server.mcp, "run"):
+                server.main(["--io-workers", "4"])
+            assert fsio._workers == 4
+        finally:
+            fsio.configure()
+
+    def test_output_format(self):
+        """Test that the format of written models is configured."""
+        try:
+            with patch.object(server.mcp, "run"):
+                server.main(["--output-format", "auto", "--pretty-threshold", "256"])
+            assert model_format._format == "auto"
+            assert model_format._threshold == 256 * 1024
+        finally:
+            model_format.configure()
+
+
+class TestClientKey:
+    """Test suite for client identification."""
+
+    def test_outside_request(self):
+        """Test the fallback identity outside of a request."""
+        assert server._client_key(server.mcp.get_context()) == "local"
+
+    def test_client_id_from_meta(self):
+        """Test that an explicit client id is used when provided."""
+        ctx = SimpleNamespace(request_context=object(), client_id="agent-7")
+        assert server._client_key(ctx) == "agent-7"
+
+    def test_session_identity(self):
+        """Test that each session is its own client."""
+        session = object()
+        ctx = SimpleNamespace(
+            request_context=SimpleNamespace(session=session), client_id=None
+        )
+        assert server._client_key(ctx) == f"session-{id(session):x}"
+
+
+class TestResourceScope:
+    """Test suite for the workspace resources are read from."""
+
+    @pytest.mark.asyncio
+    async def test_workspace_of_last_call(self, tmp_path):
+        """Test that resources are read from the workspace of the client's calls."""
+
+        async def service(params):
+            return success("✅ done")
+
+        SnapshotStore(tmp_path).create("before")
+        try:
+            params = services.init.TrestleInitInput(trestle_root=str(tmp_path))
+            await server._call(server.mcp.get_context(), params, service)
+            listed = json.loads(await server.snapshot_list())
+            assert [s["snapshot"] for s in listed] == ["before"]
+        finally:
+            workspaces._bindings.pop("local")
+
+
+class TestCall:
+    """Test suite for running services for tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_priority_bound(self):
+        """Test that the service runs with the priority of the tool."""
+
+        async def service(params):
+            return f"✅ {current_priority.get()}"
+
+        result = await server._call(
+            server.mcp.get_context(), services.init.TrestleInitInput(), service, BATCH
+        )
+        assert result.content[0].text == "✅ batch"
+
+    @pytest.mark.asyncio
+    async def test_workspace_in_use(self, tmp_path):
+        """Test that the workspace of a running call is not evicted."""
+
+        async def service(params):
+            workspace = workspaces.get(tmp_path)
+            assert workspace.busy
+            workspaces.evict_idle(now=workspace.last_used + DEFAULT_IDLE_TIMEOUT * 2)
+            assert tmp_path in workspaces
+            return success("✅ done")
+
+        params = services.init.TrestleInitInput(trestle_root=str(tmp_path))
+        try:
+            result = await server._call(server.mcp.get_context(), params, service)
+            assert result.content[0].text == "✅ done"
+            assert not workspaces.get(tmp_path).busy
+        finally:
+            workspaces._bindings.pop("local")
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_coalesced(self):
+        """Test that identical concurrent calls run the service once."""
+        runs = []
+
+        async def service(params):
+            runs.append(params)
+            await asyncio.sleep(0.02)
+            return "✅ done"
+
+        params = services.init.TrestleInitInput()
+        results = await asyncio.gather(
+            *[server._call(server.mcp.get_context(), params, service) for _ in range(3)]
+        )
+        assert len(runs) == 1
+        assert [r.content[0].text for r in results] == ["✅ done"] * 3
+
+    @pytest.mark.asyncio
+    async def test_server_busy(self):
+        """Test that a rejected call returns an error result."""
+
+        async def service(params):
+            raise QueueFullError("Server busy: 3 calls queued")
+
+        result = await server._call(
+            server.mcp.get_context(), services.init.TrestleInitInput(), service
+        )
+        assert result.content[0].text.startswith("❌ Server busy")
+        assert result.structuredContent["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_idempotency_conflict(self, tmp_path):
+        """Test that a reused idempotency key returns an error result."""
+
+        async def service(params):
+            return success("✅ done")
+
+        ctx = server.mcp.get_context()
+        root = str(tmp_path)
+        first = services.init.TrestleInitInput(trestle_root=root, idempotency_key="k")
+        other = services.init.TrestleInitInput(
+            trestle_root=root, idempotency_key="k", mode="full"
+        )
+        assert (await server._call(ctx, first, service)).content[0].text == "✅ done"
+        result = await server._call(ctx, other, service)
+        assert result.content[0].text.startswith("❌ Idempotency key conflict")
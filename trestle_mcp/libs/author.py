@@ -0,0 +1,1138 @@
+"""In-process trestle author engines.
+
+This module drives the trestle author API directly instead of the CLI, so that
+work can be split across the worker processes of ``libs/parallel.py``. The
+functions prefixed with ``_`` run inside worker processes.
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from copy import deepcopy
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from trestle.common import const, file_utils
+from trestle.common.err import TrestleError
+from trestle.common.list_utils import (
+    comma_colon_sep_to_dict,
+    comma_sep_to_list,
+    none_if_empty,
+)
+from trestle.common.load_validate import load_validate_model_path
+from trestle.common.model_utils import ModelUtils
+from trestle.core.catalog.catalog_api import CatalogAPI
+from trestle.core.catalog.catalog_interface import CatalogInterface
+from trestle.core.catalog.catalog_writer import CatalogWriter
+from trestle.core.commands.author.catalog import CatalogAssemble
+from trestle.core.commands.author.prof import ProfileAssemble, ProfileGenerate
+from trestle.core.commands.common.cmd_utils import clear_folder
+from trestle.core.control_context import ContextPurpose, ControlContext
+from trestle.core.control_interface import ParameterRep
+from trestle.core.control_reader import ControlReader
+from trestle.core.models.file_content_type import FileContentType
+from trestle.core.profile_resolver import ProfileResolver
+from trestle.core.remote import cache
+from trestle.core.remote.security import PathSecurityValidator
+from trestle.oscal import catalog as cat
+
+from trestle_mcp.libs import parallel
+from trestle_mcp.libs.cache import LRUCache, file_key
+from trestle_mcp.libs.yaml_cache import (
+    add_markdown_entries,
+    cached_frontmatter,
+    load_yaml,
+    markdown_entries,
+)
+
+# Parsed models kept by each worker process, keyed by file_key()
+_models = LRUCache(maxsize=4)
+
+# Parsed profile imports kept by each worker process, keyed by file_key()
+_imports = LRUCache(maxsize=8)
+
+
+class _WarningCollector(logging.Handler):
+    """Collect the warnings and errors trestle logs."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@contextmanager
+def collect_warnings() -> Iterator[list[str]]:
+    """Collect the messages of WARNING level or above logged by trestle in the block."""
+    collector = _WarningCollector()
+    logger = logging.getLogger("trestle")
+    logger.addHandler(collector)
+    try:
+        yield collector.messages
+    finally:
+        logger.removeHandler(collector)
+
+
+def _load_model(trestle_root: Path, model_path: Path) -> Any:
+    """Load and validate a model, reusing the copy parsed by an earlier call."""
+    key = file_key(model_path)
+    model = _models.get(key)
+    if model is None:
+        model = load_validate_model_path(trestle_root, model_path)
+        _models.put(key, model)
+    return model
+
+
+def control_matches(
+    control_id: str,
+    groups: Sequence[str],
+    group_ids: Optional[Sequence[str]],
+    control_ids: Optional[Sequence[str]],
+) -> bool:
+    """Return whether a control passes the group and control filters.
+
+    Args:
+        control_id: Id of the control
+        groups: Ids of the groups containing the control, outermost first
+        group_ids: Ids or glob patterns of groups, None for any group
+        control_ids: Ids or glob patterns of controls, None for any control
+
+    Returns:
+        bool: True when one of its groups matches group_ids and its id matches
+        control_ids
+    """
+    if group_ids is not None and not any(
+        fnmatchcase(group, pattern) for group in groups for pattern in group_ids
+    ):
+        return False
+    return control_ids is None or any(
+        fnmatchcase(control_id, pattern) for pattern in control_ids
+    )
+
+
+def _control_paths(node: dict, groups: list[str]) -> list[tuple[str, list[str]]]:
+    """Return (id, groups) of the controls under a catalog node, depth first."""
+    paths = []
+    for control in node.get("controls", []):
+        paths.append((control["id"], groups))
+        paths.extend(_control_paths(control, groups))
+    for group in node.get("groups", []):
+        paths.extend(_control_paths(group, groups + [group.get("id", "")]))
+    return paths
+
+
+def catalog_group_shards(
+    catalog_path: Path,
+    group_ids: Optional[Sequence[str]] = None,
+    control_ids: Optional[Sequence[str]] = None,
+) -> list[list[str]]:
+    """Split the controls of a catalog by top level group.
+
+    Controls placed directly in the catalog form one more shard. The catalog is
+    read as plain JSON, which is much cheaper than parsing it as an OSCAL model.
+
+    Args:
+        catalog_path: Path of the catalog JSON file
+        group_ids: Keep only the controls of these groups, see control_matches()
+        control_ids: Keep only these controls, see control_matches()
+
+    Returns:
+        list[list[str]]: Control ids (including sub-controls) of each shard
+    """
+    with open(catalog_path, encoding="utf-8") as f:
+        catalog = json.load(f)["catalog"]
+    nodes = [(group, [group.get("id", "")]) for group in catalog.get("groups", [])] + [
+        ({"controls": catalog.get("controls", [])}, [])
+    ]
+    shards = [
+        [
+            control_id
+            for control_id, groups in _control_paths(node, path)
+            if control_matches(control_id, groups, group_ids, control_ids)
+        ]
+        for node, path in nodes
+    ]
+    return [shard for shard in shards if shard]
+
+
+def remove_control_markdown(
+    markdown_path: Path,
+    group_ids: Optional[Sequence[str]],
+    control_ids: Optional[Sequence[str]],
+) -> int:
+    """Remove the markdown of the controls passing the filters from an output folder.
+
+    A subset is overwritten by removing only its own files, where a full
+    generation clears the folder. Control files are named after the control,
+    in a directory per group.
+
+    Returns:
+        int: Number of files removed
+    """
+    removed = 0
+    for path in sorted(markdown_path.rglob("*.md")):
+        groups = path.parent.relative_to(markdown_path).parts
+        if control_matches(path.stem, groups, group_ids, control_ids):
+            path.unlink()
+            removed += 1
+    return removed
+
+
+@contextmanager
+def _only_controls(
+    interface: CatalogInterface,
+    wanted: Callable[[str, Sequence[str]], bool],
+    written: list[str],
+) -> Iterator[None]:
+    """Restrict the controls a trestle writer walks to the wanted ones.
+
+    Args:
+        interface: Catalog interface the writer walks
+        wanted: Predicate on the id of a control and the ids of its groups
+        written: List the ids of the controls walked are appended to
+    """
+    all_controls = interface.get_all_controls_from_catalog
+
+    def some_controls(recurse: bool):
+        for control in all_controls(recurse):
+            if wanted(control.id, interface.get_control_path(control.id)):
+                written.append(control.id)
+                yield control
+
+    interface.get_all_controls_from_catalog = some_controls
+    try:
+        yield
+    finally:
+        del interface.get_all_controls_from_catalog
+
+
+def _write_catalog_shard(
+    trestle_root: Path,
+    catalog_path: Path,
+    markdown_path: Path,
+    yaml_header: dict,
+    overwrite_header_values: bool,
+    control_ids: list[str],
+) -> tuple[int, list[str]]:
+    """Write the markdown of some controls exactly as catalog-generate does.
+
+    Returns:
+        tuple[int, list[str]]: Number of controls written and warnings logged
+    """
+    with collect_warnings() as warnings:
+        catalog = _load_model(trestle_root, catalog_path)
+        context = ControlContext.generate(
+            ContextPurpose.CATALOG,
+            True,
+            trestle_root,
+            markdown_path,
+            cli_yaml_header=yaml_header,
+            overwrite_header_values=overwrite_header_values,
+            set_parameters_flag=True,
+        )
+        catalog_api = CatalogAPI(catalog=catalog, context=context)
+        interface = catalog_api._catalog_interface
+        part_id_map = interface.get_statement_part_id_map(label_as_key=False)
+
+        # the writer walks every control of the catalog: restrict it to this shard
+        wanted = set(control_ids)
+        written: list[str] = []
+        with _only_controls(interface, lambda i, _: i in wanted, written):
+            catalog_api._writer.write_catalog_as_catalog(context, part_id_map)
+    return len(written), warnings
+
+
+def load_yaml_header(yaml_header: Optional[str]) -> dict:
+    """Load a yaml header file the way catalog-generate does.
+
+    Args:
+        yaml_header: Path of the yaml header file, or None
+
+    Returns:
+        dict: Header content, empty when no file is given
+    """
+    if not yaml_header:
+        return {}
+    return load_yaml(yaml_header) or {}
+
+
+def generate_catalog_markdown(
+    trestle_root: Path,
+    name: str,
+    output: str,
+    yaml_header: Optional[str] = None,
+    force_overwrite: bool = False,
+    overwrite_header_values: bool = False,
+    workers: Optional[int] = None,
+    group_ids: Optional[Sequence[str]] = None,
+    control_ids: Optional[Sequence[str]] = None,
+) -> dict:
+    """Generate catalog markdown with controls sharded by group across processes.
+
+    The markdown written is byte-identical to ``trestle author catalog-generate``:
+    each shard runs the same trestle writer, restricted to its controls. With
+    group or control filters, only the matching controls are written and the
+    rest of the output folder is left untouched.
+
+    Args:
+        trestle_root: Trestle workspace root
+        name: Catalog model name
+        output: Output markdown folder, relative to the trestle root
+        yaml_header: Optional path of a yaml header file
+        force_overwrite: Remove the output folder before generating, only the
+            markdown of the matching controls with filters
+        overwrite_header_values: Overwrite values in existing markdown headers
+        workers: Number of shards run in parallel (default: size of the pool)
+        group_ids: Generate only the controls of these groups (ids or globs)
+        control_ids: Generate only these controls (ids or globs)
+
+    Returns:
+        dict with 'controls', 'shards', 'workers', 'warnings' and 'elapsed'
+
+    Raises:
+        TrestleError: When the workspace, catalog or output folder is invalid
+    """
+    started = time.perf_counter()
+    if not file_utils.is_valid_project_root(trestle_root):
+        raise TrestleError(f"{trestle_root} is not a trestle workspace")
+    if not file_utils.is_directory_name_allowed(output):
+        raise TrestleError(f"{output} is not an allowed directory name")
+    catalog_path = trestle_root / "catalogs" / name / "catalog.json"
+    if not catalog_path.exists():
+        raise TrestleError(f"Catalog {catalog_path} not found")
+    markdown_path = trestle_root / output
+    PathSecurityValidator.validate_local_path(markdown_path, trestle_root)
+
+    filtered = group_ids is not None or control_ids is not None
+    if force_overwrite and filtered:
+        if markdown_path.is_dir():
+            remove_control_markdown(markdown_path, group_ids, control_ids)
+    elif force_overwrite:
+        clear_folder(markdown_path)
+    header = load_yaml_header(yaml_header)
+    markdown_path.mkdir(parents=True, exist_ok=True)
+
+    batches = parallel.balance(
+        catalog_group_shards(catalog_path, group_ids, control_ids),
+        workers or parallel.max_workers(),
+    )
+    pool = parallel.process_pool()
+    futures = [
+        pool.submit(
+            _write_catalog_shard,
+            trestle_root,
+            catalog_path,
+            markdown_path,
+            header,
+            overwrite_header_values,
+            batch,
+        )
+        for batch in batches
+    ]
+    controls = 0
+    warnings: list[str] = []
+    for future in futures:
+        count, shard_warnings = future.result()
+        controls += count
+        warnings.extend(w for w in shard_warnings if w not in warnings)
+
+    file_utils.prune_empty_dirs(markdown_path, "*.md")
+    return {
+        "controls": controls,
+        "shards": len(batches),
+        "workers": min(len(batches), parallel.max_workers()),
+        "warnings": warnings,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+@contextmanager
+def _shared_imports() -> Iterator[None]:
+    """Serve local profile imports from ``_imports`` instead of parsing them again."""
+    get_oscal = cache.LocalFetcher.get_oscal
+
+    def cached_get_oscal(fetcher, force_update: bool = False):
+        model = _imports.get(file_key(fetcher._cached_object_path))
+        return model if model is not None else get_oscal(fetcher, force_update)
+
+    cache.LocalFetcher.get_oscal = cached_get_oscal
+    try:
+        yield
+    finally:
+        cache.LocalFetcher.get_oscal = get_oscal
+
+
+def _load_imports(trestle_root: Path, hrefs: list[str], seen: set) -> None:
+    """Parse the local models imported through hrefs, recursively, into ``_imports``.
+
+    Imports that cannot be loaded are skipped: the profiles importing them
+    report the error when they are generated.
+    """
+    for href in hrefs:
+        try:
+            fetcher = cache.FetcherFactory.get_fetcher(trestle_root, href)
+            if not isinstance(fetcher, cache.LocalFetcher):
+                continue
+            key = file_key(fetcher._cached_object_path)
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            model = _imports.get(key)
+            if model is None:
+                model = fetcher.get_oscal()
+                _imports.put(key, model)
+        except Exception:  # reported by the profiles importing it
+            continue
+        imported, model_type = model
+        if model_type == const.MODEL_TYPE_PROFILE:
+            _load_imports(trestle_root, [i.href for i in imported.imports], seen)
+
+
+def _profile_import_hrefs(profile_path: Path) -> list[str]:
+    """Return the hrefs imported by a profile, read as plain JSON."""
+    try:
+        with open(profile_path, encoding="utf-8") as f:
+            imports = json.load(f)["profile"].get("imports", [])
+    except (OSError, ValueError, KeyError):
+        return []
+    return [i["href"] for i in imports if not i.get("href", "#").startswith("#")]
+
+
+@contextmanager
+def _profile_controls(
+    group_ids: Optional[Sequence[str]],
+    control_ids: Optional[Sequence[str]],
+    written: list[str],
+) -> Iterator[None]:
+    """Restrict the profile markdown writer to the controls passing the filters.
+
+    Only the writing is restricted: the profile is still resolved in full, so
+    the markdown of each control written is the same as in a full generation.
+    """
+    write = CatalogWriter.write_catalog_as_profile_markdown
+    wanted = functools.partial(
+        control_matches, group_ids=group_ids, control_ids=control_ids
+    )
+
+    def some_profile_markdown(writer, *args, **kwargs):
+        with _only_controls(writer._catalog_interface, wanted, written):
+            write(writer, *args, **kwargs)
+
+    CatalogWriter.write_catalog_as_profile_markdown = some_profile_markdown
+    try:
+        yield
+    finally:
+        CatalogWriter.write_catalog_as_profile_markdown = write
+
+
+def _write_profile_markdown(
+    trestle_root: Path,
+    name: str,
+    output: str,
+    yaml_header: Optional[str],
+    force_overwrite: bool,
+    overwrite_header_values: bool,
+    sections: Optional[str],
+    required_sections: Optional[str],
+    group_ids: Optional[Sequence[str]] = None,
+    control_ids: Optional[Sequence[str]] = None,
+) -> dict:
+    """Write the markdown of one profile exactly as profile-generate does.
+
+    Returns:
+        dict with 'name', 'output', 'success', 'error', 'controls' (number
+        of controls written) and 'warnings'
+    """
+    result = {"name": name, "output": output, "success": False, "error": None}
+    written: list[str] = []
+    with collect_warnings() as warnings:
+        try:
+            if not file_utils.is_directory_name_allowed(output):
+                raise TrestleError(f"{output} is not an allowed directory name")
+            header: dict = {}
+            if yaml_header:
+                # round-trip loader as in the CLI: the header is updated in place
+                header = load_yaml(yaml_header, "round-trip") or {}
+            markdown_path = trestle_root / output
+            PathSecurityValidator.validate_local_path(markdown_path, trestle_root)
+            filtered = group_ids is not None or control_ids is not None
+            if force_overwrite and filtered:
+                if markdown_path.is_dir():
+                    remove_control_markdown(markdown_path, group_ids, control_ids)
+            elif force_overwrite:
+                clear_folder(markdown_path)
+            with _profile_controls(group_ids, control_ids, written):
+                code = ProfileGenerate().generate_markdown(
+                    trestle_root,
+                    trestle_root / "profiles" / name / "profile.json",
+                    markdown_path,
+                    header,
+                    overwrite_header_values,
+                    comma_colon_sep_to_dict(sections),
+                    comma_sep_to_list(required_sections),
+                )
+            result["success"] = code == 0
+            if code:
+                result["error"] = warnings[-1] if warnings else "Generation failed"
+        except Exception as e:  # reported per profile
+            result["error"] = str(e)
+    result["controls"] = len(written)
+    result["warnings"] = [w for w in dict.fromkeys(warnings) if w != result["error"]]
+    return result
+
+
+def _generate_profile_batch(
+    trestle_root: Path, cwd: str, jobs: list[tuple], processes: int
+) -> tuple[list[dict], int]:
+    """Parse the imports shared by the profiles once, then fork one child per profile.
+
+    Returns:
+        tuple[list[dict], int]: Result of each job and number of imports shared
+    """
+    # relative import hrefs resolve against the working directory, as in the CLI
+    os.chdir(cwd)
+    seen: set = set()
+    for job in jobs:
+        hrefs = _profile_import_hrefs(
+            trestle_root / "profiles" / job[0] / "profile.json"
+        )
+        _load_imports(trestle_root, hrefs, seen)
+    with _shared_imports():
+        results = parallel.fork_map(
+            _write_profile_markdown,
+            [(trestle_root, *job) for job in jobs],
+            processes,
+        )
+    return results, len(seen)
+
+
+def generate_profiles_markdown(
+    trestle_root: Path,
+    profiles: list[tuple[str, str]],
+    yaml_header: Optional[str] = None,
+    force_overwrite: bool = False,
+    overwrite_header_values: bool = False,
+    sections: Optional[str] = None,
+    required_sections: Optional[str] = None,
+    workers: Optional[int] = None,
+    group_ids: Optional[Sequence[str]] = None,
+    control_ids: Optional[Sequence[str]] = None,
+) -> dict:
+    """Generate the markdown of several profiles, parsing shared imports once.
+
+    Catalogs and profiles imported by the profiles are parsed once by a worker
+    of the process pool, which then forks one child per profile: every child
+    resolves its profile against a private copy-on-write view of the parsed
+    imports. Parsed imports stay cached in the worker for later batches. The
+    markdown written is byte-identical to ``trestle author profile-generate``.
+
+    Args:
+        trestle_root: Trestle workspace root
+        profiles: (profile name, output folder) pairs, outputs relative to the root
+        yaml_header: Optional path of a yaml header file
+        force_overwrite: Remove each output folder before generating, only the
+            markdown of the matching controls with filters
+        overwrite_header_values: Overwrite values in existing markdown headers
+        sections: Comma-separated short_name:long_name sections
+        required_sections: Comma-separated short names of required sections
+        workers: Number of profiles generated in parallel (default: size of the pool)
+        group_ids: Write only the controls of these groups (ids or globs)
+        control_ids: Write only these controls (ids or globs)
+
+    Returns:
+        dict with 'profiles' (one result dict per pair), 'imports', 'workers'
+        and 'elapsed'
+
+    Raises:
+        TrestleError: When the workspace is invalid or two profiles share an output
+    """
+    started = time.perf_counter()
+    if not file_utils.is_valid_project_root(trestle_root):
+        raise TrestleError(f"{trestle_root} is not a trestle workspace")
+    outputs = [Path(output) for _, output in profiles]
+    duplicates = sorted({str(o) for o in outputs if outputs.count(o) > 1})
+    if duplicates:
+        raise TrestleError(f"Output folder used by several profiles: {duplicates[0]}")
+
+    processes = min(workers or parallel.max_workers(), max(len(profiles), 1))
+    jobs = [
+        (
+            name,
+            output,
+            yaml_header,
+            force_overwrite,
+            overwrite_header_values,
+            sections,
+            required_sections,
+            group_ids,
+            control_ids,
+        )
+        for name, output in profiles
+    ]
+    results, imports = (
+        parallel.process_pool()
+        .submit(_generate_profile_batch, trestle_root, os.getcwd(), jobs, processes)
+        .result()
+    )
+    return {
+        "profiles": results,
+        "imports": imports,
+        "workers": processes,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+# Prose inserting a parameter: {{ insert: param, ac-1_prm_1 }}
+_PARAM_INSERT = re.compile(r"insert:\s*param,\s*([^\s}]+)")
+
+
+def _catalog_nodes(nodes: Optional[list], parent: Optional[str], tree: dict) -> None:
+    """Record the parent and the parameters of every control under catalog nodes."""
+    for node in nodes or []:
+        if isinstance(node, cat.Control):
+            tree["controls"][node.id] = node
+            if parent is not None:
+                tree["parents"][node.id] = parent
+            for param in node.params or []:
+                tree["owners"][param.id] = node.id
+            _catalog_nodes(node.controls, node.id, tree)
+        else:
+            _catalog_nodes(getattr(node, "controls", None), None, tree)
+            _catalog_nodes(getattr(node, "groups", None), None, tree)
+
+
+def control_selection(catalog: cat.Catalog, control_ids: set[str]) -> set[str]:
+    """Return the controls needed to resolve some controls of a catalog.
+
+    Args:
+        catalog: Catalog the controls come from
+        control_ids: Controls wanted, ids missing from the catalog are ignored
+
+    Returns:
+        set[str]: The controls, their ancestors, and the controls defining the
+        parameters their prose inserts, transitively
+    """
+    tree: dict = {"controls": {}, "parents": {}, "owners": {}}
+    _catalog_nodes(catalog.controls, None, tree)
+    _catalog_nodes(catalog.groups, None, tree)
+    selected: set[str] = set()
+    pending = [i for i in control_ids if i in tree["controls"]]
+    while pending:
+        control_id = pending.pop()
+        if control_id in selected:
+            continue
+        selected.add(control_id)
+        if control_id in tree["parents"]:
+            pending.append(tree["parents"][control_id])
+        text = tree["controls"][control_id].model_dump_json(exclude={"controls"})
+        for param_id in _PARAM_INSERT.findall(text):
+            owner = tree["owners"].get(param_id)
+            if owner is not None:
+                pending.append(owner)
+    return selected
+
+
+def _reduce_controls(controls: Optional[list], selected: set[str]) -> Optional[list]:
+    """Copy controls, keeping only the id, title, props and params of unselected ones.
+
+    Unselected controls stay as stubs so that the selections and parameters
+    of the profile still find them, but they carry no prose to resolve.
+    """
+    if not controls:
+        return controls
+    reduced = []
+    for control in controls:
+        if control.id in selected:
+            copy = deepcopy(control.model_copy(update={"controls": None}))
+        else:
+            copy = control.model_copy(
+                update={
+                    "params": deepcopy(control.params),
+                    "props": deepcopy(control.props),
+                    "links": None,
+                    "parts": None,
+                }
+            )
+        copy.controls = _reduce_controls(control.controls, selected)
+        reduced.append(copy)
+    return reduced
+
+
+def _reduce_groups(groups: Optional[list], selected: set[str]) -> Optional[list]:
+    if not groups:
+        return groups
+    reduced = []
+    for group in groups:
+        update = {"params": deepcopy(group.params), "parts": None}
+        if isinstance(group, cat.Group1):
+            update["groups"] = _reduce_groups(group.groups, selected)
+        else:
+            update["controls"] = _reduce_controls(group.controls, selected)
+        reduced.append(group.model_copy(update=update))
+    return reduced
+
+
+def reduce_catalog(catalog: cat.Catalog, selected: set[str]) -> cat.Catalog:
+    """Return a copy of a catalog where only the selected controls are complete."""
+    return catalog.model_copy(
+        update={
+            "metadata": deepcopy(catalog.metadata),
+            "params": deepcopy(catalog.params),
+            "controls": _reduce_controls(catalog.controls, selected),
+            "groups": _reduce_groups(catalog.groups, selected),
+        }
+    )
+
+
+def _keep_controls(controls: Optional[list], kept: set[str]) -> Optional[list]:
+    """Drop the stubs left by reduce_catalog from resolved controls."""
+    result = []
+    for control in controls or []:
+        if control.id in kept:
+            control.controls = _keep_controls(control.controls, kept)
+            result.append(control)
+    return result or None
+
+
+def _keep_groups(groups: Optional[list], kept: set[str]) -> Optional[list]:
+    result = []
+    for group in groups or []:
+        if isinstance(group, cat.Group1):
+            group.groups = _keep_groups(group.groups, kept)
+            if group.groups:
+                result.append(group)
+        else:
+            group.controls = _keep_controls(group.controls, kept)
+            if group.controls:
+                result.append(group)
+    return result or None
+
+
+@contextmanager
+def _reduced_imports(control_ids: set[str], selected: set[str]) -> Iterator[None]:
+    """Serve local imports from ``_imports``, catalogs reduced to some controls.
+
+    The models of the cache are never modified: resolution works on copies.
+    The controls kept complete are added to ``selected``.
+    """
+    get_oscal = cache.LocalFetcher.get_oscal
+
+    def reduced_get_oscal(fetcher, force_update: bool = False):
+        key = file_key(fetcher._cached_object_path)
+        loaded = _imports.get(key)
+        if loaded is None:
+            loaded = get_oscal(fetcher, force_update)
+            _imports.put(key, loaded)
+        model, model_type = loaded
+        if model_type != const.MODEL_TYPE_CATALOG:
+            return model.model_copy(deep=True), model_type
+        needed = control_selection(model, control_ids)
+        selected.update(needed)
+        return reduce_catalog(model, needed), model_type
+
+    cache.LocalFetcher.get_oscal = reduced_get_oscal
+    try:
+        yield
+    finally:
+        cache.LocalFetcher.get_oscal = get_oscal
+
+
+def _param_rep(
+    show_values: bool,
+    show_labels: bool,
+    label_prefix: Optional[str],
+    value_assigned_prefix: Optional[str],
+    value_not_assigned_prefix: Optional[str],
+) -> tuple[ParameterRep, Optional[str]]:
+    """Map the prose options of profile-resolve as the CLI does.
+
+    Returns:
+        tuple: Parameter representation and prefix of unassigned values
+    """
+    param_rep = ParameterRep.LEAVE_MOUSTACHE
+    if show_values:
+        param_rep = ParameterRep.ASSIGNMENT_FORM
+        if label_prefix or show_labels:
+            raise TrestleError(
+                "Use of show-values is not compatible with show-labels or label-prefix"
+            )
+    elif value_assigned_prefix or value_not_assigned_prefix:
+        raise TrestleError(
+            "Use of value-assigned-prefix or value-not-assigned-prefix requires show-values"
+        )
+    if show_labels:
+        param_rep = ParameterRep.LABEL_FORM
+        value_not_assigned_prefix = label_prefix
+    elif label_prefix:
+        raise TrestleError("Use of label-prefix requires show-labels")
+    return param_rep, value_not_assigned_prefix
+
+
+def _resolve_controls(
+    trestle_root: Path,
+    cwd: str,
+    profile_path: Path,
+    control_ids: list[str],
+    output: Optional[str],
+    options: dict,
+) -> dict:
+    """Resolve some controls of a profile, in a worker process."""
+    os.chdir(cwd)
+    result: dict = {"controls": [], "missing": [], "error": None}
+    with collect_warnings() as warnings:
+        try:
+            if not profile_path.exists():
+                raise TrestleError(f"Profile {profile_path} does not exist")
+            param_rep, not_assigned = _param_rep(
+                options.get("show_values", False),
+                options.get("show_labels", False),
+                options.get("label_prefix"),
+                options.get("value_assigned_prefix"),
+                options.get("value_not_assigned_prefix"),
+            )
+            requested = set(control_ids)
+            selected: set[str] = set()
+            with _reduced_imports(requested, selected):
+                catalog = ProfileResolver.get_resolved_profile_catalog(
+                    trestle_root,
+                    str(profile_path),
+                    False,
+                    False,
+                    none_if_empty(options.get("bracket_format")),
+                    param_rep,
+                    False,
+                    options.get("value_assigned_prefix"),
+                    not_assigned,
+                )
+            catalog.controls = _keep_controls(catalog.controls, selected)
+            catalog.groups = _keep_groups(catalog.groups, selected)
+            tree: dict = {"controls": {}, "parents": {}, "owners": {}}
+            _catalog_nodes(catalog.controls, None, tree)
+            _catalog_nodes(catalog.groups, None, tree)
+            for control_id, control in tree["controls"].items():
+                result["controls"].append(
+                    {
+                        "id": control_id,
+                        "title": control.title,
+                        "parent": tree["parents"].get(control_id),
+                        "requested": control_id in requested,
+                        "control": control.model_copy(
+                            update={"controls": None}
+                        ).oscal_dict()["control"],
+                    }
+                )
+            result["missing"] = [i for i in control_ids if i not in tree["controls"]]
+            if output and tree["controls"]:
+                ModelUtils.save_top_level_model(
+                    catalog, trestle_root, output, FileContentType.JSON
+                )
+        except Exception as e:  # reported to the caller
+            result["error"] = str(e)
+    result["warnings"] = [w for w in dict.fromkeys(warnings) if w != result["error"]]
+    return result
+
+
+def resolve_profile_controls(
+    trestle_root: Path,
+    name: str,
+    control_ids: list[str],
+    output: Optional[str] = None,
+    **options: Any,
+) -> dict:
+    """Resolve only some controls of a profile.
+
+    The profile is resolved by trestle as profile-resolve does, against copies
+    of its catalogs where only the requested controls, their ancestors and the
+    controls defining the parameters they insert are complete. The others are
+    kept as stubs without prose, so selections, parameters and alters of the
+    profile behave as in a full resolution while the prose substitution and
+    the output are proportional to the selection. Imports are parsed once per
+    worker process and reused by later calls.
+
+    Args:
+        trestle_root: Trestle workspace root
+        name: Profile name (profiles/<name>/profile.json)
+        control_ids: Controls to resolve
+        output: Name of a catalog to write the reduced resolved catalog to
+        **options: show_values, show_labels, bracket_format,
+            value_assigned_prefix, value_not_assigned_prefix and label_prefix
+            as for profile-resolve
+
+    Returns:
+        dict with 'controls' (id, title, parent, requested and the resolved
+        control of each control resolved), 'missing' (requested ids not in
+        the resolved profile), 'error', 'warnings' and 'elapsed'
+    """
+    started = time.perf_counter()
+    profile_path = trestle_root / "profiles" / name / "profile.json"
+    result = (
+        parallel.process_pool()
+        .submit(
+            _resolve_controls,
+            trestle_root,
+            os.getcwd(),
+            profile_path,
+            list(dict.fromkeys(control_ids)),
+            output,
+            options,
+        )
+        .result()
+    )
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def markdown_files(md_path: Path) -> list[Path]:
+    """Return the control markdown files of a directory, as trestle reads them."""
+    return [
+        path
+        for group_dir in CatalogInterface._get_group_ids_and_dirs(md_path).values()
+        for path in group_dir.glob("*.md")
+    ]
+
+
+def _parse_markdown(
+    reader: str, paths: list[Path], args: tuple
+) -> tuple[list[tuple], list]:
+    """Parse control markdown files with a ControlReader function, in a child.
+
+    Returns:
+        tuple: (value, error, warnings) of each file, the error being a
+        message as trestle errors cannot be pickled, and the markdown the
+        child parsed, for the cache of its parent
+    """
+    parse = getattr(ControlReader, reader)
+    parsed = []
+    # markdown the parent had cached when forking need not go back to it
+    known = {key for key, _ in markdown_entries(paths)}
+    with cached_frontmatter():
+        for path in paths:
+            value, error = None, None
+            with collect_warnings() as warnings:
+                try:
+                    value = parse(path, *args)
+                except Exception as e:  # raised again when trestle reads the file
+                    error = str(e)
+            parsed.append((value, error, list(warnings)))
+    return parsed, [e for e in markdown_entries(paths) if e[0] not in known]
+
+
+@contextmanager
+def _parallel_markdown(
+    reader: str, files: list[Path], processes: int, parsed: list[int]
+) -> Iterator[None]:
+    """Parse every markdown file in parallel on the first read of one by trestle.
+
+    The first call of the ControlReader function forks children that parse
+    all the files with the same arguments. Trestle then goes on reading the
+    files one at a time, in its own order, and gets the parsed results with
+    the warnings they logged, so the assembly does not depend on the number
+    of processes. Calls with other arguments parse as usual. The number of
+    files parsed in parallel is appended to parsed.
+    """
+    original = getattr(ControlReader, reader)
+    results: dict[Path, tuple] = {}
+    batch_args: list[tuple] = []
+    logger = logging.getLogger("trestle")
+
+    def read(path: Path, *args):
+        if not batch_args:
+            batch_args.append(args)
+            batches = parallel.balance([[f] for f in files], processes)
+            for batch, (values, entries) in zip(
+                batches,
+                parallel.fork_map(
+                    _parse_markdown,
+                    [(reader, batch, args) for batch in batches],
+                    processes,
+                ),
+            ):
+                results.update(zip(batch, values))
+                add_markdown_entries(entries)
+            parsed.append(len(results))
+        entry = results.pop(path, None) if args == batch_args[0] else None
+        if entry is None:
+            return original(path, *args)
+        value, error, warnings = entry
+        for warning in warnings:
+            logger.warning(warning)
+        if error is not None:
+            raise TrestleError(error)
+        return value
+
+    setattr(ControlReader, reader, staticmethod(read))
+    try:
+        yield
+    finally:
+        setattr(ControlReader, reader, staticmethod(original))
+
+
+def _assemble(
+    kind: str, trestle_root: Path, cwd: str, options: dict, processes: int
+) -> dict:
+    """Assemble a profile or catalog from markdown, in a worker process."""
+    # relative import hrefs resolve against the working directory, as in the CLI
+    os.chdir(cwd)
+    md_path = trestle_root / options["md_name"]
+    files = markdown_files(md_path) if md_path.is_dir() else []
+    parsed: list[int] = []
+    result: dict = {"error": None}
+    with collect_warnings() as warnings, cached_frontmatter():
+        try:
+            if kind == const.MODEL_TYPE_PROFILE:
+                output = trestle_root / "profiles" / options["assem_prof_name"]
+                with _parallel_markdown(
+                    "read_editable_content", files, processes, parsed
+                ):
+                    code = ProfileAssemble.assemble_profile(trestle_root, **options)
+            else:
+                output = trestle_root / "catalogs" / options["assem_cat_name"]
+                with _parallel_markdown("read_control", files, processes, parsed):
+                    code = CatalogAssemble.assemble_catalog(trestle_root, **options)
+            if code:
+                raise TrestleError(warnings[-1] if warnings else "Assembly failed")
+            result["model"] = file_key(output / f"{kind}.json")
+        except Exception as e:  # trestle errors cannot be pickled: raised by the caller
+            result["error"] = str(e)
+    result["controls"] = sum(parsed)
+    result["workers"] = min(processes, max(len(files), 1))
+    result["warnings"] = [w for w in dict.fromkeys(warnings) if w != result["error"]]
+    return result
+
+
+def _run_assemble(
+    kind: str, trestle_root: Path, options: dict, workers: Optional[int]
+) -> dict:
+    """Run an assembly in a worker of the process pool and time it."""
+    started = time.perf_counter()
+    if not file_utils.is_valid_project_root(trestle_root):
+        raise TrestleError(f"{trestle_root} is not a trestle workspace")
+    md_path = trestle_root / options["md_name"]
+    PathSecurityValidator.validate_local_path(md_path, trestle_root)
+    output = options.get("assem_prof_name") or options.get("assem_cat_name")
+    if not file_utils.is_directory_name_allowed(output):
+        raise TrestleError(f"{output} is not an allowed directory name")
+    before = file_key(trestle_root / f"{kind}s" / output / f"{kind}.json")
+    result = (
+        parallel.process_pool()
+        .submit(
+            _assemble,
+            kind,
+            trestle_root,
+            os.getcwd(),
+            options,
+            workers or parallel.max_workers(),
+        )
+        .result()
+    )
+    if result["error"]:
+        raise TrestleError(result["error"])
+    result["updated"] = result.pop("model") != before
+    del result["error"]
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def assemble_profile_markdown(
+    trestle_root: Path,
+    markdown_dir: str,
+    output_profile: str,
+    name: Optional[str] = None,
+    set_parameters: bool = False,
+    regenerate: bool = False,
+    version: Optional[str] = None,
+    sections: Optional[str] = None,
+    required_sections: Optional[str] = None,
+    allowed_sections: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """Assemble a profile from markdown, parsing the markdown files in parallel.
+
+    The profile written is the one ``trestle author profile-assemble`` writes:
+    trestle assembles it as usual, only the parsing of the markdown files
+    (YAML header and sections) is spread over forked processes.
+
+    Args:
+        trestle_root: Trestle workspace root
+        markdown_dir: Markdown folder, relative to the trestle root
+        output_profile: Name of the profile written
+        name: Profile the markdown was generated from (default: output_profile)
+        set_parameters: Set the parameters of the profile from the headers
+        regenerate: Regenerate the uuids of the profile
+        version: Version of the profile
+        sections: Comma-separated short_name:long_name sections
+        required_sections: Comma-separated short names of required sections
+        allowed_sections: Comma-separated short names of allowed sections
+        workers: Number of processes parsing markdown (default: size of the pool)
+
+    Returns:
+        dict with 'controls' (files parsed in parallel), 'workers', 'updated'
+        (False when the profile was already up to date), 'warnings' and
+        'elapsed'
+
+    Raises:
+        TrestleError: When the workspace, markdown or profile is invalid
+    """
+    options = {
+        "parent_prof_name": name,
+        "md_name": markdown_dir,
+        "assem_prof_name": output_profile,
+        "set_parameters_flag": set_parameters,
+        "regenerate": regenerate,
+        "version": version,
+        "sections_dict": comma_colon_sep_to_dict(sections),
+        "required_sections": comma_sep_to_list(required_sections),
+        # passed as the CLI does
+        "allowed_sections": allowed_sections,
+    }
+    return _run_assemble(const.MODEL_TYPE_PROFILE, trestle_root, options, workers)
+
+
+def assemble_catalog_markdown(
+    trestle_root: Path,
+    markdown_dir: str,
+    output_catalog: str,
+    name: Optional[str] = None,
+    set_parameters: bool = False,
+    regenerate: bool = False,
+    version: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """Assemble a catalog from markdown, parsing the markdown files in parallel.
+
+    The catalog written is the one ``trestle author catalog-assemble`` writes,
+    see assemble_profile_markdown().
+
+    Args:
+        trestle_root: Trestle workspace root
+        markdown_dir: Markdown folder, relative to the trestle root
+        output_catalog: Name of the catalog written
+        name: Catalog the markdown is merged into (default: output_catalog
+            when it exists)
+        set_parameters: Set the parameters of the controls from the headers
+        regenerate: Regenerate the uuids of the catalog
+        version: Version of the catalog
+        workers: Number of processes parsing markdown (default: size of the pool)
+
+    Returns:
+        dict as assemble_profile_markdown()
+
+    Raises:
+        TrestleError: When the workspace, markdown or catalog is invalid
+    """
+    options = {
+        "md_name": markdown_dir,
+        "assem_cat_name": output_catalog,
+        "parent_cat_name": name,
+        "set_parameters_flag": set_parameters,
+        "regenerate": regenerate,
+        "version": version,
+    }
+    return _run_assemble(const.MODEL_TYPE_CATALOG, trestle_root, options, workers)
@@ -0,0 +1,108 @@
+"""In-memory caches shared by the server.
+
+This module provides a small thread-safe LRU cache and the key used to detect
+that a file changed on disk.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Iterator, Optional, Union
+
+# Key identifying one version of a file: (path, mtime in ns, size in bytes)
+FileKey = tuple[str, int, int]
+
+
+def file_key(path: Union[str, Path]) -> Optional[FileKey]:
+    """Return a key that changes whenever the file is modified.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        Optional[FileKey]: (path, mtime_ns, size), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entries.
+
+    Args:
+        maxsize: Maximum number of entries kept
+        maxweight: Maximum total weight of the entries kept, such as their size
+            in bytes (default: no limit)
+    """
+
+    def __init__(self, maxsize: int = 128, maxweight: Optional[int] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weight = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._weights: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any, weight: int = 0) -> None:
+        """Store a value, evicting the least recently used entries if needed.
+
+        An entry heavier than maxweight by itself is evicted at once.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.weight += weight - self._weights.pop(key, 0)
+            if weight:
+                self._weights[key] = weight
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None and self.weight > self.maxweight
+            ):
+                evicted, _ = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(evicted, 0)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        with self._lock:
+            self.weight -= self._weights.pop(key, 0)
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def keys(self) -> list[Hashable]:
+        """Return the keys from least to most recently used."""
+        with self._lock:
+            return list(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
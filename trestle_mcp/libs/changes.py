@@ -0,0 +1,293 @@
+"""Change detection for incremental operations.
+
+Scanning the mtime of every file of a large workspace to find what changed is
+wasteful when the workspace is a git repository: git already knows. In a git
+work tree, each poll asks git for the paths changed by the commits since the
+last poll (``git diff``) and for the paths that differ from HEAD
+(``git status``), whose mtime and size confirm they changed since. The
+dependency graph, the search index, validation and the generate and assemble
+tools then look only at those paths. Consumers keep a position in the log of
+polls, so each one gets what changed since it last looked.
+
+Outside git, or when git fails, consumers get ``None`` and scan as before, and
+generate and assemble compare content hashes of the files they read and write.
+Files ignored by git are invisible to the git detector: ``ignored()`` lists
+them, for callers to hash.
+"""
+
+import hashlib
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from trestle_mcp.libs.cache import FileKey, file_key
+from trestle_mcp.libs.workspace import Workspace
+
+GIT_TIMEOUT = 30
+# Polls kept in the log: a consumer further behind scans everything again
+MAX_POLLS = 1024
+# Content hashes of files, keyed by file_key()
+HASH_CACHE_SIZE = 16384
+
+# Server state changes at every call and is never an input
+_EXCLUDE = ":(exclude).trestle/mcp"
+# Key of a path that does not differ from HEAD
+_CLEAN = ("clean",)
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        timeout=GIT_TIMEOUT,
+        check=True,
+    )
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+
+def git_toplevel(trestle_root: Path) -> Optional[Path]:
+    """Return the top level of the git work tree of a workspace, if any."""
+    if shutil.which("git") is None:
+        return None
+    try:
+        output = _git(trestle_root, "rev-parse", "--show-toplevel").strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return Path(output).resolve() if output else None
+
+
+def content_hash(
+    workspace: Workspace, path: Path, key: Optional[FileKey] = None
+) -> str:
+    """Return the sha256 of a file, hashing it again only when it changed.
+
+    Args:
+        workspace: Workspace caching the hashes
+        path: File to hash
+        key: ``file_key()`` of the file, when the caller has it already
+    """
+    key = key or file_key(path)
+    if key is None:
+        return "missing"
+    hashes = workspace.cache("file-hashes", HASH_CACHE_SIZE)
+    digest = hashes.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        hashes.put(key, digest)
+    return digest
+
+
+def touched(changed: Iterable[Path], paths: Iterable[Path]) -> bool:
+    """Return whether a changed file is one of paths or lies under one of them."""
+    paths = set(paths)
+    return any(c in paths or not paths.isdisjoint(c.parents) for c in changed)
+
+
+class GitChanges:
+    """Paths changed in the git work tree of a workspace, by poll.
+
+    Args:
+        trestle_root: Trestle workspace root, inside a git work tree
+        toplevel: Top level of the work tree
+    """
+
+    def __init__(self, trestle_root: Path, toplevel: Path):
+        self.root = trestle_root.resolve()
+        self.toplevel = toplevel
+        self._head: Optional[str] = None
+        self._dirty: dict[Path, Optional[FileKey]] = {}
+        self._polled = False
+
+    def _status(self) -> tuple[Optional[str], dict[Path, Optional[FileKey]]]:
+        output = _git(
+            self.root,
+            "status",
+            "--porcelain=v2",
+            "-z",
+            "--branch",
+            "--untracked-files=all",
+            "--no-renames",
+            "--",
+            ".",
+            _EXCLUDE,
+        )
+        head = None
+        dirty = {}
+        for entry in output.split("\0"):
+            if entry.startswith("# branch.oid "):
+                oid = entry[len("# branch.oid ") :]
+                head = None if oid == "(initial)" else oid
+            elif entry.startswith("1 "):
+                dirty[self.toplevel / entry.split(" ", 8)[8]] = None
+            elif entry.startswith("u "):
+                dirty[self.toplevel / entry.split(" ", 10)[10]] = None
+            elif entry.startswith("? "):
+                dirty[self.toplevel / entry[2:]] = None
+        return head, {path: file_key(path) for path in dirty}
+
+    def poll(self) -> Optional[set[Path]]:
+        """Return the files changed since the previous poll.
+
+        Returns:
+            set[Path]: Absolute paths of the files added, modified or deleted;
+            None on the first poll or when git cannot tell
+        """
+        try:
+            head, dirty = self._status()
+            changed: Optional[set[Path]] = set()
+            if not self._polled:
+                changed = None
+            elif head != self._head:
+                if head is None or self._head is None:
+                    changed = None
+                else:
+                    output = _git(
+                        self.root,
+                        "diff",
+                        "--name-only",
+                        "-z",
+                        "--no-renames",
+                        self._head,
+                        head,
+                        "--",
+                        ".",
+                        _EXCLUDE,
+                    )
+                    changed = {self.toplevel / p for p in output.split("\0") if p}
+        except (OSError, subprocess.SubprocessError):
+            self._polled = False
+            return None
+        if changed is not None:
+            # dirty files are reported again only when they changed since
+            changed |= {
+                path
+                for path in dirty.keys() | self._dirty.keys()
+                if dirty.get(path, _CLEAN) != self._dirty.get(path, _CLEAN)
+            }
+        self._head, self._dirty, self._polled = head, dirty, True
+        return changed
+
+    def ignored(self, paths: Iterable[Path]) -> Optional[list[Path]]:
+        """Return the files ignored by git among or under paths.
+
+        Returns:
+            list[Path]: Absolute paths of the ignored files, sorted; None when
+            git cannot tell
+        """
+        paths = [str(p) for p in paths]
+        if not paths:
+            return []
+        try:
+            output = _git(
+                self.root,
+                "ls-files",
+                "-z",
+                "--others",
+                "--ignored",
+                "--exclude-standard",
+                "--",
+                *paths,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return sorted({self.root / p for p in output.split("\0") if p})
+
+
+class WorkspaceChanges:
+    """Log of the changes of a workspace, read from positions.
+
+    A position marks a poll. Consumers keep the position they last looked at
+    and ask what changed since.
+
+    Args:
+        trestle_root: Trestle workspace root
+    """
+
+    def __init__(self, trestle_root: Path):
+        self.root = trestle_root.resolve()
+        toplevel = git_toplevel(self.root)
+        self.git = GitChanges(self.root, toplevel) if toplevel else None
+        self._polls: list[Optional[set[Path]]] = []
+        self._first = 0
+        self._cursors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self) -> str:
+        """How changes are detected: "git" or "scan"."""
+        return "git" if self.git is not None else "scan"
+
+    def _poll(self) -> int:
+        self._polls.append(self.git.poll())
+        if len(self._polls) > MAX_POLLS:
+            drop = len(self._polls) - MAX_POLLS
+            del self._polls[:drop]
+            self._first += drop
+        return self._first + len(self._polls)
+
+    def _since(self, position: Optional[int]) -> Optional[set[Path]]:
+        end = self._poll()
+        if position is None or position < self._first:
+            return None
+        changed: set[Path] = set()
+        for paths in self._polls[position - self._first : end - self._first]:
+            if paths is None:
+                return None
+            changed |= paths
+        return changed
+
+    def position(self) -> Optional[int]:
+        """Poll and return the current position, None outside git."""
+        if self.git is None:
+            return None
+        with self._lock:
+            return self._poll()
+
+    def since(self, position: Optional[int]) -> Optional[set[Path]]:
+        """Return the files changed since a position.
+
+        Returns:
+            set[Path]: Absolute paths of the changed files; None when unknown,
+            outside git, or for a position too old: scan everything
+        """
+        if self.git is None:
+            return None
+        with self._lock:
+            return self._since(position)
+
+    def ignored(self, paths: Iterable[Path]) -> Optional[list[Path]]:
+        """Return the files ignored by git among or under paths, see GitChanges.
+
+        Returns:
+            list[Path]: Absolute paths of the ignored files; None outside git
+            or when git cannot tell
+        """
+        if self.git is None:
+            return None
+        return self.git.ignored(paths)
+
+    def changes(self, consumer: str) -> Optional[set[Path]]:
+        """Return the files changed since a consumer last called, see since().
+
+        The first call of a consumer returns None.
+        """
+        if self.git is None:
+            return None
+        with self._lock:
+            changed = self._since(self._cursors.get(consumer))
+            self._cursors[consumer] = self._first + len(self._polls)
+            return changed
+
+    def forget(self, consumer: str) -> None:
+        """Drop the position of a consumer: its next call returns None."""
+        with self._lock:
+            self._cursors.pop(consumer, None)
+
+
+def workspace_changes(workspace: Workspace) -> WorkspaceChanges:
+    """Return the change detector of a workspace."""
+    return workspace.component("changes", lambda ws: WorkspaceChanges(ws.root))
@@ -0,0 +1,345 @@
+"""Concurrency control for trestle executions.
+
+This module schedules trestle commands: it bounds how many run at once, both
+overall and per MCP client, admits waiting calls by priority class and fair
+share between clients, rejects calls at once when the queues are full, and runs
+admitted calls on a worker pool shared by every client of the server.
+"""
+
+import asyncio
+import functools
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional
+
+from trestle_mcp.libs.workspace import current_workspace
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Calls waiting for a slot, overall, before new calls are rejected
+DEFAULT_MAX_QUEUE = 256
+# Interactive calls admitted in a row while batch calls wait; then one batch
+# call goes first, so batch work slows down under interactive load but never stops
+INTERACTIVE_BURST = 4
+# Wait times kept per priority class for the metrics
+WAIT_SAMPLES = 1024
+
+# Identity of the MCP client issuing the current tool call
+current_client: ContextVar[str] = ContextVar("current_client", default="local")
+# Priority class of the current tool call
+current_priority: ContextVar[str] = ContextVar("current_priority", default=INTERACTIVE)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a call is rejected because the execution queue is full."""
+
+
+def default_max_concurrency() -> int:
+    """Return the default number of concurrent trestle executions.
+
+    Returns:
+        int: Number of CPUs available, or 4 when it cannot be determined
+    """
+    return os.cpu_count() or 4
+
+
+@dataclass
+class _Waiter:
+    client: str
+    priority: str
+    sequence: int
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class ExecutionLimiter:
+    """Schedule trestle executions within concurrency and queue limits.
+
+    When a slot frees up, the next call is taken from the highest priority
+    class with waiting calls, and within a class from the client with the
+    fewest running executions, so one client sending a burst of calls cannot
+    starve the others. Clients never run more than ``max_per_client``
+    executions at once. A call that can run at once is admitted without
+    queueing. Calls that would have to wait while ``max_queue`` calls already
+    wait, or ``max_queue_per_client`` calls of the same client, are rejected at
+    once with QueueFullError instead of waiting behind the backlog.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_per_client: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_per_client: Optional[int] = None,
+    ):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: list[_Waiter] = []
+        self._active: dict[str, int] = {}
+        self._active_classes: dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._burst = 0
+        self._admitted = dict.fromkeys(PRIORITIES, 0)
+        self._rejected = dict.fromkeys(PRIORITIES, 0)
+        self._waits = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES}
+        self.configure(max_concurrency, max_per_client, max_queue, max_queue_per_client)
+
+    def configure(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_per_client: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_per_client: Optional[int] = None,
+    ) -> None:
+        """Set the concurrency and queue limits.
+
+        Args:
+            max_concurrency: Maximum concurrent executions (default: CPU count)
+            max_per_client: Maximum concurrent executions per client
+                (default: same as max_concurrency)
+            max_queue: Maximum calls waiting for a slot (default: 256)
+            max_queue_per_client: Maximum calls of one client waiting for a
+                slot (default: same as max_queue)
+        """
+        max_concurrency = max_concurrency or default_max_concurrency()
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_per_client is not None and max_per_client < 1:
+            raise ValueError("max_per_client must be at least 1")
+        max_queue = DEFAULT_MAX_QUEUE if max_queue is None else max_queue
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        if max_queue_per_client is not None and max_queue_per_client < 0:
+            raise ValueError("max_queue_per_client must not be negative")
+
+        self.max_concurrency = max_concurrency
+        self.max_per_client = min(max_per_client or max_concurrency, max_concurrency)
+        self.max_queue = max_queue
+        self.max_queue_per_client = min(
+            max_queue if max_queue_per_client is None else max_queue_per_client,
+            max_queue,
+        )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._loop = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool shared by all clients."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="trestle"
+            )
+        return self._executor
+
+    def active(self, client: Optional[str] = None) -> int:
+        """Return the number of running executions, overall or for one client."""
+        if client is not None:
+            return self._active.get(client, 0)
+        return sum(self._active.values())
+
+    def queued(self, client: Optional[str] = None) -> int:
+        """Return the number of calls waiting, overall or for one client."""
+        return sum(1 for w in self._waiters if client in (None, w.client))
+
+    def _bind_loop(self) -> None:
+        # asyncio futures belong to one event loop; drop the queue when it changes
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._waiters = []
+            self._active = {}
+            self._active_classes = {}
+            self._burst = 0
+
+    def _next(self) -> Optional[_Waiter]:
+        """Return the waiting call to admit next, if any can run."""
+        eligible = [
+            w for w in self._waiters if self.active(w.client) < self.max_per_client
+        ]
+        if not eligible:
+            return None
+        classes = [p for p in PRIORITIES if any(w.priority == p for w in eligible)]
+        priority = classes[0]
+        if priority == INTERACTIVE and len(classes) > 1:
+            if self._burst >= INTERACTIVE_BURST:
+                priority = classes[1]
+        candidates = [w for w in eligible if w.priority == priority]
+        return min(candidates, key=lambda w: (self.active(w.client), w.sequence))
+
+    def _dispatch(self) -> None:
+        """Admit waiting calls while slots are free."""
+        while self.active() < self.max_concurrency:
+            waiter = self._next()
+            if waiter is None:
+                return
+            self._waiters.remove(waiter)
+            self._admit(waiter.client, waiter.priority, waiter.queued_at)
+            waiter.future.set_result(None)
+
+    def _admit(self, client: str, priority: str, queued_at: float) -> None:
+        waiting_lower = any(w.priority != INTERACTIVE for w in self._waiters)
+        self._burst = (
+            self._burst + 1 if priority == INTERACTIVE and waiting_lower else 0
+        )
+        self._acquire(client, priority)
+        self._admitted[priority] += 1
+        self._waits[priority].append(time.perf_counter() - queued_at)
+
+    def _acquire(self, client: str, priority: str) -> None:
+        self._active[client] = self._active.get(client, 0) + 1
+        self._active_classes[priority] = self._active_classes.get(priority, 0) + 1
+
+    def _release(self, client: str, priority: str) -> None:
+        self._active[client] -= 1
+        if not self._active[client]:
+            del self._active[client]
+        self._active_classes[priority] -= 1
+        self._dispatch()
+
+    def _enqueue(self, client: str, priority: str) -> _Waiter:
+        if (
+            len(self._waiters) >= self.max_queue
+            or self.queued(client) >= self.max_queue_per_client
+        ):
+            self._rejected[priority] += 1
+            raise QueueFullError(
+                f"Server busy: {len(self._waiters)} calls queued "
+                f"({self.queued(client)} from this client), retry later"
+            )
+        waiter = _Waiter(
+            client, priority, next(self._sequence), self._loop.create_future()
+        )
+        self._waiters.append(waiter)
+        return waiter
+
+    @asynccontextmanager
+    async def slot(
+        self, client: str, priority: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """Wait for an execution slot for the given client.
+
+        Args:
+            client: Client identity the slot is accounted to
+            priority: Priority class (default: the one bound to current_priority)
+
+        Raises:
+            QueueFullError: When the call cannot even be queued
+        """
+        self._bind_loop()
+        priority = priority or current_priority.get()
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority}")
+        self._dispatch()
+        if (
+            self.active() < self.max_concurrency
+            and self.active(client) < self.max_per_client
+        ):
+            # slots left free by the dispatch are of no use to waiting calls
+            self._admit(client, priority, time.perf_counter())
+        else:
+            waiter = self._enqueue(client, priority)
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # admitted just before the cancellation: give the slot back
+                    self._release(client, priority)
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release(client, priority)
+
+    def metrics(self) -> dict[str, Any]:
+        """Return queue depths, running executions and wait times.
+
+        Returns:
+            dict: Limits, totals, then per priority class the running and
+            queued calls, admitted and rejected counts, and wait times in
+            milliseconds (mean, p50, p95, max over the last calls admitted),
+            and per client the running and queued calls
+        """
+        classes = {}
+        for priority in PRIORITIES:
+            waits = sorted(self._waits[priority])
+            classes[priority] = {
+                "active": self._active_classes.get(priority, 0),
+                "queued": sum(1 for w in self._waiters if w.priority == priority),
+                "admitted": self._admitted[priority],
+                "rejected": self._rejected[priority],
+                "wait_ms": {
+                    "mean": _ms(sum(waits) / len(waits)) if waits else 0.0,
+                    "p50": _ms(_percentile(waits, 0.5)),
+                    "p95": _ms(_percentile(waits, 0.95)),
+                    "max": _ms(waits[-1]) if waits else 0.0,
+                },
+            }
+        clients = sorted({*self._active, *(w.client for w in self._waiters)})
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_per_client": self.max_per_client,
+            "max_queue": self.max_queue,
+            "max_queue_per_client": self.max_queue_per_client,
+            "active": self.active(),
+            "queued": self.queued(),
+            "classes": classes,
+            "clients": {
+                c: {"active": self.active(c), "queued": self.queued(c)} for c in clients
+            },
+        }
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+# Limiter shared by every service of the server
+limiter = ExecutionLimiter()
+
+
+async def run_limited(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking function on a worker pool within the limits.
+
+    The call is accounted to the client bound to ``current_client`` and queued
+    in the priority class bound to ``current_priority``. It runs on
+    the dedicated workers of the workspace bound to ``current_workspace`` when it
+    has some, and on the pool shared by all clients otherwise.
+
+    Args:
+        func: Blocking callable, typically run_trestle_command
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+
+    Raises:
+        QueueFullError: When the execution queue is full
+    """
+    workspace = current_workspace.get()
+    with workspace.use() if workspace else nullcontext():
+        async with limiter.slot(current_client.get(), current_priority.get()):
+            executor = (workspace and workspace.executor) or limiter.executor
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, functools.partial(func, *args, **kwargs)
+            )
@@ -0,0 +1,301 @@
+"""Dependency graph of the models in a trestle workspace.
+
+Profiles import catalogs and other profiles, component definitions reference
+profiles, SSPs import a profile, and so on. This module scans those references
+across the workspace and keeps the transitive closure of the resulting graph,
+so the set of models made stale by a change to any file is a dictionary lookup.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from trestle.common import const
+
+from trestle_mcp.libs.cache import FileKey, file_key
+from trestle_mcp.libs.changes import workspace_changes
+from trestle_mcp.libs.workspace import Workspace
+from trestle_mcp.libs.yaml_cache import load_yaml
+
+MODEL_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# Remote hrefs never change under the workspace, so they are not tracked
+REMOTE_SCHEMES = (const.HTTPS_URI, const.SFTP_URI, "http://")
+
+
+def model_files(trestle_root: Path) -> list[Path]:
+    """Return the top level model files of a workspace.
+
+    Args:
+        trestle_root: Trestle workspace root
+
+    Returns:
+        list[Path]: Files such as catalogs/<name>/catalog.json, sorted
+    """
+    files = []
+    for model_dir in const.MODEL_DIR_LIST:
+        base = trestle_root / model_dir
+        if not base.is_dir():
+            continue
+        model_type = const.MODEL_MODULE_TO_MODEL_TYPE[
+            const.MODEL_DIR_TO_MODEL_MODULE[model_dir]
+        ]
+        for model in sorted(base.iterdir()):
+            for extension in MODEL_EXTENSIONS:
+                path = model / f"{model_type}{extension}"
+                if path.is_file():
+                    files.append(path.resolve())
+                    break
+    return files
+
+
+def is_model_file(trestle_root: Path, path: Path) -> bool:
+    """Return whether a path is a top level model file, see model_files()."""
+    model_dir = path.parent.parent
+    if model_dir.parent != trestle_root or model_dir.name not in const.MODEL_DIR_LIST:
+        return False
+    model_type = const.MODEL_MODULE_TO_MODEL_TYPE[
+        const.MODEL_DIR_TO_MODEL_MODULE[model_dir.name]
+    ]
+    return path.stem == model_type and path.suffix in MODEL_EXTENSIONS
+
+
+def _load(path: Path) -> dict:
+    if path.suffix != ".json":
+        # read only: the parsed YAML is shared with the cache
+        return load_yaml(path, "fast", shared=True) or {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _back_matter_href(model: dict, href: str) -> Optional[str]:
+    """Return the first rlink of the back-matter resource an href like #uuid points to."""
+    resources = model.get("back-matter", {}).get("resources", [])
+    for resource in resources:
+        if resource.get("uuid") == href[1:]:
+            rlinks = resource.get("rlinks", [])
+            return rlinks[0].get("href") if rlinks else None
+    return None
+
+
+def model_hrefs(model_type: str, model: dict) -> list[str]:
+    """Return the hrefs of the models a model depends on.
+
+    Args:
+        model_type: OSCAL model type, e.g. "profile"
+        model: Content of the model below its root key, as plain data
+
+    Returns:
+        list[str]: Hrefs, with back-matter references (#uuid) replaced by their rlink
+    """
+    hrefs: list[Any] = []
+    if model_type == const.MODEL_TYPE_PROFILE:
+        hrefs = [i.get("href") for i in model.get("imports", [])]
+    elif model_type == const.MODEL_TYPE_COMPDEF:
+        hrefs = [i.get("href") for i in model.get("import-component-definitions", [])]
+        for component in model.get("components", []):
+            hrefs.extend(
+                ci.get("source") for ci in component.get("control-implementations", [])
+            )
+    elif model_type == const.MODEL_TYPE_SSP:
+        hrefs = [model.get("import-profile", {}).get("href")]
+    elif model_type in (const.MODEL_TYPE_A_PLAN, const.MODEL_TYPE_POAM):
+        hrefs = [model.get("import-ssp", {}).get("href")]
+    elif model_type == const.MODEL_TYPE_A_RESULT:
+        hrefs = [model.get("import-ap", {}).get("href")]
+
+    resolved = []
+    for href in hrefs:
+        if href and href.startswith("#"):
+            href = _back_matter_href(model, href)
+        if href and href not in resolved:
+            resolved.append(href)
+    return resolved
+
+
+def href_path(
+    trestle_root: Path, href: str, cwd: Optional[Path] = None
+) -> Optional[Path]:
+    """Return the local file an href points to, as trestle's fetcher finds it.
+
+    trestle:// hrefs are relative to the trestle root. Other relative hrefs are
+    relative to the working directory trestle runs in, which is the working
+    directory of the server, not the trestle root.
+
+    Args:
+        trestle_root: Trestle workspace root
+        href: Import href, e.g. trestle://catalogs/nist/catalog.json
+        cwd: Working directory of trestle commands (default: the current one)
+
+    Returns:
+        Optional[Path]: Absolute path, or None for remote hrefs
+    """
+    if href.startswith(REMOTE_SCHEMES):
+        return None
+    if href.startswith(const.TRESTLE_HREF_HEADING):
+        return (trestle_root / href[len(const.TRESTLE_HREF_HEADING) :]).resolve()
+    if href.startswith(const.FILE_URI):
+        return Path("/" + href[len(const.FILE_URI) :]).resolve()
+    return (Path(cwd or os.getcwd()) / href).resolve()
+
+
+def _closure(edges: dict[Path, set[Path]]) -> dict[Path, frozenset[Path]]:
+    """Return, for every node, the nodes reachable from it (itself included)."""
+    closure: dict[Path, frozenset[Path]] = {}
+    for start in edges:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for node in edges.get(stack.pop(), ()):
+                if node not in seen:
+                    seen.add(node)
+                    stack.append(node)
+        closure[start] = frozenset(seen)
+    return closure
+
+
+class DependencyGraph:
+    """Transitive dependencies between the models of a trestle workspace.
+
+    The graph is built by ``refresh()``, which only re-reads model files whose
+    mtime or size changed. Queries are constant time lookups in the closures
+    computed by the last refresh.
+
+    Args:
+        trestle_root: Trestle workspace root
+        cwd: Working directory relative hrefs resolve against, see href_path()
+            (default: the current one)
+    """
+
+    def __init__(self, trestle_root: Path, cwd: Optional[Path] = None):
+        self.root = trestle_root.resolve()
+        self.cwd = Path(cwd or os.getcwd()).resolve()
+        self._keys: dict[Path, Optional[FileKey]] = {}
+        self._imports: dict[Path, set[Path]] = {}
+        self._dependencies: dict[Path, frozenset[Path]] = {}
+        self._dependents: dict[Path, frozenset[Path]] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _read_imports(self, path: Path) -> set[Path]:
+        model_type = path.stem
+        if model_type == const.MODEL_TYPE_CATALOG:
+            # catalogs import nothing: skip parsing them, they can be large
+            return set()
+        try:
+            model = _load(path).get(model_type, {})
+        except Exception:  # unreadable models depend on nothing until fixed
+            return set()
+        paths = (
+            href_path(self.root, href, self.cwd)
+            for href in model_hrefs(model_type, model)
+        )
+        return {p for p in paths if p is not None}
+
+    def refresh(self, files: Optional[Iterable[Path]] = None) -> set[Path]:
+        """Re-scan the workspace and update the graph.
+
+        Args:
+            files: Model files to re-check (default: scan the whole workspace)
+
+        Returns:
+            set[Path]: Model files added, removed or modified since the last refresh
+        """
+        with self._lock:
+            if files is None:
+                keys = {path: file_key(path) for path in model_files(self.root)}
+            else:
+                keys = dict(self._keys)
+                for path in files:
+                    path = Path(path).resolve()
+                    keys[path] = file_key(path)
+                    if keys[path] is None:
+                        del keys[path]
+            changed = {p for p in keys if keys[p] != self._keys.get(p)}
+            changed |= set(self._keys) - set(keys)
+            if not changed:
+                return changed
+
+            imports = {p: i for p, i in self._imports.items() if p in keys}
+            for path in changed & set(keys):
+                imports[path] = self._read_imports(path)
+            edges_changed = imports != self._imports
+            self._keys = keys
+            self._imports = imports
+            if edges_changed or not self._dependencies:
+                self._rebuild()
+            return changed
+
+    def _rebuild(self) -> None:
+        forward: dict[Path, set[Path]] = {}
+        reverse: dict[Path, set[Path]] = {}
+        for path, targets in self._imports.items():
+            forward.setdefault(path, set()).update(targets)
+            reverse.setdefault(path, set())
+            for target in targets:
+                forward.setdefault(target, set())
+                reverse.setdefault(target, set()).add(path)
+        self._dependencies = _closure(forward)
+        self._dependents = _closure(reverse)
+
+    def models(self) -> list[Path]:
+        """Return the model files of the workspace known to the graph."""
+        return sorted(self._keys)
+
+    def imports(self, path: Union[str, Path]) -> frozenset[Path]:
+        """Return the files a model imports directly."""
+        return frozenset(self._imports.get(Path(path).resolve(), ()))
+
+    def dependencies(self, path: Union[str, Path]) -> frozenset[Path]:
+        """Return every file a model depends on, transitively.
+
+        Args:
+            path: Model file
+
+        Returns:
+            frozenset[Path]: Files the model is built from, the model excluded
+        """
+        path = Path(path).resolve()
+        return self._dependencies.get(path, frozenset({path})) - {path}
+
+    def affected(self, path: Union[str, Path]) -> frozenset[Path]:
+        """Return what is stale if a file changed.
+
+        Args:
+            path: Changed file, a workspace model or a file imported by one
+
+        Returns:
+            frozenset[Path]: The file and every model depending on it, transitively
+        """
+        path = Path(path).resolve()
+        return self._dependents.get(path, frozenset({path}))
+
+    def stale(self, changed: Iterable[Union[str, Path]]) -> set[Path]:
+        """Return what is stale after several files changed."""
+        stale: set[Path] = set()
+        for path in changed:
+            stale |= self.affected(path)
+        return stale
+
+
+def workspace_graph(workspace: Workspace) -> DependencyGraph:
+    """Return the dependency graph of a workspace, refreshed against the disk.
+
+    In a git work tree only the model files git reports as changed since the
+    last refresh are checked again.
+
+    Args:
+        workspace: Workspace from ``libs/workspace.py``
+
+    Returns:
+        DependencyGraph: Graph kept as a component of the workspace
+    """
+    graph = workspace.component("dependencies", lambda ws: DependencyGraph(ws.root))
+    changed = workspace_changes(workspace).changes("dependencies")
+    if changed is None:
+        graph.refresh()
+    else:
+        graph.refresh(p for p in changed if is_model_file(graph.root, p))
+    return graph
@@ -0,0 +1,241 @@
+"""Structural diff between two versions of an OSCAL model.
+
+Models are compared as plain data. Items of lists are matched by identity
+(``id``, ``param-id``, ``control-id`` or ``uuid``) rather than by position, so
+inserting a control only reports that control, and moving one reports nothing.
+Lists without identities are compared as values. Every node gets a
+digest computed bottom-up from its children; subtrees with equal digests are
+skipped without being walked, so the comparison costs O(changed nodes) once the
+digests of both files are known. Digests are kept per file version, in the
+workspace holding the file.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+from trestle_mcp.libs.cache import LRUCache, file_key
+from trestle_mcp.libs.workspace import workspaces
+from trestle_mcp.libs.yaml_cache import load_yaml
+
+# Keys identifying the items of a list, by order of preference
+IDENTITY_KEYS = ("id", "param-id", "control-id", "uuid")
+
+# Kind of the items of well-known lists
+LIST_KINDS = {
+    "groups": "group",
+    "controls": "control",
+    "params": "param",
+    "parts": "part",
+    "set-parameters": "param",
+    "implemented-requirements": "requirement",
+    "statements": "statement",
+    "alters": "alter",
+    "adds": "add",
+    "removes": "remove",
+}
+
+# Parsed models and their digests kept by each cache, keyed by file_key()
+DOCUMENTS = 8
+
+# Documents of files outside the workspaces served
+_documents = LRUCache(maxsize=DOCUMENTS)
+
+
+class Document:
+    """A parsed model with the digest of each of its nodes.
+
+    Args:
+        data: Model content as plain data
+    """
+
+    def __init__(self, data: Any):
+        self.data = data
+        self._digests: dict[int, bytes] = {}
+        self.digest(data)
+
+    def digest(self, node: Any) -> bytes:
+        """Return the digest of a node, computed from the digests of its children."""
+        cached = self._digests.get(id(node))
+        if cached is not None:
+            return cached
+        # repr() of the node with containers replaced by their digest: it tells
+        # "1" from 1, and is much cheaper than feeding scalars one by one
+        if isinstance(node, dict):
+            data = repr(
+                sorted(
+                    (k, self.digest(v) if isinstance(v, (dict, list)) else v)
+                    for k, v in node.items()
+                )
+            )
+        elif isinstance(node, list):
+            data = repr(
+                [self.digest(v) if isinstance(v, (dict, list)) else v for v in node]
+            )
+        else:
+            return hashlib.blake2b(repr(node).encode(), digest_size=16).digest()
+        digest = hashlib.blake2b(data.encode(), digest_size=16).digest()
+        # only containers are memoized: scalars may be shared objects
+        self._digests[id(node)] = digest
+        return digest
+
+
+def load_document(path: Path) -> Document:
+    """Load a model file, reusing the digests of an unchanged file.
+
+    Args:
+        path: JSON or YAML model file
+
+    Returns:
+        Document: Parsed model with node digests
+    """
+    key = file_key(path)
+    workspace = workspaces.find(path)
+    cache = workspace.cache("documents", DOCUMENTS) if workspace else _documents
+    document = cache.get(key)
+    if document is None:
+        if path.suffix == ".json":
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            # read only: the parsed YAML is shared with the cache
+            data = load_yaml(path, "fast", shared=True)
+        document = Document(data)
+        cache.put(key, document)
+    return document
+
+
+def _identity(item: Any) -> Optional[str]:
+    if isinstance(item, dict):
+        for key in IDENTITY_KEYS:
+            if isinstance(item.get(key), str):
+                return item[key]
+    return None
+
+
+def _identified(items: Any) -> bool:
+    """Whether a list holds entities that can be matched by identity."""
+    return (
+        isinstance(items, list)
+        and bool(items)
+        and all(_identity(item) is not None for item in items)
+    )
+
+
+def _kind(list_key: str) -> str:
+    return LIST_KINDS.get(
+        list_key, list_key[:-1] if list_key.endswith("s") else list_key
+    )
+
+
+def _change(change: str, kind: str, ident: str, path: str, fields=None) -> dict:
+    entry = {"change": change, "kind": kind, "id": ident, "path": path}
+    if fields:
+        entry["fields"] = fields
+    return entry
+
+
+class _Differ:
+    def __init__(self, left: Document, right: Document):
+        self.left = left
+        self.right = right
+
+    def same(self, a: Any, b: Any) -> bool:
+        return self.left.digest(a) == self.right.digest(b)
+
+    def fields(self, a: Any, b: Any, prefix: str = "") -> list[str]:
+        """Return the changed fields of an entity, entity lists excluded."""
+        if self.same(a, b):
+            return []
+        if not (isinstance(a, dict) and isinstance(b, dict)):
+            return [prefix or "value"]
+        changed = []
+        for key in sorted(set(a) | set(b)):
+            if _identified(a.get(key)) or _identified(b.get(key)):
+                continue
+            if key not in a or key not in b:
+                changed.append(f"{prefix}{key}")
+            else:
+                changed.extend(self.fields(a[key], b[key], f"{prefix}{key}."))
+        return [c.rstrip(".") for c in changed]
+
+    def entity(
+        self, kind: str, ident: str, path: str, a: dict, b: dict
+    ) -> Iterator[dict]:
+        """Diff two versions of an entity and of the entities below it."""
+        if self.same(a, b):
+            return
+        fields = self.fields(a, b)
+        if fields:
+            yield _change("modified", kind, ident, path, fields)
+        yield from self.children(path, a, b)
+
+    def children(self, path: str, a: dict, b: dict) -> Iterator[dict]:
+        """Diff the entity lists found in two versions of an object."""
+        for key in sorted(set(a) | set(b)):
+            left, right = a.get(key), b.get(key)
+            if _identified(left) or _identified(right):
+                # missing lists are an empty tuple: temporary lists must not
+                # enter the digest memo, which is keyed by object id
+                yield from self.entities(key, f"{path}/{key}", left or (), right or ())
+            elif (
+                isinstance(left, dict)
+                and isinstance(right, dict)
+                and not self.same(left, right)
+            ):
+                # plain objects (e.g. metadata) may hold entity lists too
+                yield from self.children(f"{path}/{key}", left, right)
+
+    def entities(
+        self, list_key: str, path: str, a: Sequence, b: Sequence
+    ) -> Iterator[dict]:
+        """Diff two lists of entities matched by identity."""
+        if self.same(a, b):
+            return
+        kind = _kind(list_key)
+        left = {_identity(item): item for item in a}
+        right = {_identity(item): item for item in b}
+        for ident, item in left.items():
+            if ident not in right:
+                yield _change("removed", kind, ident, f"{path}[{ident}]")
+        for ident, item in right.items():
+            item_path = f"{path}[{ident}]"
+            if ident not in left:
+                yield _change("added", kind, ident, item_path)
+            else:
+                yield from self.entity(kind, ident, item_path, left[ident], item)
+
+
+def diff_documents(left: Document, right: Document) -> list[dict]:
+    """Return the changes from one version of a model to another.
+
+    Args:
+        left: Old version
+        right: New version
+
+    Returns:
+        list[dict]: Changes with 'change' (added, removed or modified), 'kind',
+        'id', 'path' and, for modified entities, the changed 'fields'
+    """
+    a, b = left.data, right.data
+    if not (isinstance(a, dict) and isinstance(b, dict) and len(a) == len(b) == 1):
+        raise ValueError("Both files must hold one OSCAL model")
+    (kind, a), (right_kind, b) = next(iter(a.items())), next(iter(b.items()))
+    if kind != right_kind:
+        raise ValueError(f"Cannot compare a {kind} with a {right_kind}")
+    ident = _identity(b) or _identity(a) or kind
+    return list(_Differ(left, right).entity(kind, ident, kind, a, b))
+
+
+def diff_files(left: Path, right: Path) -> list[dict]:
+    """Return the changes between two model files.
+
+    Args:
+        left: Old version of the model
+        right: New version of the model
+
+    Returns:
+        list[dict]: Changes, see diff_documents()
+    """
+    return diff_documents(load_document(left), load_document(right))
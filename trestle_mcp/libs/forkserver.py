@@ -0,0 +1,390 @@
+"""Fork server running trestle CLI commands in forked children.
+
+Starting the trestle CLI as a new process costs most of a second: the
+interpreter starts, then imports trestle and its OSCAL models. The fork server
+is a process spawned once that imports trestle and, optionally, parses the
+catalogs used most. Then it forks one child per command. A child starts in a
+few milliseconds and shares the memory pages of the server, copy-on-write. It
+runs the trestle CLI entry point with the arguments and working directory of
+the command. Its standard output and error go to files, and it exits with the
+exit code of the CLI, so callers get what ``subprocess.run`` would return.
+A new trestle process prints the warnings raised while importing trestle and
+its plugins, this package among them; the server imported them already, so it
+records what a fresh interpreter prints on that import and every child writes
+it first. Warnings raised while preloading are shown again by the children.
+
+Preloaded models are served to the trestle ``oscal_read`` calls of a child
+while their file is unchanged (``file_key()``). The first read of a model in
+a child gets the parsed object itself, which the child may modify since its
+memory is its own; later reads get copies. Children run in their own process
+group, killed as a whole when a command times out, and under the resource
+limits of the command (``limits.Limits``), whose address space counts the
+pages shared with the server.
+"""
+
+import functools
+import inspect
+import locale
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import traceback
+import warnings
+from multiprocessing import get_context
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from trestle_mcp.libs.cache import file_key
+from trestle_mcp.libs.limits import CompletedCommand, Limits, cpu_time
+
+logger = logging.getLogger(__name__)
+
+# Preloaded models of the fork server, by (model class, resolved path)
+_preloaded: dict[tuple[type, str], tuple[Any, Any]] = {}
+# Preloaded models already served once in this child
+_served: set[tuple[type, str]] = set()
+# Output of a new trestle process importing the CLI, written by every child
+_startup: tuple[bytes, bytes] = (b"", b"")
+
+# A new interpreter importing the CLI as the trestle script does: the directory
+# of the script, first on sys.path, holds no module
+STARTUP_PROBE = "import sys; del sys.path[0]; import trestle.cli"
+STARTUP_TIMEOUT = 60
+
+
+@functools.lru_cache(maxsize=1)
+def _read_log_line(oscal_read) -> int:
+    """Return the line of the debug log call of trestle's oscal_read."""
+    lines, first = inspect.getsourcelines(oscal_read)
+    for number, line in enumerate(lines, first):
+        if "logger.debug(" in line:
+            return number
+    return first
+
+
+def _oscal_read(original, cls, path):
+    """Read a model as trestle does, serving the preloaded copy when unchanged."""
+    resolved = str(Path(path).resolve())
+    entry = _preloaded.get((cls, resolved))
+    if entry is None or entry[0] != file_key(resolved):
+        return original(cls, path)
+    from trestle.core import base_model
+    from trestle.core.models.file_content_type import FileContentType
+
+    # the log line trestle writes on a read, from its own line: identical
+    # verbose output
+    if base_model.logger.isEnabledFor(logging.DEBUG):
+        content_type = FileContentType.path_suffix_to_content_type(Path(path))
+        alias = base_model.classname_to_alias(cls.__name__, base_model.AliasMode.JSON)
+        base_model.logger.handle(
+            base_model.logger.makeRecord(
+                base_model.logger.name,
+                logging.DEBUG,
+                base_model.__file__,
+                _read_log_line(original),
+                f"oscal_read content type {content_type} and alias {alias} "
+                f"from {path}",
+                (),
+                None,
+                "oscal_read",
+            )
+        )
+    if (cls, resolved) in _served:
+        return entry[1].model_copy(deep=True)
+    _served.add((cls, resolved))
+    return entry[1]
+
+
+def _preload(paths: Sequence[str]) -> None:
+    """Parse models in the fork server and serve them to trestle reads."""
+    from trestle.common.file_utils import extract_trestle_project_root
+    from trestle.common.load_validate import load_validate_model_path
+    from trestle.core.base_model import OscalBaseModel
+
+    for path in paths:
+        path = Path(path).resolve()
+        try:
+            key = file_key(path)
+            root = extract_trestle_project_root(path)
+            model = load_validate_model_path(root, path)
+        except Exception as e:  # a model that cannot be parsed is read as usual
+            logger.warning(f"Model {path} not preloaded: {e}")
+            continue
+        _preloaded[(type(model), str(path))] = (key, model)
+    if _preloaded:
+        original = OscalBaseModel.oscal_read.__func__
+
+        def oscal_read(cls, path):
+            return _oscal_read(original, cls, path)
+
+        OscalBaseModel.oscal_read = classmethod(oscal_read)
+
+
+def _probe_startup() -> subprocess.Popen:
+    """Start a new interpreter importing the trestle CLI, see _startup."""
+    return subprocess.Popen(
+        [sys.executable, "-c", STARTUP_PROBE],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _startup_output(probe: subprocess.Popen) -> tuple[bytes, bytes]:
+    """Return what the probe printed, or nothing if it failed."""
+    try:
+        stdout, stderr = probe.communicate(timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        probe.kill()
+        probe.communicate()
+        logger.warning("Trestle startup output not recorded: probe timed out")
+        return b"", b""
+    if probe.returncode:
+        logger.warning("Trestle startup output not recorded: probe failed")
+        return b"", b""
+    return stdout, stderr
+
+
+def _rearm_warnings() -> None:
+    """Show again the warnings already shown once in this process."""
+    # adding a filter invalidates the registries of shown warnings
+    warnings.filterwarnings("default", message="^trestle-mcp fork server$")
+    warnings.filters.pop(0)
+    warnings.onceregistry.clear()
+
+
+def _exit_code(code: Any) -> int:
+    """Return the exit code of a SystemExit as the interpreter does."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _child(args: list[str], cwd: str, directory: str, limits: Limits) -> int:
+    """Run the trestle CLI in a forked child, as ``trestle <args>`` would."""
+    from trestle import cli
+
+    os.setpgid(0, 0)
+    limits.apply()
+    os.chdir(cwd)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    for fd, name in ((1, "stdout"), (2, "stderr")):
+        output = os.open(
+            os.path.join(directory, name), os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        )
+        os.dup2(output, fd)
+        os.close(output)
+    for fd, output in zip((1, 2), _startup):
+        os.write(fd, output)
+    sys.argv = args
+    try:
+        cli.run()
+        code = 0
+    except SystemExit as e:
+        code = _exit_code(e.code)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    return code
+
+
+def _serve(conn: Connection, preload: Sequence[str]) -> None:
+    """Main loop of the fork server: fork a child per command, report its exit."""
+    # the server's stdout may carry the MCP protocol: children write to files
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    global _startup
+    probe = _probe_startup()
+    import trestle.cli  # noqa: F401  imported once, shared by every child
+
+    _preload(preload)
+    _rearm_warnings()
+    _startup = _startup_output(probe)
+    running: dict[int, tuple[int, int]] = {}  # exit pipe -> (job, pid)
+    pids: dict[int, int] = {}
+    while True:
+        for ready in wait([conn, *running]):
+            if ready is not conn:
+                job, pid = running.pop(ready)
+                os.close(ready)
+                del pids[job]
+                _, status, usage = os.wait4(pid, 0)
+                code = os.waitstatus_to_exitcode(status)
+                conn.send(("done", job, code, cpu_time(usage)))
+                continue
+            try:
+                message = conn.recv()
+            except EOFError:
+                message = ("stop",)
+            if message[0] == "stop":
+                for pid in pids.values():
+                    _kill(pid)
+                return
+            if message[0] == "kill":
+                if message[1] in pids:
+                    _kill(pids[message[1]])
+                continue
+            _, job, args, cwd, directory, limits = message
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # the child holds the write end: it is closed when the child exits
+            exited, exiting = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(exited)
+                conn.close()
+                code = 1
+                try:
+                    code = _child(args, cwd, directory, limits)
+                finally:
+                    os._exit(code)
+            os.close(exiting)
+            try:
+                os.setpgid(pid, pid)
+            except OSError:  # the child did it first, or already exited
+                pass
+            running[exited] = (job, pid)
+            pids[job] = pid
+
+
+def _kill(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+class ForkServer:
+    """Client of a fork server process, safe to use from many threads.
+
+    Args:
+        preload: Model files the fork server parses when it starts
+    """
+
+    def __init__(self, preload: Sequence[Path] = ()):
+        self.preload = [str(p) for p in preload]
+        self._process = None
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+        self._jobs: dict[int, list] = {}
+        self._next_job = 0
+
+    def _start(self) -> Connection:
+        if self._conn is None:
+            conn, child_conn = get_context("spawn").Pipe()
+            self._process = get_context("spawn").Process(
+                target=_serve, args=(child_conn, self.preload), daemon=True
+            )
+            self._process.start()
+            child_conn.close()
+            self._conn = conn
+            threading.Thread(target=self._receive, args=(conn,), daemon=True).start()
+        return self._conn
+
+    def start(self) -> None:
+        """Start the fork server now rather than on the first command."""
+        with self._lock:
+            self._start()
+
+    def _receive(self, conn: Connection) -> None:
+        """Dispatch the exit codes reported by the fork server."""
+        while True:
+            try:
+                _, job, code, used = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                waiter = self._jobs.get(job)
+            if waiter is not None:
+                waiter[1:] = [code, used]
+                waiter[0].set()
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+            waiters = list(self._jobs.values())
+        for waiter in waiters:
+            waiter[0].set()
+
+    def run(
+        self,
+        args: list[str],
+        cwd: str,
+        timeout: Optional[float] = None,
+        limits: Limits = Limits(),
+    ) -> CompletedCommand:
+        """Run a trestle command in a forked child.
+
+        Args:
+            args: Command line, the trestle binary first
+            cwd: Working directory of the command
+            timeout: Seconds after which the command is killed
+            limits: Resource limits of the command
+
+        Returns:
+            CompletedCommand: Exit code, text output and CPU time of the command
+
+        Raises:
+            subprocess.TimeoutExpired: When the command timed out
+            RuntimeError: When the fork server stopped
+        """
+        # set, exit code, CPU time
+        waiter: list = [threading.Event(), None, None]
+        with self._lock:
+            job = self._next_job = self._next_job + 1
+            self._jobs[job] = waiter
+        directory = tempfile.mkdtemp(prefix="trestle-fork-")
+        try:
+            with self._lock:
+                conn = self._start()
+                conn.send(("run", job, args, str(cwd), directory, limits))
+            if not waiter[0].wait(timeout):
+                with self._lock:
+                    if self._conn is conn:
+                        conn.send(("kill", job))
+                raise subprocess.TimeoutExpired(args, timeout)
+            if waiter[1] is None:
+                raise RuntimeError("Fork server stopped")
+            encoding = locale.getpreferredencoding(False)
+            outputs = []
+            for name in ("stdout", "stderr"):
+                with open(os.path.join(directory, name), encoding=encoding) as f:
+                    outputs.append(f.read())
+            return CompletedCommand(args, waiter[1], *outputs, cpu_time=waiter[2])
+        finally:
+            with self._lock:
+                self._jobs.pop(job, None)
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def stop(self) -> None:
+        """Stop the fork server, killing the commands still running."""
+        with self._lock:
+            conn, self._conn = self._conn, None
+            process, self._process = self._process, None
+            if conn is not None:
+                try:
+                    conn.send(("stop",))
+                except OSError:
+                    pass
+        if process is not None:
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,144 @@
+"""Batched filesystem access for the server's scans of workspace directories.
+
+Watches, incremental calls, single-flight keys and generated file listings
+scan directories of thousands of markdown files, then stat or read each file
+in turn. On a network filesystem every one of those calls is a round trip.
+Here a directory tree is listed one level at a time, the directories of a
+level listed concurrently with ``os.scandir``, and the type of each entry
+comes from the listing rather than from a stat call. Only the files kept are
+stat-ed, once. Stat-ing, reading or hashing many files runs in batches on a
+bounded pool of threads, since the calls release the GIL while they wait.
+
+The pool is for the server process: code running in a worker of the process
+pool forks children (``parallel.fork_map()``), which must not inherit threads.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TypeVar, Union
+
+from trestle_mcp.libs.cache import FileKey
+
+P = TypeVar("P")
+T = TypeVar("T")
+
+DEFAULT_WORKERS = 16
+BATCHES_PER_WORKER = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_workers = DEFAULT_WORKERS
+
+
+def configure(workers: int = DEFAULT_WORKERS) -> None:
+    """Set the number of threads of the I/O pool, replacing any running pool.
+
+    Args:
+        workers: Number of threads listing, stat-ing and reading files
+
+    Raises:
+        ValueError: When workers is below 1
+    """
+    global _executor, _workers
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        _workers = workers
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(_workers, thread_name_prefix="fsio")
+        return _executor
+
+
+def map_files(func: Callable[[P], T], paths: Iterable[P]) -> list[T]:
+    """Call a function on many files concurrently, on the I/O pool.
+
+    Args:
+        func: Function of a file, typically reading or hashing it
+        paths: Files, as paths or keys
+
+    Returns:
+        list: Results in the order of paths
+    """
+    paths = list(paths)
+    if len(paths) < 2:
+        return [func(path) for path in paths]
+    # a few batches per thread: one task per file costs more than a local read
+    size = -(-len(paths) // (_workers * BATCHES_PER_WORKER))
+    batches = [paths[i : i + size] for i in range(0, len(paths), size)]
+    results = _pool().map(lambda batch: [func(path) for path in batch], batches)
+    return [result for batch in results for result in batch]
+
+
+def _list(directory: str, suffix: Optional[str]) -> tuple[list[os.DirEntry], list[str]]:
+    """List a directory: its files with the suffix, and its subdirectories."""
+    files, directories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.endswith(suffix or "") and entry.is_file():
+                        files.append(entry)
+                except OSError:  # removed while listed
+                    continue
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        pass
+    return files, directories
+
+
+def _key(entry: os.DirEntry) -> Optional[FileKey]:
+    try:
+        stat = entry.stat()
+    except OSError:
+        return None
+    return (entry.path, stat.st_mtime_ns, stat.st_size)
+
+
+def scan(directory: Union[str, Path], suffix: Optional[str] = None) -> list[FileKey]:
+    """Return the keys of the files under a directory, as ``file_key()`` would.
+
+    Symbolic links to directories are not followed, as with ``os.walk``.
+
+    Args:
+        directory: Directory to scan, missing or not a directory for no files
+        suffix: Only files whose name ends with it, e.g. ".md"
+
+    Returns:
+        list[FileKey]: (path, mtime_ns, size) of each file, sorted by path
+    """
+    files: list[os.DirEntry] = []
+    level = [str(directory)]
+    while level:
+        if len(level) == 1:
+            listings = [_list(level[0], suffix)]
+        else:
+            listings = list(_pool().map(_list, level, [suffix] * len(level)))
+        level = []
+        for entries, directories in listings:
+            files.extend(entries)
+            level.extend(directories)
+    return sorted(filter(None, map_files(_key, files)))
+
+
+def read_files(paths: Iterable[str]) -> list[Optional[bytes]]:
+    """Read many files concurrently, None for files that cannot be read."""
+    return map_files(_read, paths)
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -0,0 +1,197 @@
+"""Idempotency keys for tool calls.
+
+A client retrying a call after a transport error passes the same
+``idempotency_key`` as the first attempt. The successful result of a call
+with a key is stored in the workspace for a while, so the retry returns it at
+once instead of importing or generating again. Reusing a key for another tool
+or other parameters is an error: the key would otherwise return the result of
+a different call. Failed calls are not stored, so retrying them runs them again.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Awaitable, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from trestle_mcp.libs.results import ResultContent, ToolResult
+from trestle_mcp.libs.storage import CompressedStore
+from trestle_mcp.libs.workspace import (
+    STATE_DIR,
+    current_workspace,
+    state_dir,
+    workspaces,
+)
+
+IDEMPOTENCY_DIR = STATE_DIR / "idempotency"
+DEFAULT_TTL = 24 * 60 * 60
+# Expired entries are removed at most this often, by the calls storing results
+PURGE_INTERVAL = 10 * 60
+
+# Field of the tool inputs: ``idempotency_key: IdempotencyKey = None``
+IdempotencyKey = Annotated[
+    Optional[str],
+    Field(
+        max_length=200,
+        description="Key identifying this call: a retry with the same key returns "
+        "the result of the first successful call instead of running again",
+    ),
+]
+
+_ttl: float = DEFAULT_TTL
+
+
+class IdempotencyError(ValueError):
+    """Raised when an idempotency key is reused for a different call."""
+
+
+def configure(ttl: float = DEFAULT_TTL) -> None:
+    """Set how long results are kept for their idempotency key.
+
+    Args:
+        ttl: Lifetime of stored results in seconds
+    """
+    global _ttl
+    if ttl <= 0:
+        raise ValueError("ttl must be positive")
+    _ttl = ttl
+
+
+def fingerprint(tool: str, params: BaseModel) -> str:
+    """Return the digest of a call, its idempotency key and trestle root excluded."""
+    data = params.model_dump(mode="json", exclude={"idempotency_key", "trestle_root"})
+    content = json.dumps([tool, data], sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class IdempotencyStore:
+    """Results of calls by idempotency key, kept in a workspace for a TTL.
+
+    Args:
+        trestle_root: Trestle workspace root
+        ttl: Lifetime of stored results in seconds (default: the configured one)
+    """
+
+    _purged: dict[Path, float] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, trestle_root: Path, ttl: Optional[float] = None):
+        self.trestle_root = trestle_root
+        self.store = CompressedStore(trestle_root / IDEMPOTENCY_DIR)
+        self.ttl = ttl or _ttl
+
+    @staticmethod
+    def _entry(key: str) -> str:
+        # keys come from clients: never use them as file names
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return now - entry.get("created", 0) > self.ttl
+
+    def lookup(self, key: str, call: str) -> Optional[ToolResult]:
+        """Return the result stored for a key, if any and not expired.
+
+        Args:
+            key: Idempotency key
+            call: Fingerprint of the call, see fingerprint()
+
+        Raises:
+            IdempotencyError: When the key was used for a different call
+        """
+        name = self._entry(key)
+        try:
+            entry = self.store.read_json(name)
+        except (KeyError, OSError, ValueError):
+            return None
+        if self._expired(entry, time.time()):
+            self.store.delete(name)
+            return None
+        if entry["call"] != call:
+            raise IdempotencyError(
+                f"Idempotency key {key} was already used with other parameters"
+            )
+        content = ResultContent.model_validate(entry["content"])
+        return ToolResult(entry["text"], content)
+
+    def save(self, key: str, call: str, result: ToolResult) -> None:
+        """Store the result of a call for its key."""
+        now = time.time()
+        state_dir(self.trestle_root)
+        self.store.write_json(
+            self._entry(key),
+            {
+                "call": call,
+                "created": now,
+                "text": str(result),
+                "content": result.content.model_dump(mode="json"),
+            },
+        )
+        with self._lock:
+            due = now - self._purged.get(self.store.directory, 0) > PURGE_INTERVAL
+            if due:
+                self._purged[self.store.directory] = now
+        if due:
+            self.purge(now)
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Remove expired entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = now or time.time()
+        removed = 0
+        for name in list(self.store.keys()):
+            try:
+                expired = self._expired(self.store.read_json(name), now)
+            except (KeyError, OSError, ValueError):
+                expired = True
+            if expired:
+                self.store.delete(name)
+                removed += 1
+        return removed
+
+
+async def run_idempotent(
+    tool: str, params: BaseModel, service: Callable[..., Awaitable[str]]
+) -> str:
+    """Run a service, or return the stored result of the call with the same key.
+
+    Calls without ``idempotency_key`` always run.
+
+    Args:
+        tool: Tool name
+        params: Input of the call
+        service: Service running the call
+
+    Returns:
+        str: Result of the service, the stored one for a retried key
+
+    Raises:
+        IdempotencyError: When the key was used for a different call
+    """
+    key = getattr(params, "idempotency_key", None)
+    if not key:
+        return await service(params)
+    workspace = current_workspace.get() or workspaces.get(None)
+    store = IdempotencyStore(workspace.root)
+    call = fingerprint(tool, params)
+    stored = await asyncio.to_thread(store.lookup, key, call)
+    if stored is not None:
+        content = stored.content.model_copy(
+            update={
+                "warnings": [
+                    *stored.content.warnings,
+                    f"Result stored for idempotency key {key}",
+                ]
+            }
+        )
+        return ToolResult(str(stored), content)
+    result = await service(params)
+    if isinstance(result, ToolResult) and result.content.status == "success":
+        await asyncio.to_thread(store.save, key, call, result)
+    return result
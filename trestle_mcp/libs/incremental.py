@@ -0,0 +1,164 @@
+"""Skipping generate and assemble calls whose files did not change.
+
+Generating markdown from an unchanged model into unchanged markdown, or
+assembling unchanged markdown into an unchanged profile, writes the same
+files again. A successful call records the files it reads (the files and
+models its input names and every model those import) and the files it writes.
+The same call again returns the recorded result without running while none of
+those files changed: per the change log of the workspace in a git work tree
+(``libs/changes.py``), by content hashes otherwise. The files the change log
+cannot see, those outside the workspace and those ignored by git, are compared
+by content hashes in a git work tree too. Calls forcing an overwrite or
+regenerating UUIDs always run. A call that does run does all its work: trestle
+generates and assembles whole directories and models.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+
+from pydantic import BaseModel
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.changes import content_hash, touched, workspace_changes
+from trestle_mcp.libs.dependencies import workspace_graph
+from trestle_mcp.libs.idempotency import fingerprint
+from trestle_mcp.libs.results import ToolResult
+from trestle_mcp.libs.singleflight import external_files, input_paths
+from trestle_mcp.libs.snapshot import output_paths
+from trestle_mcp.libs.workspace import Workspace, current_workspace, workspaces
+
+# Inputs asking to write everything again
+ALWAYS_RUN = ("force_overwrite", "regenerate")
+# Calls recorded per workspace
+RUNS_CACHE_SIZE = 256
+
+
+@dataclass
+class Run:
+    """Files of a successful call, and their state around it.
+
+    The state is a position in the change log with the digest of the files
+    the log cannot see in a git work tree, a digest of the file contents
+    otherwise.
+    """
+
+    inputs: list[Path]
+    outputs: list[Path]
+    before: Union[tuple[int, str], str]
+    after: Union[tuple[int, str], str]
+    result: ToolResult
+
+
+def call_inputs(workspace: Workspace, params: BaseModel) -> list[Path]:
+    """Return the files and directories a call reads, imports included."""
+    inputs = set(input_paths(workspace.root, params))
+    inputs.update(external_files(workspace.root, params))
+    graph = workspace_graph(workspace)
+    for model in graph.models():
+        if touched([model], inputs):
+            inputs |= graph.dependencies(model)
+    return sorted(inputs)
+
+
+def tree_digest(workspace: Workspace, paths: list[Path]) -> str:
+    """Return the digest of the content of files and directories."""
+    digest = hashlib.sha256()
+    for path in paths:
+        files = [(path, None)]
+        if path.is_dir():
+            files = [(Path(key[0]), key) for key in fsio.scan(path)]
+        hashes = fsio.map_files(lambda file: content_hash(workspace, *file), files)
+        for (file, _), content in zip(files, hashes):
+            digest.update(f"{file}:{content}\n".encode())
+    return digest.hexdigest()
+
+
+def unseen_files(workspace: Workspace, paths: list[Path]) -> Optional[list[Path]]:
+    """Return the paths the change log cannot see: outside the workspace or ignored.
+
+    Returns:
+        list[Path]: Paths outside the workspace and files ignored by git under
+        the others; None when git cannot tell
+    """
+    root = workspace.root
+    ignored = workspace_changes(workspace).ignored(
+        [path for path in paths if path.is_relative_to(root)]
+    )
+    if ignored is None:
+        return None
+    return [path for path in paths if not path.is_relative_to(root)] + ignored
+
+
+def _stamp(workspace: Workspace, paths: list[Path]) -> Union[tuple[int, str], str]:
+    position = workspace_changes(workspace).position()
+    if position is not None:
+        unseen = unseen_files(workspace, paths)
+        if unseen is not None:
+            return position, tree_digest(workspace, unseen)
+    return tree_digest(workspace, paths)
+
+
+def _unchanged(
+    workspace: Workspace, stamp: Union[tuple[int, str], str], paths: list[Path]
+) -> bool:
+    if isinstance(stamp, str):
+        return stamp == tree_digest(workspace, paths)
+    position, digest = stamp
+    changed = workspace_changes(workspace).since(position)
+    if changed is None or touched(changed, paths):
+        return False
+    unseen = unseen_files(workspace, paths)
+    return unseen is not None and digest == tree_digest(workspace, unseen)
+
+
+def unchanged(workspace: Workspace, run: Run) -> bool:
+    """Return whether no file read or written by a recorded call changed."""
+    return _unchanged(workspace, run.before, run.inputs) and _unchanged(
+        workspace, run.after, run.outputs
+    )
+
+
+async def run_incremental(
+    tool: str, service: Callable[..., Awaitable[str]], params: BaseModel
+) -> str:
+    """Run a service, or return its last result if none of its files changed.
+
+    Args:
+        tool: Tool name
+        service: Service running the call
+        params: Input of the call
+
+    Returns:
+        str: Result of the service, the recorded one when the call was skipped
+    """
+    if any(getattr(params, field, False) for field in ALWAYS_RUN):
+        return await service(params)
+    workspace = current_workspace.get() or workspaces.get(None)
+    runs = workspace.cache("incremental", RUNS_CACHE_SIZE)
+    call = fingerprint(tool, params)
+    run = runs.get(call)
+    if run is not None and await asyncio.to_thread(unchanged, workspace, run):
+        content = run.result.content.model_copy(
+            update={
+                "warnings": [
+                    *run.result.content.warnings,
+                    "Skipped: no file read or written by this call changed "
+                    "since its last run",
+                ]
+            }
+        )
+        return ToolResult(str(run.result), content)
+
+    inputs = await asyncio.to_thread(call_inputs, workspace, params)
+    before = await asyncio.to_thread(_stamp, workspace, inputs)
+    result = await service(params)
+    runs.pop(call)
+    if isinstance(result, ToolResult) and result.content.status == "success":
+        outputs = await asyncio.to_thread(output_paths, workspace.root, params)
+        if outputs:
+            after = await asyncio.to_thread(_stamp, workspace, outputs)
+            runs.put(call, Run(inputs, outputs, before, after, result))
+    return result
@@ -0,0 +1,252 @@
+"""Resource limits of trestle commands.
+
+A pathological input, such as a huge CSV or a recursive profile import chain,
+can make one trestle process take all the memory or CPU of a shared server.
+Each trestle command can run with limits on its address space, CPU time, open
+files and on the size of every file it writes, its captured output included.
+The limits are set with ``setrlimit`` in the process of the command before
+trestle starts. New processes go through a small launcher that sets them and
+execs trestle. Children of the fork server set them themselves. Commands run
+in a session of their own, out of the process group of the server, and the
+whole group is killed when a command times out.
+
+A command that fails at a limit fails in a way that depends on where the
+limit hit. Memory runs out as a MemoryError, often caught and logged by trestle
+with an empty message, as an abort or a crash, or even as a deadlock ended by
+the command timeout. CPU time ends with SIGXCPU, or SIGKILL at the hard limit.
+Writes past the size limit fail with EFBIG, and opening too many files fails
+with EMFILE. ``Limits.breach()`` reports a limit only from evidence of it: the
+signal of the limit, the CPU time used or the error output. A failure at a
+limit that leaves no such trace is reported as a plain failure.
+"""
+
+import errno
+import io
+import locale
+import os
+import re
+import resource
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+MB = 1024 * 1024
+# Share of the CPU limit a killed command must have used to be blamed on it:
+# rusage accounts slightly less time than the kernel checks against RLIMIT_CPU
+CPU_TOLERANCE = 0.95
+
+# Sets the limits given as NAME:soft:hard,... then becomes the command
+_LAUNCHER = """\
+import os, resource, sys
+for limit in filter(None, sys.argv[1].split(",")):
+    name, soft, hard = limit.split(":")
+    resource.setrlimit(getattr(resource, name), (int(soft), int(hard)))
+os.execvp(sys.argv[2], sys.argv[2:])
+"""
+
+# What memory exhaustion leaves in the error output of Python, Rust and C++ code
+_MEMORY_ERRORS = (
+    "MemoryError",
+    "memory allocation of",
+    os.strerror(errno.ENOMEM),
+    "bad_alloc",
+)
+# trestle logs a caught exception as "<message>: <exception>", and a
+# MemoryError raised when no memory is left has no text, nor has an error
+# wrapping it
+_EMPTY_ERROR = re.compile(r" ERROR: .*: \.?$", re.MULTILINE)
+
+
+class CompletedCommand(subprocess.CompletedProcess):
+    """A finished command, with the CPU time it used.
+
+    Attributes:
+        cpu_time: User and system CPU time in seconds, None when unknown
+    """
+
+    def __init__(
+        self,
+        args: list[str],
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        cpu_time: Optional[float] = None,
+    ):
+        super().__init__(args, returncode, stdout, stderr)
+        self.cpu_time = cpu_time
+
+
+def cpu_time(usage: resource.struct_rusage) -> float:
+    """Return the user and system CPU time of a resource usage, in seconds."""
+    return usage.ru_utime + usage.ru_stime
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Resource limits of one trestle command, None for no limit.
+
+    Attributes:
+        memory: Address space in bytes
+        cpu: CPU time in seconds
+        open_files: Open file descriptors
+        output: Size in bytes of each file written, standard output included
+    """
+
+    memory: Optional[int] = None
+    cpu: Optional[int] = None
+    open_files: Optional[int] = None
+    output: Optional[int] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether any limit is set."""
+        return any(
+            value is not None
+            for value in (self.memory, self.cpu, self.open_files, self.output)
+        )
+
+    def rlimits(self) -> list[tuple[str, int, int]]:
+        """Return the (resource name, soft, hard) limits to set.
+
+        Limits are lowered to the hard limits of the server, which an
+        unprivileged process cannot raise.
+        """
+        limits = [
+            ("RLIMIT_AS", self.memory, self.memory),
+            # SIGXCPU at the soft limit, SIGKILL a second later if it is ignored
+            ("RLIMIT_CPU", self.cpu, self.cpu and self.cpu + 1),
+            ("RLIMIT_NOFILE", self.open_files, self.open_files),
+            ("RLIMIT_FSIZE", self.output, self.output),
+        ]
+        result = []
+        for name, soft, hard in limits:
+            if soft is None:
+                continue
+            _, maximum = resource.getrlimit(getattr(resource, name))
+            if maximum != resource.RLIM_INFINITY:
+                soft, hard = min(soft, maximum), min(hard, maximum)
+            result.append((name, soft, hard))
+        return result
+
+    def apply(self) -> None:
+        """Set the limits on the current process."""
+        for name, soft, hard in self.rlimits():
+            resource.setrlimit(getattr(resource, name), (soft, hard))
+
+    def command(self, cmd: list[str]) -> list[str]:
+        """Return a command line running cmd under the limits."""
+        spec = ",".join(f"{name}:{soft}:{hard}" for name, soft, hard in self.rlimits())
+        return [sys.executable, "-I", "-S", "-c", _LAUNCHER, spec, *cmd]
+
+    def breach(
+        self, returncode: int, stderr: str, cpu_time: Optional[float] = None
+    ) -> Optional[str]:
+        """Return the limit a failed command exceeded, if there is evidence of it.
+
+        Args:
+            returncode: Exit code of the command, negative for a signal
+            stderr: Error output of the command
+            cpu_time: CPU time the command used in seconds, None when unknown
+
+        Returns:
+            Optional[str]: "cpu", "output", "open_files" or "memory"
+        """
+        if returncode == 0:
+            return None
+        if self.cpu is not None and (
+            returncode == -signal.SIGXCPU
+            # the hard limit kills a command ignoring SIGXCPU: not the OOM killer
+            or returncode == -signal.SIGKILL
+            and cpu_time is not None
+            and cpu_time >= self.cpu * CPU_TOLERANCE
+        ):
+            return "cpu"
+        if self.output is not None and (
+            returncode == -signal.SIGXFSZ or os.strerror(errno.EFBIG) in stderr
+        ):
+            return "output"
+        if self.open_files is not None and os.strerror(errno.EMFILE) in stderr:
+            return "open_files"
+        if self.memory is not None and (
+            any(marker in stderr for marker in _MEMORY_ERRORS)
+            or _EMPTY_ERROR.search(stderr)
+        ):
+            return "memory"
+        return None
+
+    def describe(self, limit: str) -> str:
+        """Return a description of a limit and its value."""
+        if limit == "memory":
+            return f"memory ({self.memory // MB} MB of address space)"
+        if limit == "cpu":
+            return f"CPU time ({self.cpu} s)"
+        if limit == "open_files":
+            return f"open files ({self.open_files})"
+        return f"output size ({self.output // MB} MB per file)"
+
+
+def _wait(process: subprocess.Popen, timeout: Optional[float]) -> Optional[float]:
+    """Wait for a process, returning the CPU time it used when the system tells.
+
+    Raises:
+        subprocess.TimeoutExpired: When the process is still running at the timeout
+    """
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):  # not Linux 5.3 or later
+        process.wait(timeout)
+        return None
+    try:
+        if not select.select([pidfd], [], [], timeout)[0]:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+    finally:
+        os.close(pidfd)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return cpu_time(usage)
+
+
+def run(
+    cmd: list[str], cwd: str, timeout: Optional[float], limits: Limits
+) -> CompletedCommand:
+    """Run a command in a new process under resource limits.
+
+    Standard output and error go through files, so the output limit bounds
+    them too. The command runs in a session of its own, killed as a whole at
+    the timeout.
+
+    Returns:
+        CompletedCommand: Exit code, text output and CPU time of the command
+
+    Raises:
+        subprocess.TimeoutExpired: When the command timed out
+    """
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            limits.command(cmd),
+            cwd=cwd,
+            stdout=stdout,
+            stderr=stderr,
+            start_new_session=True,
+        )
+        try:
+            used = _wait(process, timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            process.wait()
+            raise
+        encoding = locale.getpreferredencoding(False)
+        outputs = []
+        for output in (stdout, stderr):
+            output.seek(0)
+            # decoded as text=True would, with universal newlines
+            text = io.TextIOWrapper(io.BytesIO(output.read()), encoding=encoding)
+            outputs.append(text.read())
+    return CompletedCommand(cmd, process.returncode, *outputs, cpu_time=used)
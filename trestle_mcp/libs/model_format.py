@@ -0,0 +1,143 @@
+"""Format of the JSON models written by tool calls.
+
+Trestle writes JSON models indented by two spaces. For a resolved NIST
+catalog that is a third more bytes than compact JSON, all of them written,
+then read again by every later call: search, the dependency graph, diff, the
+control index and trestle itself. Calls writing models can ask for another
+format, per call with their ``output_format`` input or for every call with
+the ``--output-format`` server option:
+
+- "pretty": as trestle writes it, indented (the default: files are left as is)
+- "compact": no whitespace at all
+- "auto": indented while the compact model is smaller than the threshold of
+  the server, compact above
+
+After a successful call, the JSON files among its outputs are rewritten in the
+format when they are not in it already. Both formats are exactly what trestle
+writes (orjson with or without indentation), so a model reads back the same.
+A file already compact costs a scan for a newline, an indented one is parsed
+once to be rewritten, or measured by "auto".
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Annotated, Awaitable, Callable, Literal, Optional
+
+import orjson
+from pydantic import BaseModel, Field
+
+from trestle_mcp.libs.results import ToolResult
+from trestle_mcp.libs.workspace import resolve_root
+
+FORMATS = ("pretty", "compact", "auto")
+# Compact size under which "auto" keeps a model indented
+DEFAULT_THRESHOLD = 1024 * 1024
+
+# Field of the inputs of tools writing models: ``output_format: OutputFormat = None``
+OutputFormat = Annotated[
+    Optional[Literal["pretty", "compact", "auto"]],
+    Field(
+        description="Format of the JSON model written: pretty (indented, as trestle "
+        "writes it), compact, or auto (compact from the size threshold of the "
+        "server). Default: the format of the server",
+    ),
+]
+
+_format = "pretty"
+_threshold = DEFAULT_THRESHOLD
+
+
+def configure(format: str = "pretty", threshold: int = DEFAULT_THRESHOLD) -> None:
+    """Set the format of the models written by calls that do not choose one.
+
+    Args:
+        format: "pretty", "compact" or "auto"
+        threshold: Compact size in bytes from which "auto" writes compact JSON
+
+    Raises:
+        ValueError: When the format is unknown
+    """
+    global _format, _threshold
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format}, use one of {', '.join(FORMATS)}")
+    _format = format
+    _threshold = threshold
+
+
+def format_model(path: Path, format: Optional[str] = None) -> bool:
+    """Rewrite a JSON model in a format, unless it is in that format already.
+
+    Args:
+        path: JSON model file
+        format: "pretty", "compact" or "auto" (default: the server format)
+
+    Returns:
+        bool: Whether the file was rewritten
+
+    Raises:
+        OSError: When the file cannot be read or written
+        ValueError: When the file is not JSON
+    """
+    format = format or _format
+    if format == "pretty" or path.suffix != ".json" or not path.is_file():
+        return False
+    data = path.read_bytes()
+    # orjson escapes newlines in strings: only indentation has them
+    indented = b"\n" in data
+    if not indented and (format == "compact" or len(data) >= _threshold):
+        return False
+    model = orjson.loads(data)
+    if indented:
+        data = orjson.dumps(model)
+        if format == "auto" and len(data) < _threshold:
+            return False
+    else:
+        data = orjson.dumps(model, option=orjson.OPT_INDENT_2)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def format_outputs(
+    trestle_root: Path, outputs: list[str], format: Optional[str]
+) -> int:
+    """Rewrite the JSON models among the outputs of a call, see format_model().
+
+    Returns:
+        int: Number of files rewritten
+    """
+    return sum(format_model(trestle_root / output, format) for output in outputs)
+
+
+async def run_formatted(
+    service: Callable[..., Awaitable[str]], params: BaseModel
+) -> str:
+    """Run a service writing models, then write its models in the chosen format.
+
+    Args:
+        service: Service running the call
+        params: Input of the call, with an ``output_format`` field
+
+    Returns:
+        str: Result of the service
+    """
+    result = await service(params)
+    format = params.output_format or _format
+    if (
+        format == "pretty"
+        or not isinstance(result, ToolResult)
+        or result.content.status != "success"
+    ):
+        return result
+    root = resolve_root(getattr(params, "trestle_root", None))
+    try:
+        await asyncio.to_thread(format_outputs, root, result.content.outputs, format)
+    except (OSError, ValueError) as e:
+        warning = f"Models not written as {format} JSON: {e}"
+        content = result.content.model_copy(
+            update={"warnings": [*result.content.warnings, warning]}
+        )
+        return ToolResult(f"{result}\nWarning: {warning}", content)
+    return result
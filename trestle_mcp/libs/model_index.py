@@ -0,0 +1,156 @@
+"""Byte range index of the controls of JSON catalogs.
+
+A catalog is scanned once per version: the scanner walks the structural tokens
+of the JSON text and records, for every object of a ``controls`` list, its
+id, title and byte range in the file. Reading a control is then a seek and a
+read of that range, without parsing the catalog. Each entry has an ETag, the
+hash of its bytes, so clients can keep what they fetched and only read again
+controls whose ETag changed. Indexes are kept in memory per workspace and in
+the workspace storage, so they survive restarts.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Optional, Union
+
+from trestle_mcp.libs.cache import file_key
+from trestle_mcp.libs.storage import CompressedStore
+from trestle_mcp.libs.workspace import STATE_DIR, Workspace, state_dir
+
+INDEX_DIR = STATE_DIR / "index"
+INDEX_VERSION = 1
+
+# Strings (with their escapes) and structural characters; numbers, booleans
+# and whitespace are skipped
+_TOKENS = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]:,]', re.DOTALL)
+_FIELDS = (b"id", b"title")
+
+
+def etag(content: Union[str, bytes]) -> str:
+    """Return the entity tag of some content."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+
+def _string(token: bytes) -> str:
+    text = token[1:-1]
+    if b"\\" not in text:
+        return text.decode("utf-8")
+    return json.loads(token)
+
+
+def scan_controls(data: bytes) -> dict[str, dict]:
+    """Return the controls of a JSON catalog with their byte range.
+
+    Args:
+        data: Content of the catalog file
+
+    Returns:
+        dict: Entries with 'title', 'offset', 'length', 'parent' (id of the
+        enclosing control, for enhancements) and 'etag', by control id, in
+        document order
+    """
+    controls: dict[str, dict] = {}
+    # open containers: [is object, start, key of the list holding it, fields]
+    stack: list[list] = []
+    # key of the value being read in the innermost object
+    keys: list[Optional[bytes]] = []
+    expect_key = False
+    for match in _TOKENS.finditer(data):
+        token = match.group()
+        char = token[:1]
+        if char == b'"':
+            if stack and stack[-1][0]:
+                if expect_key:
+                    keys[-1] = token[1:-1]
+                elif keys[-1] in _FIELDS:
+                    stack[-1][3][keys[-1]] = _string(token)
+        elif char in (b"{", b"["):
+            if stack:
+                list_key = keys[-1] if stack[-1][0] else stack[-1][2]
+            else:
+                list_key = None
+            stack.append([char == b"{", match.start(), list_key, {}])
+            keys.append(None)
+            expect_key = char == b"{"
+        elif char in (b"}", b"]"):
+            is_object, start, list_key, fields = stack.pop()
+            keys.pop()
+            if is_object and list_key == b"controls" and b"id" in fields:
+                # the enclosing control, if any, is the nearest control object
+                parent = next(
+                    (
+                        entry[3].get(b"id")
+                        for entry in reversed(stack)
+                        if entry[0] and entry[2] == b"controls"
+                    ),
+                    None,
+                )
+                controls[fields[b"id"]] = {
+                    "title": fields.get(b"title", ""),
+                    "offset": start,
+                    "length": match.end() - start,
+                    "parent": parent,
+                    "etag": etag(data[start : match.end()]),
+                }
+            expect_key = False
+        elif char == b",":
+            expect_key = bool(stack) and stack[-1][0]
+        else:  # ":"
+            expect_key = False
+    # document order: parents close after their enhancements
+    return dict(sorted(controls.items(), key=lambda item: item[1]["offset"]))
+
+
+def read_range(path: Path, offset: int, length: int) -> bytes:
+    """Read a byte range of a file."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def control_index(
+    workspace: Workspace, catalog: Path, rebuild: bool = False
+) -> dict[str, dict]:
+    """Return the control index of a JSON catalog, building it if needed.
+
+    Args:
+        workspace: Workspace holding the catalog
+        catalog: Path of the catalog file
+        rebuild: Scan the catalog again, ignoring the indexes kept
+
+    Returns:
+        dict: Index entries by control id, see scan_controls()
+
+    Raises:
+        ValueError: When the catalog is not a JSON file
+        FileNotFoundError: When the catalog does not exist
+    """
+    if catalog.suffix != ".json":
+        raise ValueError(f"{catalog.name}: only JSON catalogs are indexed")
+    key = file_key(catalog)
+    if key is None:
+        raise FileNotFoundError(f"File {catalog} not found")
+    indexes = workspace.cache("control-index", 64)
+    controls = None if rebuild else indexes.get(key)
+    if controls is not None:
+        return controls
+
+    store = CompressedStore(workspace.root / INDEX_DIR)
+    name = catalog.relative_to(workspace.root).as_posix()
+    stamp = [INDEX_VERSION, key[1], key[2]]
+    try:
+        stored = None if rebuild else store.read_json(name)
+        if stored and stored["stamp"] == stamp:
+            controls = stored["controls"]
+    except (KeyError, OSError, ValueError):
+        pass
+    if controls is None:
+        controls = scan_controls(catalog.read_bytes())
+        state_dir(workspace.root)
+        store.write_json(name, {"stamp": stamp, "controls": controls})
+    indexes.put(key, controls)
+    return controls
@@ -0,0 +1,51 @@
+"""Cursor based pagination of list-like tool results.
+
+A cursor is an opaque string returned with a page and passed back by the client
+to fetch the next one.
+"""
+
+from typing import Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    """Return the offset a cursor points to.
+
+    Raises:
+        ValueError: When the cursor is invalid
+    """
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
+
+
+def paginate(
+    items: Sequence[T], cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+) -> tuple[Sequence[T], int, Optional[str]]:
+    """Return one page of items.
+
+    Args:
+        items: Full result
+        cursor: Cursor returned with the previous page, None for the first page
+        limit: Maximum number of items in the page
+
+    Returns:
+        tuple: Items of the page, offset of the first one, and the cursor of the
+        next page (None on the last page)
+
+    Raises:
+        ValueError: When the cursor is invalid
+    """
+    offset = parse_cursor(cursor)
+    if offset > len(items):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    end = offset + max(1, limit)
+    return items[offset:end], offset, str(end) if end < len(items) else None
@@ -0,0 +1,124 @@
+"""Process pool for CPU-bound work done in-process with the trestle API.
+
+Workers are spawned once and kept warm across tool calls, so trestle is only
+imported once per worker and models they parse can be reused by later calls.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_max_workers: Optional[int] = None
+
+
+def max_workers() -> int:
+    """Return the size of the process pool.
+
+    Returns:
+        int: Configured number of worker processes, or the CPU count by default
+    """
+    return _max_workers or os.cpu_count() or 1
+
+
+def configure(workers: Optional[int] = None) -> None:
+    """Set the size of the process pool, replacing any running pool.
+
+    Args:
+        workers: Number of worker processes (default: CPU count)
+    """
+    global _max_workers
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+    shutdown()
+    _max_workers = workers
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, starting it on first use.
+
+    Workers are started with the "spawn" method: the server runs worker
+    threads, and forking a multi-threaded process is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    """Stop the shared process pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def fork_map(
+    func: Callable[..., T], calls: Iterable[Sequence[Any]], processes: int
+) -> list[T]:
+    """Run each call in a fresh child process forked from the current process.
+
+    Children see the memory of the current process as it was when they were
+    forked, copy-on-write: data loaded beforehand (e.g. parsed catalogs) is
+    shared without being parsed again, and whatever one call mutates is never
+    seen by another. Must be used from a single-threaded process, such as a
+    worker of ``process_pool()``. Where "fork" is not available the children
+    are spawned and start from scratch.
+
+    Args:
+        func: Function to run, called as ``func(*call)``
+        calls: Arguments of each call
+        processes: Maximum number of children running at once
+
+    Returns:
+        list[T]: Results, in the order of the calls
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    # one call per child, so every call starts from the same memory
+    with context.Pool(
+        processes=max(1, min(processes, len(calls))), maxtasksperchild=1
+    ) as pool:
+        return pool.starmap(func, calls, chunksize=1)
+
+
+def balance(shards: Sequence[Sequence[T]], bins: int) -> list[list[T]]:
+    """Pack shards into at most ``bins`` batches of similar size.
+
+    Shards are never split. Each batch keeps its shards in their original order,
+    and empty batches are dropped.
+
+    Args:
+        shards: Units of work, e.g. the control ids of each group
+        bins: Maximum number of batches
+
+    Returns:
+        list[list[T]]: Batches of items
+    """
+    bins = max(1, min(bins, len(shards)))
+    batches: list[list[int]] = [[] for _ in range(bins)]
+    sizes = [0] * bins
+    # largest shards first, each into the currently lightest batch
+    for index in sorted(range(len(shards)), key=lambda i: -len(shards[i])):
+        target = sizes.index(min(sizes))
+        batches[target].append(index)
+        sizes[target] += len(shards[index])
+    return [
+        [item for index in sorted(batch) for item in shards[index]]
+        for batch in batches
+        if batch
+    ]
@@ -0,0 +1,183 @@
+"""Structured tool results.
+
+Services return a ToolResult: the formatted message clients always received,
+carrying the same result as structured content (status, output paths, counts,
+timings, warnings and, for list-like results, one page of items with the
+cursor of the next page). Tool handlers send both: the message as text content
+and the structure as MCP structured content, described by the output schema of
+every tool.
+"""
+
+from pathlib import Path
+from typing import Annotated, Any, Literal, Optional, Sequence
+
+from mcp.types import CallToolResult, TextContent
+from pydantic import BaseModel, Field
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.pagination import paginate
+
+MARKS = ("✅ ", "❌ ")
+
+
+class ResultContent(BaseModel):
+    """Structured content of a tool result."""
+
+    status: Literal["success", "error"] = Field(
+        ..., description="Whether the tool succeeded"
+    )
+    message: str = Field(..., description="One line summary of the result")
+    outputs: list[str] = Field(
+        default_factory=list,
+        description="Files and directories written, relative to the trestle root",
+    )
+    counts: dict[str, int] = Field(
+        default_factory=dict, description="Counters of the result, by name"
+    )
+    elapsed: Optional[float] = Field(
+        default=None, description="Duration of the call in seconds"
+    )
+    warnings: list[str] = Field(default_factory=list, description="Warnings")
+    error: Optional[str] = Field(default=None, description="Error details")
+    limit: Optional[str] = Field(
+        default=None,
+        description="Resource limit the trestle command exceeded: memory, cpu, "
+        "open_files, output or timeout",
+    )
+    items: list[dict[str, Any]] = Field(
+        default_factory=list,
+        description="Page of the list-like part of the result (files, findings)",
+    )
+    total: Optional[int] = Field(
+        default=None, description="Number of items over all pages"
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to pass back to fetch the next page of items",
+    )
+
+
+# Return annotation of tool handlers: a result with the output schema above
+ToolOutput = Annotated[CallToolResult, ResultContent]
+
+
+class ToolResult(str):
+    """Formatted message of a tool, carrying its structured content.
+
+    Args:
+        text: Message shown to the client
+        content: Structured content of the result
+    """
+
+    content: ResultContent
+
+    def __new__(cls, text: str, content: ResultContent):
+        result = super().__new__(cls, text)
+        result.content = content
+        return result
+
+
+def _message(text: str) -> str:
+    line = text.split("\n", 1)[0]
+    for mark in MARKS:
+        if line.startswith(mark):
+            return line[len(mark) :]
+    return line
+
+
+def success(text: str, **fields: Any) -> ToolResult:
+    """Return a successful result.
+
+    Args:
+        text: Formatted message
+        **fields: Structured fields, see ResultContent
+    """
+    return ToolResult(
+        text, ResultContent(status="success", message=_message(text), **fields)
+    )
+
+
+def failure(text: str, error: Optional[str] = None, **fields: Any) -> ToolResult:
+    """Return a failed result.
+
+    Args:
+        text: Formatted message
+        error: Error details
+        **fields: Structured fields, see ResultContent
+    """
+    return ToolResult(
+        text,
+        ResultContent(status="error", message=_message(text), error=error, **fields),
+    )
+
+
+def page_fields(
+    items: Sequence[dict], cursor: Optional[str], limit: int
+) -> dict[str, Any]:
+    """Return the structured fields of one page of items.
+
+    Raises:
+        ValueError: When the cursor is invalid
+    """
+    page, _, next_cursor = paginate(items, cursor, limit)
+    return {"items": list(page), "total": len(items), "next_cursor": next_cursor}
+
+
+def output_files(trestle_root: Path, output: str) -> list[dict]:
+    """Return the files under an output directory, relative to the trestle root."""
+    paths = sorted(Path(key[0]) for key in fsio.scan(trestle_root / output))
+    return [{"path": path.relative_to(trestle_root).as_posix()} for path in paths]
+
+
+def files_page(
+    trestle_root: Path, output: str, cursor: Optional[str], limit: int
+) -> ToolResult:
+    """Return a page of the files of an output directory, without generating them.
+
+    Args:
+        trestle_root: Trestle root the output directory is relative to
+        output: Output directory
+        cursor: Cursor returned with the previous page
+        limit: Maximum number of files in the page
+    """
+    files = output_files(trestle_root, output)
+    try:
+        fields = page_fields(files, cursor, limit)
+    except ValueError as e:
+        return failure(
+            f"❌ Failed to list generated files\n\nOutput: {output}\nError: {e}", str(e)
+        )
+    offset = int(cursor or 0)
+    paths = "\n".join(item["path"] for item in fields["items"])
+    more = f"\n\nNext cursor: {fields['next_cursor']}" if fields["next_cursor"] else ""
+    return success(
+        f"✅ Generated files listed\n\nOutput: {output}\n"
+        f"Showing {offset + 1}-{offset + len(fields['items'])} of {len(files)}\n\n"
+        f"{paths}{more}",
+        outputs=[output],
+        counts={"files": len(files)},
+        **fields,
+    )
+
+
+def to_call_result(result: str, elapsed: Optional[float] = None) -> CallToolResult:
+    """Convert a service result to the result of a tool call.
+
+    Args:
+        result: Service result, a ToolResult or a plain formatted message
+        elapsed: Duration of the call, used when the result has none
+
+    Returns:
+        CallToolResult: The message as text content with the structured content
+    """
+    if isinstance(result, ToolResult):
+        content = result.content
+    else:
+        status = "error" if result.startswith(MARKS[1]) else "success"
+        content = ResultContent(status=status, message=_message(result))
+    if content.elapsed is None and elapsed is not None:
+        content = content.model_copy(update={"elapsed": round(elapsed, 3)})
+    return CallToolResult(
+        content=[TextContent(type="text", text=str(result))],
+        structuredContent=content.model_dump(mode="json"),
+    )
@@ -0,0 +1,289 @@
+"""Full-text search over the controls of the workspace catalogs.
+
+Each catalog gets a segment of an inverted index: the terms of the title,
+statement, guidance and parameter labels of every control, with their weighted
+frequency per control. Segments are rebuilt only for catalogs whose file
+changed, so the index follows the workspace incrementally. Queries are ranked
+with BM25 over all selected segments; a query only touches the postings of
+its own terms.
+"""
+
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from trestle_mcp.libs.cache import FileKey, file_key
+from trestle_mcp.libs.changes import workspace_changes
+from trestle_mcp.libs.workspace import Workspace
+from trestle_mcp.libs.yaml_cache import load_yaml
+
+# Weight of a term occurrence, by field
+FIELD_WEIGHTS = {"title": 3.0, "statement": 1.5, "guidance": 1.0, "params": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this "
+    "to was were will with".split()
+)
+
+_TERM = re.compile(r"[a-z0-9]+")
+# Parameter insertions such as {{ insert: param, ac-1_prm_1 }}
+_MOUSTACHE = re.compile(r"{{.*?}}")
+SNIPPET_LENGTH = 160
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the terms of a text: lower case words without stopwords."""
+    text = _MOUSTACHE.sub(" ", text.lower())
+    return [term for term in _TERM.findall(text) if term not in STOPWORDS]
+
+
+def _prose(parts: Iterable[dict]) -> Iterator[str]:
+    """Yield the prose of parts and of their subparts."""
+    for part in parts:
+        if part.get("prose"):
+            yield part["prose"]
+        yield from _prose(part.get("parts", []))
+
+
+def _fields(control: dict) -> dict[str, str]:
+    """Return the searchable text of a control, by field."""
+    fields = {"title": control.get("title", ""), "statement": "", "guidance": ""}
+    for part in control.get("parts", []):
+        name = part.get("name")
+        if name in ("statement", "guidance"):
+            fields[name] += " ".join(_prose([part])) + " "
+    labels = [p.get("label", "") for p in control.get("params", [])]
+    labels += [
+        guideline.get("prose", "")
+        for p in control.get("params", [])
+        for guideline in p.get("guidelines", [])
+    ]
+    fields["params"] = " ".join(labels)
+    return fields
+
+
+def _controls(node: dict, parent: Optional[str] = None) -> Iterator[tuple]:
+    """Yield (control, parent id) for the controls of a catalog or group."""
+    for group in node.get("groups", []):
+        yield from _controls(group, parent)
+    for control in node.get("controls", []):
+        yield control, parent
+        yield from _controls(control, control.get("id"))
+
+
+class Segment:
+    """Inverted index of the controls of one catalog.
+
+    Args:
+        name: Catalog name
+        catalog: Content of the catalog, below its root key
+    """
+
+    def __init__(self, name: str, catalog: dict):
+        self.name = name
+        self.docs: list[dict] = []
+        self.lengths: list[float] = []
+        self.postings: dict[str, dict[int, float]] = defaultdict(dict)
+        for control, parent in _controls(catalog):
+            fields = _fields(control)
+            weights: Counter = Counter()
+            for field, text in fields.items():
+                for term in tokenize(text):
+                    weights[term] += FIELD_WEIGHTS[field]
+            doc = len(self.docs)
+            prose = _MOUSTACHE.sub("…", fields["statement"] + fields["guidance"])
+            self.docs.append(
+                {
+                    "id": control.get("id", ""),
+                    "title": fields["title"],
+                    "parent": parent,
+                    "text": " ".join(prose.split()),
+                }
+            )
+            self.lengths.append(sum(weights.values()))
+            for term, weight in weights.items():
+                self.postings[term][doc] = weight
+        self.postings = dict(self.postings)
+
+
+def _load(path: Path) -> dict:
+    if path.suffix != ".json":
+        # read only: the parsed YAML is shared with the cache
+        return load_yaml(path, "fast", shared=True) or {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    """Return the part of a text around the first query term it contains."""
+    lowered = text.lower()
+    positions = [m.start() for m in _TERM.finditer(lowered) if m.group() in terms]
+    start = max(0, positions[0] - SNIPPET_LENGTH // 4) if positions else 0
+    snippet = text[start : start + SNIPPET_LENGTH]
+    prefix = "…" if start else ""
+    suffix = "…" if start + SNIPPET_LENGTH < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+class SearchIndex:
+    """Inverted index of the controls of all catalogs of a workspace.
+
+    Args:
+        trestle_root: Trestle workspace root
+    """
+
+    def __init__(self, trestle_root: Path):
+        self.trestle_root = trestle_root
+        self._segments: dict[str, tuple[FileKey, Segment]] = {}
+        self._lock = threading.Lock()
+
+    def _catalog_files(self, names: Optional[Iterable[str]] = None) -> dict[str, Path]:
+        files = {}
+        base = self.trestle_root / "catalogs"
+        if base.is_dir():
+            models = base.iterdir() if names is None else (base / n for n in names)
+            for model in sorted(models):
+                for extension in (".json", ".yaml", ".yml"):
+                    path = model / f"catalog{extension}"
+                    if path.is_file():
+                        files[model.name] = path
+                        break
+        return files
+
+    def refresh(self, changed: Optional[Iterable[Path]] = None) -> list[str]:
+        """Index catalogs added or changed since the last refresh.
+
+        Args:
+            changed: Files changed since the last refresh (default: check
+                every catalog of the workspace)
+
+        Returns:
+            list[str]: Names of the catalogs indexed again
+        """
+        with self._lock:
+            names = None
+            if changed is not None:
+                base = (self.trestle_root / "catalogs").resolve()
+                names = {
+                    p.relative_to(base).parts[0]
+                    for p in changed
+                    if p.is_relative_to(base) and len(p.relative_to(base).parts) == 2
+                }
+                if not names:
+                    return []
+            files = self._catalog_files(names)
+            for name in set(self._segments if names is None else names) - set(files):
+                self._segments.pop(name, None)
+            changed_names = []
+            for name, path in files.items():
+                key = file_key(path)
+                current = self._segments.get(name)
+                if current and current[0] == key:
+                    continue
+                data = _load(path).get("catalog", {})
+                self._segments[name] = (key, Segment(name, data))
+                changed_names.append(name)
+            return changed_names
+
+    @property
+    def catalogs(self) -> list[str]:
+        """Names of the indexed catalogs."""
+        return sorted(self._segments)
+
+    def size(self, catalogs: Optional[Iterable[str]] = None) -> int:
+        """Return the number of indexed controls."""
+        return sum(len(s.docs) for s in self._select(catalogs))
+
+    def _select(self, catalogs: Optional[Iterable[str]]) -> list[Segment]:
+        if catalogs is None:
+            return [segment for _, segment in self._segments.values()]
+        missing = sorted(set(catalogs) - set(self._segments))
+        if missing:
+            raise ValueError(f"Catalogs not found: {', '.join(missing)}")
+        return [self._segments[name][1] for name in sorted(set(catalogs))]
+
+    def search(
+        self,
+        query: str,
+        catalogs: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: int = 10,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Return the controls matching a query, best first.
+
+        Args:
+            query: Words to search
+            catalogs: Names of the catalogs to search (default: all)
+            offset: Rank of the first match returned
+            limit: Maximum number of matches returned
+
+        Returns:
+            tuple: Number of matches, and the matches from offset with 'catalog',
+            'id', 'title', 'parent', 'score' and 'snippet'
+
+        Raises:
+            ValueError: When a selected catalog does not exist
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        segments = self._select(catalogs)
+        count = sum(len(s.docs) for s in segments)
+        if not terms or not count:
+            return 0, []
+        average = sum(sum(s.lengths) for s in segments) / count
+        scores: dict[tuple[str, int], float] = defaultdict(float)
+        for term in terms:
+            frequency = sum(len(s.postings.get(term, ())) for s in segments)
+            if not frequency:
+                continue
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for segment in segments:
+                for doc, weight in segment.postings.get(term, {}).items():
+                    norm = K1 * (1 - B + B * segment.lengths[doc] / average)
+                    scores[(segment.name, doc)] += (
+                        idf * weight * (K1 + 1) / (weight + norm)
+                    )
+        # only the requested page is ranked fully and given snippets
+        top = heapq.nsmallest(
+            offset + limit, scores.items(), key=lambda item: (-item[1], item[0])
+        )
+        by_name = {s.name: s for s in segments}
+        results = []
+        for (name, doc), score in top[offset:]:
+            entry = by_name[name].docs[doc]
+            results.append(
+                {
+                    "catalog": name,
+                    "id": entry["id"],
+                    "title": entry["title"],
+                    "parent": entry["parent"],
+                    "score": round(score, 4),
+                    "snippet": _snippet(entry["text"], set(terms)),
+                }
+            )
+        return len(scores), results
+
+
+def workspace_index(workspace: Workspace) -> SearchIndex:
+    """Return the search index of a workspace, refreshed.
+
+    In a git work tree only the catalogs git reports as changed since the last
+    refresh are checked again.
+    """
+    index = workspace.component("search", lambda ws: SearchIndex(ws.root))
+    changes = workspace_changes(workspace)
+    try:
+        index.refresh(changes.changes("search"))
+    except Exception:
+        # the catalog that failed must be read again next time
+        changes.forget("search")
+        raise
+    return index
@@ -0,0 +1,219 @@
+"""Coalescing of identical tool calls in flight.
+
+Agents, and retries of one agent, often send the same call while the first is
+still running. Such calls share a key: the tool, its normalised input and the
+version of the workspace files the input names. While a call runs, calls with
+the same key wait for it and share its result instead of starting trestle
+again on the same output files.
+"""
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from pydantic import BaseModel
+from trestle.common import const
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.cache import FileKey, file_key
+
+# Fields naming what a call writes: the call itself changes those files, so
+# they must not make its duplicates look different
+OUTPUT_FIELDS = ("output", "output_profile", "output_catalog", "output_dir")
+
+
+def _strings(field: str, value: Any) -> Iterator[tuple[str, str]]:
+    if isinstance(value, str):
+        yield field, value
+    elif isinstance(value, dict):
+        for name, item in value.items():
+            yield from _strings(str(name), item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(field, item)
+
+
+def field_strings(params: BaseModel) -> Iterator[tuple[str, str]]:
+    """Yield the strings of an input with the name of the field holding them.
+
+    Nested models, dicts and lists are walked: the strings of the profiles of
+    a batch come with the field of each profile, such as "name" or "output".
+
+    Args:
+        params: Input of a call
+
+    Returns:
+        Iterator[tuple[str, str]]: (innermost field name, string) pairs
+    """
+    return _strings("", params.model_dump())
+
+
+def workspace_paths(trestle_root: Path, value: str) -> list[Path]:
+    """Return the existing workspace files or directories a string names.
+
+    A string names a path in the workspace, relative to the trestle root or
+    absolute, such as a markdown directory, or a model, such as the catalog
+    written by profile-resolve. The trestle root itself and paths outside of
+    it are left out.
+
+    Args:
+        trestle_root: Resolved trestle root
+        value: String of an input
+
+    Returns:
+        list[Path]: Absolute paths
+    """
+    if not value or "\x00" in value:
+        return []
+    paths = []
+    candidates = [trestle_root / value]
+    if not Path(value).is_absolute():
+        candidates += [trestle_root / d / value for d in const.MODEL_DIR_LIST]
+    for path in candidates:
+        path = path.resolve()
+        if path != trestle_root and path.is_relative_to(trestle_root) and path.exists():
+            paths.append(path)
+    return paths
+
+
+def _tree_keys(path: Path) -> list[FileKey]:
+    """Return the keys of a file, or of every file under a directory."""
+    if path.is_file():
+        return [file_key(path)]
+    return fsio.scan(path)
+
+
+def input_paths(trestle_root: Path, params: BaseModel) -> list[Path]:
+    """Return the workspace files and directories named by the input of a call.
+
+    A string of the input names a file when it is a path relative to the
+    trestle root, such as a markdown directory or a CSV file, or when it is the
+    name of a model, such as the profile of profile-resolve. Strings of nested
+    inputs, such as the profiles of a batch, count too. Outputs and the whole
+    workspace are left out.
+
+    Args:
+        trestle_root: Trestle root the paths are relative to
+        params: Input of the call
+
+    Returns:
+        list[Path]: Absolute paths that exist, sorted
+    """
+    root = trestle_root.resolve()
+    paths: set[Path] = set()
+    exclude = {"trestle_root", "idempotency_key", *OUTPUT_FIELDS}
+    for field, value in field_strings(params):
+        if field not in exclude:
+            paths.update(workspace_paths(root, value))
+    return sorted(paths)
+
+
+def external_files(trestle_root: Path, params: BaseModel) -> list[Path]:
+    """Return the files outside the workspace named by the input of a call.
+
+    Such files, for example a YAML header kept elsewhere, are read by the call
+    but never seen by the change detection of the workspace.
+
+    Args:
+        trestle_root: Trestle root relative paths are resolved against
+        params: Input of the call
+
+    Returns:
+        list[Path]: Absolute paths of existing files, sorted
+    """
+    root = trestle_root.resolve()
+    paths: set[Path] = set()
+    exclude = {"trestle_root", "idempotency_key", *OUTPUT_FIELDS}
+    for field, value in field_strings(params):
+        if field in exclude or not value or "\x00" in value:
+            continue
+        path = (root / value).resolve()
+        if not path.is_relative_to(root) and path.is_file():
+            paths.add(path)
+    return sorted(paths)
+
+
+def input_files(trestle_root: Path, params: BaseModel) -> list[FileKey]:
+    """Return the keys of the workspace files named by the input of a call.
+
+    Args:
+        trestle_root: Trestle root the paths are relative to
+        params: Input of the call
+
+    Returns:
+        list[FileKey]: Keys of the files under input_paths(), sorted
+    """
+    keys: set[FileKey] = set()
+    for path in input_paths(trestle_root, params):
+        keys.update(_tree_keys(path))
+    return sorted(keys)
+
+
+def request_key(tool: str, params: BaseModel, trestle_root: Path) -> str:
+    """Return the key identifying a tool call.
+
+    Args:
+        tool: Tool name
+        params: Input of the call
+        trestle_root: Trestle root of the call
+
+    Returns:
+        str: Digest of the tool, its input and the version of its input files
+    """
+    content = [
+        tool,
+        str(trestle_root),
+        params.model_dump(mode="json", exclude={"trestle_root"}),
+        input_files(trestle_root, params),
+    ]
+    data = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """Run one execution per key at a time, shared by all its callers."""
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        """Return the number of executions running."""
+        return len(self._flights)
+
+    async def run(self, key: Optional[str], func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func, or wait for the execution of the same key in flight.
+
+        The execution runs as its own task in the context of the first caller:
+        a caller cancelled while waiting does not cancel it for the others.
+
+        Args:
+            key: Key of the call, None to never share it
+            func: Coroutine function running the call
+
+        Returns:
+            The result of the execution, raised again if it failed
+        """
+        if key is None:
+            return await func()
+        task = self._flights.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # retrieved here so a failure nobody waits for is not logged
+            task.exception()
+
+
+# Calls in flight of the server
+flights = SingleFlight()
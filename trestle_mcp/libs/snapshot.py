@@ -0,0 +1,354 @@
+"""Copy-on-write snapshots of trestle workspaces.
+
+A snapshot is a tree under ``.trestle/mcp/snapshots/<id>/files`` holding every
+file of the workspace, cloned rather than copied: reflinks where the file
+system supports them (btrfs, XFS), hard links otherwise, plain copies as a
+last resort. Creating a snapshot therefore costs one system call per file and
+no data.
+
+Reflinks are copy-on-write by themselves. Hard links share the file with the
+workspace, and trestle rewrites files in place, so before a tool writes, the
+files under its outputs that are still shared with a snapshot are replaced by
+private copies (``protect``). Only those files are ever copied. Restoring
+links the snapshot files back and removes the files created since.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, Optional, Sequence
+
+from pydantic import BaseModel
+
+from trestle_mcp.libs.singleflight import (
+    OUTPUT_FIELDS,
+    field_strings,
+    workspace_paths,
+)
+from trestle_mcp.libs.storage import CompressedStore
+from trestle_mcp.libs.workspace import STATE_DIR, Workspace, state_dir
+
+SNAPSHOT_DIR = STATE_DIR / "snapshots"
+# Never part of a snapshot: server state, and history git already keeps
+EXCLUDED = (STATE_DIR, Path(".git"))
+MODES = ("auto", "reflink", "hardlink", "copy")
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+# Cloning methods tried in order, by mode
+METHODS = {
+    "auto": ("reflink", "hardlink", "copy"),
+    "reflink": ("reflink",),
+    "hardlink": ("hardlink",),
+    "copy": ("copy",),
+}
+# ioctl cloning a file on Linux (btrfs, XFS with reflink, bcachefs)
+FICLONE = 0x40049409
+
+
+def _reflink(source: Path, target: Path) -> None:
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            target.unlink(missing_ok=True)
+            raise
+    shutil.copystat(source, target)
+
+
+def clone(source: Path, target: Path, methods: Sequence[str]) -> str:
+    """Clone a file with the first method that works.
+
+    Args:
+        source: File to clone
+        target: New file, its directory must exist
+        methods: Methods to try in order: "reflink", "hardlink", "copy"
+
+    Returns:
+        str: Method used
+
+    Raises:
+        OSError: When the last method fails too
+    """
+    for i, method in enumerate(methods):
+        try:
+            if method == "reflink":
+                _reflink(source, target)
+            elif method == "hardlink":
+                os.link(source, target)
+            else:
+                shutil.copy2(source, target)
+            return method
+        except (OSError, ImportError):
+            if i == len(methods) - 1:
+                raise
+    raise ValueError("No cloning method given")
+
+
+def _excluded(relative: Path) -> bool:
+    return any(relative == e or e in relative.parents for e in EXCLUDED)
+
+
+def workspace_files(trestle_root: Path) -> Iterator[Path]:
+    """Yield the files of a workspace part of snapshots, relative to the root.
+
+    Symbolic links are left out: snapshots neither keep nor remove them.
+    """
+    for parent, dirs, files in os.walk(trestle_root):
+        relative = Path(parent).relative_to(trestle_root)
+        dirs[:] = sorted(d for d in dirs if not _excluded(relative / d))
+        for name in sorted(files):
+            if not os.path.islink(os.path.join(parent, name)):
+                yield relative / name
+
+
+def _unshare(path: Path) -> None:
+    """Give a hard linked file its own copy, keeping its metadata."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.cow")
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """Snapshots of one workspace.
+
+    Args:
+        trestle_root: Trestle workspace root
+    """
+
+    def __init__(self, trestle_root: Path):
+        self.trestle_root = trestle_root
+        self.directory = trestle_root / SNAPSHOT_DIR
+        self.manifests = CompressedStore(self.directory)
+
+    def _files(self, snapshot_id: str) -> Path:
+        return self.directory / snapshot_id / "files"
+
+    def ids(self) -> list[str]:
+        """Return the ids of the snapshots, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        # only the top level: the file trees of the snapshots are never walked
+        found = [
+            entry.name
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and f"{entry.name}/manifest" in self.manifests
+        ]
+        return sorted(found, key=lambda i: self.manifest(i)["created"])
+
+    def manifest(self, snapshot_id: str) -> dict:
+        """Return the manifest of a snapshot.
+
+        Raises:
+            KeyError: When the snapshot does not exist
+        """
+        return self.manifests.read_json(f"{snapshot_id}/manifest")
+
+    def create(self, snapshot_id: Optional[str] = None, mode: str = "auto") -> dict:
+        """Snapshot every file of the workspace.
+
+        Args:
+            snapshot_id: Name of the snapshot (default: creation time)
+            mode: "auto" (reflink, then hard link, then copy), "reflink",
+                "hardlink" or "copy"
+
+        Returns:
+            dict: Manifest with 'id', 'created', 'methods' (files per
+            cloning method) and 'files' ({path: [size, mtime_ns]})
+
+        Raises:
+            ValueError: When the name is invalid or already used
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode}, use one of {', '.join(MODES)}")
+        snapshot_id = snapshot_id or time.strftime("%Y%m%d-%H%M%S") + (
+            f"-{time.time_ns() // 1_000_000 % 1000:03d}"
+        )
+        if not _NAME.match(snapshot_id):
+            raise ValueError(f"Invalid snapshot name {snapshot_id}")
+        if f"{snapshot_id}/manifest" in self.manifests:
+            raise ValueError(f"Snapshot {snapshot_id} already exists")
+        state_dir(self.trestle_root)
+        target = self._files(snapshot_id)
+        if target.exists():
+            shutil.rmtree(target)
+        chain = METHODS[mode]
+        methods: dict[str, int] = {}
+        files: dict[str, list[int]] = {}
+        for relative in workspace_files(self.trestle_root):
+            source = self.trestle_root / relative
+            destination = target / relative
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            method = clone(source, destination, chain)
+            # methods that failed once fail for every file: stop trying them
+            chain = chain[chain.index(method) :]
+            methods[method] = methods.get(method, 0) + 1
+            stat = destination.stat()
+            files[relative.as_posix()] = [stat.st_size, stat.st_mtime_ns]
+        manifest = {
+            "id": snapshot_id,
+            "created": time.time(),
+            "methods": methods,
+            "files": files,
+        }
+        self.manifests.write_json(f"{snapshot_id}/manifest", manifest)
+        return manifest
+
+    def restore(self, snapshot_id: str) -> dict:
+        """Bring the workspace back to a snapshot.
+
+        Files changed since the snapshot are linked back to their snapshot
+        version, files created since are removed. The snapshot is kept.
+
+        Returns:
+            dict: 'restored', 'removed' and 'unchanged' paths, and 'damaged':
+            snapshot files changed in place since the snapshot (through a hard
+            link, by a writer that bypassed protect()), restored as they are now
+
+        Raises:
+            KeyError: When the snapshot does not exist
+        """
+        manifest = self.manifest(snapshot_id)
+        source_root = self._files(snapshot_id)
+        report: dict[str, list[str]] = {
+            "restored": [],
+            "removed": [],
+            "unchanged": [],
+            "damaged": [],
+        }
+        for path, (size, mtime_ns) in manifest["files"].items():
+            source = source_root / path
+            target = self.trestle_root / path
+            stat = source.stat()
+            damaged = [stat.st_size, stat.st_mtime_ns] != [size, mtime_ns]
+            if damaged:
+                report["damaged"].append(path)
+            try:
+                current = target.stat()
+                # same file, or a copy with the size and mtime of the snapshot
+                if os.path.samestat(stat, current) or (
+                    not damaged
+                    and [current.st_size, current.st_mtime_ns] == [size, mtime_ns]
+                ):
+                    report["unchanged"].append(path)
+                    continue
+            except OSError:
+                pass
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.restore")
+            tmp.unlink(missing_ok=True)
+            clone(source, tmp, METHODS["auto"])
+            os.replace(tmp, target)
+            report["restored"].append(path)
+        kept = set(manifest["files"])
+        for relative in list(workspace_files(self.trestle_root)):
+            if relative.as_posix() not in kept:
+                (self.trestle_root / relative).unlink()
+                report["removed"].append(relative.as_posix())
+        self._prune_dirs(kept)
+        return report
+
+    def _prune_dirs(self, kept: Iterable[str]) -> None:
+        """Remove directories left empty by a restore that the snapshot lacks."""
+        needed = {Path(p).parent for p in kept}
+        needed = {a for p in needed for a in (p, *p.parents)}
+        for parent, dirs, _ in os.walk(self.trestle_root, topdown=False):
+            relative = Path(parent).relative_to(self.trestle_root)
+            if relative == Path(".") or _excluded(relative) or relative in needed:
+                continue
+            if any(_excluded(relative / d) for d in dirs):
+                continue
+            try:
+                os.rmdir(parent)
+            except OSError:
+                pass
+
+    def delete(self, snapshot_id: str) -> None:
+        """Remove a snapshot.
+
+        Raises:
+            KeyError: When the snapshot does not exist
+        """
+        self.manifest(snapshot_id)
+        shutil.rmtree(self.directory / snapshot_id)
+
+    def protect(self, paths: Iterable[Path]) -> int:
+        """Unshare the hard linked files under paths before they are written.
+
+        Args:
+            paths: Files or directories about to be written
+
+        Returns:
+            int: Number of files copied
+        """
+        if not self.directory.is_dir():
+            return 0
+        copied = 0
+        for path in paths:
+            files = [path] if path.is_file() else []
+            if path.is_dir():
+                files = [
+                    Path(parent) / name
+                    for parent, _, names in os.walk(path)
+                    for name in names
+                ]
+            for file in files:
+                stat = file.lstat()
+                if stat.st_nlink > 1 and not file.is_symlink():
+                    _unshare(file)
+                    copied += 1
+        return copied
+
+
+def output_paths(trestle_root: Path, params: BaseModel) -> list[Path]:
+    """Return the files and directories a tool call writes, from its output fields.
+
+    Outputs are paths relative to the trestle root, such as a markdown
+    directory, or model names, such as the catalog written by profile-resolve.
+    Output fields of nested inputs, such as the profiles of a batch, count too.
+    """
+    root = trestle_root.resolve()
+    return [
+        path
+        for field, value in field_strings(params)
+        if field in OUTPUT_FIELDS
+        for path in workspace_paths(root, value)
+    ]
+
+
+def protect_outputs(trestle_root: Path, params: BaseModel) -> int:
+    """Unshare the files a tool call is about to write from the snapshots.
+
+    Returns:
+        int: Number of files copied
+    """
+    return SnapshotStore(trestle_root).protect(output_paths(trestle_root, params))
+
+
+async def run_locked(
+    workspace: Workspace, service: Callable[..., Awaitable[str]], params: BaseModel
+) -> str:
+    """Run a service holding the workspace locks of the outputs it writes.
+
+    Calls writing the same output in one workspace, such as two generations
+    with different options into one markdown directory, run one after the
+    other instead of interleaving their writes.
+
+    Args:
+        workspace: Workspace of the call
+        service: Service running the call
+        params: Input of the call
+
+    Returns:
+        str: Result of the service
+    """
+    outputs = await asyncio.to_thread(output_paths, workspace.root, params)
+    async with workspace.locked(str(path) for path in outputs):
+        return await service(params)
@@ -0,0 +1,189 @@
+"""Optionally compressed on-disk storage for the server caches and snapshots.
+
+Entries are stored as plain files, gzip files (standard library) or zstd files
+(when the optional ``zstandard`` package is installed). Reads are streaming:
+``open()`` returns a file object that decompresses as it is read, and
+``copy_to()`` restores an entry chunk by chunk, so an entry is only inflated in
+memory when a caller reads it all. Each entry is read with the codec it was
+written with, so changing the codec never invalidates existing entries.
+"""
+
+import gzip
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+CODEC_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+CHUNK_SIZE = 1024 * 1024
+
+# gzip level 6 and zstd level 3: good ratio on JSON at a fraction of the max level cost
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_codec = "none"
+
+
+def available_codecs() -> list[str]:
+    """Return the codecs usable in this environment."""
+    codecs = ["none", "gzip"]
+    if zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def configure(codec: str = "none") -> None:
+    """Set the codec used by stores created without an explicit one.
+
+    Args:
+        codec: "none", "gzip" or "zstd"
+    """
+    global _codec
+    if codec not in available_codecs():
+        raise ValueError(
+            f"Unsupported codec {codec}, available: {', '.join(available_codecs())}"
+        )
+    _codec = codec
+
+
+def default_codec() -> str:
+    """Return the codec configured for the server."""
+    return _codec
+
+
+def _open_write(path: Path, codec: str) -> BinaryIO:
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+    if codec == "zstd":
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return compressor.stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+def _open_read(path: Path, codec: str) -> BinaryIO:
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd compressed: install zstandard")
+        decompressor = zstandard.ZstdDecompressor()
+        return decompressor.stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+class CompressedStore:
+    """Directory of entries stored with a codec.
+
+    Args:
+        directory: Directory holding the entries
+        codec: Codec of new entries (default: the configured codec)
+    """
+
+    def __init__(self, directory: Path, codec: Optional[str] = None):
+        self.directory = directory
+        self.codec = codec or default_codec()
+        if self.codec not in available_codecs():
+            raise ValueError(f"Unsupported codec {self.codec}")
+
+    def _path(self, key: str, codec: str) -> Path:
+        if not key or Path(key).is_absolute() or ".." in Path(key).parts:
+            raise ValueError(f"Invalid key {key}")
+        return self.directory / f"{key}{CODEC_SUFFIXES[codec]}"
+
+    def _find(self, key: str) -> tuple[Path, str]:
+        # the configured codec first, then whatever older entries used
+        for codec in [self.codec, *CODEC_SUFFIXES]:
+            path = self._path(key, codec)
+            if path.is_file():
+                return path, codec
+        raise KeyError(key)
+
+    def write(self, key: str, source: Union[bytes, BinaryIO]) -> int:
+        """Store an entry, replacing any previous version atomically.
+
+        Args:
+            key: Entry name, may contain "/"
+            source: Content, as bytes or a binary file object read by chunks
+
+        Returns:
+            int: Size of the stored file in bytes
+        """
+        path = self._path(key, self.codec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with _open_write(tmp, self.codec) as f:
+            if isinstance(source, bytes):
+                f.write(source)
+            else:
+                shutil.copyfileobj(source, f, CHUNK_SIZE)
+        os.replace(tmp, path)
+        # drop versions written with another codec
+        for codec in CODEC_SUFFIXES:
+            if codec != self.codec:
+                self._path(key, codec).unlink(missing_ok=True)
+        return path.stat().st_size
+
+    def write_json(self, key: str, data: Any) -> int:
+        """Store data as compact JSON."""
+        return self.write(key, json.dumps(data, separators=(",", ":")).encode())
+
+    def open(self, key: str) -> BinaryIO:
+        """Open an entry for streaming reads.
+
+        Raises:
+            KeyError: When the entry does not exist
+        """
+        path, codec = self._find(key)
+        return _open_read(path, codec)
+
+    def read(self, key: str) -> bytes:
+        """Return the whole content of an entry."""
+        with self.open(key) as f:
+            return f.read()
+
+    def read_json(self, key: str) -> Any:
+        """Return the JSON content of an entry."""
+        with self.open(key) as f:
+            return json.load(f)
+
+    def copy_to(self, key: str, destination: Path) -> None:
+        """Write the content of an entry to a file, chunk by chunk."""
+        with self.open(key) as src, open(destination, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def stored_size(self, key: str) -> int:
+        """Return the size of an entry on disk."""
+        return self._find(key)[0].stat().st_size
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self._find(key)
+        except KeyError:
+            return False
+        return True
+
+    def delete(self, key: str) -> None:
+        """Remove an entry, whatever its codec."""
+        for codec in CODEC_SUFFIXES:
+            self._path(key, codec).unlink(missing_ok=True)
+
+    def keys(self) -> Iterator[str]:
+        """Yield the names of the stored entries."""
+        if not self.directory.is_dir():
+            return
+        suffixes = sorted(filter(None, CODEC_SUFFIXES.values()), key=len, reverse=True)
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            key = path.relative_to(self.directory).as_posix()
+            for suffix in suffixes:
+                if key.endswith(suffix):
+                    key = key[: -len(suffix)]
+                    break
+            yield key
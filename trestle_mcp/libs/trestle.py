@@ -1,12 +1,50 @@
 """Trestle CLI wrapper utilities.
 
 This module provides common functions for interacting with the trestle CLI.
+Commands run as new processes, or with the "forkserver" runner as children
+forked from a process that has trestle imported already (``libs/forkserver.py``).
+Either way they can run under resource limits (``libs/limits.py``).
 """
 
 import os
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
+
+from trestle_mcp.libs import limits as resource_limits
+from trestle_mcp.libs.forkserver import ForkServer
+from trestle_mcp.libs.limits import Limits
+
+RUNNERS = ("subprocess", "forkserver")
+COMMAND_TIMEOUT = 60
+
+_forkserver: Optional[ForkServer] = None
+_limits = Limits()
+
+
+def configure(
+    runner: str = "subprocess", preload: Sequence[Path] = (), limits: Limits = Limits()
+) -> None:
+    """Choose how trestle commands run.
+
+    Args:
+        runner: "subprocess" (a new process per command) or "forkserver"
+        preload: Model files the fork server parses once, for its commands
+        limits: Resource limits of every command
+
+    Raises:
+        ValueError: When the runner is unknown
+    """
+    global _forkserver, _limits
+    if runner not in RUNNERS:
+        raise ValueError(f"Unknown runner {runner}, use one of {', '.join(RUNNERS)}")
+    if _forkserver is not None:
+        _forkserver.stop()
+    _forkserver = None
+    _limits = limits
+    if runner == "forkserver":
+        _forkserver = ForkServer(preload)
+        _forkserver.start()
 
 
 def find_trestle_bin() -> str:
@@ -37,28 +75,49 @@ def run_trestle_command(args: list[str], cwd: Optional[str] = None) -> dict:
         cwd: Working directory for the command
 
     Returns:
-        dict with 'success', 'stdout', 'stderr', 'returncode'
+        dict with 'success', 'stdout', 'stderr', 'returncode', and 'limit': the
+        resource limit the command exceeded ("memory", "cpu", "open_files",
+        "output" or "timeout"), None otherwise
     """
     trestle_bin = find_trestle_bin()
     cmd = [trestle_bin] + args
 
     try:
-        result = subprocess.run(
-            cmd, cwd=cwd or os.getcwd(), capture_output=True, text=True, timeout=60
-        )
+        if _forkserver is not None:
+            result = _forkserver.run(cmd, cwd or os.getcwd(), COMMAND_TIMEOUT, _limits)
+        elif _limits.active:
+            result = resource_limits.run(
+                cmd, cwd or os.getcwd(), COMMAND_TIMEOUT, _limits
+            )
+        else:
+            result = subprocess.run(
+                cmd,
+                cwd=cwd or os.getcwd(),
+                capture_output=True,
+                text=True,
+                timeout=COMMAND_TIMEOUT,
+            )
 
+        stderr = result.stderr
+        limit = _limits.breach(
+            result.returncode, stderr, getattr(result, "cpu_time", None)
+        )
+        if limit is not None:
+            stderr = f"Resource limit exceeded: {_limits.describe(limit)}\n{stderr}"
         return {
             "success": result.returncode == 0,
             "stdout": result.stdout,
-            "stderr": result.stderr,
+            "stderr": stderr,
             "returncode": result.returncode,
+            "limit": limit,
         }
     except subprocess.TimeoutExpired:
         return {
             "success": False,
             "stdout": "",
-            "stderr": "Command timed out after 60 seconds",
+            "stderr": f"Command timed out after {COMMAND_TIMEOUT} seconds",
             "returncode": -1,
+            "limit": "timeout",
         }
     except Exception as e:
         return {
@@ -66,4 +125,5 @@ def run_trestle_command(args: list[str], cwd: Optional[str] = None) -> dict:
             "stdout": "",
             "stderr": f"Error executing trestle: {str(e)}",
             "returncode": -1,
+            "limit": None,
         }
@@ -0,0 +1,223 @@
+"""Incremental, parallel validation of the models of a trestle workspace.
+
+Each model is validated by the same validators as ``trestle validate``. Results
+are stored in the workspace under ``.trestle/mcp/validate.json``, compressed
+with the configured storage codec, keyed by a hash of the model files and of
+every file the model depends on, so only models that changed, or whose imports
+changed, are validated again. The functions
+prefixed with ``_`` run inside worker processes.
+"""
+
+import argparse
+import hashlib
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import trestle.core.validator_factory as vfact
+from trestle.common import const
+from trestle.common.err import TrestleError
+from trestle.common.model_utils import ModelUtils
+from trestle.core import oscal_backward_compatibility
+from trestle.core.remote.security import PathSecurityValidator
+
+from trestle_mcp.libs import parallel
+from trestle_mcp.libs.author import collect_warnings
+from trestle_mcp.libs.changes import content_hash, touched, workspace_changes
+from trestle_mcp.libs.dependencies import workspace_graph
+from trestle_mcp.libs.storage import CompressedStore
+from trestle_mcp.libs.workspace import STATE_DIR, Workspace, state_dir
+
+CACHE_FILE = STATE_DIR / "validate.json"
+CACHE_VERSION = 1
+
+
+def _validate_model(trestle_root: Path, model_path: Path) -> dict:
+    """Validate one model as ``trestle validate -f`` does."""
+    result = {"valid": False, "error": None}
+    with collect_warnings() as messages:
+        try:
+            issues = []
+            if model_path.suffix == ".json":
+                issues = oscal_backward_compatibility.check_file(model_path)
+            errors = [str(i) for i in issues if i.severity == "ERROR"]
+            if errors:
+                result["error"] = errors[0]
+            else:
+                _, _, model = ModelUtils.load_distributed(model_path, trestle_root)
+                validator = vfact.validator_factory.get(
+                    argparse.Namespace(mode=const.VAL_MODE_ALL)
+                )
+                if validator.model_is_valid(model, True, trestle_root):
+                    result["valid"] = True
+                else:
+                    result["error"] = f"Did not pass the {validator.error_msg()}"
+        except TrestleError as e:
+            result["error"] = f"Failed to load: {e}"
+        except Exception as e:  # reported per model
+            result["error"] = str(e)
+    result["warnings"] = [m for m in dict.fromkeys(messages) if m != result["error"]]
+    return result
+
+
+def _validate_models(trestle_root: Path, model_paths: list[Path]) -> list[dict]:
+    return [_validate_model(trestle_root, path) for path in model_paths]
+
+
+def _model_files(model_path: Path) -> list[Path]:
+    """Return the files a model is loaded from, including split sub-models."""
+    files = [model_path]
+    split_dir = model_path.with_suffix("")
+    if split_dir.is_dir():
+        files.extend(sorted(p for p in split_dir.rglob("*") if p.is_file()))
+    return files
+
+
+def _load_cache(trestle_root: Path) -> dict:
+    try:
+        cache = CompressedStore(trestle_root / CACHE_FILE.parent).read_json(
+            CACHE_FILE.name
+        )
+    except (KeyError, OSError, ValueError):
+        return {}
+    return cache.get("results", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(trestle_root: Path, results: dict) -> None:
+    CompressedStore(state_dir(trestle_root)).write_json(
+        CACHE_FILE.name, {"version": CACHE_VERSION, "results": results}
+    )
+
+
+def select_models(
+    workspace: Workspace,
+    files: Optional[Iterable[str]] = None,
+    model_type: Optional[str] = None,
+    name: Optional[str] = None,
+) -> list[Path]:
+    """Return the model files to validate.
+
+    Args:
+        workspace: Workspace to validate
+        files: Model files, relative to the trestle root
+        model_type: Only models of this OSCAL type, e.g. "profile"
+        name: Only the model with this name (with model_type)
+
+    Returns:
+        list[Path]: Absolute model files; every model of the workspace by default
+
+    Raises:
+        TrestleError: When a selected model does not exist or is outside the
+            workspace
+    """
+    root = workspace.root
+    if files:
+        paths = [(root / f).resolve() for f in files]
+        for path in paths:
+            PathSecurityValidator.validate_local_path(path, root)
+        missing = [str(p) for p in paths if not p.is_file()]
+        if missing:
+            raise TrestleError(f"File {missing[0]} not found")
+        return paths
+
+    models = workspace_graph(workspace).models()
+    if model_type:
+        model_dir = const.MODEL_TYPE_TO_MODEL_DIR[model_type]
+        models = [p for p in models if p.parent.parent.name == model_dir]
+        if name:
+            models = [p for p in models if p.parent.name == name]
+            if not models:
+                raise TrestleError(f"Model {model_dir}/{name} not found")
+    return models
+
+
+def validate_models(
+    workspace: Workspace,
+    models: list[Path],
+    force: bool = False,
+    workers: Optional[int] = None,
+) -> dict:
+    """Validate models, reusing the results of those that did not change.
+
+    A result is reused when the model files and every file the model depends
+    on (per the dependency graph of the workspace) have the same content as
+    when it was computed. In a git work tree, files git does not report as
+    changed are not even hashed again. The other models are validated in
+    parallel by the process pool.
+
+    Args:
+        workspace: Workspace the models belong to
+        models: Absolute paths of the model files
+        force: Validate every model again, ignoring stored results
+        workers: Number of processes used (default: size of the pool)
+
+    Returns:
+        dict with 'results' (path, valid, error, warnings and cached per model),
+        'validated', 'cached', 'workers' and 'elapsed'
+    """
+    started = time.perf_counter()
+    models = list(dict.fromkeys(models))
+    root = workspace.root
+    graph = workspace_graph(workspace)
+    stored = _load_cache(root)
+    # keys computed by earlier calls, still valid while none of their files
+    # changed per git; recomputed from content hashes otherwise
+    changed = workspace_changes(workspace).changes("validate")
+    verified = workspace.component("validate-keys", lambda ws: {})
+    if changed is None:
+        verified.clear()
+    else:
+        # the changes are consumed by this call: every key they invalidate
+        # goes, not only those of the models selected now
+        for rel in [
+            rel for rel, (_, watched) in verified.items() if touched(changed, watched)
+        ]:
+            del verified[rel]
+
+    keys: dict[str, str] = {}
+    results: dict[str, dict] = {}
+    for path in models:
+        rel = (
+            path.relative_to(root).as_posix()
+            if path.is_relative_to(root)
+            else str(path)
+        )
+        known = verified.get(rel)
+        if known is not None:
+            keys[rel] = known[0]
+        else:
+            files = _model_files(path)
+            dependencies = sorted(graph.dependencies(path))
+            digest = hashlib.sha256()
+            for file in files + dependencies:
+                digest.update(f"{file}:{content_hash(workspace, file)}\n".encode())
+            keys[rel] = digest.hexdigest()
+            watched = frozenset([*files, path.with_suffix(""), *dependencies])
+            verified[rel] = (keys[rel], watched)
+        entry = stored.get(rel)
+        if not force and entry and entry.get("key") == keys[rel]:
+            results[rel] = {**entry["result"], "cached": True}
+
+    stale = [(rel, path) for rel, path in zip(keys, models) if rel not in results]
+    batches = parallel.balance(
+        [[item] for item in stale], workers or parallel.max_workers()
+    )
+    pool = parallel.process_pool()
+    futures = [
+        (batch, pool.submit(_validate_models, root, [path for _, path in batch]))
+        for batch in batches
+    ]
+    for batch, future in futures:
+        for (rel, _), result in zip(batch, future.result()):
+            results[rel] = {**result, "cached": False}
+            stored[rel] = {"key": keys[rel], "result": result}
+
+    if stale:
+        _save_cache(root, stored)
+    return {
+        "results": [{"path": rel, **results[rel]} for rel in keys],
+        "validated": len(stale),
+        "cached": len(keys) - len(stale),
+        "workers": len(batches),
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,280 @@
+"""Watches assembling profiles in the background when their markdown changes.
+
+A watch binds a markdown directory to an output profile. File changes are
+detected with inotify through the optional ``watchfiles`` package, or by
+polling the size and mtime of the files when it is not installed. Bursts of
+changes, such as an agent rewriting many controls, are debounced into one
+batch. A batch only triggers an assembly when the content of a markdown file
+really changed since the last assembly, so touching files or saving them
+unchanged costs nothing. Assemblies run on the shared workers with the batch
+priority, and the status of the last one is kept for the watch resources.
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+try:
+    import watchfiles
+except ImportError:  # optional dependency
+    watchfiles = None
+
+from trestle_mcp.libs import fsio
+from trestle_mcp.libs.concurrency import BATCH, current_client, current_priority
+from trestle_mcp.libs.results import ToolResult
+from trestle_mcp.libs.workspace import current_workspace, workspaces
+
+DEFAULT_DEBOUNCE = 1.0
+POLL_INTERVAL = 0.5
+MARKDOWN_SUFFIX = ".md"
+
+
+def backend() -> str:
+    """Return how file changes are detected: "inotify" or "polling"."""
+    return "inotify" if watchfiles is not None else "polling"
+
+
+def scan(directory: Path) -> dict[str, tuple[int, int]]:
+    """Return the (mtime, size) of the markdown files under a directory."""
+    return {key[0]: key[1:] for key in fsio.scan(directory, MARKDOWN_SUFFIX)}
+
+
+def digests(paths: Iterable[str]) -> dict[str, Optional[str]]:
+    """Return the digests of many files, read concurrently."""
+    paths = list(paths)
+    return dict(zip(paths, fsio.map_files(digest, paths)))
+
+
+def digest(path: str) -> Optional[str]:
+    """Return the digest of a file content, None when it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class Watch:
+    """Background assembly of a profile from a markdown directory.
+
+    Args:
+        watch_id: Identity of the watch
+        trestle_root: Trestle workspace root
+        markdown_dir: Directory of the markdown controls, relative to the root
+        output_profile: Name of the profile assembled
+        assemble: Coroutine function running one assembly
+        debounce: Seconds without changes before a batch is assembled
+    """
+
+    def __init__(
+        self,
+        watch_id: str,
+        trestle_root: Path,
+        markdown_dir: str,
+        output_profile: str,
+        assemble: Callable[[], Awaitable[str]],
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        self.id = watch_id
+        self.trestle_root = trestle_root
+        self.markdown_dir = markdown_dir
+        self.output_profile = output_profile
+        self.directory = trestle_root / markdown_dir
+        self.assemble = assemble
+        self.debounce = debounce
+        self.state = "starting"
+        self.runs = 0
+        self.skipped = 0
+        self.last_run: Optional[dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._digests: dict[str, Optional[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    def start(self) -> None:
+        """Start watching in a background task."""
+        self._task = asyncio.create_task(self._run(), name=f"watch-{self.id}")
+
+    async def ready(self) -> None:
+        """Wait until the initial state of the directory is recorded."""
+        await self._ready.wait()
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.state = "stopped"
+
+    def status(self) -> dict[str, Any]:
+        """Return the state of the watch and the result of its last assembly."""
+        return {
+            "id": self.id,
+            "trestle_root": str(self.trestle_root),
+            "markdown_dir": self.markdown_dir,
+            "output_profile": self.output_profile,
+            "backend": backend(),
+            "debounce": self.debounce,
+            "state": self.state,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "last_run": self.last_run,
+            "error": self.error,
+        }
+
+    async def _changes(self, files: dict) -> AsyncIterator[set[str]]:
+        """Yield debounced batches of changed markdown paths."""
+        if watchfiles is not None:
+            async for batch in watchfiles.awatch(
+                self.directory, debounce=int(self.debounce * 1000)
+            ):
+                paths = {p for _, p in batch if p.endswith(MARKDOWN_SUFFIX)}
+                if paths:
+                    yield paths
+            return
+        pending: set[str] = set()
+        last_change = 0.0
+        while True:
+            await asyncio.sleep(min(POLL_INTERVAL, self.debounce))
+            current = await asyncio.to_thread(scan, self.directory)
+            changed = {
+                path
+                for path in files.keys() | current.keys()
+                if files.get(path) != current.get(path)
+            }
+            files = current
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+            elif pending and now - last_change >= self.debounce:
+                yield pending
+                pending = set()
+
+    async def _run(self) -> None:
+        current_client.set(f"watch-{self.id}")
+        current_priority.set(BATCH)
+        try:
+            files = await asyncio.to_thread(scan, self.directory)
+            self._digests = await asyncio.to_thread(digests, files)
+            self.state = "watching"
+            self._ready.set()
+            async for paths in self._changes(files):
+                await self._process(paths)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+        finally:
+            self._ready.set()
+
+    async def _process(self, paths: set[str]) -> None:
+        """Assemble the profile if the content of a changed file differs."""
+        current = await asyncio.to_thread(digests, paths)
+        changed = sorted(p for p in paths if current[p] != self._digests.get(p))
+        for path, value in current.items():
+            if value is None:
+                self._digests.pop(path, None)
+            else:
+                self._digests[path] = value
+        if not changed:
+            self.skipped += 1
+            return
+        self.state = "assembling"
+        started = time.perf_counter()
+        run: dict[str, Any] = {
+            "started": _now(),
+            "changed": [
+                Path(p).relative_to(self.trestle_root).as_posix() for p in changed
+            ],
+        }
+        # the workspace may have been evicted and created again since the
+        # last run: look it up each time, and keep it in use while assembling
+        workspace = workspaces.get(self.trestle_root)
+        current_workspace.set(workspace)
+        try:
+            with workspace.use():
+                result = await self.assemble()
+            success = not result.startswith("❌")
+            run["message"] = (
+                result.content.message
+                if isinstance(result, ToolResult)
+                else result.split("\n", 1)[0]
+            )
+            if not success and isinstance(result, ToolResult):
+                run["error"] = result.content.error
+        except Exception as e:
+            success = False
+            run["message"] = "Assembly failed"
+            run["error"] = str(e)
+        run["status"] = "success" if success else "error"
+        run["finished"] = _now()
+        run["duration"] = round(time.perf_counter() - started, 3)
+        self.runs += 1
+        self.last_run = run
+        self.state = "watching"
+
+
+class WatchRegistry:
+    """Watches of the server, by id."""
+
+    def __init__(self):
+        self._watches: dict[str, Watch] = {}
+
+    @staticmethod
+    def watch_id(trestle_root: Path, markdown_dir: str, output_profile: str) -> str:
+        """Return the id of the watch of a markdown directory and profile."""
+        key = f"{trestle_root}\0{markdown_dir}\0{output_profile}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+    async def start(self, watch: Watch) -> Watch:
+        """Start a watch, replacing the one with the same id."""
+        previous = self._watches.pop(watch.id, None)
+        if previous is not None:
+            await previous.stop()
+        self._watches[watch.id] = watch
+        watch.start()
+        await watch.ready()
+        return watch
+
+    async def stop(self, watch_id: str) -> Watch:
+        """Stop and forget a watch.
+
+        Raises:
+            KeyError: When the watch does not exist
+        """
+        watch = self._watches.pop(watch_id)
+        await watch.stop()
+        return watch
+
+    def get(self, watch_id: str) -> Watch:
+        """Return a watch.
+
+        Raises:
+            KeyError: When the watch does not exist
+        """
+        return self._watches[watch_id]
+
+    def list(self) -> list[Watch]:
+        """Return the watches, oldest first."""
+        return list(self._watches.values())
+
+    async def stop_all(self) -> None:
+        """Stop every watch."""
+        for watch_id in list(self._watches):
+            await self.stop(watch_id)
+
+
+# Watches of the server
+watches = WatchRegistry()
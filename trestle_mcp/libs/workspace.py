@@ -0,0 +1,302 @@
+"""Workspace-aware state for a server shared by many trestle workspaces.
+
+Every trestle_root served by the process gets its own ``Workspace``: cache
+namespaces, per-workspace components such as indexes, a lock domain and,
+optionally, dedicated worker threads. Workspaces that stay idle are evicted so
+one tenant's data never pushes out another tenant's hot data.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Union
+
+from trestle_mcp.libs.cache import LRUCache
+
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+DEFAULT_CACHE_SIZE = 128
+# Clients whose last workspace is remembered for the resources they read
+MAX_BINDINGS = 4096
+# Caches, results and snapshots the server keeps in each workspace
+STATE_DIR = Path(".trestle") / "mcp"
+
+
+def resolve_root(trestle_root: Optional[Union[str, Path]] = None) -> Path:
+    """Resolve the trestle root a tool call operates on.
+
+    Args:
+        trestle_root: Path given by the client, or None for the current directory
+
+    Returns:
+        Path: Absolute, normalized trestle root
+    """
+    return Path(trestle_root or os.getcwd()).expanduser().resolve()
+
+
+def state_dir(trestle_root: Path) -> Path:
+    """Return the directory of the server state in a workspace, creating it.
+
+    The directory holds a ``.gitignore`` ignoring everything in it, so the
+    server state never shows up as untracked files of the workspace repository.
+
+    Args:
+        trestle_root: Trestle workspace root
+
+    Returns:
+        Path: The .trestle/mcp directory of the workspace
+    """
+    directory = trestle_root / STATE_DIR
+    ignore = directory / ".gitignore"
+    if not ignore.is_file():
+        directory.mkdir(parents=True, exist_ok=True)
+        ignore.write_text("*\n")
+    return directory
+
+
+class Workspace:
+    """State owned by one trestle root.
+
+    Args:
+        root: Absolute trestle root path
+        workers: Number of dedicated worker threads (0 to use the shared pool)
+    """
+
+    def __init__(self, root: Path, workers: int = 0):
+        self.root = root
+        self.workers = workers
+        self.last_used = time.monotonic()
+        self._caches: dict[str, LRUCache] = {}
+        self._components: dict[str, Any] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._mutex = threading.Lock()
+
+    def cache(
+        self,
+        namespace: str,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        maxweight: Optional[int] = None,
+    ) -> LRUCache:
+        """Return the cache for a namespace, creating it on first use.
+
+        Args:
+            namespace: Cache name
+            maxsize: Maximum number of entries, for a new cache
+            maxweight: Maximum total weight of the entries, for a new cache
+        """
+        with self._mutex:
+            if namespace not in self._caches:
+                self._caches[namespace] = LRUCache(maxsize, maxweight)
+            return self._caches[namespace]
+
+    def component(self, name: str, factory: Callable[["Workspace"], Any]) -> Any:
+        """Return a per-workspace component (e.g. an index), creating it on first use.
+
+        Args:
+            name: Component name
+            factory: Called with this workspace to build the component
+        """
+        with self._mutex:
+            if name not in self._components:
+                self._components[name] = factory(self)
+            return self._components[name]
+
+    def lock(self, name: str = "") -> asyncio.Lock:
+        """Return a named lock scoped to this workspace."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._locks = {}
+        return self._locks.setdefault(name, asyncio.Lock())
+
+    @asynccontextmanager
+    async def locked(self, names: Iterable[str]) -> AsyncIterator[None]:
+        """Hold several named locks of this workspace for the block.
+
+        Locks are taken in sorted order, so calls sharing some names never
+        deadlock.
+        """
+        async with AsyncExitStack() as stack:
+            for name in sorted(set(names)):
+                await stack.enter_async_context(self.lock(name))
+            yield
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        """Dedicated worker pool, or None when the workspace uses the shared pool."""
+        if not self.workers:
+            return None
+        with self._mutex:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"trestle-{self.root.name}",
+                )
+            return self._executor
+
+    @property
+    def busy(self) -> bool:
+        """Whether a tool call is currently using this workspace."""
+        return self._active > 0
+
+    @contextmanager
+    def use(self) -> Iterator["Workspace"]:
+        """Mark the workspace as in use for the duration of the block."""
+        with self._mutex:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            with self._mutex:
+                self._active -= 1
+            self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        """Release caches, components and dedicated workers."""
+        with self._mutex:
+            for cache in self._caches.values():
+                cache.clear()
+            self._caches.clear()
+            for component in self._components.values():
+                close = getattr(component, "close", None)
+                if callable(close):
+                    close()
+            self._components.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class WorkspaceRegistry:
+    """Route tool calls to per-workspace state and evict idle workspaces.
+
+    Args:
+        idle_timeout: Seconds after which an unused workspace is evicted
+        workers: Dedicated worker threads per workspace (0 to share the global pool)
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, workers: int = 0):
+        self._workspaces: dict[Path, Workspace] = {}
+        self._bindings = LRUCache(MAX_BINDINGS)
+        self._lock = threading.Lock()
+        self.configure(idle_timeout, workers)
+
+    def configure(
+        self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, workers: int = 0
+    ) -> None:
+        """Set the eviction timeout and worker affinity for new workspaces."""
+        if idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        if workers < 0:
+            raise ValueError("workers must not be negative")
+        self.idle_timeout = idle_timeout
+        self.workers = workers
+
+    def get(self, trestle_root: Optional[Union[str, Path]] = None) -> Workspace:
+        """Return the workspace for a trestle root, creating it if needed.
+
+        Args:
+            trestle_root: Path given by the client, or None for the current directory
+        """
+        root = resolve_root(trestle_root)
+        self.evict_idle()
+        with self._lock:
+            workspace = self._workspaces.get(root)
+            if workspace is None:
+                workspace = Workspace(root, self.workers)
+                self._workspaces[root] = workspace
+            workspace.last_used = time.monotonic()
+            return workspace
+
+    def find(self, path: Union[str, Path]) -> Optional[Workspace]:
+        """Return the live workspace holding a file, without creating one.
+
+        Args:
+            path: File path, relative to the current directory or absolute
+
+        Returns:
+            Optional[Workspace]: The workspace with the deepest root containing
+            the file, or None when no live workspace holds it
+        """
+        path = Path(os.path.abspath(path))
+        with self._lock:
+            roots = [root for root in self._workspaces if path.is_relative_to(root)]
+            if not roots:
+                return None
+            return self._workspaces[max(roots, key=lambda root: len(root.parts))]
+
+    def bind(self, client: str, trestle_root: Optional[Union[str, Path]]) -> None:
+        """Remember the workspace a client works in, for the resources it reads.
+
+        Args:
+            client: Client key
+            trestle_root: Trestle root of the last tool call of the client
+        """
+        self._bindings.put(client, resolve_root(trestle_root))
+
+    def bound(self, client: str) -> Workspace:
+        """Return the workspace of the last tool call of a client.
+
+        Args:
+            client: Client key
+
+        Returns:
+            Workspace: The bound workspace, or the one of the current directory
+            for a client that has not chosen one
+        """
+        return self.get(self._bindings.get(client))
+
+    def evict_idle(self, now: Optional[float] = None) -> list[Path]:
+        """Evict workspaces unused for longer than the idle timeout.
+
+        Returns:
+            list[Path]: Roots of the evicted workspaces
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                root
+                for root, workspace in self._workspaces.items()
+                if not workspace.busy and now - workspace.last_used > self.idle_timeout
+            ]
+            evicted = [self._workspaces.pop(root) for root in idle]
+        for workspace in evicted:
+            workspace.close()
+        return idle
+
+    def clear(self) -> None:
+        """Evict every workspace."""
+        with self._lock:
+            evicted = list(self._workspaces.values())
+            self._workspaces.clear()
+        for workspace in evicted:
+            workspace.close()
+
+    def roots(self) -> list[Path]:
+        """Return the roots of the live workspaces."""
+        with self._lock:
+            return list(self._workspaces)
+
+    def __contains__(self, trestle_root: Union[str, Path]) -> bool:
+        with self._lock:
+            return resolve_root(trestle_root) in self._workspaces
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._workspaces)
+
+
+# Registry shared by every service of the server
+workspaces = WorkspaceRegistry()
+
+# Workspace targeted by the current tool call
+current_workspace: ContextVar[Optional[Workspace]] = ContextVar(
+    "current_workspace", default=None
+)
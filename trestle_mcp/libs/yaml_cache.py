@@ -0,0 +1,202 @@
+"""Cache of parsed YAML files and markdown frontmatter.
+
+Parsing YAML is slow, with ruamel.yaml's round-trip loader slowest of all.
+Yaml header files given to catalog-generate and profile-generate, YAML models
+read by search, the dependency graph and diff, and the frontmatter of markdown
+controls read by the assembly engines are parsed once per version of each file.
+Entries are keyed by ``file_key()`` (path, mtime and size), so an edited file is
+parsed again. Files of a workspace served by the process are cached in that
+workspace, so one tenant's large markdown tree never evicts another's entries;
+other files share a process-wide cache. Each cache is bounded both by its
+number of entries and by the total size of the files it holds. Files larger
+than MAX_FILE_SIZE are never cached.
+
+Callers get a deep copy of a cached value, so they can modify it. Read-only
+callers may instead ask for the shared value, which they must leave unchanged.
+They may also ask for the fast loader, libyaml's safe loader from PyYAML. It is
+set up with the YAML 1.2 resolvers ruamel.yaml uses, because ruamel writes
+``yes``, ``on`` or ``1:30`` unquoted, and YAML 1.1 would read them as booleans
+and numbers. Where PyYAML was built without libyaml, the fast loader falls back
+to ruamel's safe loader.
+"""
+
+import re
+from contextlib import contextmanager
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from ruamel.yaml import YAML
+from ruamel.yaml.resolver import implicit_resolvers
+from trestle.core.markdown.markdown_processor import MarkdownProcessor
+
+from trestle_mcp.libs.cache import FileKey, LRUCache, file_key
+from trestle_mcp.libs.workspace import workspaces
+
+try:
+    import yaml
+    from yaml import CSafeLoader
+except ImportError:  # PyYAML without libyaml: ruamel is used instead
+    CSafeLoader = None
+
+LOADERS = ("safe", "round-trip", "fast")
+# Parsed files kept by each cache, and the total size of those files
+CACHE_SIZE = 4096
+CACHE_BYTES = 64 * 1024 * 1024
+MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# Tags resolved by ruamel for YAML 1.2 that libyaml can construct
+_TAGS = ("bool", "float", "int", "merge", "null", "timestamp")
+
+# Cache namespace of the parsed files in a workspace
+NAMESPACE = "yaml"
+
+# Parsed files outside the workspaces served
+_parsed = LRUCache(maxsize=CACHE_SIZE, maxweight=CACHE_BYTES)
+
+if CSafeLoader is not None:
+
+    class FastLoader(CSafeLoader):
+        """libyaml safe loader resolving plain scalars as ruamel.yaml does."""
+
+        yaml_implicit_resolvers: dict = {}
+
+        def construct_yaml_int(self, node: Any) -> int:
+            """Construct an int, where YAML 1.2 reads 010 as ten."""
+            value = self.construct_scalar(node).replace("_", "")
+            sign = -1 if value[0] == "-" else 1
+            value = value.lstrip("+-")
+            for prefix, base in (("0b", 2), ("0o", 8), ("0x", 16)):
+                if value.startswith(prefix):
+                    return sign * int(value[2:], base)
+            return sign * int(value)
+
+    for _versions, _tag, _regexp, _first in implicit_resolvers:
+        if (1, 2) in _versions and _tag.rsplit(":", 1)[-1] in _TAGS:
+            FastLoader.add_implicit_resolver(
+                _tag, re.compile(_regexp.pattern, re.X), _first
+            )
+    FastLoader.add_constructor("tag:yaml.org,2002:int", FastLoader.construct_yaml_int)
+else:
+    FastLoader = None
+
+
+def _cache(path: Union[str, Path]) -> LRUCache:
+    """Return the cache of the workspace holding a file, or the process-wide one."""
+    workspace = workspaces.find(path)
+    if workspace is None:
+        return _parsed
+    return workspace.cache(NAMESPACE, CACHE_SIZE, CACHE_BYTES)
+
+
+def _caches() -> list[LRUCache]:
+    caches = [_parsed]
+    for root in workspaces.roots():
+        workspace = workspaces.find(root)
+        if workspace is not None:
+            caches.append(workspace.cache(NAMESPACE, CACHE_SIZE, CACHE_BYTES))
+    return caches
+
+
+def _parse(path: Path, loader: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        if loader == "fast" and FastLoader is not None:
+            return yaml.load(f, Loader=FastLoader)
+        if loader == "round-trip":
+            return YAML().load(f)
+        return YAML(typ="safe").load(f)
+
+
+def load_yaml(
+    path: Union[str, Path], loader: str = "safe", shared: bool = False
+) -> Any:
+    """Return the content of a YAML file, parsed once per version of the file.
+
+    Args:
+        path: YAML file
+        loader: "safe" (ruamel safe loader), "round-trip" (ruamel round-trip
+            loader, keeping comments and order) or "fast" (libyaml, for
+            read-only uses)
+        shared: Return the cached value itself, which must not be modified,
+            instead of a copy
+
+    Returns:
+        Any: Parsed content
+
+    Raises:
+        OSError: When the file cannot be read
+        ValueError: When the loader is unknown
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader {loader}, use one of {', '.join(LOADERS)}")
+    path = Path(path)
+    key = file_key(path)
+    cache = _cache(path)
+    cached = cache.get((loader, key)) if key is not None else None
+    if cached is None:
+        cached = [_parse(path, loader)]
+        if key is not None and key[2] <= MAX_FILE_SIZE:
+            cache.put((loader, key), cached, key[2])
+    return cached[0] if shared else deepcopy(cached[0])
+
+
+@contextmanager
+def cached_frontmatter() -> Iterator[None]:
+    """Serve the markdown trestle reads in the block from the cache.
+
+    Trestle reads the frontmatter and body of a markdown file at once; both
+    are cached, and the frontmatter is copied for each read.
+    """
+    original = MarkdownProcessor.read_markdown_wo_processing
+
+    def read(self, md_path: Path, read_header: bool = True, read_body: bool = True):
+        key = file_key(md_path)
+        cache = _cache(md_path)
+        entry = cache.get(("markdown", key)) if key is not None else None
+        if entry is None:
+            # key taken before reading: the content is never older than the key
+            entry = original(self, md_path, True, True)
+            if key is not None and key[2] <= MAX_FILE_SIZE:
+                cache.put(("markdown", key), entry, key[2])
+        header, body = entry
+        return (deepcopy(header) if read_header else {}), (body if read_body else "")
+
+    MarkdownProcessor.read_markdown_wo_processing = read
+    try:
+        yield
+    finally:
+        MarkdownProcessor.read_markdown_wo_processing = original
+
+
+def markdown_entries(paths: Iterable[Path]) -> list[tuple[FileKey, Any]]:
+    """Return the cached markdown of files, to hand over to another process."""
+    entries = []
+    for path in paths:
+        key = file_key(path)
+        entry = _cache(path).get(("markdown", key)) if key is not None else None
+        if entry is not None:
+            entries.append((key, entry))
+    return entries
+
+
+def add_markdown_entries(entries: Iterable[tuple[FileKey, Any]]) -> None:
+    """Cache markdown parsed by another process, see markdown_entries()."""
+    for key, entry in entries:
+        _cache(key[0]).put(("markdown", key), entry, key[2])
+
+
+def clear() -> None:
+    """Drop every cached file."""
+    for cache in _caches():
+        cache.clear()
+
+
+def cache_info() -> dict:
+    """Return the entries, total file size, hits and misses of the caches."""
+    caches = _caches()
+    return {
+        "entries": sum(len(cache) for cache in caches),
+        "bytes": sum(cache.weight for cache in caches),
+        "hits": sum(cache.hits for cache in caches),
+        "misses": sum(cache.misses for cache in caches),
+    }
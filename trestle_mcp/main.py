@@ -5,12 +5,164 @@ MCP Server for compliance-trestle OSCAL framework.
 This server provides tools to manage OSCAL models using the trestle CLI.
 """
 
-from mcp.server.fastmcp import FastMCP
+import argparse
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import CallToolResult
+from pydantic import BaseModel
 
 from trestle_mcp import services
+from trestle_mcp.libs import (
+    fsio,
+    idempotency,
+    model_format,
+    parallel,
+    storage,
+    trestle,
+)
+from trestle_mcp.libs.concurrency import (
+    BATCH,
+    INTERACTIVE,
+    QueueFullError,
+    current_client,
+    current_priority,
+    limiter,
+)
+from trestle_mcp.libs.idempotency import IdempotencyError, run_idempotent
+from trestle_mcp.libs.incremental import run_incremental
+from trestle_mcp.libs.limits import MB, Limits
+from trestle_mcp.libs.model_format import run_formatted
+from trestle_mcp.libs.model_index import etag
+from trestle_mcp.libs.results import ToolOutput, failure, to_call_result
+from trestle_mcp.libs.singleflight import flights, request_key
+from trestle_mcp.libs.snapshot import protect_outputs, run_locked
+from trestle_mcp.libs.workspace import (
+    DEFAULT_IDLE_TIMEOUT,
+    current_workspace,
+    workspaces,
+)
+
+
+class TrestleMCP(FastMCP):
+    """FastMCP server tagging the resources it serves with an ETag."""
+
+    async def read_resource(self, uri) -> Iterable[ReadResourceContents]:
+        return [
+            ReadResourceContents(
+                content=contents.content,
+                mime_type=contents.mime_type,
+                meta={**(contents.meta or {}), "etag": etag(contents.content)},
+            )
+            for contents in await super().read_resource(uri)
+        ]
+
 
 # Initialize the MCP server
-mcp = FastMCP("trestle_mcp")
+mcp = TrestleMCP("trestle_mcp")
+
+
+def _client_key(ctx: Context) -> str:
+    """Identify the MCP client issuing a tool call.
+
+    An explicit client id from the request metadata wins; otherwise each MCP
+    session (one per connected client) is its own client.
+    """
+    try:
+        request_context = ctx.request_context
+    except ValueError:
+        return "local"
+    client_id = ctx.client_id
+    if client_id:
+        return str(client_id)
+    return f"session-{id(request_context.session):x}"
+
+
+@contextmanager
+def _request_scope(
+    ctx: Context, params: BaseModel, priority: str = INTERACTIVE
+) -> Iterator[None]:
+    """Bind the calling client, its target workspace and priority for the block.
+
+    The workspace is in use until the block ends, so it is not evicted while
+    the call runs.
+    """
+    client = _client_key(ctx)
+    client_token = current_client.set(client)
+    priority_token = current_priority.set(priority)
+    workspace = workspaces.get(getattr(params, "trestle_root", None))
+    workspace_token = current_workspace.set(workspace)
+    if "trestle_root" in type(params).model_fields:
+        # resources of the client are read from the workspace it works in
+        workspaces.bind(client, workspace.root)
+    try:
+        with workspace.use():
+            yield
+    finally:
+        current_workspace.reset(workspace_token)
+        current_priority.reset(priority_token)
+        current_client.reset(client_token)
+
+
+@contextmanager
+def _resource_scope() -> Iterator[None]:
+    """Bind the reading client and the workspace of its last tool call."""
+    client = _client_key(mcp.get_context())
+    client_token = current_client.set(client)
+    workspace_token = current_workspace.set(workspaces.bound(client))
+    try:
+        yield
+    finally:
+        current_workspace.reset(workspace_token)
+        current_client.reset(client_token)
+
+
+async def _call(
+    ctx: Context,
+    params: BaseModel,
+    service: Callable[..., Awaitable[str]],
+    priority: str = INTERACTIVE,
+    incremental: bool = False,
+) -> CallToolResult:
+    """Run a service for a tool call and return its text and structured result.
+
+    Long running tools are queued with the batch priority, so quick calls of
+    interactive users go first under load. A call identical to one still
+    running, input files included, shares the result of that one, and a call
+    retried with an idempotency key gets the result stored by the first one.
+    An incremental call is skipped when no file it reads or writes changed
+    since its last run. Calls writing the same output in a workspace run one
+    at a time. Models written by a call are rewritten in the output format it
+    chose.
+    """
+    started = time.perf_counter()
+    with _request_scope(ctx, params, priority):
+        try:
+            workspace = current_workspace.get()
+            root = workspace.root
+            key = await asyncio.to_thread(request_key, service.__name__, params, root)
+            # files shared with a snapshot get their own copy before being written
+            await asyncio.to_thread(protect_outputs, root, params)
+            run = service
+            if "output_format" in type(params).model_fields:
+                run = functools.partial(run_formatted, run)
+            if incremental:
+                run = functools.partial(run_incremental, service.__name__, run)
+            run = functools.partial(run_locked, workspace, run)
+            result = await flights.run(
+                key,
+                functools.partial(run_idempotent, service.__name__, params, run),
+            )
+        except QueueFullError as e:
+            result = failure(f"❌ Server busy\n\nError: {e}", str(e))
+        except IdempotencyError as e:
+            result = failure(f"❌ Idempotency key conflict\n\nError: {e}", str(e))
+    return to_call_result(result, time.perf_counter() - started)
 
 
 @mcp.tool(
@@ -24,8 +176,10 @@ mcp = FastMCP("trestle_mcp")
         "openWorldHint": False,
     },
 )
-async def trestle_init(params: services.init.TrestleInitInput) -> str:
-    return await services.init.trestle_init(params)
+async def trestle_init(
+    params: services.init.TrestleInitInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.init.trestle_init)
 
 
 @mcp.tool(
@@ -39,8 +193,10 @@ async def trestle_init(params: services.init.TrestleInitInput) -> str:
         "openWorldHint": True,
     },
 )
-async def trestle_import(params: services.import_.TrestleImportInput) -> str:
-    return await services.import_.trestle_import(params)
+async def trestle_import(
+    params: services.import_.TrestleImportInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.import_.trestle_import, BATCH)
 
 
 @mcp.tool(
@@ -56,8 +212,15 @@ async def trestle_import(params: services.import_.TrestleImportInput) -> str:
 )
 async def trestle_catalog_generate(
     params: services.author.catalog_generate.TrestleCatalogGenerateInput,
-) -> str:
-    return await services.author.catalog_generate.trestle_catalog_generate(params)
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.catalog_generate.trestle_catalog_generate,
+        BATCH,
+        incremental=True,
+    )
 
 
 @mcp.tool(
@@ -73,9 +236,37 @@ async def trestle_catalog_generate(
 )
 async def trestle_author_profile_generate(
     params: services.author.profile_generate.TrestleAuthorProfileGenerateInput,
-) -> str:
-    return await services.author.profile_generate.trestle_author_profile_generate(
-        params
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.profile_generate.trestle_author_profile_generate,
+        BATCH,
+        incremental=True,
+    )
+
+
+@mcp.tool(
+    name="trestle_author_profile_generate_batch",
+    title="Generate Markdown Controls for Several Profiles",
+    description=services.author.profile_generate.trestle_author_profile_generate_batch.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": True,
+    },
+)
+async def trestle_author_profile_generate_batch(
+    params: services.author.profile_generate.TrestleAuthorProfileGenerateBatchInput,
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.profile_generate.trestle_author_profile_generate_batch,
+        BATCH,
     )
 
 
@@ -92,8 +283,37 @@ async def trestle_author_profile_generate(
 )
 async def trestle_author_profile_resolve(
     params: services.author.profile_resolve.TrestleAuthorProfileResolveInput,
-) -> str:
-    return await services.author.profile_resolve.trestle_author_profile_resolve(params)
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.profile_resolve.trestle_author_profile_resolve,
+        BATCH,
+    )
+
+
+@mcp.tool(
+    name="trestle_author_profile_resolve_controls",
+    title="Resolve Selected Controls of a Profile",
+    description=services.author.profile_resolve.trestle_author_profile_resolve_controls.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True,
+    },
+)
+async def trestle_author_profile_resolve_controls(
+    params: services.author.profile_resolve.TrestleAuthorProfileResolveControlsInput,
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.profile_resolve.trestle_author_profile_resolve_controls,
+        BATCH,
+    )
 
 
 @mcp.tool(
@@ -109,9 +329,38 @@ async def trestle_author_profile_resolve(
 )
 async def trestle_author_profile_assemble(
     params: services.author.profile_assemble.TrestleAuthorProfileAssembleInput,
-) -> str:
-    return await services.author.profile_assemble.trestle_author_profile_assemble(
-        params
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.profile_assemble.trestle_author_profile_assemble,
+        BATCH,
+        incremental=True,
+    )
+
+
+@mcp.tool(
+    name="trestle_author_catalog_assemble",
+    title="Assemble Catalog JSON from Markdown Directory",
+    description=services.author.catalog_assemble.trestle_author_catalog_assemble.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": True,
+    },
+)
+async def trestle_author_catalog_assemble(
+    params: services.author.catalog_assemble.TrestleAuthorCatalogAssembleInput,
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx,
+        params,
+        services.author.catalog_assemble.trestle_author_catalog_assemble,
+        BATCH,
+        incremental=True,
     )
 
 
@@ -128,13 +377,411 @@ async def trestle_author_profile_assemble(
 )
 async def trestle_task_csv_to_oscal_cd(
     params: services.task.csv_to_oscal_cd.TrestleTaskCsvToOscalCdInput,
-) -> str:
-    return await services.task.csv_to_oscal_cd.trestle_task_csv_to_oscal_cd(params)
+    ctx: Context,
+) -> ToolOutput:
+    return await _call(
+        ctx, params, services.task.csv_to_oscal_cd.trestle_task_csv_to_oscal_cd, BATCH
+    )
+
+
+@mcp.tool(
+    name="trestle_validate",
+    title="Validate OSCAL Models",
+    description=services.validate.trestle_validate.__doc__,
+    annotations={
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_validate(
+    params: services.validate.TrestleValidateInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.validate.trestle_validate)
+
+
+@mcp.tool(
+    name="trestle_diff",
+    title="Compare OSCAL Models",
+    description=services.diff.trestle_diff.__doc__,
+    annotations={
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_diff(
+    params: services.diff.TrestleDiffInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.diff.trestle_diff)
+
+
+@mcp.tool(
+    name="trestle_search_controls",
+    title="Search Controls",
+    description=services.search.trestle_search_controls.__doc__,
+    annotations={
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_search_controls(
+    params: services.search.TrestleSearchControlsInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.search.trestle_search_controls)
+
+
+@mcp.tool(
+    name="trestle_snapshot_create",
+    title="Snapshot Workspace",
+    description=services.snapshot.trestle_snapshot_create.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False,
+    },
+)
+async def trestle_snapshot_create(
+    params: services.snapshot.TrestleSnapshotCreateInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.snapshot.trestle_snapshot_create)
+
+
+@mcp.tool(
+    name="trestle_snapshot_restore",
+    title="Restore Workspace Snapshot",
+    description=services.snapshot.trestle_snapshot_restore.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_snapshot_restore(
+    params: services.snapshot.TrestleSnapshotRestoreInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.snapshot.trestle_snapshot_restore)
+
+
+@mcp.tool(
+    name="trestle_snapshot_delete",
+    title="Delete Workspace Snapshot",
+    description=services.snapshot.trestle_snapshot_delete.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_snapshot_delete(
+    params: services.snapshot.TrestleSnapshotDeleteInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.snapshot.trestle_snapshot_delete)
+
+
+@mcp.tool(
+    name="trestle_watch_start",
+    title="Watch Markdown and Assemble Profile",
+    description=services.watch.trestle_watch_start.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_watch_start(
+    params: services.watch.TrestleWatchStartInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.watch.trestle_watch_start)
+
+
+@mcp.tool(
+    name="trestle_watch_stop",
+    title="Stop Watch",
+    description=services.watch.trestle_watch_stop.__doc__,
+    annotations={
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def trestle_watch_stop(
+    params: services.watch.TrestleWatchStopInput, ctx: Context
+) -> ToolOutput:
+    return await _call(ctx, params, services.watch.trestle_watch_stop)
+
+
+@mcp.resource(
+    "trestle://catalogs/{name}/controls",
+    name="catalog_controls",
+    title="Catalog Controls",
+    description=services.resources.catalog_controls.__doc__,
+    mime_type="application/json",
+)
+async def catalog_controls(name: str) -> str:
+    with _resource_scope():
+        return await services.resources.catalog_controls(name)
+
+
+@mcp.resource(
+    "trestle://catalogs/{name}/controls/{control_id}",
+    name="catalog_control",
+    title="Catalog Control",
+    description=services.resources.catalog_control.__doc__,
+    mime_type="application/json",
+)
+async def catalog_control(name: str, control_id: str) -> str:
+    with _resource_scope():
+        return await services.resources.catalog_control(name, control_id)
+
+
+@mcp.resource(
+    "trestle://profiles/{name}/imports",
+    name="profile_imports",
+    title="Profile Imports",
+    description=services.resources.profile_imports.__doc__,
+    mime_type="application/json",
+)
+async def profile_imports(name: str) -> str:
+    with _resource_scope():
+        return await services.resources.profile_imports(name)
+
+
+@mcp.resource(
+    "trestle://markdown/{output}/controls/{control_id}",
+    name="markdown_control",
+    title="Markdown Control",
+    description=services.resources.markdown_control.__doc__,
+    mime_type="text/markdown",
+)
+async def markdown_control(output: str, control_id: str) -> str:
+    with _resource_scope():
+        return await services.resources.markdown_control(output, control_id)
+
+
+@mcp.resource(
+    "trestle://snapshots",
+    name="snapshot_list",
+    title="Workspace Snapshots",
+    description=services.resources.snapshot_list.__doc__,
+    mime_type="application/json",
+)
+async def snapshot_list() -> str:
+    with _resource_scope():
+        return await services.resources.snapshot_list()
+
 
+@mcp.resource(
+    "trestle://watches",
+    name="watch_list",
+    title="Profile Watches",
+    description=services.resources.watch_list.__doc__,
+    mime_type="application/json",
+)
+async def watch_list() -> str:
+    with _resource_scope():
+        return await services.resources.watch_list()
 
-def main():
+
+@mcp.resource(
+    "trestle://watches/{watch_id}",
+    name="watch_status",
+    title="Profile Watch Status",
+    description=services.resources.watch_status.__doc__,
+    mime_type="application/json",
+)
+async def watch_status(watch_id: str) -> str:
+    with _resource_scope():
+        return await services.resources.watch_status(watch_id)
+
+
+@mcp.resource(
+    "trestle://server/metrics",
+    name="server_metrics",
+    title="Server Metrics",
+    description=services.resources.server_metrics.__doc__,
+    mime_type="application/json",
+)
+async def server_metrics() -> str:
+    return await services.resources.server_metrics()
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="trestle-mcp",
+        description="MCP server for compliance-trestle OSCAL framework",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default="stdio",
+        help="Transport to serve MCP over (default: stdio)",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Bind address for HTTP transports"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8000, help="Port for HTTP transports"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Maximum concurrent trestle executions (default: CPU count)",
+    )
+    parser.add_argument(
+        "--max-per-client",
+        type=int,
+        default=None,
+        help="Maximum concurrent trestle executions per client (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=None,
+        help="Maximum calls waiting for an execution slot before new calls are "
+        "rejected (default: 256)",
+    )
+    parser.add_argument(
+        "--max-queue-per-client",
+        type=int,
+        default=None,
+        help="Maximum calls of one client waiting for an execution slot "
+        "(default: same as --max-queue)",
+    )
+    parser.add_argument(
+        "--workspace-idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds after which caches of an unused workspace are evicted",
+    )
+    parser.add_argument(
+        "--workspace-workers",
+        type=int,
+        default=0,
+        help="Dedicated worker threads per workspace (default: 0, share the global pool)",
+    )
+    parser.add_argument(
+        "--process-workers",
+        type=int,
+        default=None,
+        help="Worker processes for parallel authoring (default: CPU count)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=fsio.DEFAULT_WORKERS,
+        help="Threads listing and reading workspace files concurrently "
+        "(default: 16)",
+    )
+    parser.add_argument(
+        "--storage-compression",
+        choices=storage.available_codecs(),
+        default="none",
+        help="Compression of the server caches and snapshots (default: none)",
+    )
+    parser.add_argument(
+        "--idempotency-ttl",
+        type=float,
+        default=idempotency.DEFAULT_TTL,
+        help="Seconds results are kept for their idempotency key (default: 86400)",
+    )
+    parser.add_argument(
+        "--trestle-runner",
+        choices=trestle.RUNNERS,
+        default="subprocess",
+        help="How trestle commands run: a new process each, or children forked "
+        "from a process with trestle loaded (default: subprocess)",
+    )
+    parser.add_argument(
+        "--preload-model",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Model file the forkserver runner parses once for all its commands "
+        "(repeatable)",
+    )
+    parser.add_argument(
+        "--limit-memory",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Address space of each trestle command in MB (default: unlimited)",
+    )
+    parser.add_argument(
+        "--limit-cpu",
+        type=int,
+        default=None,
+        metavar="SECONDS",
+        help="CPU time of each trestle command (default: unlimited)",
+    )
+    parser.add_argument(
+        "--limit-open-files",
+        type=int,
+        default=None,
+        help="Open files of each trestle command (default: unlimited)",
+    )
+    parser.add_argument(
+        "--limit-output",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Size in MB of each file a trestle command writes, its output "
+        "included (default: unlimited)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=model_format.FORMATS,
+        default="pretty",
+        help="Format of the JSON models written by tool calls that do not choose "
+        "one: indented, compact, or auto (default: pretty)",
+    )
+    parser.add_argument(
+        "--pretty-threshold",
+        type=int,
+        default=model_format.DEFAULT_THRESHOLD // 1024,
+        metavar="KB",
+        help="Compact size in KB from which the auto format writes compact JSON "
+        "(default: 1024)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None):
     """Main entry point for the trestle MCP server."""
-    mcp.run()
+    args = _parse_args(argv)
+    limiter.configure(
+        args.max_concurrency,
+        args.max_per_client,
+        args.max_queue,
+        args.max_queue_per_client,
+    )
+    workspaces.configure(args.workspace_idle_timeout, args.workspace_workers)
+    parallel.configure(args.process_workers)
+    fsio.configure(args.io_workers)
+    storage.configure(args.storage_compression)
+    idempotency.configure(args.idempotency_ttl)
+    limits = Limits(
+        memory=args.limit_memory and args.limit_memory * MB,
+        cpu=args.limit_cpu,
+        open_files=args.limit_open_files,
+        output=args.limit_output and args.limit_output * MB,
+    )
+    trestle.configure(args.trestle_runner, args.preload_model, limits)
+    model_format.configure(args.output_format, args.pretty_threshold * 1024)
+    if args.transport != "stdio":
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
 
 
 if __name__ == "__main__":
@@ -3,4 +3,15 @@
 Each service module handles a specific trestle command (feature).
 """
 
-from trestle_mcp.services import author, import_, init, task
+from trestle_mcp.services import (
+    author,
+    diff,
+    import_,
+    init,
+    resources,
+    search,
+    snapshot,
+    task,
+    validate,
+    watch,
+)
@@ -1,4 +1,5 @@
 from trestle_mcp.services.author import (
+    catalog_assemble,
     catalog_generate,
     profile_assemble,
     profile_generate,
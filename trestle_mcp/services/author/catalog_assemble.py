@@ -0,0 +1,167 @@
+"""Trestle author catalog-assemble command service.
+
+This module implements catalog JSON assembly from a markdown directory.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from trestle_mcp.libs.author import assemble_catalog_markdown
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.model_format import OutputFormat
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
+
+
+class TrestleAuthorCatalogAssembleInput(BaseModel):
+    """Input model for trestle author catalog-assemble command."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    markdown_dir: str = Field(
+        description="Directory containing the catalog markdown controls."
+    )
+    output_catalog: str = Field(
+        description="Output catalog directory name (catalogs/<output_catalog>/catalog.json)"
+    )
+    name: Optional[str] = Field(
+        default=None,
+        description=(
+            "Catalog the markdown controls are merged into (optional, default: "
+            "the output catalog when it exists)"
+        ),
+    )
+    set_parameters: bool = Field(
+        default=False,
+        description="Set parameters and props from frontmatter (optional)",
+    )
+    regenerate: bool = Field(
+        default=False, description="Force UUID regeneration (optional)"
+    )
+    version: Optional[str] = Field(
+        default=None, description="Catalog version (optional)"
+    )
+    verbose: bool = Field(default=False, description="Verbose output")
+    trestle_root: Optional[str] = Field(
+        default=None, description="Path to trestle root dir"
+    )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Parse the markdown files in parallel across this many processes "
+            "(default: serial assembly with the trestle CLI)"
+        ),
+    )
+
+
+async def trestle_author_catalog_assemble(
+    params: TrestleAuthorCatalogAssembleInput,
+) -> str:
+    """Assemble markdown controls into a Catalog JSON file.
+
+    This tool assembles an OSCAL catalog JSON (catalog.json) from a directory of
+    markdown controls generated by trestle_author_catalog_generate. The controls
+    are merged into the parent catalog, or into the output catalog when it
+    already exists.
+
+    Args:
+        params (TrestleAuthorCatalogAssembleInput):
+            - markdown_dir (str): Markdown controls directory (required)
+            - output_catalog (str): Output catalog directory name (required)
+            - name (Optional[str]): Catalog the controls are merged into
+            - set_parameters (bool): Set parameters and props from YAML frontmatter
+            - regenerate (bool): Force UUID regeneration
+            - version (Optional[str]): Model version
+            - verbose (bool): Verbose output
+            - trestle_root (Optional[str]): Path of trestle root directory
+            - output_format (Optional[str]): pretty, compact or auto JSON
+            - workers (Optional[int]): Number of processes parsing markdown (optional)
+
+    Returns:
+        str: Success message with stdout, or error message with stderr details
+
+    Examples:
+        - Use when: Write edited catalog markdown back into catalog JSON
+            trestle_author_catalog_assemble(markdown_dir="md_catalog", output_catalog="nist", name="nist")
+        - Use when: Assembling a large markdown directory quickly (set workers)
+        - Don't use when: Input markdown_dir does not exist, or malformed markdown
+    """
+    if params.workers:
+        return await _assemble_parallel(params)
+
+    args = ["author", "catalog-assemble"]
+
+    if params.name:
+        args.extend(["--name", params.name])
+    args.extend(["--markdown", params.markdown_dir])
+    args.extend(["--output", params.output_catalog])
+    if params.set_parameters:
+        args.append("--set-parameters")
+    if params.regenerate:
+        args.append("--regenerate")
+    if params.version:
+        args.extend(["--version", params.version])
+    if params.verbose:
+        args.append("--verbose")
+    if params.trestle_root:
+        args.extend(["--trestle-root", params.trestle_root])
+
+    result = await run_limited(run_trestle_command, args)
+
+    if result["success"]:
+        output = result["stdout"].strip()
+        return success(
+            f"✅ Catalog assembled from markdown successfully\n\nOutput: {params.output_catalog}\n\n{output}",
+            outputs=[f"catalogs/{params.output_catalog}/catalog.json"],
+        )
+    else:
+        error = result["stderr"].strip()
+        return failure(
+            f"❌ Failed to assemble catalog from markdown\n\nMarkdownDir: {params.markdown_dir}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
+
+
+async def _assemble_parallel(params: TrestleAuthorCatalogAssembleInput) -> str:
+    """Assemble the catalog with the in-process engine parsing markdown in parallel."""
+    try:
+        result = await run_limited(
+            assemble_catalog_markdown,
+            resolve_root(params.trestle_root),
+            params.markdown_dir,
+            params.output_catalog,
+            name=params.name,
+            set_parameters=params.set_parameters,
+            regenerate=params.regenerate,
+            version=params.version,
+            workers=params.workers,
+        )
+    except Exception as e:
+        return failure(
+            f"❌ Failed to assemble catalog from markdown\n\nMarkdownDir: {params.markdown_dir}\nError: {e}",
+            str(e),
+        )
+
+    summary = (
+        f"Controls: {result['controls']} "
+        f"(workers: {result['workers']}, elapsed: {result['elapsed']:.2f}s)"
+    )
+    if not result["updated"]:
+        summary += (
+            "\nAssembled catalog is not different from existing version, so no update."
+        )
+    warnings = "".join(f"\nWarning: {w}" for w in result["warnings"])
+    return success(
+        f"✅ Catalog assembled from markdown successfully\n\nOutput: {params.output_catalog}\n\n{summary}{warnings}",
+        outputs=[f"catalogs/{params.output_catalog}/catalog.json"],
+        counts={"controls": result["controls"], "workers": result["workers"]},
+        elapsed=result["elapsed"],
+        warnings=result["warnings"],
+    )
@@ -7,7 +7,20 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.author import generate_catalog_markdown
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from trestle_mcp.libs.results import (
+    ToolResult,
+    failure,
+    files_page,
+    output_files,
+    page_fields,
+    success,
+)
 from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
 
 
 class TrestleCatalogGenerateInput(BaseModel):
@@ -35,7 +48,45 @@ class TrestleCatalogGenerateInput(BaseModel):
         default=None,
         description="Path to trestle root directory (default: current directory)",
     )
+    idempotency_key: IdempotencyKey = None
     verbose: bool = Field(default=False, description="Display verbose output")
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Generate in parallel, sharding controls by group across this many "
+            "worker processes (default: serial generation with the trestle CLI)"
+        ),
+    )
+    group_ids: Optional[list[str]] = Field(
+        default=None,
+        min_length=1,
+        description=(
+            "Generate only the controls of these groups, by id or glob "
+            "(e.g. ['ac', 'a*']); other markdown files are left untouched"
+        ),
+    )
+    control_ids: Optional[list[str]] = Field(
+        default=None,
+        min_length=1,
+        description=(
+            "Generate only these controls, by id or glob (e.g. ['ac-2', "
+            "'ac-2.*']); other markdown files are left untouched"
+        ),
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Cursor returned with the previous page of generated files: lists "
+            "the next page without generating again"
+        ),
+    )
+    limit: int = Field(
+        default=DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of generated files listed in the result",
+    )
 
 
 async def trestle_catalog_generate(params: TrestleCatalogGenerateInput) -> str:
@@ -50,15 +101,32 @@ async def trestle_catalog_generate(params: TrestleCatalogGenerateInput) -> str:
             - overwrite_header_values (bool): Overwrite markdown header values (optional)
             - trestle_root (Optional[str]): Trestle workspace root path (optional)
             - verbose (bool): Display verbose output (optional)
+            - workers (Optional[int]): Number of worker processes for parallel generation (optional)
+            - group_ids (Optional[list[str]]): Groups to generate, ids or globs (optional)
+            - control_ids (Optional[list[str]]): Controls to generate, ids or globs (optional)
+            - cursor (Optional[str]): Cursor of the page of generated files to list (optional)
+            - limit (int): Maximum number of generated files listed (default: 50)
 
     Returns:
-        str: Success or error message
+        str: Success or error message, with the generated files as structured content
 
     Examples:
         - Use when: "Generate markdown controls from a catalog"
         - Use when: "Split a catalog JSON into control-wise markdowns"
+        - Use when: "Generate markdowns for a large catalog quickly" (set workers)
+        - Use when: "Regenerate only the AC family" (set group_ids=["ac"])
         - Don't use when: "Catalog is missing or output directory already exists and not overwritten"
     """
+    if params.cursor:
+        return files_page(
+            resolve_root(params.trestle_root),
+            params.output,
+            params.cursor,
+            params.limit,
+        )
+    if params.workers or params.group_ids or params.control_ids:
+        return await _generate_parallel(params)
+
     args = ["author", "catalog-generate"]
 
     # Required arguments
@@ -77,11 +145,76 @@ async def trestle_catalog_generate(params: TrestleCatalogGenerateInput) -> str:
     if params.verbose:
         args.append("--verbose")
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ Catalog controls generated as markdown successfully\n\nOutput: {params.output}\n\n{output}"
+        return _generated(
+            params,
+            f"✅ Catalog controls generated as markdown successfully\n\nOutput: {params.output}\n\n{output}",
+        )
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to generate catalog markdowns\n\nCatalog: {params.name}\nError: {error}"
+        return failure(
+            f"❌ Failed to generate catalog markdowns\n\nCatalog: {params.name}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
+
+
+def _generated(params: TrestleCatalogGenerateInput, text: str, **fields) -> ToolResult:
+    """Return a successful result listing one page of the generated files."""
+    files = output_files(resolve_root(params.trestle_root), params.output)
+    counts = {"files": len(files), **fields.pop("counts", {})}
+    return success(
+        text,
+        outputs=[params.output],
+        counts=counts,
+        **page_fields(files, None, params.limit),
+        **fields,
+    )
+
+
+async def _generate_parallel(params: TrestleCatalogGenerateInput) -> str:
+    """Generate the markdown with the sharded in-process engine.
+
+    The trestle CLI can only generate whole catalogs: subsets always run here.
+    """
+    try:
+        result = await run_limited(
+            generate_catalog_markdown,
+            resolve_root(params.trestle_root),
+            params.name,
+            params.output,
+            yaml_header=params.yaml_header,
+            force_overwrite=params.force_overwrite,
+            overwrite_header_values=params.overwrite_header_values,
+            workers=params.workers,
+            group_ids=params.group_ids,
+            control_ids=params.control_ids,
+        )
+    except Exception as e:
+        return failure(
+            f"❌ Failed to generate catalog markdowns\n\nCatalog: {params.name}\nError: {e}",
+            str(e),
+        )
+
+    summary = (
+        f"Controls: {result['controls']} "
+        f"(shards: {result['shards']}, workers: {result['workers']}, "
+        f"elapsed: {result['elapsed']:.2f}s)"
+    )
+    if not result["controls"] and (params.group_ids or params.control_ids):
+        result["warnings"].append("No control matches the group and control filters")
+    warnings = "".join(f"\nWarning: {w}" for w in result["warnings"])
+    return _generated(
+        params,
+        f"✅ Catalog controls generated as markdown successfully\n\nOutput: {params.output}\n\n{summary}{warnings}",
+        counts={
+            "controls": result["controls"],
+            "shards": result["shards"],
+            "workers": result["workers"],
+        },
+        elapsed=result["elapsed"],
+        warnings=result["warnings"],
+    )
@@ -7,7 +7,13 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.author import assemble_profile_markdown
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.model_format import OutputFormat
+from trestle_mcp.libs.results import failure, success
 from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
 
 
 class TrestleAuthorProfileAssembleInput(BaseModel):
@@ -46,6 +52,16 @@ class TrestleAuthorProfileAssembleInput(BaseModel):
     trestle_root: Optional[str] = Field(
         default=None, description="Path to trestle root dir"
     )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Parse the markdown files in parallel across this many processes "
+            "(default: serial assembly with the trestle CLI)"
+        ),
+    )
 
 
 async def trestle_author_profile_assemble(
@@ -68,6 +84,8 @@ async def trestle_author_profile_assemble(
             - allowed_sections (Optional[str]): Allowed section short names, comma-separated
             - verbose (bool): Verbose output
             - trestle_root (Optional[str]): Path of trestle root directory
+            - output_format (Optional[str]): pretty, compact or auto JSON
+            - workers (Optional[int]): Number of processes parsing markdown (optional)
 
     Returns:
         str: Success message with stdout, or error message with stderr details
@@ -75,8 +93,12 @@ async def trestle_author_profile_assemble(
     Examples:
         - Use when: Automatically assemble OSCAL profile from markdown directory
         - Use when: CI/CD profile assembling, parameter expansion
+        - Use when: Assembling a large markdown directory quickly (set workers)
         - Don't use when: Input markdown_dir does not exist, or malformed markdown
     """
+    if params.workers:
+        return await _assemble_parallel(params)
+
     args = ["author", "profile-assemble"]
 
     if params.name:
@@ -102,11 +124,59 @@ async def trestle_author_profile_assemble(
     if params.trestle_root:
         args.extend(["--trestle-root", params.trestle_root])
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ Profile assembled from markdown successfully\n\nOutput: {params.output_profile}\n\n{output}"
+        return success(
+            f"✅ Profile assembled from markdown successfully\n\nOutput: {params.output_profile}\n\n{output}",
+            outputs=[f"profiles/{params.output_profile}/profile.json"],
+        )
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to assemble profile from markdown\n\nMarkdownDir: {params.markdown_dir}\nError: {error}"
+        return failure(
+            f"❌ Failed to assemble profile from markdown\n\nMarkdownDir: {params.markdown_dir}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
+
+
+async def _assemble_parallel(params: TrestleAuthorProfileAssembleInput) -> str:
+    """Assemble the profile with the in-process engine parsing markdown in parallel."""
+    try:
+        result = await run_limited(
+            assemble_profile_markdown,
+            resolve_root(params.trestle_root),
+            params.markdown_dir,
+            params.output_profile,
+            name=params.name,
+            set_parameters=params.set_parameters,
+            regenerate=params.regenerate,
+            version=params.version,
+            sections=params.sections,
+            required_sections=params.required_sections,
+            allowed_sections=params.allowed_sections,
+            workers=params.workers,
+        )
+    except Exception as e:
+        return failure(
+            f"❌ Failed to assemble profile from markdown\n\nMarkdownDir: {params.markdown_dir}\nError: {e}",
+            str(e),
+        )
+
+    summary = (
+        f"Controls: {result['controls']} "
+        f"(workers: {result['workers']}, elapsed: {result['elapsed']:.2f}s)"
+    )
+    if not result["updated"]:
+        summary += (
+            "\nAssembled profile is no different from existing version, so no update."
+        )
+    warnings = "".join(f"\nWarning: {w}" for w in result["warnings"])
+    return success(
+        f"✅ Profile assembled from markdown successfully\n\nOutput: {params.output_profile}\n\n{summary}{warnings}",
+        outputs=[f"profiles/{params.output_profile}/profile.json"],
+        counts={"controls": result["controls"], "workers": result["workers"]},
+        elapsed=result["elapsed"],
+        warnings=result["warnings"],
+    )
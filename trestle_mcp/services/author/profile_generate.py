@@ -7,7 +7,19 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from trestle_mcp.libs.author import generate_profiles_markdown
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from trestle_mcp.libs.results import (
+    failure,
+    files_page,
+    output_files,
+    page_fields,
+    success,
+)
 from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
 
 
 class TrestleAuthorProfileGenerateInput(BaseModel):
@@ -38,7 +50,37 @@ class TrestleAuthorProfileGenerateInput(BaseModel):
     trestle_root: Optional[str] = Field(
         default=None, description="Path to trestle workspace root"
     )
+    idempotency_key: IdempotencyKey = None
     verbose: bool = Field(default=False, description="Display verbose output")
+    group_ids: Optional[list[str]] = Field(
+        default=None,
+        min_length=1,
+        description=(
+            "Generate only the controls of these groups, by id or glob "
+            "(e.g. ['ac', 'a*']); other markdown files are left untouched"
+        ),
+    )
+    control_ids: Optional[list[str]] = Field(
+        default=None,
+        min_length=1,
+        description=(
+            "Generate only these controls, by id or glob (e.g. ['ac-2', "
+            "'ac-2.*']); other markdown files are left untouched"
+        ),
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Cursor returned with the previous page of generated files: lists "
+            "the next page without generating again"
+        ),
+    )
+    limit: int = Field(
+        default=DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of generated files listed in the result",
+    )
 
 
 async def trestle_author_profile_generate(
@@ -61,15 +103,30 @@ async def trestle_author_profile_generate(
             - required_sections (Optional[str]): required section short names, comma-separated
             - trestle_root (Optional[str]): workspace root path
             - verbose (bool): verbose output
+            - group_ids (Optional[list[str]]): groups to generate, ids or globs
+            - control_ids (Optional[list[str]]): controls to generate, ids or globs
+            - cursor (Optional[str]): cursor of the page of generated files to list
+            - limit (int): maximum number of generated files listed (default: 50)
 
     Returns:
-        str: Success message or error details
+        str: Success message or error details, with the generated files as structured content
 
     Examples:
         - Use when: "Generate markdown controls for a given profile"
         - Use when: "Customize output with required sections or header overwrite"
+        - Use when: "Regenerate only the AC family" (set group_ids=["ac"])
         - Don't use when: Profile file does not exist
     """
+    if params.cursor:
+        return files_page(
+            resolve_root(params.trestle_root),
+            params.output,
+            params.cursor,
+            params.limit,
+        )
+    if params.group_ids or params.control_ids:
+        return await _generate_subset(params)
+
     args = ["author", "profile-generate"]
 
     # Required
@@ -91,11 +148,203 @@ async def trestle_author_profile_generate(
     if params.verbose:
         args.append("--verbose")
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ Profile-based markdown controls generated successfully\n\nOutput: {params.output}\n\n{output}"
+        files = output_files(resolve_root(params.trestle_root), params.output)
+        return success(
+            f"✅ Profile-based markdown controls generated successfully\n\nOutput: {params.output}\n\n{output}",
+            outputs=[params.output],
+            counts={"files": len(files)},
+            **page_fields(files, None, params.limit),
+        )
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to generate profile-based markdowns\n\nProfile: {params.name}\nError: {error}"
+        return failure(
+            f"❌ Failed to generate profile-based markdowns\n\nProfile: {params.name}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
+
+
+async def _generate_subset(params: TrestleAuthorProfileGenerateInput) -> str:
+    """Generate the markdown of some controls with the in-process engine.
+
+    The trestle CLI can only generate whole profiles: subsets always run here.
+    """
+    root = resolve_root(params.trestle_root)
+    try:
+        result = await run_limited(
+            generate_profiles_markdown,
+            root,
+            [(params.name, params.output)],
+            yaml_header=params.yaml_header,
+            force_overwrite=params.force_overwrite,
+            overwrite_header_values=params.overwrite_header_values,
+            sections=params.sections,
+            required_sections=params.required_sections,
+            group_ids=params.group_ids,
+            control_ids=params.control_ids,
+        )
+    except Exception as e:
+        result = {"profiles": [{"success": False, "error": str(e), "warnings": []}]}
+    profile = result["profiles"][0]
+    if not profile["success"]:
+        return failure(
+            f"❌ Failed to generate profile-based markdowns\n\nProfile: {params.name}\nError: {profile['error']}",
+            profile["error"],
+            warnings=profile["warnings"],
+        )
+
+    warnings = list(profile["warnings"])
+    if not profile["controls"]:
+        warnings.append("No control matches the group and control filters")
+    files = output_files(root, params.output)
+    return success(
+        f"✅ Profile-based markdown controls generated successfully\n\nOutput: {params.output}\n\n"
+        f"Controls: {profile['controls']} (elapsed: {result['elapsed']:.2f}s)"
+        + "".join(f"\nWarning: {w}" for w in warnings),
+        outputs=[params.output],
+        counts={"files": len(files), "controls": profile["controls"]},
+        elapsed=result["elapsed"],
+        warnings=warnings,
+        **page_fields(files, None, params.limit),
+    )
+
+
+class ProfileOutput(BaseModel):
+    """A profile and the directory its markdown is generated into."""
+
+    name: str = Field(
+        ..., description="Profile name to transform (profiles/<name>/profile.json)"
+    )
+    output: str = Field(..., description="Output directory for generated markdown")
+
+
+class TrestleAuthorProfileGenerateBatchInput(BaseModel):
+    """Input model for generating the markdown of several profiles at once."""
+
+    profiles: list[ProfileOutput] = Field(
+        ...,
+        min_length=1,
+        description="Profiles to transform with their output directory",
+    )
+    yaml_header: Optional[str] = Field(
+        default=None, description="YAML to insert as markdown header (optional)"
+    )
+    force_overwrite: bool = Field(
+        default=False, description="Overwrite all markdown files in output directories"
+    )
+    overwrite_header_values: bool = Field(
+        default=False,
+        description="Overwrite only YAML header values in markdown controls",
+    )
+    sections: Optional[str] = Field(
+        default=None,
+        description="Sections to split in each control markdown file (comma-separated)",
+    )
+    required_sections: Optional[str] = Field(
+        default=None,
+        description="Comma-separated section short names required in the output",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None, description="Path to trestle workspace root"
+    )
+    idempotency_key: IdempotencyKey = None
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Number of profiles generated in parallel (default: number of CPUs)",
+    )
+
+
+async def trestle_author_profile_generate_batch(
+    params: TrestleAuthorProfileGenerateBatchInput,
+) -> str:
+    """Generate markdown documentation sets for several profiles in one call.
+
+    This tool runs profile-generate for a list of (profile name, output directory)
+    pairs. Catalogs and profiles imported by several of them, such as a catalog
+    shared by low/moderate/high baselines, are parsed only once, and the markdown
+    sets are generated in parallel. Each set is identical to the one generated by
+    trestle_author_profile_generate.
+
+    Args:
+        params (TrestleAuthorProfileGenerateBatchInput):
+            - profiles (list[ProfileOutput]): profile name and output directory pairs (required)
+            - yaml_header (Optional[str]): yaml header file path
+            - force_overwrite (bool): overwrite all in each output dir
+            - overwrite_header_values (bool): overwrite header values only
+            - sections (Optional[str]): targeted sections in markdown
+            - required_sections (Optional[str]): required section short names, comma-separated
+            - trestle_root (Optional[str]): workspace root path
+            - workers (Optional[int]): profiles generated in parallel
+
+    Returns:
+        str: Per-profile results; success only if every profile was generated
+
+    Examples:
+        - Use when: "Generate markdown for the low, moderate and high baselines"
+        - Use when: "Regenerate every profile that imports the same catalog"
+        - Don't use when: Only one profile is needed (use trestle_author_profile_generate)
+    """
+    try:
+        result = await run_limited(
+            generate_profiles_markdown,
+            resolve_root(params.trestle_root),
+            [(p.name, p.output) for p in params.profiles],
+            yaml_header=params.yaml_header,
+            force_overwrite=params.force_overwrite,
+            overwrite_header_values=params.overwrite_header_values,
+            sections=params.sections,
+            required_sections=params.required_sections,
+            workers=params.workers,
+        )
+    except Exception as e:
+        return failure(
+            f"❌ Failed to generate profile-based markdowns\n\nError: {e}", str(e)
+        )
+
+    lines = []
+    for profile in result["profiles"]:
+        if profile["success"]:
+            lines.append(f"✅ {profile['name']}: {profile['output']}")
+        else:
+            lines.append(f"❌ {profile['name']}: {profile['error']}")
+        lines.extend(f"   Warning: {w}" for w in profile["warnings"])
+    failed = sum(not p["success"] for p in result["profiles"])
+    summary = (
+        f"Profiles: {len(result['profiles']) - failed} generated, {failed} failed "
+        f"(shared imports: {result['imports']}, workers: {result['workers']}, "
+        f"elapsed: {result['elapsed']:.2f}s)"
+    )
+    details = "\n".join(lines)
+    fields = {
+        "outputs": [p["output"] for p in result["profiles"] if p["success"]],
+        "counts": {
+            "generated": len(result["profiles"]) - failed,
+            "failed": failed,
+            "imports": result["imports"],
+            "workers": result["workers"],
+        },
+        "elapsed": result["elapsed"],
+        "warnings": [
+            f"{p['name']}: {w}" for p in result["profiles"] for w in p["warnings"]
+        ],
+        "items": [
+            {key: p[key] for key in ("name", "output", "success", "error")}
+            for p in result["profiles"]
+        ],
+        "total": len(result["profiles"]),
+    }
+    if failed:
+        return failure(
+            f"❌ Failed to generate some profile-based markdowns\n\n{summary}\n\n{details}",
+            f"{failed} profiles failed",
+            **fields,
+        )
+    return success(
+        f"✅ Profile-based markdown controls generated successfully\n\n{summary}\n\n{details}",
+        **fields,
+    )
@@ -7,7 +7,13 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.author import resolve_profile_controls
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.model_format import OutputFormat
+from trestle_mcp.libs.results import failure, success
 from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
 
 
 class TrestleAuthorProfileResolveInput(BaseModel):
@@ -41,6 +47,8 @@ class TrestleAuthorProfileResolveInput(BaseModel):
     trestle_root: Optional[str] = Field(
         None, description="Path to trestle root directory."
     )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
 
 
 async def trestle_author_profile_resolve(
@@ -63,6 +71,7 @@ async def trestle_author_profile_resolve(
             - label_prefix (str): Prefix for label output (optional)
             - verbose (bool): Display verbose output (optional)
             - trestle_root (str): Path to trestle root directory (optional)
+            - output_format (str): pretty, compact or auto JSON (optional)
 
     Returns:
         str: Result summary string. On success, a checked message with output. On failure, a cross mark and error details.
@@ -92,11 +101,146 @@ async def trestle_author_profile_resolve(
     if params.trestle_root:
         args.extend(["--trestle-root", params.trestle_root])
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ Catalog controls generated as markdown successfully\n\nOutput: {params.output}\n\n{output}"
+        return success(
+            f"✅ Catalog controls generated as markdown successfully\n\nOutput: {params.output}\n\n{output}",
+            outputs=[f"catalogs/{params.output}/catalog.json"],
+        )
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to generate catalog markdowns\n\nCatalog: {params.name}\nError: {error}"
+        return failure(
+            f"❌ Failed to generate catalog markdowns\n\nCatalog: {params.name}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
+
+
+class TrestleAuthorProfileResolveControlsInput(BaseModel):
+    """Input model for resolving some controls of a profile."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    name: str = Field(
+        ..., description="Name of the source profile model in the trestle workspace."
+    )
+    control_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Ids of the controls to resolve (e.g. ['ac-1', 'ac-2.1']).",
+    )
+    output: Optional[str] = Field(
+        None,
+        description="Name of a catalog to write the resolved controls to (optional).",
+    )
+    show_values: Optional[bool] = Field(
+        False, description="Show values for parameters in prose."
+    )
+    show_labels: Optional[bool] = Field(
+        False, description="Show labels for parameters in prose."
+    )
+    bracket_format: Optional[str] = Field(
+        None, description="Bracket format to wrap value (e.g. [.] or ((.)))."
+    )
+    value_assigned_prefix: Optional[str] = Field(
+        None, description="Prefix for parameter string if value assigned."
+    )
+    value_not_assigned_prefix: Optional[str] = Field(
+        None, description="Prefix for parameter string if value not assigned."
+    )
+    label_prefix: Optional[str] = Field(None, description="Prefix for parameter label.")
+    trestle_root: Optional[str] = Field(
+        None, description="Path to trestle root directory."
+    )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
+
+
+async def trestle_author_profile_resolve_controls(
+    params: TrestleAuthorProfileResolveControlsInput,
+) -> str:
+    """Resolve only some controls of an OSCAL profile.
+
+    This tool resolves the given controls of a profile (profiles/<name>/profile.json)
+    as trestle_author_profile_resolve would, without resolving the whole catalog.
+    Only the requested controls, their parent controls and the controls defining
+    the parameters they insert are resolved, so the cost follows the selection
+    rather than the size of the catalog. Each resolved control is identical to
+    the same control in the full resolved catalog. The controls are returned as
+    structured content, and written as a catalog when an output is given.
+
+    Args:
+        params (TrestleAuthorProfileResolveControlsInput):
+            - name (str): Source profile name (required)
+            - control_ids (list[str]): Controls to resolve (required)
+            - output (str): Catalog to write the resolved controls to (optional)
+            - show_values (bool): Show parameter values in prose (optional)
+            - show_labels (bool): Show parameter labels in prose (optional)
+            - bracket_format (str): Bracket format for values (optional)
+            - value_assigned_prefix (str): Prefix if value is assigned (optional)
+            - value_not_assigned_prefix (str): Prefix if value not assigned (optional)
+            - label_prefix (str): Prefix for label output (optional)
+            - trestle_root (str): Path to trestle root directory (optional)
+            - output_format (str): pretty, compact or auto JSON (optional)
+
+    Returns:
+        str: Success message listing the resolved controls, or error details.
+        Requested ids not in the resolved profile are reported as warnings.
+
+    Examples:
+        - Resolve two controls with their parameter values
+            trestle_author_profile_resolve_controls(name="myprofile", control_ids=["ac-1", "ac-2"], show_values=True)
+        - Don't use when: the whole catalog is needed (use trestle_author_profile_resolve)
+    """
+    try:
+        result = await run_limited(
+            resolve_profile_controls,
+            resolve_root(params.trestle_root),
+            params.name,
+            params.control_ids,
+            params.output,
+            show_values=params.show_values,
+            show_labels=params.show_labels,
+            bracket_format=params.bracket_format,
+            value_assigned_prefix=params.value_assigned_prefix,
+            value_not_assigned_prefix=params.value_not_assigned_prefix,
+            label_prefix=params.label_prefix,
+        )
+    except Exception as e:
+        result = {"error": str(e), "warnings": []}
+    if result["error"]:
+        return failure(
+            f"❌ Failed to resolve profile controls\n\nProfile: {params.name}\n"
+            f"Error: {result['error']}",
+            result["error"],
+            warnings=result["warnings"],
+        )
+
+    controls = result["controls"]
+    warnings = [
+        f"Control {i} not found in the resolved profile" for i in result["missing"]
+    ]
+    lines = [
+        f"{c['id']}: {c['title']}" + ("" if c["requested"] else " (needed)")
+        for c in controls
+    ]
+    written = params.output if params.output and controls else None
+    return success(
+        f"✅ Profile controls resolved\n\nProfile: {params.name}\n"
+        + (f"Output: {written}\n" if written else "")
+        + f"Resolved: {len(controls)} controls in {result['elapsed']:.2f}s\n\n"
+        + "\n".join(lines),
+        outputs=[f"catalogs/{written}/catalog.json"] if written else [],
+        counts={
+            "resolved": len(controls),
+            "requested": sum(c["requested"] for c in controls),
+            "missing": len(result["missing"]),
+        },
+        elapsed=result["elapsed"],
+        warnings=[*warnings, *result["warnings"]],
+        items=controls,
+        total=len(controls),
+    )
@@ -0,0 +1,131 @@
+"""Structural diff service.
+
+This module implements the comparison of two versions of an OSCAL model by
+identity of their controls, parameters, parts and other entities.
+"""
+
+from collections import Counter
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+from trestle.core.remote.security import PathSecurityValidator
+
+from trestle_mcp.libs.cache import file_key
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.diff import diff_files
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.workspace import workspaces
+
+CHANGE_SYMBOLS = {"added": "+", "removed": "-", "modified": "~"}
+
+
+class TrestleDiffInput(BaseModel):
+    """Input model for the structural diff of two model files."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    left: str = Field(
+        ..., description="Old version of the model file, relative to the trestle root"
+    )
+    right: str = Field(
+        ..., description="New version of the model file, relative to the trestle root"
+    )
+    cursor: Optional[str] = Field(
+        default=None, description="Cursor returned with the previous page of changes"
+    )
+    limit: int = Field(
+        default=DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of changes returned",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+def _format_change(change: dict) -> str:
+    line = f"{CHANGE_SYMBOLS[change['change']]} {change['kind']} {change['id']}"
+    line += f" ({change['path']})"
+    if change.get("fields"):
+        line += f": {', '.join(change['fields'])}"
+    return line
+
+
+async def trestle_diff(params: TrestleDiffInput) -> str:
+    """Compare two versions of an OSCAL model structurally.
+
+    This tool compares two model files (e.g. a profile before and after
+    trestle_author_profile_assemble) by identity: controls, groups, parts and
+    params are matched by id, other entities by uuid, whatever their position.
+    Unchanged subtrees are skipped using per-node hashes. The result is a
+    compact list of added (+), removed (-) and modified (~) entities, with the
+    fields that changed, returned one page at a time.
+
+    Args:
+        params (TrestleDiffInput):
+            - left (str): old version of the model file (required)
+            - right (str): new version of the model file (required)
+            - cursor (Optional[str]): cursor of the page to fetch
+            - limit (int): maximum number of changes returned (default: 50)
+            - trestle_root (Optional[str]): workspace root path
+
+    Returns:
+        str: Change counts and one line per change, with the cursor of the next page
+
+    Examples:
+        - Use when: "What did profile-assemble change in my profile?"
+        - Use when: "Compare the imported catalog with the previous version"
+        - Don't use when: Comparing files that are not OSCAL models
+    """
+    workspace = workspaces.get(params.trestle_root)
+    try:
+        left = (workspace.root / params.left).resolve()
+        right = (workspace.root / params.right).resolve()
+        for path in (left, right):
+            PathSecurityValidator.validate_local_path(path, workspace.root)
+            if not path.is_file():
+                raise FileNotFoundError(f"File {path} not found")
+
+        # keep the change list so further pages are not computed again
+        diffs = workspace.cache("diff", 16)
+        key = (file_key(left), file_key(right))
+        changes = diffs.get(key)
+        if changes is None:
+            changes = await run_limited(diff_files, left, right)
+            diffs.put(key, changes)
+        page, offset, next_cursor = paginate(changes, params.cursor, params.limit)
+    except Exception as e:
+        return failure(
+            f"❌ Failed to compare models\n\nLeft: {params.left}\nRight: {params.right}\nError: {e}",
+            str(e),
+        )
+
+    counts = Counter(change["change"] for change in changes)
+    summary = (
+        f"Changes: {len(changes)} (added: {counts['added']}, "
+        f"removed: {counts['removed']}, modified: {counts['modified']})"
+    )
+    fields = {
+        "counts": {"changes": len(changes), **counts},
+        "items": list(page),
+        "total": len(changes),
+        "next_cursor": next_cursor,
+    }
+    if not changes:
+        return success(
+            f"✅ Models compared\n\nLeft: {params.left}\nRight: {params.right}\n\n{summary}",
+            **fields,
+        )
+    lines = "\n".join(_format_change(change) for change in page)
+    shown = f"Showing {offset + 1}-{offset + len(page)} of {len(changes)}"
+    more = f"\n\nNext cursor: {next_cursor}" if next_cursor else ""
+    return success(
+        f"✅ Models compared\n\nLeft: {params.left}\nRight: {params.right}\n\n"
+        f"{summary}\n{shown}\n\n{lines}{more}",
+        **fields,
+    )
@@ -4,11 +4,17 @@ This module implements the OSCAL model import functionality.
 Note: Named 'import_model' because 'import' is a Python reserved keyword.
 """
 
+from pathlib import Path
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.model_format import OutputFormat
+from trestle_mcp.libs.results import failure, success
 from trestle_mcp.libs.trestle import run_trestle_command
+from trestle_mcp.libs.workspace import resolve_root
 
 
 class TrestleImportInput(BaseModel):
@@ -24,9 +30,25 @@ class TrestleImportInput(BaseModel):
     trestle_root: Optional[str] = Field(
         default=None, description="Path to trestle root directory"
     )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
     verbose: bool = Field(default=False, description="Display verbose output")
 
 
+def _imported_files(trestle_root: Path, output: str) -> list[str]:
+    """Return the model file written by an import, relative to the trestle root."""
+    # the model type is only known to trestle: the newest <type dir>/<output> file
+    files = [
+        path
+        for path in trestle_root.glob(f"*/{output}/*")
+        if path.is_file() and path.suffix in (".json", ".yaml", ".yml")
+    ]
+    if not files:
+        return []
+    newest = max(files, key=lambda path: path.stat().st_mtime_ns)
+    return [newest.relative_to(trestle_root).as_posix()]
+
+
 async def trestle_import(params: TrestleImportInput) -> str:
     """Import an existing OSCAL model into the trestle workspace.
 
@@ -46,6 +68,7 @@ async def trestle_import(params: TrestleImportInput) -> str:
             - output (str): Name of output element
             - regenerate (bool): Force generation of new UUIDs (default: false)
             - trestle_root (Optional[str]): Path to trestle root directory
+            - output_format (Optional[str]): pretty, compact or auto JSON
             - verbose (bool): Display verbose output (default: false)
 
     Returns:
@@ -71,11 +94,18 @@ async def trestle_import(params: TrestleImportInput) -> str:
     if params.verbose:
         args.append("--verbose")
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ OSCAL model imported successfully\n\nOutput: {params.output}\n\n{output}"
+        return success(
+            f"✅ OSCAL model imported successfully\n\nOutput: {params.output}\n\n{output}",
+            outputs=_imported_files(resolve_root(params.trestle_root), params.output),
+        )
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to import OSCAL model\n\nFile: {params.file}\nError: {error}"
+        return failure(
+            f"❌ Failed to import OSCAL model\n\nFile: {params.file}\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
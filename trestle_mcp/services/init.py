@@ -8,6 +8,9 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.results import failure, success
 from trestle_mcp.libs.trestle import run_trestle_command
 
 
@@ -32,6 +35,7 @@ class TrestleInitInput(BaseModel):
         default=None,
         description="Path to trestle root directory (default: current directory)",
     )
+    idempotency_key: IdempotencyKey = None
     verbose: bool = Field(default=False, description="Display verbose output")
 
 
@@ -81,11 +85,15 @@ async def trestle_init(params: TrestleInitInput) -> str:
     if params.verbose:
         args.append("--verbose")
 
-    result = run_trestle_command(args)
+    result = await run_limited(run_trestle_command, args)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return f"✅ Trestle workspace initialized successfully\n\n{output}"
+        return success(f"✅ Trestle workspace initialized successfully\n\n{output}")
     else:
         error = result["stderr"].strip()
-        return f"❌ Failed to initialize trestle workspace\n\nError: {error}"
+        return failure(
+            f"❌ Failed to initialize trestle workspace\n\nError: {error}",
+            error,
+            limit=result.get("limit"),
+        )
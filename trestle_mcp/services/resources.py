@@ -0,0 +1,178 @@
+"""Workspace model resources.
+
+This module implements the MCP resources exposing the models of the trestle
+workspace piece by piece: the controls of a catalog, read from a byte range
+index without parsing the catalog, the imports of a profile, and generated
+markdown controls, as well as the snapshots of the workspace, the status of
+profile watches and the execution metrics of the server. Unlike
+tools, resources report errors by raising.
+
+Resources have no trestle_root argument: they are read from the workspace of
+the last tool call of the client (``WorkspaceRegistry.bind()``), or from the
+current directory of the server before the client made one.
+"""
+
+import glob
+import json
+from pathlib import Path
+
+from trestle.core.remote.security import PathSecurityValidator
+
+from trestle_mcp.libs.concurrency import limiter, run_limited
+from trestle_mcp.libs.dependencies import href_path
+from trestle_mcp.libs.diff import load_document
+from trestle_mcp.libs.model_index import control_index, etag, read_range
+from trestle_mcp.libs.singleflight import flights
+from trestle_mcp.libs.snapshot import SnapshotStore
+from trestle_mcp.libs.watch import Watch, watches
+from trestle_mcp.libs.workspace import Workspace, current_workspace, workspaces
+
+
+def _workspace() -> Workspace:
+    return current_workspace.get() or workspaces.get(None)
+
+
+def _model_file(workspace: Workspace, *parts: str) -> Path:
+    path = workspace.root.joinpath(*parts).resolve()
+    PathSecurityValidator.validate_local_path(path, workspace.root)
+    if not path.is_file():
+        raise FileNotFoundError(f"{path.relative_to(workspace.root)} not found")
+    return path
+
+
+def _read_control(
+    workspace: Workspace, catalog: Path, control_id: str, rebuild: bool = False
+) -> str:
+    controls = control_index(workspace, catalog, rebuild)
+    if control_id not in controls:
+        raise KeyError(f"Control {control_id} not found in {catalog.parent.name}")
+    entry = controls[control_id]
+    data = read_range(catalog, entry["offset"], entry["length"])
+    if etag(data) != entry["etag"] and not rebuild:
+        # the catalog changed since it was indexed: index the new version
+        return _read_control(workspace, catalog, control_id, rebuild=True)
+    return data.decode("utf-8")
+
+
+async def catalog_controls(name: str) -> str:
+    """List the controls of a catalog: id, title, parent control, size and ETag.
+
+    Compare the ETags with the ones of controls already fetched to read again
+    only the controls that changed.
+    """
+    workspace = _workspace()
+    catalog = _model_file(workspace, "catalogs", name, "catalog.json")
+    controls = await run_limited(control_index, workspace, catalog)
+    return json.dumps(
+        [
+            {
+                "id": control_id,
+                "title": entry["title"],
+                "parent": entry["parent"],
+                "length": entry["length"],
+                "etag": entry["etag"],
+            }
+            for control_id, entry in controls.items()
+        ]
+    )
+
+
+async def catalog_control(name: str, control_id: str) -> str:
+    """Read one control of a catalog as JSON, enhancements included.
+
+    Only the bytes of the control are read from the catalog file.
+    """
+    workspace = _workspace()
+    catalog = _model_file(workspace, "catalogs", name, "catalog.json")
+    return await run_limited(_read_control, workspace, catalog, control_id)
+
+
+async def profile_imports(name: str) -> str:
+    """List the imports of a profile with the workspace file each href resolves to."""
+    workspace = _workspace()
+    profile = _model_file(workspace, "profiles", name, "profile.json")
+    document = await run_limited(load_document, profile)
+    imports = []
+    for entry in document.data.get("profile", {}).get("imports", []):
+        path = href_path(workspace.root, entry.get("href", ""))
+        imports.append(
+            {
+                **entry,
+                "path": (
+                    path.relative_to(workspace.root).as_posix()
+                    if path and path.is_relative_to(workspace.root)
+                    else None
+                ),
+            }
+        )
+    return json.dumps(imports)
+
+
+async def markdown_control(output: str, control_id: str) -> str:
+    """Read one generated markdown control of an output directory."""
+    workspace = _workspace()
+    directory = (workspace.root / output).resolve()
+    PathSecurityValidator.validate_local_path(directory, workspace.root)
+    matches = (
+        sorted(directory.rglob(f"{glob.escape(control_id)}.md"))
+        if directory.is_dir()
+        else []
+    )
+    if not matches:
+        raise FileNotFoundError(f"Control {control_id} not found in {output}")
+    return matches[0].read_text(encoding="utf-8")
+
+
+async def snapshot_list() -> str:
+    """List the snapshots of the workspace: name, creation time and files."""
+    store = SnapshotStore(_workspace().root)
+
+    def snapshots() -> list[dict]:
+        result = []
+        for snapshot_id in store.ids():
+            manifest = store.manifest(snapshot_id)
+            result.append(
+                {
+                    "snapshot": snapshot_id,
+                    "created": manifest["created"],
+                    "files": len(manifest["files"]),
+                    "methods": manifest["methods"],
+                }
+            )
+        return result
+
+    return json.dumps(await run_limited(snapshots))
+
+
+def _watch(workspace: Workspace, watch_id: str) -> Watch:
+    watch = watches.get(watch_id)
+    if watch.trestle_root != workspace.root:
+        raise KeyError(watch_id)
+    return watch
+
+
+async def watch_list() -> str:
+    """List the profile watches of the workspace with their state and last assembly."""
+    root = _workspace().root
+    return json.dumps([w.status() for w in watches.list() if w.trestle_root == root])
+
+
+async def watch_status(watch_id: str) -> str:
+    """Report the state of a profile watch and the result of its last assembly."""
+    return json.dumps(_watch(_workspace(), watch_id).status())
+
+
+async def server_metrics() -> str:
+    """Report the execution queues of the server.
+
+    Running and queued calls overall, per priority class (interactive, batch)
+    and per client, calls admitted and rejected, recent wait times, and calls
+    that shared the result of an identical call in flight.
+    """
+    return json.dumps(
+        {
+            **limiter.metrics(),
+            "in_flight": flights.in_flight(),
+            "coalesced": flights.coalesced,
+        }
+    )
@@ -0,0 +1,127 @@
+"""Control search service.
+
+This module implements the full-text search over the controls of the catalogs
+in the trestle workspace.
+"""
+
+import time
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.pagination import MAX_PAGE_SIZE, parse_cursor
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.search import workspace_index
+from trestle_mcp.libs.workspace import Workspace, workspaces
+
+DEFAULT_SEARCH_LIMIT = 10
+
+
+class TrestleSearchControlsInput(BaseModel):
+    """Input model for the search of controls."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    query: str = Field(
+        ..., min_length=1, description="Words to search, e.g. 'encryption at rest'"
+    )
+    catalogs: Optional[list[str]] = Field(
+        default=None,
+        description="Names of the catalogs to search (default: all catalogs)",
+    )
+    cursor: Optional[str] = Field(
+        default=None, description="Cursor returned with the previous page of matches"
+    )
+    limit: int = Field(
+        default=DEFAULT_SEARCH_LIMIT,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of matches returned",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+def _search(
+    workspace: Workspace, params: TrestleSearchControlsInput, offset: int
+) -> tuple:
+    index = workspace_index(workspace)
+    started = time.perf_counter()
+    total, matches = index.search(params.query, params.catalogs, offset, params.limit)
+    return total, matches, index.size(params.catalogs), time.perf_counter() - started
+
+
+async def trestle_search_controls(params: TrestleSearchControlsInput) -> str:
+    """Search the controls of the workspace catalogs by words of their prose.
+
+    This tool finds the controls whose title, statement, guidance or parameter
+    labels mention the query words, across every catalog of the workspace
+    (including catalogs written by trestle_author_profile_resolve) or the
+    selected ones. Matches are ranked by relevance (BM25, titles weigh most)
+    and returned one page at a time with a snippet of the matching prose. The
+    index is kept per workspace and only catalogs that changed are indexed again.
+
+    Args:
+        params (TrestleSearchControlsInput):
+            - query (str): words to search (required)
+            - catalogs (Optional[list[str]]): catalog names to search
+            - cursor (Optional[str]): cursor of the page to fetch
+            - limit (int): maximum number of matches returned (default: 10)
+            - trestle_root (Optional[str]): workspace root path
+
+    Returns:
+        str: Ranked matches with catalog, control id, title and snippet, with the
+        cursor of the next page
+
+    Examples:
+        - Use when: "Which controls mention encryption at rest?"
+        - Use when: "Find the account management controls of the moderate baseline"
+        - Don't use when: The control id is known (read trestle://catalogs/{name}/controls/{id})
+    """
+    workspace = workspaces.get(params.trestle_root)
+    try:
+        offset = parse_cursor(params.cursor)
+        total, matches, indexed, elapsed = await run_limited(
+            _search, workspace, params, offset
+        )
+    except Exception as e:
+        return failure(
+            f"❌ Failed to search controls\n\nQuery: {params.query}\nError: {e}", str(e)
+        )
+
+    next_cursor = str(offset + len(matches)) if offset + len(matches) < total else None
+    summary = (
+        f"Matches: {total} (controls indexed: {indexed}, "
+        f"elapsed: {elapsed * 1000:.1f}ms)"
+    )
+    fields = {
+        "counts": {"matches": total, "indexed": indexed},
+        "items": matches,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+    if not matches:
+        return success(
+            f"✅ No controls found\n\nQuery: {params.query}\n\n{summary}", **fields
+        )
+    lines = []
+    for rank, match in enumerate(matches, offset + 1):
+        lines.append(
+            f"{rank}. {match['catalog']}/{match['id']} {match['title']} "
+            f"(score: {match['score']:.2f})"
+        )
+        if match["snippet"]:
+            lines.append(f"   {match['snippet']}")
+    shown = f"Showing {offset + 1}-{offset + len(matches)} of {total}"
+    more = f"\n\nNext cursor: {next_cursor}" if next_cursor else ""
+    return success(
+        f"✅ Controls found\n\nQuery: {params.query}\n\n{summary}\n{shown}\n\n"
+        + "\n".join(lines)
+        + more,
+        **fields,
+    )
@@ -0,0 +1,184 @@
+"""Workspace snapshot services.
+
+This module implements the tools snapshotting a trestle workspace before a
+speculative change and bringing it back afterwards.
+"""
+
+import time
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.snapshot import SnapshotStore
+from trestle_mcp.libs.workspace import workspaces
+
+
+class TrestleSnapshotCreateInput(BaseModel):
+    """Input model for creating a workspace snapshot."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    snapshot: Optional[str] = Field(
+        default=None,
+        description="Name of the snapshot: letters, digits, '.', '_' and '-' "
+        "(default: creation time)",
+    )
+    mode: Literal["auto", "reflink", "hardlink", "copy"] = Field(
+        default="auto",
+        description="How files are cloned: 'auto' uses reflinks when the file "
+        "system supports them, then hard links, then copies",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+class TrestleSnapshotRestoreInput(BaseModel):
+    """Input model for restoring a workspace snapshot."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    snapshot: str = Field(..., description="Name of the snapshot")
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+class TrestleSnapshotDeleteInput(BaseModel):
+    """Input model for deleting a workspace snapshot."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    snapshot: str = Field(..., description="Name of the snapshot to delete")
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+async def trestle_snapshot_create(params: TrestleSnapshotCreateInput) -> str:
+    """Snapshot the trestle workspace before a speculative change.
+
+    This tool records every file of the workspace (except .git and the server
+    state) so that trestle_snapshot_restore can bring them back, for example
+    after trying profile-assemble with regenerate or catalog-generate with
+    force_overwrite. Files are cloned, not copied: reflinks where the file
+    system supports them, hard links otherwise, so a snapshot takes
+    milliseconds and almost no space. Files later written by trestle tools are
+    copied just before being written.
+
+    Args:
+        params (TrestleSnapshotCreateInput):
+            - snapshot (Optional[str]): Name of the snapshot (default: creation time)
+            - mode (str): "auto", "reflink", "hardlink" or "copy" (default: auto)
+            - trestle_root (Optional[str]): Path to trestle root directory
+
+    Returns:
+        str: Success message with the snapshot name, or error message
+
+    Examples:
+        - trestle_snapshot_create(snapshot="before-assemble")
+    """
+    store = SnapshotStore(workspaces.get(params.trestle_root).root)
+    started = time.perf_counter()
+    try:
+        manifest = await run_limited(store.create, params.snapshot, params.mode)
+    except Exception as e:
+        return failure(
+            f"❌ Failed to create snapshot\n\nSnapshot: {params.snapshot}\nError: {e}",
+            str(e),
+        )
+    elapsed = time.perf_counter() - started
+    methods = ", ".join(f"{m}: {n}" for m, n in sorted(manifest["methods"].items()))
+    files = len(manifest["files"])
+    return success(
+        f"✅ Snapshot created\n\nSnapshot: {manifest['id']}\n"
+        f"Files: {files}{f' ({methods})' if methods else ''}\n"
+        f"Elapsed: {elapsed * 1000:.1f}ms",
+        counts={"files": files, **manifest["methods"]},
+        items=[{"snapshot": manifest["id"]}],
+    )
+
+
+async def trestle_snapshot_restore(params: TrestleSnapshotRestoreInput) -> str:
+    """Bring the trestle workspace back to a snapshot.
+
+    This tool restores the files changed since trestle_snapshot_create and
+    removes the files created since. Unchanged files are not touched. The
+    snapshot is kept, so it can be restored again.
+
+    Args:
+        params (TrestleSnapshotRestoreInput):
+            - snapshot (str): Name of the snapshot (required)
+            - trestle_root (Optional[str]): Path to trestle root directory
+
+    Returns:
+        str: Success message with the restored and removed files, or error message
+
+    Examples:
+        - trestle_snapshot_restore(snapshot="before-assemble")
+    """
+    store = SnapshotStore(workspaces.get(params.trestle_root).root)
+    try:
+        report = await run_limited(store.restore, params.snapshot)
+    except KeyError:
+        error = f"Snapshot {params.snapshot} not found"
+        return failure(f"❌ Failed to restore snapshot\n\nError: {error}", error)
+    except Exception as e:
+        return failure(
+            f"❌ Failed to restore snapshot\n\nSnapshot: {params.snapshot}\nError: {e}",
+            str(e),
+        )
+    changes = [{"path": p, "action": "restored"} for p in report["restored"]]
+    changes += [{"path": p, "action": "removed"} for p in report["removed"]]
+    text = (
+        f"✅ Snapshot restored\n\nSnapshot: {params.snapshot}\n"
+        f"Restored: {len(report['restored'])}, removed: {len(report['removed'])}, "
+        f"unchanged: {len(report['unchanged'])}"
+    )
+    if changes:
+        text += "\n\n" + "\n".join(f"{c['action']}: {c['path']}" for c in changes[:50])
+    if len(changes) > 50:
+        text += f"\n... and {len(changes) - 50} more"
+    return success(
+        text,
+        counts={k: len(v) for k, v in report.items()},
+        items=changes,
+        warnings=[
+            f"{path} was modified in place after the snapshot"
+            for path in report["damaged"]
+        ],
+    )
+
+
+async def trestle_snapshot_delete(params: TrestleSnapshotDeleteInput) -> str:
+    """Delete a snapshot created by trestle_snapshot_create.
+
+    Args:
+        params (TrestleSnapshotDeleteInput):
+            - snapshot (str): Name of the snapshot (required)
+            - trestle_root (Optional[str]): Path to trestle root directory
+
+    Returns:
+        str: Success message, or error message
+    """
+    store = SnapshotStore(workspaces.get(params.trestle_root).root)
+    try:
+        await run_limited(store.delete, params.snapshot)
+    except KeyError:
+        error = f"Snapshot {params.snapshot} not found"
+        return failure(f"❌ Failed to delete snapshot\n\nError: {error}", error)
+    except Exception as e:
+        return failure(
+            f"❌ Failed to delete snapshot\n\nSnapshot: {params.snapshot}\nError: {e}",
+            str(e),
+        )
+    return success(f"✅ Snapshot deleted\n\nSnapshot: {params.snapshot}")
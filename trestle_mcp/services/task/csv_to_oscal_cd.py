@@ -10,6 +10,10 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.model_format import OutputFormat
+from trestle_mcp.libs.results import failure, success
 from trestle_mcp.libs.trestle import run_trestle_command
 
 
@@ -58,7 +62,7 @@ class TrestleTaskCsvToOscalCdInput(BaseModel):
         default=None,
         description=(
             "Optional mapping of column names to CSS classes, "
-            "e.g. {\"Rule_Id\": \"scc_class\"}. "
+            'e.g. {"Rule_Id": "scc_class"}. '
             "Each entry becomes class.<column-name> = <value> in the config."
         ),
     )
@@ -66,6 +70,8 @@ class TrestleTaskCsvToOscalCdInput(BaseModel):
         default=None,
         description="Path to trestle root directory (default: current directory)",
     )
+    output_format: OutputFormat = None
+    idempotency_key: IdempotencyKey = None
     verbose: bool = Field(default=False, description="Display verbose output")
 
 
@@ -96,6 +102,7 @@ async def trestle_task_csv_to_oscal_cd(params: TrestleTaskCsvToOscalCdInput) ->
             - validate_controls (str): Control validation mode: on/warn/off (default: off)
             - class_column_mappings (Optional[dict]): Column-to-class mappings (optional)
             - trestle_root (Optional[str]): Trestle workspace root path (optional)
+            - output_format (str): pretty, compact or auto JSON (optional)
             - verbose (bool): Display verbose output (optional)
 
     Returns:
@@ -138,19 +145,22 @@ async def trestle_task_csv_to_oscal_cd(params: TrestleTaskCsvToOscalCdInput) ->
         if params.verbose:
             args.append("--verbose")
 
-        result = run_trestle_command(args)
+        result = await run_limited(run_trestle_command, args)
     finally:
         Path(config_path).unlink(missing_ok=True)
 
     if result["success"]:
         output = result["stdout"].strip()
-        return (
+        return success(
             f"✅ CSV converted to OSCAL component definition successfully\n\n"
-            f"Output directory: {params.output_dir}\n\n{output}"
+            f"Output directory: {params.output_dir}\n\n{output}",
+            outputs=[f"{params.output_dir}/component-definition.json"],
         )
     else:
         error = result["stderr"].strip()
-        return (
+        return failure(
             f"❌ Failed to convert CSV to OSCAL component definition\n\n"
-            f"CSV file: {params.csv_file}\nError: {error}"
+            f"CSV file: {params.csv_file}\nError: {error}",
+            error,
+            limit=result.get("limit"),
         )
@@ -0,0 +1,167 @@
+"""Trestle validate command service.
+
+This module implements the validation of the models in the trestle workspace.
+"""
+
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from trestle_mcp.libs.concurrency import run_limited
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.validate import select_models, validate_models
+from trestle_mcp.libs.workspace import workspaces
+
+
+class ModelType(str, Enum):
+    """OSCAL model types stored in a trestle workspace."""
+
+    CATALOG = "catalog"
+    PROFILE = "profile"
+    COMPONENT_DEFINITION = "component-definition"
+    SYSTEM_SECURITY_PLAN = "system-security-plan"
+    ASSESSMENT_PLAN = "assessment-plan"
+    ASSESSMENT_RESULTS = "assessment-results"
+    PLAN_OF_ACTION_AND_MILESTONES = "plan-of-action-and-milestones"
+    MAPPING_COLLECTION = "mapping-collection"
+
+
+class TrestleValidateInput(BaseModel):
+    """Input model for trestle validate command."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    files: Optional[list[str]] = Field(
+        default=None,
+        description="Model files to validate, relative to the trestle root",
+    )
+    type: Optional[ModelType] = Field(
+        default=None, description="Validate only models of this type"
+    )
+    name: Optional[str] = Field(
+        default=None, description="Name of a single model to validate (with type)"
+    )
+    force: bool = Field(
+        default=False, description="Validate again models whose result is cached"
+    )
+    workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Number of processes validating in parallel (default: number of CPUs)",
+    )
+    cursor: Optional[str] = Field(
+        default=None, description="Cursor returned with the previous page of results"
+    )
+    limit: int = Field(
+        default=DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of model results returned",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None,
+        description="Path to trestle root directory (default: current directory)",
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+async def trestle_validate(params: TrestleValidateInput) -> str:
+    """Validate the OSCAL models of the trestle workspace.
+
+    This tool runs the validations of `trestle validate` (schema, duplicates,
+    references, links, catalog and rule parameters) on all models of the
+    workspace, on models of one type, or on selected files. Results are cached
+    per model, keyed by the content of the model and of everything it imports,
+    so only models that changed, or whose imports changed, are validated again.
+    Stale models are validated in parallel. Invalid models are listed first, one
+    page at a time; the next page comes from the cache.
+
+    Args:
+        params (TrestleValidateInput):
+            - files (Optional[list[str]]): model files relative to the trestle root
+            - type (Optional[ModelType]): validate models of this type only
+            - name (Optional[str]): single model name (with type)
+            - force (bool): ignore cached results
+            - workers (Optional[int]): parallel processes
+            - cursor (Optional[str]): cursor of the page of results to fetch
+            - limit (int): maximum number of model results returned (default: 50)
+            - trestle_root (Optional[str]): workspace root path
+
+    Returns:
+        str: Counts and one line per model (✅ valid / ❌ invalid with the reason),
+        with the cursor of the next page
+
+    Examples:
+        - Use when: "Check that every model in the workspace is valid"
+        - Use when: "Validate the profile I just edited"
+        - Don't use when: The directory is not a trestle workspace
+    """
+    if params.name and not params.type:
+        return failure(
+            "❌ Failed to validate models\n\nError: name requires type",
+            "name requires type",
+        )
+
+    workspace = workspaces.get(params.trestle_root)
+    try:
+        models = select_models(
+            workspace,
+            params.files,
+            params.type.value if params.type else None,
+            params.name,
+        )
+        result = await run_limited(
+            validate_models, workspace, models, params.force, params.workers
+        )
+        # invalid models first: they are what callers page through
+        results = sorted(result["results"], key=lambda model: model["valid"])
+        page, offset, next_cursor = paginate(results, params.cursor, params.limit)
+    except Exception as e:
+        return failure(f"❌ Failed to validate models\n\nError: {e}", str(e))
+
+    lines = []
+    for model in page:
+        cached = " (cached)" if model["cached"] else ""
+        if model["valid"]:
+            lines.append(f"✅ {model['path']}{cached}")
+        else:
+            lines.append(f"❌ {model['path']}{cached}: {model['error']}")
+    invalid = sum(not m["valid"] for m in results)
+    summary = (
+        f"Models: {len(results)}, invalid: {invalid} "
+        f"(validated: {result['validated']}, cached: {result['cached']}, "
+        f"workers: {result['workers']}, elapsed: {result['elapsed']:.2f}s)"
+    )
+    if results:
+        summary += f"\nShowing {offset + 1}-{offset + len(page)} of {len(results)}"
+    details = "\n".join(lines)
+    if next_cursor:
+        details += f"\n\nNext cursor: {next_cursor}"
+    fields = {
+        "counts": {
+            "models": len(results),
+            "invalid": invalid,
+            "validated": result["validated"],
+            "cached": result["cached"],
+            "workers": result["workers"],
+        },
+        "elapsed": result["elapsed"],
+        "warnings": [
+            f"{m['path']}: {w}" for m in results for w in m.get("warnings", [])
+        ],
+        "items": [
+            {key: m[key] for key in ("path", "valid", "error", "cached")} for m in page
+        ],
+        "total": len(results),
+        "next_cursor": next_cursor,
+    }
+    if invalid:
+        return failure(
+            f"❌ Validation failed\n\n{summary}\n\n{details}",
+            f"{invalid} invalid models",
+            **fields,
+        )
+    return success(f"✅ All models are valid\n\n{summary}\n\n{details}", **fields)
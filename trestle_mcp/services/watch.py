@@ -0,0 +1,181 @@
+"""Profile watch services.
+
+This module implements the tools starting and stopping watches that assemble
+a profile in the background whenever its markdown controls are edited.
+"""
+
+import asyncio
+import functools
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+from trestle.core.remote.security import PathSecurityValidator
+
+from trestle_mcp.libs.idempotency import IdempotencyKey
+from trestle_mcp.libs.results import failure, success
+from trestle_mcp.libs.snapshot import protect_outputs, run_locked
+from trestle_mcp.libs.watch import DEFAULT_DEBOUNCE, Watch, backend, watches
+from trestle_mcp.libs.workspace import workspaces
+from trestle_mcp.services.author.profile_assemble import (
+    TrestleAuthorProfileAssembleInput,
+    trestle_author_profile_assemble,
+)
+
+
+class TrestleWatchStartInput(BaseModel):
+    """Input model for starting a profile watch."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    markdown_dir: str = Field(
+        description="Directory containing the profile markdown controls."
+    )
+    output_profile: str = Field(
+        description="Output profile directory name (profiles/<output_profile>/profile.json)"
+    )
+    name: Optional[str] = Field(
+        default=None, description="Profile model name (optional)"
+    )
+    set_parameters: bool = Field(
+        default=False, description="Expand parameters in frontmatter (optional)"
+    )
+    version: Optional[str] = Field(
+        default=None, description="Profile version (optional)"
+    )
+    sections: Optional[str] = Field(
+        default=None, description="Sections short:long comma-separated (optional)"
+    )
+    required_sections: Optional[str] = Field(
+        default=None, description="Required section short names, comma-separated"
+    )
+    allowed_sections: Optional[str] = Field(
+        default=None, description="Allowed section short names, comma-separated"
+    )
+    debounce: float = Field(
+        default=DEFAULT_DEBOUNCE,
+        gt=0,
+        le=60,
+        description="Seconds without further edits before the profile is assembled",
+    )
+    trestle_root: Optional[str] = Field(
+        default=None, description="Path to trestle root dir"
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+class TrestleWatchStopInput(BaseModel):
+    """Input model for stopping a profile watch."""
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    watch_id: str = Field(description="Id returned when the watch was started")
+    trestle_root: Optional[str] = Field(
+        default=None, description="Path to trestle root dir"
+    )
+    idempotency_key: IdempotencyKey = None
+
+
+async def _assemble(root: Path, params: TrestleAuthorProfileAssembleInput) -> str:
+    # files shared with a snapshot get their own copy before being written
+    await asyncio.to_thread(protect_outputs, root, params)
+    # a manual assemble of the same profile waits for this one, and vice versa
+    return await run_locked(
+        workspaces.get(root), trestle_author_profile_assemble, params
+    )
+
+
+async def trestle_watch_start(params: TrestleWatchStartInput) -> str:
+    """Assemble a profile automatically whenever its markdown controls change.
+
+    This tool registers a watch on a markdown directory produced by
+    trestle_author_profile_generate. After each burst of edits, once no file
+    changed for `debounce` seconds, the profile is assembled in the background
+    as trestle_author_profile_assemble would, unless no markdown content really
+    changed. Starting a watch again for the same directory and profile replaces
+    it. The state of the watch and its last assembly are served by the
+    trestle://watches/{watch_id} resource.
+
+    Args:
+        params (TrestleWatchStartInput):
+            - markdown_dir (str): Markdown directory watched (required)
+            - output_profile (str): Profile assembled (required)
+            - name, set_parameters, version, sections, required_sections,
+              allowed_sections: Options of profile-assemble (optional)
+            - debounce (float): Seconds without edits before assembling (default: 1)
+            - trestle_root (str): Path to trestle root dir (optional)
+
+    Returns:
+        str: Success message with the watch id, or error message
+
+    Examples:
+        - Assemble profiles/my_prof on every edit of markdown/my_prof
+            trestle_watch_start(markdown_dir="markdown/my_prof", output_profile="my_prof")
+    """
+    root = workspaces.get(params.trestle_root).root
+    directory = (root / params.markdown_dir).resolve()
+    try:
+        PathSecurityValidator.validate_local_path(directory, root)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Directory {params.markdown_dir} not found")
+    except Exception as e:
+        return failure(
+            f"❌ Failed to start watch\n\nMarkdownDir: {params.markdown_dir}\nError: {e}",
+            str(e),
+        )
+
+    assemble = TrestleAuthorProfileAssembleInput(
+        markdown_dir=params.markdown_dir,
+        output_profile=params.output_profile,
+        name=params.name,
+        set_parameters=params.set_parameters,
+        version=params.version,
+        sections=params.sections,
+        required_sections=params.required_sections,
+        allowed_sections=params.allowed_sections,
+        trestle_root=params.trestle_root,
+    )
+    watch_id = watches.watch_id(root, params.markdown_dir, params.output_profile)
+    watch = await watches.start(
+        Watch(
+            watch_id,
+            root,
+            params.markdown_dir,
+            params.output_profile,
+            functools.partial(_assemble, root, assemble),
+            params.debounce,
+        )
+    )
+    return success(
+        f"✅ Watch started\n\nWatch: {watch.id}\nMarkdownDir: {params.markdown_dir}\n"
+        f"Output: {params.output_profile}\nBackend: {backend()}\n"
+        f"Status: trestle://watches/{watch.id}",
+        items=[watch.status()],
+    )
+
+
+async def trestle_watch_stop(params: TrestleWatchStopInput) -> str:
+    """Stop a watch started by trestle_watch_start in the same workspace.
+
+    Args:
+        params (TrestleWatchStopInput):
+            - watch_id (str): Id returned by trestle_watch_start (required)
+            - trestle_root (str): Path to trestle root dir (optional)
+
+    Returns:
+        str: Success message with the number of assemblies run, or error message
+    """
+    root = workspaces.get(params.trestle_root).root
+    try:
+        # the watches of other workspaces are not visible to this one
+        if watches.get(params.watch_id).trestle_root != root:
+            raise KeyError(params.watch_id)
+        watch = await watches.stop(params.watch_id)
+    except KeyError:
+        error = f"Watch {params.watch_id} not found"
+        return failure(f"❌ Failed to stop watch\n\nError: {error}", error)
+    return success(
+        f"✅ Watch stopped\n\nWatch: {watch.id}\nAssemblies: {watch.runs}",
+        counts={"runs": watch.runs, "skipped": watch.skipped},
+        items=[watch.status()],
+    )